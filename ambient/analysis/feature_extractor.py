@@ -8,10 +8,11 @@ Author: AlexPose Team
 """
 
 import numpy as np
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 from loguru import logger
 
 from ambient.core.frame import FrameSequence
+from ambient.core.pose_sequence import poses_to_array
 
 
 class FeatureExtractor:
@@ -95,7 +96,7 @@ class FeatureExtractor:
             return {}
         
         # Convert pose sequence to numpy arrays
-        keypoints_array = self._poses_to_array(pose_sequence)
+        keypoints_array = poses_to_array(pose_sequence)
         
         if keypoints_array is None or keypoints_array.size == 0:
             return {}
@@ -127,37 +128,6 @@ class FeatureExtractor:
         
         return features
     
-    def _poses_to_array(self, pose_sequence: List[Dict[str, Any]]) -> Optional[np.ndarray]:
-        """Convert pose sequence to numpy array."""
-        if not pose_sequence:
-            return None
-        
-        # Get keypoints from first valid pose to determine structure
-        keypoints_data = None
-        for pose in pose_sequence:
-            if pose.get("keypoints"):
-                keypoints_data = pose["keypoints"]
-                break
-        
-        if not keypoints_data:
-            return None
-        
-        num_keypoints = len(keypoints_data)
-        num_frames = len(pose_sequence)
-        
-        # Create array: [frames, keypoints, (x, y, confidence)]
-        keypoints_array = np.zeros((num_frames, num_keypoints, 3))
-        
-        for frame_idx, pose in enumerate(pose_sequence):
-            keypoints = pose.get("keypoints", [])
-            for kp_idx, kp in enumerate(keypoints):
-                if kp_idx < num_keypoints:
-                    keypoints_array[frame_idx, kp_idx, 0] = kp.get("x", 0)
-                    keypoints_array[frame_idx, kp_idx, 1] = kp.get("y", 0)
-                    keypoints_array[frame_idx, kp_idx, 2] = kp.get("confidence", 0)
-        
-        return keypoints_array
-    
     def _extract_kinematic_features(self, keypoints: np.ndarray) -> Dict[str, Any]:
         """Extract kinematic features (positions, velocities, accelerations)."""
         features = {}
@@ -62,6 +62,7 @@ except ImportError:
 
 from ambient.core.interfaces import IAnalyzer, IConfigurationManager, IOutputManager, IGaitAnalyzer
 from ambient.core.frame import Frame, FrameSequence
+from ambient.core.pose_sequence import PoseSequence, poses_to_array
 from ambient.exceptions import AmbientError
 from ambient.analysis.feature_extractor import FeatureExtractor
 from ambient.analysis.temporal_analyzer import TemporalAnalyzer
@@ -737,22 +738,25 @@ class EnhancedGaitAnalyzer(IGaitAnalyzer):
     
     def analyze_gait_sequence(
         self, 
-        pose_sequence: List[Dict[str, Any]], 
+        pose_sequence: Union[PoseSequence, List[Dict[str, Any]]], 
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Analyze gait patterns from pose sequence.
         
         Args:
-            pose_sequence: List of pose estimation results
+            pose_sequence: PoseSequence or list of pose estimation results
             metadata: Optional metadata about the sequence
             
         Returns:
             Dictionary containing comprehensive gait analysis results
         """
-        if not pose_sequence:
+        if pose_sequence is None or len(pose_sequence) == 0:
             return {"error": "Empty pose sequence"}
         
+        # Convert once; the feature, temporal and symmetry analyzers share the array
+        pose_sequence = PoseSequence.coerce(pose_sequence)
+        
         analysis_results = {
             "metadata": metadata or {},
             "sequence_info": {
@@ -779,7 +783,7 @@ class EnhancedGaitAnalyzer(IGaitAnalyzer):
                 analysis_results["timing_analysis"] = timing_analysis
                 
                 # Convert poses to array for phase analysis
-                keypoints_array = self._poses_to_array(pose_sequence)
+                keypoints_array = poses_to_array(pose_sequence)
                 if keypoints_array is not None:
                     phase_features = self.temporal_analyzer.extract_phase_features(cycles, keypoints_array)
                     analysis_results["phase_features"] = phase_features
@@ -831,37 +835,6 @@ class EnhancedGaitAnalyzer(IGaitAnalyzer):
         """
         return self.temporal_analyzer.detect_gait_cycles(pose_sequence)
     
-    def _poses_to_array(self, pose_sequence: List[Dict[str, Any]]) -> Optional[np.ndarray]:
-        """Convert pose sequence to numpy array."""
-        if not pose_sequence:
-            return None
-        
-        # Get keypoints from first valid pose
-        keypoints_data = None
-        for pose in pose_sequence:
-            if pose.get("keypoints"):
-                keypoints_data = pose["keypoints"]
-                break
-        
-        if not keypoints_data:
-            return None
-        
-        num_keypoints = len(keypoints_data)
-        num_frames = len(pose_sequence)
-        
-        # Create array: [frames, keypoints, (x, y, confidence)]
-        keypoints_array = np.zeros((num_frames, num_keypoints, 3))
-        
-        for frame_idx, pose in enumerate(pose_sequence):
-            keypoints = pose.get("keypoints", [])
-            for kp_idx, kp in enumerate(keypoints):
-                if kp_idx < num_keypoints:
-                    keypoints_array[frame_idx, kp_idx, 0] = kp.get("x", 0)
-                    keypoints_array[frame_idx, kp_idx, 1] = kp.get("y", 0)
-                    keypoints_array[frame_idx, kp_idx, 2] = kp.get("confidence", 0)
-        
-        return keypoints_array
-    
     def _generate_summary_assessment(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate summary assessment from analysis results."""
         summary = {
@@ -8,10 +8,11 @@ Author: AlexPose Team
 """
 
 import numpy as np
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 from loguru import logger
 
 from ambient.core.frame import FrameSequence
+from ambient.core.pose_sequence import PoseSequence, poses_to_array
 
 
 class TemporalAnalyzer:
@@ -27,7 +28,8 @@ class TemporalAnalyzer:
         fps: float = 30.0,
         min_cycle_duration: float = 0.8,  # seconds
         max_cycle_duration: float = 2.5,  # seconds
-        detection_method: str = "heel_strike"
+        detection_method: str = "heel_strike",
+        interpolated_weight: float = 0.5
     ):
         """
         Initialize temporal analyzer.
@@ -37,11 +39,14 @@ class TemporalAnalyzer:
             min_cycle_duration: Minimum gait cycle duration in seconds
             max_cycle_duration: Maximum gait cycle duration in seconds
             detection_method: Method for cycle detection ("heel_strike", "toe_off", "combined")
+            interpolated_weight: Weight of an interpolated frame relative to an
+                estimated one when averaging cycle statistics
         """
         self.fps = fps
         self.min_cycle_duration = min_cycle_duration
         self.max_cycle_duration = max_cycle_duration
         self.detection_method = detection_method
+        self.interpolated_weight = interpolated_weight
         
         # Convert durations to frames
         self.min_cycle_frames = int(min_cycle_duration * fps)
@@ -63,7 +68,8 @@ class TemporalAnalyzer:
             return []
         
         # Convert poses to array format
-        keypoints_array = self._poses_to_array(pose_sequence)
+        poses = PoseSequence.coerce(pose_sequence)
+        keypoints_array = poses_to_array(poses)
         if keypoints_array is None:
             return []
         
@@ -85,43 +91,21 @@ class TemporalAnalyzer:
                 cycle["cycle_id"] = i
                 cycle["duration_seconds"] = cycle["duration_frames"] / self.fps
                 cycle["detection_method"] = self.detection_method
+                self._weight_cycle(cycle, poses.interpolated)
             
         except Exception as e:
             logger.error(f"Gait cycle detection failed: {e}")
         
         return cycles
     
-    def _poses_to_array(self, pose_sequence: List[Dict[str, Any]]) -> Optional[np.ndarray]:
-        """Convert pose sequence to numpy array."""
-        if not pose_sequence:
-            return None
-        
-        # Get keypoints from first valid pose
-        keypoints_data = None
-        for pose in pose_sequence:
-            if pose.get("keypoints"):
-                keypoints_data = pose["keypoints"]
-                break
-        
-        if not keypoints_data:
-            return None
-        
-        num_keypoints = len(keypoints_data)
-        num_frames = len(pose_sequence)
-        
-        # Create array: [frames, keypoints, (x, y, confidence)]
-        keypoints_array = np.zeros((num_frames, num_keypoints, 3))
-        
-        for frame_idx, pose in enumerate(pose_sequence):
-            keypoints = pose.get("keypoints", [])
-            for kp_idx, kp in enumerate(keypoints):
-                if kp_idx < num_keypoints:
-                    keypoints_array[frame_idx, kp_idx, 0] = kp.get("x", 0)
-                    keypoints_array[frame_idx, kp_idx, 1] = kp.get("y", 0)
-                    keypoints_array[frame_idx, kp_idx, 2] = kp.get("confidence", 0)
-        
-        return keypoints_array
-    
+    def _weight_cycle(self, cycle: Dict[str, Any], interpolated: np.ndarray) -> None:
+        """Weight a cycle by the share of its frames that were interpolated."""
+        frames = interpolated[cycle["start_frame"]:cycle["end_frame"] + 1]
+        count = int(frames.sum())
+        cycle["interpolated_frames"] = count
+        fraction = count / len(frames) if len(frames) else 0.0
+        cycle["weight"] = 1.0 - (1.0 - self.interpolated_weight) * fraction
+
     def _detect_cycles_heel_strike(self, keypoints: np.ndarray) -> List[Dict[str, Any]]:
         """Detect gait cycles using heel strike events."""
         cycles = []
@@ -285,25 +269,30 @@ class TemporalAnalyzer:
         # Analyze cycle durations
         all_durations = [c["duration_seconds"] for c in cycles]
         if all_durations:
-            analysis["cycle_duration_mean"] = np.mean(all_durations)
-            analysis["cycle_duration_std"] = np.std(all_durations)
-            analysis["cycle_duration_cv"] = np.std(all_durations) / np.mean(all_durations)
+            mean, std = self._weighted_stats(cycles)
+            analysis["cycle_duration_mean"] = mean
+            analysis["cycle_duration_std"] = std
+            analysis["cycle_duration_cv"] = std / mean
             analysis["cycle_duration_range"] = np.max(all_durations) - np.min(all_durations)
         
         # Analyze left foot cycles
         if left_cycles:
-            left_durations = [c["duration_seconds"] for c in left_cycles]
-            analysis["left_cycle_duration_mean"] = np.mean(left_durations)
-            analysis["left_cycle_duration_std"] = np.std(left_durations)
+            mean, std = self._weighted_stats(left_cycles)
+            analysis["left_cycle_duration_mean"] = mean
+            analysis["left_cycle_duration_std"] = std
             analysis["left_cycle_count"] = len(left_cycles)
         
         # Analyze right foot cycles
         if right_cycles:
-            right_durations = [c["duration_seconds"] for c in right_cycles]
-            analysis["right_cycle_duration_mean"] = np.mean(right_durations)
-            analysis["right_cycle_duration_std"] = np.std(right_durations)
+            mean, std = self._weighted_stats(right_cycles)
+            analysis["right_cycle_duration_mean"] = mean
+            analysis["right_cycle_duration_std"] = std
             analysis["right_cycle_count"] = len(right_cycles)
         
+        interpolated = sum(c.get("interpolated_frames", 0) for c in cycles)
+        if interpolated:
+            analysis["interpolated_frame_count"] = interpolated
+        
         # Calculate asymmetry
         if left_cycles and right_cycles:
             left_mean = analysis["left_cycle_duration_mean"]
@@ -331,6 +320,15 @@ class TemporalAnalyzer:
         
         return analysis
     
+    def _weighted_stats(self, cycles: List[Dict[str, Any]]) -> Tuple[float, float]:
+        """Mean and standard deviation of cycle durations, weighted by cycle weight."""
+        durations = np.array([c["duration_seconds"] for c in cycles])
+        weights = np.array([c.get("weight", 1.0) for c in cycles])
+        if np.all(weights == 1.0) or weights.sum() <= 0:
+            return np.mean(durations), np.std(durations)
+        mean = np.average(durations, weights=weights)
+        return mean, np.sqrt(np.average((durations - mean) ** 2, weights=weights))
+    
     def extract_phase_features(self, cycles: List[Dict[str, Any]], keypoints: np.ndarray) -> Dict[str, Any]:
         """
         Extract features for different phases of gait cycles.
@@ -417,7 +415,7 @@ class TemporalAnalyzer:
             "right_toe_off": []
         }
         
-        keypoints_array = self._poses_to_array(pose_sequence)
+        keypoints_array = poses_to_array(pose_sequence)
         if keypoints_array is None:
             return events
         
@@ -19,6 +19,7 @@ from .data_models import (
     ConditionPrediction, ClassificationResult, VideoMetadata, ProcessingMetadata,
     GaitCycle, AnalysisResult, TrainingDataSample, DatasetInfo
 )
+from .pose_sequence import PoseSequence, PoseSequenceError
 
 __all__ = [
     # Interfaces
@@ -45,4 +46,6 @@ __all__ = [
     "AnalysisResult",
     "TrainingDataSample",
     "DatasetInfo",
+    "PoseSequence",
+    "PoseSequenceError",
 ]
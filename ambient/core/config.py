@@ -15,7 +15,7 @@ Author: AlexPose Team
 """
 
 import os
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
@@ -46,6 +46,34 @@ class PoseEstimatorConfig:
     model_name: Optional[str] = None
     device: Optional[str] = None
     detector: Optional[str] = None
+    confidence_threshold: Optional[float] = None
+    persistent_worker: Optional[bool] = None  # AlphaPose: keep models loaded in one worker process
+    input_size: Optional[int] = None  # Longest frame side the model consumes; frames are decoded at this size
+    runtime: Optional[str] = None  # YOLO inference runtime: "torch", "onnx" or "openvino"
+    num_threads: Optional[int] = None  # Intra-op threads of the onnx/openvino runtime
+    keyframe_estimation: Optional[Dict[str, Any]] = None  # KeyframePoseEstimator settings; None estimates every frame
+    roi_tracking: Optional[Dict[str, Any]] = None  # ROITrackingEstimator settings; None estimates full frames
+    
+    def to_estimator_config(self) -> Dict[str, Any]:
+        """
+        Get the settings as a PoseEstimatorFactory.create_estimator config.
+        
+        Returns:
+            Dictionary of the fields that are set, except enabled
+        """
+        return {
+            name: value for name, value in asdict(self).items()
+            if name != "enabled" and value is not None
+        }
+
+
+@dataclass
+class PoseEstimatorPoolConfig:
+    """Server-wide pose estimator pool configuration."""
+    max_instances_per_type: int = 2
+    idle_timeout_seconds: Optional[float] = 600.0  # None keeps idle estimators loaded
+    acquire_timeout_seconds: Optional[float] = None  # None waits for a free estimator
+    warm_up: List[str] = field(default_factory=list)  # Estimators loaded at server startup
 
 
 @dataclass
@@ -54,6 +82,7 @@ class PoseEstimationConfig:
     estimators: Dict[str, PoseEstimatorConfig] = field(default_factory=dict)
     default_estimator: str = "mediapipe"
     confidence_threshold: float = 0.5
+    pool: PoseEstimatorPoolConfig = field(default_factory=PoseEstimatorPoolConfig)
 
 
 @dataclass
@@ -527,13 +556,27 @@ class ConfigurationManager(IConfigurationManager):
                         net_resolution=est_config.get("net_resolution"),
                         model_name=est_config.get("model_name"),
                         device=est_config.get("device"),
-                        detector=est_config.get("detector")
+                        detector=est_config.get("detector"),
+                        confidence_threshold=est_config.get("confidence_threshold"),
+                        persistent_worker=est_config.get("persistent_worker"),
+                        input_size=est_config.get("input_size"),
+                        runtime=est_config.get("runtime"),
+                        num_threads=est_config.get("num_threads"),
+                        keyframe_estimation=est_config.get("keyframe_estimation"),
+                        roi_tracking=est_config.get("roi_tracking")
                     )
                 
+                pool_config = pe_config.get("pool", {})
                 self.config.pose_estimation = PoseEstimationConfig(
                     estimators=estimators,
                     default_estimator=pe_config.get("default_estimator", "mediapipe"),
-                    confidence_threshold=pe_config.get("confidence_threshold", 0.5)
+                    confidence_threshold=pe_config.get("confidence_threshold", 0.5),
+                    pool=PoseEstimatorPoolConfig(
+                        max_instances_per_type=pool_config.get("max_instances_per_type", 2),
+                        idle_timeout_seconds=pool_config.get("idle_timeout_seconds", 600.0),
+                        acquire_timeout_seconds=pool_config.get("acquire_timeout_seconds"),
+                        warm_up=list(pool_config.get("warm_up", []))
+                    )
                 )
             
             # Classification
@@ -909,6 +952,9 @@ class ConfigurationManager(IConfigurationManager):
             if config.device and config.device not in ["auto", "cpu", "cuda", "mps"]:
                 warnings.append(f"Unknown device '{config.device}' for {name}")
         
+        if config.input_size is not None and (not isinstance(config.input_size, int) or config.input_size <= 0):
+            errors.append(f"{name} input_size must be a positive integer, got {config.input_size}")
+        
         # Validate confidence thresholds
         for attr in ["min_detection_confidence", "min_tracking_confidence"]:
             value = getattr(config, attr, None)
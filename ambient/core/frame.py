@@ -7,7 +7,8 @@ supporting multiple data sources and formats with lazy loading and memory manage
 Key Features:
 - Multiple data source support (files, videos, URLs, numpy arrays)
 - Lazy loading for memory efficiency
-- Format conversion (RGB, BGR, grayscale)
+- Format conversion (RGB, BGR, grayscale), memoized per frame
+- Copy-on-write sharing of pixel data, exposed as read-only views
 - Metadata support and error handling
 - FFmpeg with OpenCV fallback for video processing
 
@@ -21,9 +22,9 @@ import tempfile
 import threading
 import time
 import weakref
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import psutil
@@ -44,23 +45,75 @@ try:
 except ImportError:
     requests = None
 
+from ambient.utils.frame_store import DecodedFrameStore, FrameStoreError, open_frame_store
+from ambient.utils.parallel_decode import ParallelDecodeError, fill_frame_store_parallel
+from ambient.utils.prefetch import BackgroundPrefetcher
+from ambient.utils.seek_index import get_seek_index, seek_capture
+from ambient.utils.video_metadata import VideoMetadataError, executable_available, get_video_metadata
+from ambient.utils.video_decoder import (
+    FFMPEG_MODES,
+    RAWPIPE_MODE,
+    TENSOR_COLORS,
+    DecodeGeometry,
+    VideoDecoderError,
+    VideoDecoderSession,
+    convert_frame_into,
+    ffmpeg_on_path,
+    probe_frame_size,
+    read_frame_ffmpeg_raw,
+    sample_frame_indices,
+)
+
+
+_BYTES_PER_MB = 1024 * 1024
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """Read-only view of an array; the array itself stays writable."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
 
 class FrameError(Exception):
     """Exception raised for Frame-related errors."""
     pass
 
 
+class _LRUEntry:
+    """Bookkeeping for one loaded frame in the memory manager LRU."""
+    
+    __slots__ = ('frame', 'nbytes', 'load_time')
+    
+    def __init__(self, frame: 'Frame', nbytes: int):
+        self.frame = frame
+        self.nbytes = nbytes
+        self.load_time = time.time()
+
+
 class MemoryManager:
     """
     Global memory manager for Frame objects with LRU cache and automatic cleanup.
     
     This singleton class manages memory usage across all Frame objects,
     providing automatic cleanup when memory usage exceeds thresholds.
+    
+    Loaded frames are kept in a byte-accounted LRU with a running total, so
+    inserts and evictions are O(1). Cache hits never take the lock: they are
+    appended to a promotion queue that is applied to the LRU order in batches
+    by whichever thread next holds the lock. System memory is checked on the
+    insert path at most once per ``system_check_interval`` seconds instead of
+    by a polling thread.
     """
     
     _instance = None
     _lock = threading.Lock()
     
+    # Pending promotions applied opportunistically from the hit path, and
+    # with a blocking acquire once this many are queued so the queue is bounded
+    _PROMOTION_BATCH = 64
+    _PROMOTION_LIMIT = 4096
+    
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -74,16 +127,27 @@ class MemoryManager:
             return
         
         self._initialized = True
-        self._loaded_frames = OrderedDict()  # LRU cache of loaded frames
+        self._loaded_frames: "OrderedDict[int, _LRUEntry]" = OrderedDict()  # LRU cache of loaded frames
         self._frame_registry = weakref.WeakSet()  # All frame instances
         self._memory_threshold_mb = 1024  # 1GB default threshold
         self._max_loaded_frames = 100  # Maximum frames to keep loaded
         self._cleanup_lock = threading.Lock()
         self._monitoring_enabled = True
         
-        # Start memory monitoring thread
-        self._monitor_thread = threading.Thread(target=self._memory_monitor, daemon=True)
-        self._monitor_thread.start()
+        # Running byte total of all entries in _loaded_frames
+        self._total_bytes = 0
+        
+        # Lock-free hit path: deque appends are atomic
+        self._pending_promotions: deque = deque()
+        
+        # Statistics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        
+        # Rate-limited system memory check, replacing the polling thread
+        self.system_check_interval = 5.0
+        self._last_system_check = 0.0
     
     def register_frame(self, frame: 'Frame') -> None:
         """Register a frame instance for memory management."""
@@ -92,28 +156,68 @@ class MemoryManager:
     def mark_frame_loaded(self, frame: 'Frame', data_size_mb: float) -> None:
         """Mark a frame as loaded and add to LRU cache."""
         frame_id = id(frame)
+        nbytes = int(round(data_size_mb * _BYTES_PER_MB))
         
         with self._cleanup_lock:
-            # Remove if already exists (to update position)
-            if frame_id in self._loaded_frames:
-                del self._loaded_frames[frame_id]
+            self._apply_promotions()
             
-            # Add to end (most recently used)
-            self._loaded_frames[frame_id] = {
-                'frame': frame,
-                'size_mb': data_size_mb,
-                'load_time': time.time()
-            }
+            entry = self._loaded_frames.get(frame_id)
+            if entry is not None:
+                # Reloaded or resized while tracked: update in place
+                self._total_bytes += nbytes - entry.nbytes
+                entry.nbytes = nbytes
+                entry.load_time = time.time()
+                self._loaded_frames.move_to_end(frame_id)
+            else:
+                self._loaded_frames[frame_id] = _LRUEntry(frame, nbytes)
+                self._total_bytes += nbytes
+                self._misses += 1
             
             # Check if we need to cleanup
             self._check_memory_limits()
     
+    def touch_frame(self, frame: 'Frame') -> None:
+        """
+        Record a cache hit on an already loaded frame.
+        
+        The LRU position is updated lazily; the lock is only taken, without
+        blocking, once enough promotions have queued up. If the lock stays
+        busy until the queue reaches ``_PROMOTION_LIMIT``, the hit waits for
+        it and drains the queue.
+        """
+        pending = self._pending_promotions
+        pending.append(id(frame))
+        
+        queued = len(pending)
+        if queued >= self._PROMOTION_LIMIT:
+            with self._cleanup_lock:
+                self._apply_promotions()
+        elif queued >= self._PROMOTION_BATCH and self._cleanup_lock.acquire(blocking=False):
+            try:
+                self._apply_promotions()
+            finally:
+                self._cleanup_lock.release()
+    
+    def _apply_promotions(self) -> None:
+        """Move queued hits to the most recently used end (lock held)."""
+        pending = self._pending_promotions
+        loaded = self._loaded_frames
+        while True:
+            try:
+                frame_id = pending.popleft()
+            except IndexError:
+                break
+            self._hits += 1
+            if frame_id in loaded:
+                loaded.move_to_end(frame_id)
+    
     def mark_frame_unloaded(self, frame: 'Frame') -> None:
         """Mark a frame as unloaded and remove from cache."""
         frame_id = id(frame)
         with self._cleanup_lock:
-            if frame_id in self._loaded_frames:
-                del self._loaded_frames[frame_id]
+            entry = self._loaded_frames.pop(frame_id, None)
+            if entry is not None:
+                self._total_bytes -= entry.nbytes
     
     def _check_memory_limits(self) -> None:
         """Check memory limits and cleanup if necessary."""
@@ -122,10 +226,32 @@ class MemoryManager:
             self._unload_oldest_frame()
         
         # Check memory usage limit
-        total_memory_mb = sum(info['size_mb'] for info in self._loaded_frames.values())
-        if total_memory_mb > self._memory_threshold_mb:
+        if self._total_bytes > self._memory_threshold_mb * _BYTES_PER_MB:
+            total_memory_mb = self._total_bytes / _BYTES_PER_MB
             logger.info(f"Memory usage ({total_memory_mb:.1f}MB) exceeds threshold ({self._memory_threshold_mb}MB), cleaning up")
             self._cleanup_excess_memory()
+        
+        self._check_system_memory()
+    
+    def _check_system_memory(self) -> None:
+        """Cleanup if system memory is under pressure, at most once per interval."""
+        if not self._monitoring_enabled:
+            return
+        
+        now = time.monotonic()
+        if now - self._last_system_check < self.system_check_interval:
+            return
+        self._last_system_check = now
+        
+        try:
+            memory = psutil.virtual_memory()
+        except Exception as e:
+            logger.error(f"Memory monitoring error: {e}")
+            return
+        
+        if memory.percent > 85:  # System memory usage > 85%
+            logger.warning(f"High system memory usage: {memory.percent:.1f}%")
+            self._cleanup_excess_memory()
     
     def _unload_oldest_frame(self) -> None:
         """Unload the least recently used frame."""
@@ -133,57 +259,53 @@ class MemoryManager:
             return
         
         # Get oldest frame (first in OrderedDict)
-        frame_id, frame_info = next(iter(self._loaded_frames.items()))
-        frame = frame_info['frame']
+        frame_id, entry = self._loaded_frames.popitem(last=False)
+        self._total_bytes -= entry.nbytes
+        self._evictions += 1
         
         try:
-            if hasattr(frame, '_force_unload'):
-                frame._force_unload()
+            if hasattr(entry.frame, '_force_unload'):
+                entry.frame._force_unload()
                 logger.debug(f"Automatically unloaded frame {frame_id} to free memory")
         except Exception as e:
             logger.warning(f"Failed to unload frame {frame_id}: {e}")
-        
-        del self._loaded_frames[frame_id]
     
     def _cleanup_excess_memory(self) -> None:
         """Cleanup frames until memory usage is under threshold."""
-        target_memory = self._memory_threshold_mb * 0.8  # Clean up to 80% of threshold
+        target_bytes = self._memory_threshold_mb * _BYTES_PER_MB * 0.8  # Clean up to 80% of threshold
         
-        while self._loaded_frames:
-            total_memory_mb = sum(info['size_mb'] for info in self._loaded_frames.values())
-            if total_memory_mb <= target_memory:
-                break
+        while self._loaded_frames and self._total_bytes > target_bytes:
             self._unload_oldest_frame()
     
-    def _memory_monitor(self) -> None:
-        """Background thread to monitor system memory usage."""
-        while self._monitoring_enabled:
-            try:
-                # Check system memory usage
-                memory = psutil.virtual_memory()
-                if memory.percent > 85:  # System memory usage > 85%
-                    logger.warning(f"High system memory usage: {memory.percent:.1f}%")
-                    with self._cleanup_lock:
-                        self._cleanup_excess_memory()
-                
-                time.sleep(30)  # Check every 30 seconds
-            except Exception as e:
-                logger.error(f"Memory monitoring error: {e}")
-                time.sleep(60)  # Wait longer on error
-    
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get current memory usage statistics."""
         with self._cleanup_lock:
+            self._apply_promotions()
             total_frames = len(self._loaded_frames)
-            total_memory_mb = sum(info['size_mb'] for info in self._loaded_frames.values())
-            
-            return {
-                'loaded_frames': total_frames,
-                'total_memory_mb': total_memory_mb,
-                'memory_threshold_mb': self._memory_threshold_mb,
-                'max_loaded_frames': self._max_loaded_frames,
-                'system_memory_percent': psutil.virtual_memory().percent
-            }
+            total_bytes = self._total_bytes
+            hits, misses, evictions = self._hits, self._misses, self._evictions
+        
+        lookups = hits + misses
+        return {
+            'loaded_frames': total_frames,
+            'total_memory_mb': total_bytes / _BYTES_PER_MB,
+            'total_bytes': total_bytes,
+            'memory_threshold_mb': self._memory_threshold_mb,
+            'max_loaded_frames': self._max_loaded_frames,
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'system_memory_percent': psutil.virtual_memory().percent
+        }
+    
+    def reset_stats(self) -> None:
+        """Reset hit, miss and eviction counters."""
+        with self._cleanup_lock:
+            self._pending_promotions.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
     
     def set_memory_threshold(self, threshold_mb: int) -> None:
         """Set memory threshold for automatic cleanup."""
@@ -199,15 +321,16 @@ class MemoryManager:
         """Force cleanup of all loaded frames."""
         with self._cleanup_lock:
             frames_to_unload = list(self._loaded_frames.values())
-            for frame_info in frames_to_unload:
+            for entry in frames_to_unload:
                 try:
-                    frame = frame_info['frame']
-                    if hasattr(frame, '_force_unload'):
-                        frame._force_unload()
+                    if hasattr(entry.frame, '_force_unload'):
+                        entry.frame._force_unload()
                 except Exception as e:
                     logger.warning(f"Failed to force unload frame: {e}")
             
             self._loaded_frames.clear()
+            self._pending_promotions.clear()
+            self._total_bytes = 0
             logger.info("Forced cleanup of all loaded frames")
     
     def shutdown(self) -> None:
@@ -227,15 +350,30 @@ class Frame:
     This class provides a unified interface for working with image/video frames
     from various sources while maintaining metadata and supporting advanced
     lazy loading and memory management.
+    
+    Video frames extracted with FFmpeg are streamed through a raw-video pipe
+    by default; set ``ffmpeg_mode`` to ``"jpeg"`` (per instance or on the
+    class) to use the legacy temp-JPEG extraction instead.
+    
+    Pixel data the frame owns (decoded data, or a copy of the array it was
+    built from) is returned writable by load(). Shared data is copy-on-write:
+    frames built from arrays with copy=False, frame store views, and copies
+    or resizes of loaded frames that share a buffer are returned as read-only
+    views, and writable() makes a private copy the first time they are
+    modified. Format and size conversions made through as_format() are
+    memoized per frame and counted in the frame's memory.
     """
     
+    ffmpeg_mode: str = RAWPIPE_MODE
+    
     def __init__(
         self,
         data: Optional[Union[np.ndarray, str, Path]] = None,
         source_type: str = "array",
         metadata: Optional[Dict[str, Any]] = None,
         format: str = "RGB",
-        lazy_load: bool = False
+        lazy_load: bool = False,
+        copy: bool = True
     ):
         """
         Initialize a Frame object.
@@ -246,6 +384,8 @@ class Frame:
             metadata: Optional metadata dictionary
             format: Color format ("RGB", "BGR", "GRAY")
             lazy_load: Whether to defer loading until needed
+            copy: Whether to copy array data when it is loaded (False shares
+                the caller's array as a read-only view)
         """
         self.data = data
         self.source_type = source_type
@@ -257,13 +397,32 @@ class Frame:
         self._data_size_mb = 0.0
         self._last_access_time = time.time()
         self._access_count = 0
+        self._decoder: Optional[VideoDecoderSession] = None
+        self._frame_store: Optional[DecodedFrameStore] = None
+        self._decode_geometry: Optional[DecodeGeometry] = None
+        
+        # Copy-on-write state: the writable buffer this frame owns, if any,
+        # and whether the loaded data is borrowed from another frame
+        self._private_buffer: Optional[np.ndarray] = None
+        self._owns_data = False
+        self._borrowed = False
+        self._copy_array = copy
+        
+        # Memoized conversions keyed by (format, size)
+        self._derived: Dict[Tuple[str, Optional[Tuple[int, int]]], np.ndarray] = {}
+        self._derived_bytes = 0
         
         # Register with memory manager
         _memory_manager.register_frame(self)
         
-        # Store original data reference for lazy loading
         if not lazy_load and isinstance(data, np.ndarray):
-            self._loaded_data = data.copy()
+            if copy:
+                # The frame owns a private copy, so the caller's array can change freely
+                self.data = self._private_buffer = data.copy()
+                self._owns_data = True
+                self._loaded_data = self._private_buffer
+            else:
+                self._loaded_data = _readonly(data)
             self._is_loaded = True
             self._access_count = 1  # Count the initial load
             self._calculate_memory_usage()
@@ -347,7 +506,10 @@ class Frame:
         video_path: Union[str, Path],
         frame_index: int,
         format: str = "RGB",
-        lazy_load: bool = True
+        lazy_load: bool = True,
+        decoder: Optional[VideoDecoderSession] = None,
+        frame_store: Optional[DecodedFrameStore] = None,
+        geometry: Optional[DecodeGeometry] = None
     ) -> "Frame":
         """
         Create a Frame from a video file at specific frame index.
@@ -357,6 +519,12 @@ class Frame:
             frame_index: Frame index to extract (0-based)
             format: Desired color format
             lazy_load: Whether to defer loading
+            decoder: Optional decoder session shared with other frames of
+                the same video
+            frame_store: Optional memory-mapped store of decoded frames;
+                loaded data is then a read-only view into the store
+            geometry: Optional decode-time crop/downscale; keypoints found
+                on the frame map back through to_source_keypoints()
             
         Returns:
             Frame object
@@ -371,20 +539,27 @@ class Frame:
             "file_name": path.name
         }
         
-        return cls(
+        frame = cls(
             data={"video_path": str(path), "frame_index": frame_index},
             source_type="video",
             metadata=metadata,
             format=format,
             lazy_load=lazy_load
         )
+        frame._decoder = decoder
+        frame._frame_store = frame_store
+        if geometry is not None and not geometry.is_identity:
+            frame._decode_geometry = geometry
+            frame.metadata["decode_geometry"] = geometry.to_dict()
+        return frame
     
     @classmethod
     def from_array(
         cls,
         array: np.ndarray,
         format: str = "RGB",
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        copy: bool = True
     ) -> "Frame":
         """
         Create a Frame from a numpy array.
@@ -393,6 +568,8 @@ class Frame:
             array: Numpy array containing image data
             format: Color format of the array
             metadata: Optional metadata
+            copy: Whether to copy the array (False shares it without copying;
+                load() then returns a read-only view)
             
         Returns:
             Frame object
@@ -416,7 +593,8 @@ class Frame:
             source_type="array",
             metadata=frame_metadata,
             format=format,
-            lazy_load=False
+            lazy_load=False,
+            copy=copy
         )
     
     @classmethod
@@ -444,6 +622,11 @@ class Frame:
         """
         Load frame data into memory if not already loaded.
         
+        Data the frame owns is returned writable. Shared data is returned
+        as a read-only view; use writable() to modify it. After modifying
+        the data in place, call writable() so memoized conversions are
+        dropped.
+        
         Returns:
             Numpy array containing frame data
         """
@@ -452,12 +635,12 @@ class Frame:
         
         if self._is_loaded and self._loaded_data is not None:
             # Update LRU position
-            _memory_manager.mark_frame_loaded(self, self._data_size_mb)
+            _memory_manager.touch_frame(self)
             return self._loaded_data
         
         try:
             if self.source_type == "array":
-                self._loaded_data = self.data.copy() if isinstance(self.data, np.ndarray) else None
+                self._loaded_data = self.data if isinstance(self.data, np.ndarray) else None
             elif self.source_type == "file":
                 self._loaded_data = self._load_from_file(self.data)
             elif self.source_type == "video":
@@ -472,6 +655,24 @@ class Frame:
             
             # Convert format if needed
             self._loaded_data = self._convert_format(self._loaded_data, self.format)
+            
+            # Freshly decoded buffers and copied arrays belong to this frame;
+            # shared arrays and store views are copied on first write
+            if self.source_type == "array":
+                if self._owns_data:
+                    self._private_buffer = self.data
+                elif self._copy_array:
+                    self._private_buffer = np.array(self._loaded_data, copy=True)
+                else:
+                    self._private_buffer = None
+            elif self._frame_store is not None and self._frame_store.owns(self._loaded_data):
+                self._private_buffer = None
+            else:
+                self._private_buffer = self._loaded_data
+            if self._private_buffer is not None:
+                self._loaded_data = self._private_buffer
+            else:
+                self._loaded_data = _readonly(self._loaded_data)
             self._is_loaded = True
             
             # Calculate memory usage and register with memory manager
@@ -485,13 +686,18 @@ class Frame:
             raise FrameError(f"Failed to load frame: {e}")
     
     def _calculate_memory_usage(self) -> None:
-        """Calculate memory usage of loaded data."""
-        if self._loaded_data is not None:
-            # Calculate size in MB
-            size_bytes = self._loaded_data.nbytes
-            self._data_size_mb = size_bytes / (1024 * 1024)
+        """Calculate memory usage of loaded data and memoized conversions."""
+        if self._loaded_data is None:
+            size_bytes = 0
+        elif self._borrowed:
+            # Counted by the frame that owns the buffer
+            size_bytes = 0
+        elif self._frame_store is not None and self._frame_store.owns(self._loaded_data):
+            # Views into the frame store are backed by the OS page cache
+            size_bytes = 0
         else:
-            self._data_size_mb = 0.0
+            size_bytes = self._loaded_data.nbytes
+        self._data_size_mb = (size_bytes + self._derived_bytes) / _BYTES_PER_MB
     
     def _load_from_file(self, file_path: str) -> Optional[np.ndarray]:
         """Load image data from file using available libraries."""
@@ -518,10 +724,41 @@ class Frame:
         raise FrameError(f"No suitable image library available to load {path}")
     
     def _load_from_video(self, video_data: Dict[str, Any]) -> Optional[np.ndarray]:
-        """Load frame from video using FFmpeg with OpenCV fallback."""
+        """Load frame from the frame store, or decode it and store it."""
+        frame_index = video_data["frame_index"]
+        store = self._frame_store
+        
+        if store is not None:
+            stored = store.get(frame_index)
+            if stored is not None:
+                return stored
+        
+        data = self._decode_from_video(video_data)
+        
+        geometry = self._decode_geometry
+        if geometry is not None and (data.shape[1], data.shape[0]) == geometry.source_size:
+            # Fallback decoders return full frames
+            data = geometry.apply(data)
+        
+        if store is not None:
+            try:
+                return store.put(frame_index, data)
+            except FrameStoreError as e:
+                logger.warning(f"Could not store decoded frame {frame_index}: {e}")
+        return data
+    
+    def _decode_from_video(self, video_data: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Decode frame from video using FFmpeg with OpenCV fallback."""
         video_path = video_data["video_path"]
         frame_index = video_data["frame_index"]
         
+        # Use the shared decoder session when one is attached
+        if self._decoder is not None and not self._decoder.is_closed:
+            try:
+                return self._decoder.read(frame_index)
+            except VideoDecoderError as e:
+                logger.warning(f"Decoder session failed to extract frame: {e}")
+        
         # Try FFmpeg first
         if self._is_ffmpeg_available():
             try:
@@ -589,30 +826,37 @@ class Frame:
             raise FrameError(f"Failed to load image from URL {url}: {e}")
     
     def _is_ffmpeg_available(self) -> bool:
-        """Check if FFmpeg is available on the system."""
-        try:
-            subprocess.run(
-                ["ffmpeg", "-version"],
-                capture_output=True,
-                check=True,
-                timeout=5
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
-            return False
+        """Check if FFmpeg is available on the system (cached per PATH)."""
+        return executable_available("ffmpeg", verify=True)
     
     def _extract_frame_ffmpeg(self, video_path: str, frame_index: int) -> np.ndarray:
         """Extract frame using FFmpeg."""
+        if self.ffmpeg_mode not in FFMPEG_MODES:
+            raise FrameError(f"Unsupported FFmpeg mode: {self.ffmpeg_mode}")
+        
+        if self.ffmpeg_mode == RAWPIPE_MODE:
+            try:
+                return read_frame_ffmpeg_raw(
+                    video_path, frame_index, seek_index=get_seek_index(video_path),
+                    geometry=self._decode_geometry
+                )
+            except VideoDecoderError as e:
+                raise FrameError(f"FFmpeg error: {e}")
+        
         with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
             temp_path = temp_file.name
         
         try:
-            # FFmpeg command to extract specific frame
+            # FFmpeg command to extract specific frame, input-seeking to the
+            # keyframe before it; output frame n is video frame base + n
+            seek_index = get_seek_index(video_path)
+            seek_args, base = seek_index.input_seek(frame_index) if seek_index is not None else ([], 0)
             cmd = [
                 "ffmpeg",
                 "-v", "error",
+                *seek_args,
                 "-i", video_path,
-                "-vf", f"select=eq(n\\,{frame_index})",
+                "-vf", f"select=eq(n\\,{frame_index - base})",
                 "-frames:v", "1",
                 "-y",
                 temp_path
@@ -642,8 +886,8 @@ class Frame:
             if not cap.isOpened():
                 raise FrameError(f"Could not open video: {video_path}")
             
-            # Set frame position
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            # Seek to the preceding keyframe and decode forward
+            seek_capture(cap, frame_index, get_seek_index(video_path))
             
             ret, frame = cap.read()
             if not ret or frame is None:
@@ -682,6 +926,89 @@ class Frame:
             logger.error(f"Format conversion failed: {e}")
             return data
     
+    def as_format(self, format: str, size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """
+        Get the frame in another color format and/or size, memoized.
+        
+        The first request for a representation converts the loaded data and
+        keeps the result, counted in this frame's memory, until the frame is
+        unloaded or modified through writable().
+        
+        Args:
+            format: Target color format ("RGB", "BGR", "GRAY")
+            size: Optional target (width, height)
+            
+        Returns:
+            Array in the requested representation (conversions are read-only)
+        """
+        data = self.load()
+        if size is not None and tuple(size) == (data.shape[1], data.shape[0]):
+            size = None
+        if format == self.format and size is None:
+            return data
+        
+        key = (format, None if size is None else (int(size[0]), int(size[1])))
+        derived = self._derived.get(key)
+        if derived is not None:
+            return derived
+        
+        converted = data
+        if size is not None:
+            if cv2 is not None:
+                converted = cv2.resize(converted, key[1])
+            elif Image is not None:
+                converted = np.array(Image.fromarray(converted).resize(key[1]))
+            else:
+                raise FrameError("No suitable image library available for resizing")
+        converted = self._convert_format(converted, format)
+        if converted is data:
+            # Unsupported conversion: nothing new to keep
+            return data
+        
+        converted = _readonly(converted)
+        if self._is_loaded:
+            self._derived[key] = converted
+            self._derived_bytes += converted.nbytes
+            self._calculate_memory_usage()
+            _memory_manager.mark_frame_loaded(self, self._data_size_mb)
+        return converted
+    
+    def writable(self) -> np.ndarray:
+        """
+        Get the pixel data for in-place modification (copy-on-write).
+        
+        Shared data (an array the frame was created from with copy=False, a
+        frame store view, or a buffer borrowed from another frame) is copied
+        first, so other owners never see the change. The frame then holds its data in
+        memory as an array frame, so modifications survive unloading, and
+        memoized conversions are dropped. Call writable() again before each
+        round of modifications so conversions are not reused stale.
+        
+        Returns:
+            Writable array backing this frame
+        """
+        data = self.load()
+        
+        if self._private_buffer is None:
+            self._private_buffer = np.array(data, copy=True)
+            self._borrowed = False
+        
+        self.source_type = "array"
+        self.data = self._private_buffer
+        self._owns_data = True
+        self._frame_store = None
+        
+        self._loaded_data = self._private_buffer
+        self._clear_derived()
+        self._calculate_memory_usage()
+        _memory_manager.mark_frame_loaded(self, self._data_size_mb)
+        return self._private_buffer
+    
+    def _clear_derived(self) -> None:
+        """Drop memoized conversions."""
+        self._derived.clear()
+        self._derived_bytes = 0
+    
     @property
     def shape(self) -> Optional[Tuple[int, ...]]:
         """Get frame shape without loading if possible."""
@@ -714,10 +1041,32 @@ class Frame:
             'is_loaded': self._is_loaded
         }
     
+    @property
+    def decode_geometry(self) -> Optional[DecodeGeometry]:
+        """Decode-time crop/downscale applied to this frame, if any."""
+        return self._decode_geometry
+    
+    def to_source_keypoints(self, keypoints: List[Any]) -> List[Any]:
+        """
+        Map keypoints detected on this frame to source-video pixels.
+        
+        Args:
+            keypoints: Keypoint dicts with "x"/"y" entries, or objects with
+                x/y attributes
+            
+        Returns:
+            Keypoints in source coordinates (unchanged without decode geometry)
+        """
+        if self._decode_geometry is None:
+            return keypoints
+        return self._decode_geometry.map_keypoints(keypoints)
+    
     def unload(self) -> None:
         """Unload frame data from memory to save space."""
         if self.lazy_load and self._is_loaded:
             self._loaded_data = None
+            self._private_buffer = None
+            self._clear_derived()
             self._is_loaded = False
             _memory_manager.mark_frame_unloaded(self)
             logger.debug(f"Unloaded frame data, freed {self._data_size_mb:.2f}MB")
@@ -727,6 +1076,8 @@ class Frame:
         """Force unload frame data (called by memory manager)."""
         if self._is_loaded:
             self._loaded_data = None
+            self._private_buffer = None
+            self._clear_derived()
             self._is_loaded = False
             self._data_size_mb = 0.0
     
@@ -764,21 +1115,44 @@ class Frame:
             raise FrameError("No suitable image library available for saving")
     
     def copy(self) -> "Frame":
-        """Create a copy of this frame."""
+        """
+        Create a copy of this frame.
+        
+        A loaded frame's copy shares shared (read-only) data copy-on-write,
+        only duplicating it when the copy is modified through writable().
+        Data this frame owns, which load() returns writable, is copied.
+        """
         if self._is_loaded:
-            return Frame.from_array(
-                self._loaded_data.copy(),
+            shared = self._private_buffer is None
+            frame = Frame.from_array(
+                self._loaded_data,
                 format=self.format,
-                metadata=self.metadata.copy()
+                metadata=self.metadata.copy(),
+                copy=not shared
             )
+            frame._decode_geometry = self._decode_geometry
+            if shared:
+                frame._borrow()
+            return frame
         else:
-            return Frame(
+            frame = Frame(
                 data=self.data,
                 source_type=self.source_type,
                 metadata=self.metadata.copy(),
                 format=self.format,
-                lazy_load=self.lazy_load
+                lazy_load=self.lazy_load,
+                copy=self._copy_array
             )
+            frame._decoder = self._decoder
+            frame._frame_store = self._frame_store
+            frame._decode_geometry = self._decode_geometry
+            return frame
+    
+    def _borrow(self) -> None:
+        """Mark the loaded data as borrowed from another frame, which accounts for it."""
+        self._borrowed = True
+        self._calculate_memory_usage()
+        _memory_manager.mark_frame_loaded(self, self._data_size_mb)
     
     def __del__(self):
         """Cleanup when frame is garbage collected."""
@@ -797,17 +1171,10 @@ class Frame:
             height: Target height
             
         Returns:
-            New Frame with resized data
+            New Frame sharing the memoized resized data
         """
         data = self.load()
-        
-        if cv2 is not None:
-            resized = cv2.resize(data, (width, height))
-        elif Image is not None:
-            img = Image.fromarray(data)
-            resized = np.array(img.resize((width, height)))
-        else:
-            raise FrameError("No suitable image library available for resizing")
+        resized = self.as_format(self.format, (width, height))
         
         metadata = self.metadata.copy()
         metadata.update({
@@ -815,7 +1182,11 @@ class Frame:
             "resized_to": (height, width, data.shape[2] if len(data.shape) == 3 else 1)
         })
         
-        return Frame.from_array(resized, format=self.format, metadata=metadata)
+        frame = Frame.from_array(resized, format=self.format, metadata=metadata, copy=False)
+        if self._is_loaded:
+            # Accounted for by this frame, as its memo or its own data
+            frame._borrow()
+        return frame
 
 
 class FrameSequence:
@@ -849,7 +1220,23 @@ class FrameSequence:
         self.lazy_load = lazy_load
         self._batch_size = 10  # Default batch size for operations
         self._preload_window = 3  # Number of frames to preload around current position
+        self._prefetch_depth = 0  # Batches decoded ahead in process_in_batches
         self._current_position = 0
+        
+        # Incrementally maintained preload window [start, end); None until first access
+        self._window_start: Optional[int] = None
+        self._window_end = 0
+        self._access_direction = 0  # +1 forward, -1 backward, 0 unknown/random
+        
+        # Asynchronous preloading of frames entering the window
+        self._async_preload = False
+        self._preload_lock = threading.Lock()
+        self._preload_pending: List[int] = []
+        self._preload_event = threading.Event()
+        self._preload_thread: Optional[threading.Thread] = None
+        self._preload_closed = False
+        self._decoder: Optional[VideoDecoderSession] = None
+        self._frame_store: Optional[DecodedFrameStore] = None
     
     @classmethod
     def from_video(
@@ -861,11 +1248,41 @@ class FrameSequence:
         format: str = "RGB",
         lazy_load: bool = True,
         video_info: Optional[Dict[str, Any]] = None,
-        backend: str = "opencv"
+        backend: str = "opencv",
+        shared_decoder: bool = True,
+        frame_cache: bool = False,
+        frame_cache_dir: Optional[Union[str, Path]] = None,
+        frame_cache_max_side: Optional[int] = None,
+        decode_size: Optional[int] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None,
+        frame_rate: Optional[float] = None,
+        workers: int = 1
     ) -> "FrameSequence":
         """
         Create a FrameSequence from a video file.
         
+        When shared_decoder is enabled, all frames share one decoder session
+        owned by the sequence, so loading frames in order decodes each frame
+        once instead of re-decoding the video for every frame.
+        
+        When frame_cache is enabled, decoded frames are kept in a per-video
+        memory-mapped store on disk and frames load as zero-copy views into
+        it, so frames evicted by the memory manager reload without decoding.
+        
+        With decode_size and/or roi, frames are cropped and downscaled while
+        decoding (typically to a pose estimator's input size), and
+        Frame.to_source_keypoints() maps detections back to source pixels.
+        
+        With frame_rate, the video is subsampled while decoding: frames are
+        chosen by presentation timestamp (exact for variable frame rate
+        videos when a seek index is available), only those frames are
+        created, and the decoder skips the others without converting them.
+        
+        With workers > 1, the frames are decoded up front by a pool of
+        processes, each decoding one keyframe-aligned segment straight into
+        the decoded-frame store, which is opened for this purpose even when
+        frame_cache is disabled. Frames then load as views into the store.
+        
         Args:
             video_path: Path to video file
             start_frame: Starting frame index
@@ -875,6 +1292,17 @@ class FrameSequence:
             lazy_load: Whether to use lazy loading
             video_info: Optional video metadata
             backend: Backend to use ("ffmpeg" or "opencv")
+            shared_decoder: Whether frames share a sequential decoder session
+            frame_cache: Whether to keep decoded frames in an on-disk store
+            frame_cache_dir: Store directory (default data/cache/frames)
+            frame_cache_max_side: Store frames downscaled so the longer side
+                is at most this many pixels
+            decode_size: Decode frames downscaled so the longer side is at
+                most this many pixels
+            roi: Decode only this (x, y, width, height) region of each frame
+            frame_rate: Target frames per second; frames are sampled from
+                the [start_frame, end_frame) range instead of using step
+            workers: Number of decoder processes for up-front parallel decoding
             
         Returns:
             FrameSequence object
@@ -892,12 +1320,87 @@ class FrameSequence:
         if end_frame is None:
             end_frame = total_frames
         
+        # Frames to create, sampled by timestamp when a target rate is given
+        source_fps = None
+        seek_index = None
+        if frame_rate:
+            source_fps = (video_info or {}).get("fps") or cls._get_video_fps(path)
+            seek_index = get_seek_index(path)
+            try:
+                sampled = sample_frame_indices(
+                    frame_rate, total_frames, source_fps or 0.0, seek_index=seek_index
+                )
+            except VideoDecoderError as e:
+                raise FrameError(f"Cannot sample {video_path} at {frame_rate} fps: {e}")
+            frame_indices = [i for i in sampled if start_frame <= i < end_frame]
+        else:
+            frame_indices = list(range(start_frame, min(end_frame, total_frames), step))
+        
+        # Decode-time crop/downscale
+        geometry = None
+        if decode_size or roi:
+            try:
+                source_size = (
+                    (video_info["width"], video_info["height"])
+                    if video_info and video_info.get("width") and video_info.get("height")
+                    else probe_frame_size(path)
+                )
+                geometry = DecodeGeometry.fit(source_size, max_side=decode_size, crop=roi)
+                if geometry.is_identity:
+                    geometry = None
+            except VideoDecoderError as e:
+                logger.warning(f"Could not set up reduced-resolution decoding, decoding full frames: {e}")
+        
+        # Open a decoder session shared by all frames of the sequence
+        decoder = None
+        decoder_backend = "ffmpeg" if backend == "ffmpeg" and ffmpeg_on_path() else "opencv"
+        if shared_decoder:
+            try:
+                decoder = VideoDecoderSession(
+                    path, backend=decoder_backend, geometry=geometry,
+                    frame_indices=frame_indices if frame_rate else None
+                )
+            except VideoDecoderError as e:
+                logger.warning(f"Could not create decoder session, frames will decode independently: {e}")
+        
+        # Open the memory-mapped decoded-frame store
+        frame_store = None
+        parallel = workers > 1 and len(frame_indices) > 1
+        if frame_cache or parallel:
+            try:
+                if geometry is not None:
+                    frame_store = open_frame_store(
+                        path, cache_dir=frame_cache_dir, frame_size=geometry.output_size,
+                        variant=f"crop={geometry.crop}" if geometry.crop else ""
+                    )
+                else:
+                    frame_store = open_frame_store(
+                        path, cache_dir=frame_cache_dir, max_side=frame_cache_max_side
+                    )
+            except (FrameStoreError, OSError) as e:
+                logger.warning(f"Could not open frame store, frames will not be cached: {e}")
+        
+        # Decode keyframe-aligned segments in parallel into the store
+        if parallel and frame_store is not None:
+            try:
+                fill_frame_store_parallel(
+                    frame_store, frame_indices, workers, backend=decoder_backend, geometry=geometry
+                )
+            except ParallelDecodeError as e:
+                logger.warning(f"Parallel decoding failed, frames will decode on demand: {e}")
+        
         # Create frames
         frames = []
-        for frame_idx in range(start_frame, min(end_frame, total_frames), step):
+        for frame_idx in frame_indices:
             frame = Frame.from_video(
-                video_path, frame_idx, format=format, lazy_load=lazy_load
+                video_path, frame_idx, format=format, lazy_load=lazy_load,
+                decoder=decoder, frame_store=frame_store, geometry=geometry
             )
+            if frame_rate:
+                if seek_index is not None and frame_idx < seek_index.frame_count:
+                    frame.metadata["timestamp"] = seek_index.frame_time(frame_idx)
+                elif source_fps:
+                    frame.metadata["timestamp"] = frame_idx / float(source_fps)
             frames.append(frame)
         
         metadata = {
@@ -911,26 +1414,42 @@ class FrameSequence:
         
         if video_info:
             metadata.update(video_info)
-        
-        return cls(frames=frames, metadata=metadata)
+        if geometry is not None:
+            metadata["decode_geometry"] = geometry.to_dict()
+        if frame_rate:
+            metadata["frame_rate"] = frame_rate
+            metadata["source_fps"] = source_fps
+            metadata["frame_indices"] = frame_indices
+        
+        sequence = cls(frames=frames, metadata=metadata)
+        sequence._decoder = decoder
+        sequence._frame_store = frame_store
+        return sequence
     
     @staticmethod
     def _get_video_frame_count(video_path: Union[str, Path]) -> int:
         """Get total frame count from video."""
         if cv2 is not None:
             try:
-                cap = cv2.VideoCapture(str(video_path))
-                if cap.isOpened():
-                    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                    cap.release()
-                    return count
-            except Exception:
+                return int(get_video_metadata(video_path, "opencv")["frame_count"])
+            except VideoMetadataError:
                 pass
         
         # Fallback: assume 30 FPS and get duration
         logger.warning("Could not determine video frame count, using estimate")
         return 1000  # Default estimate
     
+    @staticmethod
+    def _get_video_fps(video_path: Union[str, Path]) -> Optional[float]:
+        """Get the nominal frame rate of a video, or None if unknown."""
+        if cv2 is not None:
+            try:
+                fps = float(get_video_metadata(video_path, "opencv")["fps"])
+                return fps if fps > 0 else None
+            except VideoMetadataError:
+                pass
+        return None
+    
     def __len__(self) -> int:
         """Get number of frames in sequence."""
         return len(self.frames)
@@ -938,41 +1457,168 @@ class FrameSequence:
     def __getitem__(self, index: Union[int, slice]) -> Union[Frame, "FrameSequence"]:
         """Get frame(s) by index with smart preloading."""
         if isinstance(index, int):
-            self._current_position = index
-            self._smart_preload(index)
-            return self.frames[index]
+            frame = self.frames[index]
+            position = index + len(self.frames) if index < 0 else index
+            self._smart_preload(position)
+            self._current_position = position
+            return frame
         elif isinstance(index, slice):
-            return FrameSequence(
+            sliced = FrameSequence(
                 frames=self.frames[index],
                 metadata=self.metadata.copy(),
                 sequence_id=self.sequence_id,
                 lazy_load=self.lazy_load
             )
+            sliced._decoder = self._decoder
+            sliced._frame_store = self._frame_store
+            return sliced
         else:
             raise TypeError("Index must be int or slice")
     
     def _smart_preload(self, current_index: int) -> None:
-        """Preload frames around current position for smooth access."""
+        """
+        Preload frames around current position for smooth access.
+        
+        The window is maintained incrementally: only frames entering or
+        leaving it are loaded or unloaded, so sequential access costs O(window)
+        per frame rather than O(sequence length). During forward playback the
+        window extends further ahead than behind, and vice versa.
+        """
         if not self.lazy_load:
             return
         
-        start_idx = max(0, current_index - self._preload_window)
-        end_idx = min(len(self.frames), current_index + self._preload_window + 1)
+        total = len(self.frames)
+        if not 0 <= current_index < total:
+            return
+        
+        new_start, new_end = self._preload_bounds(current_index, total)
         
-        # Preload frames in window
-        for i in range(start_idx, end_idx):
+        if self._window_start is None:
+            # First access: nothing is known about resident frames, sweep once
+            leaving = (i for i in range(total) if i < new_start or i >= new_end)
+            entering = list(range(new_start, new_end))
+        else:
+            old_start, old_end = self._window_start, min(self._window_end, total)
+            leaving = (i for i in range(old_start, old_end) if i < new_start or i >= new_end)
+            entering = [i for i in range(new_start, new_end) if i < old_start or i >= old_end]
+        
+        with self._preload_lock:
+            self._window_start, self._window_end = new_start, new_end
+            
+            # Unload frames leaving the window to save memory. Under the lock,
+            # so a preload finishing concurrently either sees the frame
+            # unloaded here or the new window, and unloads it itself
+            for i in leaving:
+                frame = self.frames[i]
+                if frame.is_loaded and frame.lazy_load:
+                    frame.unload()
+        
+        # Nearest frames in the direction of travel first
+        entering.sort(key=lambda i: (abs(i - current_index), (i - current_index) * -self._access_direction))
+        
+        if self._async_preload:
+            # The caller loads the requested frame itself
+            self._schedule_preload([i for i in entering if i != current_index])
+        else:
+            self._preload_frames(entering)
+    
+    def _preload_bounds(self, current_index: int, total: int) -> Tuple[int, int]:
+        """Compute the [start, end) preload window, skewed by access direction."""
+        previous = self._current_position if self._window_start is not None else None
+        if previous is not None and 0 < abs(current_index - previous) <= max(1, self._preload_window):
+            self._access_direction = 1 if current_index > previous else -1
+        else:
+            self._access_direction = 0
+        
+        window = self._preload_window
+        behind = ahead = window
+        if self._access_direction != 0:
+            # Keep the same span, shifted towards the direction of travel
+            behind = window // 2
+            ahead = 2 * window - behind
+            if self._access_direction < 0:
+                behind, ahead = ahead, behind
+        
+        return max(0, current_index - behind), min(total, current_index + ahead + 1)
+    
+    def _preload_frames(self, indices: List[int]) -> None:
+        """Load the given frames, skipping ones that have left the window."""
+        for i in indices:
+            with self._preload_lock:
+                if not self._in_preload_window(i):
+                    continue
+            if i >= len(self.frames):
+                continue
             frame = self.frames[i]
             if not frame.is_loaded:
                 try:
                     frame.load()
                 except Exception as e:
                     logger.warning(f"Failed to preload frame {i}: {e}")
+                    continue
+                
+                # The window may have moved on while the frame was loading,
+                # past the point where it would have been unloaded
+                with self._preload_lock:
+                    if not self._in_preload_window(i) and frame.is_loaded and frame.lazy_load:
+                        frame.unload()
+    
+    def _in_preload_window(self, index: int) -> bool:
+        """Whether a frame index is in the current preload window (call under _preload_lock)."""
+        return self._window_start is not None and self._window_start <= index < self._window_end
+    
+    def _schedule_preload(self, indices: List[int]) -> None:
+        """Hand frames to the background preload thread, replacing stale work."""
+        with self._preload_lock:
+            self._preload_pending = indices
+            if self._preload_thread is None or not self._preload_thread.is_alive():
+                self._preload_closed = False
+                self._preload_thread = threading.Thread(
+                    target=self._preload_worker, name="frame-preload", daemon=True
+                )
+                self._preload_thread.start()
+        self._preload_event.set()
+    
+    def _preload_worker(self) -> None:
+        """Background thread loading frames entering the preload window."""
+        while True:
+            self._preload_event.wait(timeout=1.0)
+            with self._preload_lock:
+                if self._preload_closed:
+                    return
+                indices, self._preload_pending = self._preload_pending, []
+                self._preload_event.clear()
+            
+            for i in indices:
+                # Newer accesses supersede this batch
+                if self._preload_event.is_set() or self._preload_closed:
+                    break
+                self._preload_frames([i])
+    
+    def set_async_preload(self, enabled: bool = True) -> None:
+        """
+        Enable or disable asynchronous preloading.
         
-        # Unload frames outside window to save memory
-        for i, frame in enumerate(self.frames):
-            if i < start_idx or i >= end_idx:
-                if frame.is_loaded and frame.lazy_load:
-                    frame.unload()
+        When enabled, frames entering the preload window are loaded by a
+        background thread so indexing never blocks on neighbouring frames.
+        
+        Args:
+            enabled: Whether to preload in the background
+        """
+        self._async_preload = enabled
+        if not enabled:
+            self._stop_preload_thread()
+    
+    def _stop_preload_thread(self) -> None:
+        """Stop the background preload thread, if running."""
+        with self._preload_lock:
+            self._preload_closed = True
+            self._preload_pending = []
+            thread = self._preload_thread
+            self._preload_thread = None
+        self._preload_event.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
     
     def append(self, frame: Frame) -> None:
         """Add a frame to the sequence."""
@@ -1020,49 +1666,234 @@ class FrameSequence:
         
         return batch_data
     
+    def load_batch_tensor(
+        self,
+        start: int,
+        size: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+        color: str = "BGR",
+        size_hw: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
+        """
+        Load a batch of frames into one contiguous (N, H, W, 3) uint8 array.
+        
+        Frames that are not loaded yet and share a decoder session are
+        decoded straight into the batch buffer without being kept in memory;
+        loaded frames are copied in. Colour conversion and resizing write
+        into the buffer in place, so passing the same ``out`` for every batch
+        makes batched inference free of per-frame allocations. Frames that
+        fail to load are left as zeros.
+        
+        Args:
+            start: Index of the first frame
+            size: Number of frames (uses default batch size if None)
+            out: Optional preallocated buffer of shape (>= N, H, W, 3)
+            color: Channel order of the batch ("BGR" or "RGB")
+            size_hw: Optional (height, width) to resize frames to; defaults to
+                the buffer size, or the size of the first frame
+            
+        Returns:
+            View of the first N entries of the batch buffer
+        """
+        if size is None:
+            size = self._batch_size
+        if color not in TENSOR_COLORS:
+            raise FrameError(f"Unsupported batch tensor color: {color}")
+        
+        end = min(start + size, len(self.frames))
+        count = max(0, end - start)
+        
+        if out is not None:
+            if (out.ndim != 4 or out.shape[3] != 3 or out.dtype != np.uint8
+                    or not out.flags['C_CONTIGUOUS']):
+                raise FrameError(f"Batch buffer must be contiguous uint8 (N, H, W, 3), got {out.shape} {out.dtype}")
+            if out.shape[0] < count:
+                raise FrameError(f"Batch buffer holds {out.shape[0]} frames, {count} requested")
+            if size_hw is not None and tuple(size_hw) != out.shape[1:3]:
+                raise FrameError(f"Batch buffer size {out.shape[1:3]} does not match size_hw {tuple(size_hw)}")
+        else:
+            if count == 0:
+                height, width = size_hw or (0, 0)
+                return np.empty((0, height, width, 3), dtype=np.uint8)
+            height, width = size_hw or self._native_frame_hw(self.frames[start])
+            out = np.empty((count, height, width, 3), dtype=np.uint8)
+        
+        for k in range(count):
+            try:
+                self._frame_into(self.frames[start + k], out[k], color)
+            except Exception as e:
+                logger.warning(f"Failed to load frame {start + k} in batch tensor: {e}")
+                out[k].fill(0)
+        
+        return out[:count]
+    
+    def iter_batch_tensors(
+        self,
+        batch_size: Optional[int] = None,
+        color: str = "BGR",
+        size_hw: Optional[Tuple[int, int]] = None,
+        prefetch: Optional[int] = None
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Iterate over the sequence as contiguous batch tensors.
+        
+        Batches are written into a small ring of reused buffers, so a yielded
+        tensor is only valid until the iteration advances. With prefetching,
+        the next batches are decoded in the background while the current one
+        is processed.
+        
+        Args:
+            batch_size: Frames per batch (uses default batch size if None)
+            color: Channel order of the batches ("BGR" or "RGB")
+            size_hw: Optional (height, width) to resize frames to
+            prefetch: Number of batches to decode ahead in the background
+                (0 for serial loading, None for the sequence default)
+            
+        Yields:
+            Tuples of (start index, batch tensor)
+        """
+        if batch_size is None:
+            batch_size = self._batch_size
+        if prefetch is None:
+            prefetch = self._prefetch_depth
+        if not self.frames:
+            return
+        
+        height, width = size_hw or self._native_frame_hw(self.frames[0])
+        # Buffers in flight: one being consumed, `prefetch` queued, one being filled
+        buffers: List[Optional[np.ndarray]] = [None] * (prefetch + 2 if prefetch > 0 else 1)
+        
+        def load(item: Tuple[int, int]) -> np.ndarray:
+            batch_number, start_idx = item
+            slot = batch_number % len(buffers)
+            if buffers[slot] is None:
+                buffers[slot] = np.empty((batch_size, height, width, 3), dtype=np.uint8)
+            return self.load_batch_tensor(
+                start_idx, batch_size, out=buffers[slot], color=color, size_hw=(height, width)
+            )
+        
+        items = list(enumerate(range(0, len(self.frames), batch_size)))
+        if prefetch > 0:
+            with BackgroundPrefetcher(load, items, depth=prefetch, name="frame-prefetch") as prefetcher:
+                for (_, start_idx), batch in prefetcher:
+                    yield start_idx, batch
+        else:
+            for item in items:
+                yield item[1], load(item)
+    
+    def _frame_into(self, frame: Frame, dst: np.ndarray, color: str) -> None:
+        """Write one frame into a batch buffer slot."""
+        decoder = frame._decoder
+        if (not frame.is_loaded and frame.source_type == "video" and frame._frame_store is None
+                and decoder is not None and not decoder.is_closed):
+            try:
+                decoder.read_into(frame.data["frame_index"], dst, color)
+                return
+            except VideoDecoderError as e:
+                logger.warning(f"Decoder session failed to decode into batch: {e}")
+        
+        convert_frame_into(frame.load(), dst, frame.format, color)
+    
+    @staticmethod
+    def _native_frame_hw(frame: Frame) -> Tuple[int, int]:
+        """Get a frame's (height, width), loading it only if nothing else is known."""
+        shape = frame.shape
+        if shape is None and frame._frame_store is not None:
+            shape = frame._frame_store.frame_shape
+        if shape is None and frame._decoder is not None:
+            try:
+                width, height = frame._decoder.frame_size
+                shape = (height, width)
+            except VideoDecoderError as e:
+                logger.debug(f"Could not probe frame size from decoder: {e}")
+        if shape is None:
+            shape = frame.load().shape
+        return int(shape[0]), int(shape[1])
+    
     def process_in_batches(self, processor_func, batch_size: Optional[int] = None, 
-                          unload_after_processing: bool = True) -> List[Any]:
+                          unload_after_processing: bool = True,
+                          prefetch: Optional[int] = None) -> List[Any]:
         """
         Process frames in batches to manage memory usage.
         
+        With prefetching enabled, a background thread decodes the next
+        batches while processor_func runs on the current one. At most
+        ``prefetch`` decoded batches wait in the queue, so a slow consumer
+        holds the producer back; the producer is cancelled and joined when
+        processing ends or is interrupted.
+        
         Args:
             processor_func: Function to process each batch of frames
             batch_size: Size of each batch
             unload_after_processing: Whether to unload frames after processing
+            prefetch: Number of batches to decode ahead in the background
+                (0 for serial processing, None for the sequence default)
             
         Returns:
             List of processing results
         """
         if batch_size is None:
             batch_size = self._batch_size
+        if prefetch is None:
+            prefetch = self._prefetch_depth
         
         results = []
         total_frames = len(self.frames)
+        starts = range(0, total_frames, batch_size)
         
-        for start_idx in range(0, total_frames, batch_size):
+        if prefetch > 0:
+            def load(start_idx: int) -> Optional[List[np.ndarray]]:
+                try:
+                    return self.load_batch(start_idx, batch_size)
+                except Exception as e:
+                    logger.error(f"Failed to process batch starting at {start_idx}: {e}")
+                    return None
+            
+            with BackgroundPrefetcher(load, starts, depth=prefetch, name="frame-prefetch") as prefetcher:
+                for start_idx, batch_data in prefetcher:
+                    if batch_data is None:
+                        results.append(None)
+                        continue
+                    results.append(self._process_loaded_batch(
+                        processor_func, batch_data, start_idx, batch_size, unload_after_processing
+                    ))
+            return results
+        
+        for start_idx in starts:
             try:
                 # Load batch
                 batch_data = self.load_batch(start_idx, batch_size)
-                
-                # Process batch
-                batch_result = processor_func(batch_data, start_idx)
-                results.append(batch_result)
-                
-                # Unload frames if requested
-                if unload_after_processing:
-                    end_idx = min(start_idx + batch_size, total_frames)
-                    for i in range(start_idx, end_idx):
-                        if self.frames[i].lazy_load:
-                            self.frames[i].unload()
-                
-                logger.debug(f"Processed batch {start_idx}-{start_idx + len(batch_data)}")
-                
             except Exception as e:
                 logger.error(f"Failed to process batch starting at {start_idx}: {e}")
                 results.append(None)
+                continue
+            results.append(self._process_loaded_batch(
+                processor_func, batch_data, start_idx, batch_size, unload_after_processing
+            ))
         
         return results
     
+    def _process_loaded_batch(self, processor_func, batch_data: List[np.ndarray], start_idx: int,
+                              batch_size: int, unload_after_processing: bool) -> Any:
+        """Run processor_func on a loaded batch and optionally unload its frames."""
+        try:
+            # Process batch
+            batch_result = processor_func(batch_data, start_idx)
+            
+            # Unload frames if requested
+            if unload_after_processing:
+                end_idx = min(start_idx + batch_size, len(self.frames))
+                for i in range(start_idx, end_idx):
+                    if self.frames[i].lazy_load:
+                        self.frames[i].unload()
+            
+            logger.debug(f"Processed batch {start_idx}-{start_idx + len(batch_data)}")
+            return batch_result
+            
+        except Exception as e:
+            logger.error(f"Failed to process batch starting at {start_idx}: {e}")
+            return None
+    
     def unload_all(self) -> None:
         """Unload all frames from memory."""
         for frame in self.frames:
@@ -1082,6 +1913,24 @@ class FrameSequence:
             self.frames[i].unload()
         logger.debug(f"Unloaded frames {start_idx}-{end_idx} in sequence {self.sequence_id}")
     
+    @property
+    def decoder(self) -> Optional[VideoDecoderSession]:
+        """Decoder session shared by the frames of this sequence, if any."""
+        return self._decoder
+    
+    @property
+    def frame_store(self) -> Optional[DecodedFrameStore]:
+        """Decoded-frame store backing the frames of this sequence, if any."""
+        return self._frame_store
+    
+    def close(self) -> None:
+        """Release the shared decoder session and flush the frame store, if any."""
+        self._stop_preload_thread()
+        if self._decoder is not None:
+            self._decoder.close()
+        if self._frame_store is not None:
+            self._frame_store.flush()
+    
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get memory usage statistics for this sequence."""
         loaded_count = sum(1 for frame in self.frames if frame.is_loaded)
@@ -1129,9 +1978,15 @@ class FrameSequence:
         """Set the default batch size for batch operations."""
         self._batch_size = max(1, batch_size)
     
+    def set_prefetch_depth(self, depth: int) -> None:
+        """Set how many batches process_in_batches decodes ahead by default."""
+        self._prefetch_depth = max(0, depth)
+    
     def set_preload_window(self, window_size: int) -> None:
         """Set the preload window size for smart preloading."""
         self._preload_window = max(0, window_size)
+        # Frames of the previous window are swept on the next access
+        self._window_start = None
     
     def get_frame_at_time(self, timestamp: float, fps: float = 30.0) -> Optional[Frame]:
         """
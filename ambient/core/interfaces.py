@@ -143,6 +143,12 @@ class IOutputManager(ABC):
 class IPoseEstimator(ABC):
     """Interface for pose estimation operations."""
 
+    # Longest frame side the model consumes; None when full frames are wanted.
+    # Callers may decode frames at this size (FrameSequence.from_video's
+    # decode_size), and estimators map keypoints back with
+    # Frame.to_source_keypoints().
+    input_size: Optional[int] = None
+
     @abstractmethod
     def estimate_pose(self, frame: Frame) -> Dict[str, Any]:
         """
@@ -0,0 +1,427 @@
+"""
+Compact array-backed pose sequence for AlexPose.
+
+Pose estimators and the GAVD pipeline pass keypoints around as one list of
+``{"x", "y", "confidence", "id"}`` dicts per frame. At roughly 250 bytes
+per keypoint dict, a 10k-frame BODY_25 sequence occupies tens of
+megabytes, and every analyzer rebuilt a NumPy array from it with nested
+Python loops.
+
+PoseSequence stores the same data as one contiguous float32 array of shape
+(frames, keypoints, 3) holding x, y and confidence, plus the frame numbers,
+the number of keypoints each frame actually had, and per-sequence metadata
+such as the source video dimensions (stored once rather than on every
+keypoint). Frames filled by interpolation rather than estimated are
+flagged, so analyzers can weight them. Dict views are built lazily, one
+frame at a time, for JSON APIs and code that still expects the dict format.
+
+Author: AlexPose Team
+"""
+
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+
+class PoseSequenceError(Exception):
+    """Exception raised for invalid pose sequence data."""
+    pass
+
+
+class PoseSequence(Sequence):
+    """
+    Keypoints of a sequence of frames in one contiguous float32 array.
+
+    Frames with fewer keypoints than the sequence (e.g. no detection) are
+    zero-padded; ``counts`` records how many keypoints each frame had so the
+    dict views reproduce the original lists. Indexing with an integer
+    returns a lazily built frame dict, slicing returns a PoseSequence that
+    shares the array.
+    """
+
+    def __init__(
+        self,
+        keypoints: np.ndarray,
+        frame_numbers: Optional[Iterable[int]] = None,
+        counts: Optional[Iterable[int]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        interpolated: Optional[Iterable[bool]] = None
+    ):
+        """
+        Wrap a keypoint array without copying it when it is already float32.
+
+        Args:
+            keypoints: Array of shape (frames, keypoints, 3) with x, y, confidence
+            frame_numbers: Frame number of each frame (default 0..frames-1)
+            counts: Keypoints present in each frame (default all)
+            metadata: Per-sequence metadata (e.g. source_width, source_height, fps)
+            interpolated: Whether each frame was interpolated rather than
+                estimated (default none)
+        """
+        array = np.asarray(keypoints)
+        if array.ndim != 3 or array.shape[2] != 3:
+            raise PoseSequenceError(
+                f"Keypoints must have shape (frames, keypoints, 3), got {array.shape}"
+            )
+        self._keypoints = np.ascontiguousarray(array, dtype=np.float32)
+        num_frames, num_keypoints = self._keypoints.shape[:2]
+
+        if frame_numbers is None:
+            self._frame_numbers = np.arange(num_frames, dtype=np.int64)
+        else:
+            self._frame_numbers = np.asarray(frame_numbers, dtype=np.int64).reshape(-1)
+
+        if counts is None:
+            self._counts = np.full(num_frames, num_keypoints, dtype=np.int32)
+        else:
+            self._counts = np.asarray(counts, dtype=np.int32).reshape(-1)
+
+        if interpolated is None:
+            self._interpolated = np.zeros(num_frames, dtype=bool)
+        else:
+            self._interpolated = np.asarray(interpolated, dtype=bool).reshape(-1)
+
+        if len(self._frame_numbers) != num_frames or len(self._counts) != num_frames:
+            raise PoseSequenceError(
+                f"Expected {num_frames} frame numbers and counts, "
+                f"got {len(self._frame_numbers)} and {len(self._counts)}"
+            )
+        if len(self._interpolated) != num_frames:
+            raise PoseSequenceError(
+                f"Expected {num_frames} interpolation flags, got {len(self._interpolated)}"
+            )
+        if num_frames and (self._counts.min() < 0 or self._counts.max() > num_keypoints):
+            raise PoseSequenceError(f"Keypoint counts must be between 0 and {num_keypoints}")
+
+        self.metadata: Dict[str, Any] = dict(metadata or {})
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_keypoint_frames(
+        cls,
+        frames: List[List[Dict[str, Any]]],
+        frame_numbers: Optional[Iterable[int]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        num_keypoints: Optional[int] = None,
+        interpolated: Optional[Iterable[bool]] = None
+    ) -> "PoseSequence":
+        """
+        Build a sequence from per-frame keypoint dict lists (estimator output).
+
+        Args:
+            frames: One list of keypoint dicts (x, y, confidence) per frame
+            frame_numbers: Frame number of each frame (default 0..frames-1)
+            metadata: Per-sequence metadata
+            num_keypoints: Keypoints per frame; defaults to the length of the
+                first non-empty frame, longer frames are truncated
+            interpolated: Whether each frame was interpolated
+
+        Returns:
+            PoseSequence holding the frames
+        """
+        frames = [kps or [] for kps in frames]
+        if num_keypoints is None:
+            num_keypoints = next((len(kps) for kps in frames if kps), 0)
+        counts = np.array([min(len(kps), num_keypoints) for kps in frames], dtype=np.int32)
+
+        # Read all values in one pass, then scatter them into the padded array
+        total = int(counts.sum())
+        values = np.fromiter(
+            (
+                value
+                for kps, count in zip(frames, counts.tolist())
+                for kp in kps[:count]
+                for value in (kp.get("x", 0), kp.get("y", 0), kp.get("confidence", 0))
+            ),
+            dtype=np.float32,
+            count=total * 3
+        ).reshape(total, 3)
+
+        return cls.from_packed(
+            counts, values, num_keypoints,
+            frame_numbers=frame_numbers, metadata=metadata, interpolated=interpolated
+        )
+
+    @classmethod
+    def from_poses(
+        cls,
+        poses: Iterable[Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]] = None,
+        keypoints_key: str = "keypoints",
+        frame_key: Optional[str] = None,
+        num_keypoints: Optional[int] = None
+    ) -> "PoseSequence":
+        """
+        Build a sequence from pose dicts such as ``{"keypoints": [...]}``.
+
+        Source video dimensions found on the first pose or its first keypoint
+        (the GAVD pipeline stamps ``source_width``/``source_height`` onto
+        every keypoint) are moved into the sequence metadata, and the
+        ``interpolated`` flag of each pose is kept.
+
+        Args:
+            poses: Pose dicts, one per frame
+            metadata: Per-sequence metadata
+            keypoints_key: Key of the keypoint list in each pose dict
+            frame_key: Key of the frame number in each pose dict (default:
+                frames are numbered 0..frames-1)
+            num_keypoints: Keypoints per frame (see from_keypoint_frames)
+
+        Returns:
+            PoseSequence holding the poses
+        """
+        poses = list(poses)
+        frames = [pose.get(keypoints_key) or [] for pose in poses]
+        frame_numbers = None
+        if frame_key is not None:
+            frame_numbers = [int(pose.get(frame_key) or 0) for pose in poses]
+        interpolated = [bool(pose.get("interpolated", False)) for pose in poses]
+
+        metadata = dict(metadata or {})
+        first_keypoint = next((kps[0] for kps in frames if kps), None)
+        for source in (poses[0] if poses else None, first_keypoint):
+            if isinstance(source, dict):
+                for key in ("source_width", "source_height"):
+                    if source.get(key) is not None:
+                        metadata.setdefault(key, source[key])
+
+        return cls.from_keypoint_frames(frames, frame_numbers, metadata, num_keypoints, interpolated)
+
+    @classmethod
+    def from_packed(
+        cls,
+        counts: np.ndarray,
+        points: np.ndarray,
+        num_keypoints: Optional[int] = None,
+        frame_numbers: Optional[Iterable[int]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        interpolated: Optional[Iterable[bool]] = None
+    ) -> "PoseSequence":
+        """
+        Build a sequence from flat packed arrays (as written by the keypoint cache).
+
+        When every frame has the same number of keypoints and ``points`` is
+        float32, the sequence is a view of ``points`` and nothing is copied.
+
+        Args:
+            counts: Keypoints in each frame
+            points: Array of shape (sum(counts), 3) with x, y, confidence
+            num_keypoints: Keypoints per frame (default max(counts))
+            frame_numbers: Frame number of each frame
+            metadata: Per-sequence metadata
+            interpolated: Whether each frame was interpolated
+
+        Returns:
+            PoseSequence holding the frames
+        """
+        counts = np.asarray(counts, dtype=np.int32).reshape(-1)
+        points = np.asarray(points).reshape(-1, 3)
+        if num_keypoints is None:
+            num_keypoints = int(counts.max()) if len(counts) else 0
+        if int(counts.sum()) != len(points):
+            raise PoseSequenceError(
+                f"Counts describe {int(counts.sum())} keypoints, got {len(points)}"
+            )
+
+        if len(counts) and np.all(counts == num_keypoints):
+            keypoints = points.reshape(len(counts), num_keypoints, 3)
+        else:
+            keypoints = np.zeros((len(counts), num_keypoints, 3), dtype=np.float32)
+            mask = np.arange(num_keypoints) < counts[:, None]
+            keypoints[mask] = points
+        return cls(keypoints, frame_numbers, counts, metadata, interpolated)
+
+    @classmethod
+    def coerce(cls, poses: Union["PoseSequence", Iterable[Dict[str, Any]], np.ndarray]) -> "PoseSequence":
+        """
+        Get a PoseSequence for analyzer input, converting dict lists once.
+
+        Args:
+            poses: PoseSequence (returned as is), keypoint array or pose dicts
+
+        Returns:
+            PoseSequence
+        """
+        if isinstance(poses, cls):
+            return poses
+        if isinstance(poses, np.ndarray):
+            return cls(poses)
+        return cls.from_poses(poses)
+
+    # ------------------------------------------------------------------
+    # Array access
+    # ------------------------------------------------------------------
+
+    @property
+    def keypoints(self) -> np.ndarray:
+        """Keypoint array of shape (frames, keypoints, 3)."""
+        return self._keypoints
+
+    @property
+    def xy(self) -> np.ndarray:
+        """View of the x, y coordinates, shape (frames, keypoints, 2)."""
+        return self._keypoints[..., :2]
+
+    @property
+    def confidence(self) -> np.ndarray:
+        """View of the confidences, shape (frames, keypoints)."""
+        return self._keypoints[..., 2]
+
+    @property
+    def frame_numbers(self) -> np.ndarray:
+        """Frame number of each frame."""
+        return self._frame_numbers
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Keypoints present in each frame."""
+        return self._counts
+
+    @property
+    def interpolated(self) -> np.ndarray:
+        """Whether each frame was interpolated rather than estimated."""
+        return self._interpolated
+
+    @property
+    def num_frames(self) -> int:
+        """Number of frames."""
+        return self._keypoints.shape[0]
+
+    @property
+    def num_keypoints(self) -> int:
+        """Number of keypoints per frame."""
+        return self._keypoints.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays."""
+        return (
+            self._keypoints.nbytes + self._frame_numbers.nbytes
+            + self._counts.nbytes + self._interpolated.nbytes
+        )
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Keypoint array, copied for copy=True or a different dtype."""
+        if dtype is not None and np.dtype(dtype) != self._keypoints.dtype:
+            if copy is False:
+                raise ValueError(f"Converting keypoints to {np.dtype(dtype)} requires a copy")
+            return self._keypoints.astype(dtype)
+        return self._keypoints.copy() if copy else self._keypoints
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PoseSequence(
+                self._keypoints[index],
+                self._frame_numbers[index],
+                self._counts[index],
+                self.metadata,
+                self._interpolated[index]
+            )
+        if index < 0:
+            index += self.num_frames
+        if not 0 <= index < self.num_frames:
+            raise IndexError(f"Frame index {index} out of range for {self.num_frames} frames")
+        return self.frame_dict(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.num_frames):
+            yield self.frame_dict(index)
+
+    def __repr__(self) -> str:
+        return (
+            f"PoseSequence(frames={self.num_frames}, keypoints={self.num_keypoints}, "
+            f"nbytes={self.nbytes})"
+        )
+
+    # ------------------------------------------------------------------
+    # Dict views
+    # ------------------------------------------------------------------
+
+    def frame_keypoints(self, index: int, include_source: bool = False) -> List[Dict[str, Any]]:
+        """
+        Build the keypoint dict list of one frame.
+
+        Args:
+            index: Frame position in the sequence
+            include_source: Stamp source_width/source_height from the metadata
+                onto each keypoint, as the GAVD pose files do
+
+        Returns:
+            Keypoint dicts with x, y, confidence and id
+        """
+        count = int(self._counts[index])
+        values = self._keypoints[index, :count].tolist()
+        keypoints = [
+            {"x": x, "y": y, "confidence": c, "id": i}
+            for i, (x, y, c) in enumerate(values)
+        ]
+        if include_source:
+            width = self.metadata.get("source_width")
+            height = self.metadata.get("source_height")
+            if width and height:
+                for kp in keypoints:
+                    kp["source_width"] = width
+                    kp["source_height"] = height
+        return keypoints
+
+    def frame_dict(self, index: int) -> Dict[str, Any]:
+        """
+        Build the pose dict of one frame.
+
+        Args:
+            index: Frame position in the sequence
+
+        Returns:
+            Dictionary with 'frame_num' and 'keypoints', plus
+            'interpolated': True for interpolated frames
+        """
+        pose = {
+            "frame_num": int(self._frame_numbers[index]),
+            "keypoints": self.frame_keypoints(index)
+        }
+        if self._interpolated[index]:
+            pose["interpolated"] = True
+        return pose
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the sequence for JSON APIs.
+
+        Returns:
+            Dictionary with 'metadata' and 'frames' (one pose dict per frame)
+        """
+        return {
+            "metadata": dict(self.metadata),
+            "frames": [self.frame_dict(i) for i in range(self.num_frames)]
+        }
+
+
+def poses_to_array(
+    poses: Optional[Union[PoseSequence, Iterable[Dict[str, Any]], np.ndarray]]
+) -> Optional[np.ndarray]:
+    """
+    Get the float64 (frames, keypoints, 3) array analyzers compute on.
+
+    Analyzers work in float64 so their results stay JSON-serializable
+    Python floats.
+
+    Args:
+        poses: PoseSequence, keypoint array or pose dicts
+
+    Returns:
+        Keypoint array, or None when there are no frames or no keypoints
+    """
+    if poses is None or len(poses) == 0:
+        return None
+
+    sequence = PoseSequence.coerce(poses)
+    if sequence.num_keypoints == 0:
+        return None
+    return sequence.keypoints.astype(np.float64)
@@ -23,13 +23,15 @@ Date: 2025-07-26
 """
 
 from loguru import logger as loguru_logger
+import inspect
 import os
 import sys
 import subprocess
 import tempfile
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import pandas as pd
 
@@ -38,9 +40,23 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from ambient.gavd.keypoints import BoundingBoxProcessor, KeypointGenerator
-from ambient.gavd.pose_estimators import PoseEstimator
+from ambient.gavd.pose_estimators import (
+    DEFAULT_CROP_PADDING,
+    DEFAULT_WARMUP_FRAMES,
+    PoseEstimator,
+    merge_frame_ranges,
+)
 from ambient.utils.youtube_cache import extract_video_id
 from ambient.utils.csv_parser import parse_csv_with_dicts
+from ambient.utils.keypoint_cache import (
+    DEFAULT_KEYPOINT_CACHE_SIZE_MB,
+    KeypointCache,
+    KeypointCacheError,
+    get_keypoint_cache,
+)
+from ambient.utils.seek_index import get_seek_index
+from ambient.utils.video_decoder import FFMPEG_MODES, RAWPIPE_MODE, read_frame_ffmpeg_raw
+from ambient.utils.video_metadata import get_video_metadata
 from ambient.utils.youtube_cache import cache_youtube_videos_from_rows
 
 
@@ -658,22 +674,290 @@ class PoseDataConverter:
     solely on data format conversion.
     """
 
+    # Videos whose keypoints are kept in memory between sequences
+    MAX_CACHED_VIDEOS = 4
+
     def __init__(
         self,
         keypoint_extractor: Optional[PoseKeypointExtractor] = None,
         estimator: Optional[PoseEstimator] = None,
         video_cache_dir: Optional[Union[str, Path]] = "data/youtube",
+        ffmpeg_mode: str = RAWPIPE_MODE,
+        video_workers: int = 1,
+        keypoint_cache: bool = False,
+        keypoint_cache_dir: Optional[Union[str, Path]] = None,
+        keypoint_cache_size_mb: float = DEFAULT_KEYPOINT_CACHE_SIZE_MB,
+        bbox_crop: bool = False,
+        bbox_crop_padding: float = DEFAULT_CROP_PADDING,
     ):
         """
         Initialize the pose data converter.
 
         Args:
             keypoint_extractor (Optional[PoseKeypointExtractor]): Keypoint extractor
+            ffmpeg_mode (str): Per-frame fallback extraction mode; "rawpipe" decodes
+                straight into numpy arrays, "jpeg" writes temporary JPEG files
+            video_workers (int): Processes used by estimators that support
+                segment-parallel video estimation (1 for serial)
+            keypoint_cache (bool): Keep estimated video keypoints in a persistent
+                on-disk cache keyed by video content, frame range, estimator
+                fingerprint and model, so reprocessing skips inference
+            keypoint_cache_dir (Optional[Union[str, Path]]): Cache directory
+                (default data/cache/keypoints)
+            keypoint_cache_size_mb (float): LRU size budget of the cache
+            bbox_crop (bool): In range mode, crop video frames around the
+                annotated bbox before inference, for estimators that accept
+                bboxes; keypoints stay in video coordinates
+            bbox_crop_padding (float): Margin around the bbox as a fraction
+                of its size
         """
+        if ffmpeg_mode not in FFMPEG_MODES:
+            raise ValueError(f"Unsupported ffmpeg mode: {ffmpeg_mode}")
         self.keypoint_extractor = keypoint_extractor or PoseKeypointExtractor()
         # Optional pluggable estimator (e.g., OpenPose, MediaPipe)
         self.estimator: Optional[PoseEstimator] = estimator
         self.video_cache_dir: Path = self._resolve_cache_dir(video_cache_dir)
+        self.ffmpeg_mode = ffmpeg_mode
+        self.video_workers = max(1, video_workers)
+        self.bbox_crop = bbox_crop
+        self.bbox_crop_padding = bbox_crop_padding
+        # Frame indices (and their bboxes) needed per URL by all sequences
+        # about to be converted
+        self._planned_frames: Dict[str, Set[int]] = {}
+        self._planned_bboxes: Dict[str, Dict[int, Any]] = {}
+        # In-process keypoints of the most recent videos (whole-video and
+        # range mode), bounded to MAX_CACHED_VIDEOS
+        self._video_kp_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._video_range_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # (video, frame index) last estimated on its own, for estimators that
+        # track the subject between frames
+        self._last_single_frame: Optional[Tuple[Path, int]] = None
+        self.keypoint_cache: Optional[KeypointCache] = (
+            get_keypoint_cache(keypoint_cache_dir, keypoint_cache_size_mb) if keypoint_cache else None
+        )
+
+    @staticmethod
+    def _remember(cache: "OrderedDict[str, Any]", key: str, value: Any) -> Any:
+        """Insert into a bounded in-process cache, dropping the oldest videos."""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > PoseDataConverter.MAX_CACHED_VIDEOS:
+            cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _row_frame_index(row: Any) -> int:
+        """0-based video frame index of a GAVD row.
+
+        GAVD CSV uses 1-based frame numbers (starting from 1), so we convert to 0-based.
+        However, if frame_num values are absolute frame numbers in the video (e.g., 1757),
+        we use them directly after converting to 0-based.
+        """
+        frame_num_val = int(row.get("frame_num", 0))
+        # Convert 1-based frame_num to 0-based frame_index
+        # This handles both cases: frame_num starting at 1, or absolute frame numbers
+        return frame_num_val - 1 if frame_num_val >= 1 else frame_num_val
+
+    def plan_video_ranges(self, sequences: Iterable[pd.DataFrame]) -> None:
+        """
+        Record the frames that a batch of sequences will need from each video.
+
+        Estimators that can estimate frame ranges then process, on first use
+        of a video, the union of the annotated ranges of every planned
+        sequence sharing its URL, instead of the whole video or one
+        sequence's range at a time.
+
+        Args:
+            sequences: Sequence DataFrames that will be converted
+        """
+        planned: Dict[str, Set[int]] = {}
+        planned_bboxes: Dict[str, Dict[int, Any]] = {}
+        for seq_data in sequences:
+            if "url" not in seq_data.columns or "frame_num" not in seq_data.columns:
+                continue
+            missing = [None] * len(seq_data)
+            bboxes = seq_data["bbox"] if "bbox" in seq_data.columns else missing
+            vid_infos = seq_data["vid_info"] if "vid_info" in seq_data.columns else missing
+            for url, frame_num, bbox, vid_info in zip(seq_data["url"], seq_data["frame_num"], bboxes, vid_infos):
+                if not isinstance(url, str) or not url.strip() or pd.isna(frame_num):
+                    continue
+                frame_index = self._row_frame_index({"frame_num": frame_num})
+                planned.setdefault(url, set()).add(frame_index)
+                if isinstance(bbox, dict):
+                    planned_bboxes.setdefault(url, {})[frame_index] = (bbox, vid_info)
+        self._planned_frames = planned
+        self._planned_bboxes = planned_bboxes
+
+    def _supports_range_estimation(self) -> bool:
+        """Check if the estimator can estimate selected frame ranges of a video."""
+        return callable(getattr(type(self.estimator), "estimate_video_frame_ranges", None))
+
+    def _uses_bbox_crops(self) -> bool:
+        """Check if range estimation should crop frames around annotated bboxes."""
+        if not self.bbox_crop or not self._supports_range_estimation():
+            return False
+        try:
+            parameters = inspect.signature(self.estimator.estimate_video_frame_ranges).parameters
+        except (TypeError, ValueError):
+            return False
+        return "bboxes" in parameters
+
+    def _estimate_video_ranges(
+        self,
+        video_path: Path,
+        url: str,
+        needed: Set[int],
+        model_pose: str,
+        cache_key: str,
+        fingerprint: str,
+        bboxes: Optional[Dict[int, Any]] = None
+    ) -> Dict[str, Any]:
+        """Estimate the needed frames (and the URL's planned frames) not yet estimated."""
+        entry = self._video_range_cache.get(cache_key)
+        if entry is None:
+            entry = {"estimated": set(), "frames": {}, "video_width": None, "video_height": None}
+        self._remember(self._video_range_cache, cache_key, entry)
+        missing = needed - entry["estimated"]
+        if not missing:
+            return entry
+
+        # Estimate every planned frame of this video together with the missing ones
+        wanted = missing | (self._planned_frames.get(url, set()) - entry["estimated"])
+
+        if self.keypoint_cache is not None:
+            try:
+                cached = self.keypoint_cache.get(video_path, fingerprint, model_pose, wanted)
+                self._merge_range_result(entry, cached)
+                entry["estimated"].update(cached["frames"])
+                wanted -= set(cached["frames"])
+            except KeypointCacheError as e:
+                loguru_logger.warning(f"Keypoint cache lookup failed for {video_path}: {e}")
+            if not wanted:
+                return entry
+
+        ranges = merge_frame_ranges(wanted, max_gap=DEFAULT_WARMUP_FRAMES)
+        options: Dict[str, Any] = {"workers": self.video_workers} if self.video_workers > 1 else {}
+        if bboxes is not None:
+            # Bboxes of every frame about to be estimated, planned ones included
+            options["bboxes"] = self._video_bboxes(
+                video_path, {**self._planned_bboxes.get(url, {}), **bboxes}
+            )
+            options["crop_padding"] = self.bbox_crop_padding
+        try:
+            loguru_logger.debug(f"Processing video keypoint ranges: {video_path}::{model_pose} {ranges}")
+            result = self.estimator.estimate_video_frame_ranges(
+                video_path, ranges, model=model_pose, **options
+            )
+            self._merge_range_result(entry, result)
+            self._store_ranges(video_path, fingerprint, model_pose, ranges, result)
+        except Exception as e:
+            # Rows fall back to single-frame estimation
+            loguru_logger.warning(f"Range estimation failed for {video_path}: {e}")
+        entry["estimated"].update(i for start, end in ranges for i in range(start, end))
+        return entry
+
+    def _video_bboxes(
+        self,
+        video_path: Path,
+        annotated: Dict[int, Any]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Scale (bbox, vid_info) annotations to the resolution of the cached video."""
+        try:
+            info = get_video_metadata(video_path, "opencv")
+        except Exception as e:
+            loguru_logger.debug(f"Could not read video size of {video_path}: {e}")
+            info = {}
+        bboxes = {}
+        for frame_index, (bbox, vid_info) in annotated.items():
+            if isinstance(vid_info, dict) and info.get("width") and info.get("height"):
+                bbox = self._scale_bbox_coordinates(
+                    bbox, vid_info.get("width", info["width"]), vid_info.get("height", info["height"]),
+                    info["width"], info["height"]
+                )
+            bboxes[frame_index] = bbox
+        return bboxes
+
+    @staticmethod
+    def _merge_range_result(entry: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Merge estimated or cached range keypoints into an in-process entry."""
+        entry["frames"].update(result.get("frames", {}))
+        entry["video_width"] = result.get("video_width") or entry["video_width"]
+        entry["video_height"] = result.get("video_height") or entry["video_height"]
+
+    def _store_ranges(
+        self,
+        video_path: Path,
+        fingerprint: str,
+        model_pose: str,
+        ranges: List[Any],
+        result: Dict[str, Any]
+    ) -> None:
+        """Persist estimated ranges, each up to its first frame without results."""
+        if self.keypoint_cache is None:
+            return
+        frames = result.get("frames", {})
+        try:
+            for start, end in ranges:
+                estimated = []
+                for i in range(start, end):
+                    if i not in frames:
+                        break
+                    estimated.append(frames[i])
+                self.keypoint_cache.put(
+                    video_path, fingerprint, model_pose, start, estimated,
+                    result.get("video_width"), result.get("video_height")
+                )
+        except (KeypointCacheError, OSError) as e:
+            loguru_logger.warning(f"Could not cache keypoints for {video_path}: {e}")
+
+    def _estimate_whole_video(
+        self,
+        video_path: Path,
+        model_pose: str,
+        cache_key: str,
+        fingerprint: str
+    ) -> Any:
+        """Estimate (or load cached) keypoints for every frame of a video."""
+        if cache_key in self._video_kp_cache:
+            self._video_kp_cache.move_to_end(cache_key)
+            return self._video_kp_cache[cache_key]
+
+        if self.keypoint_cache is not None:
+            try:
+                cached = self.keypoint_cache.get_video(video_path, fingerprint, model_pose)
+            except KeypointCacheError as e:
+                loguru_logger.warning(f"Keypoint cache lookup failed for {video_path}: {e}")
+                cached = None
+            if cached is not None:
+                return self._remember(self._video_kp_cache, cache_key, cached)
+
+        # Estimate all frames at once
+        try:
+            loguru_logger.debug(f"Processing video keypoints: {video_path}::{model_pose}")
+            # Only parallel-capable estimators take workers
+            parallel = {"workers": self.video_workers} if self.video_workers > 1 else {}
+            video_result = self.estimator.estimate_video_keypoints(
+                video_path, model=model_pose, **parallel
+            )
+        except (AttributeError, NotImplementedError):
+            # Estimator doesn't support video mode; fall back per-frame
+            video_result = None
+
+        if (
+            self.keypoint_cache is not None
+            and isinstance(video_result, dict)
+            and isinstance(video_result.get("frames"), list)
+        ):
+            try:
+                self.keypoint_cache.put(
+                    video_path, fingerprint, model_pose, 0, video_result["frames"],
+                    video_result.get("video_width"), video_result.get("video_height"),
+                    complete=True
+                )
+            except (KeypointCacheError, OSError) as e:
+                loguru_logger.warning(f"Could not cache keypoints for {video_path}: {e}")
+
+        return self._remember(self._video_kp_cache, cache_key, video_result)
 
     def _resolve_cache_dir(self, p: Optional[Union[str, Path]]) -> Path:
         base = Path(p or "data/youtube")
@@ -790,14 +1074,19 @@ class PoseDataConverter:
         """
         temp_dir = tempfile.mkdtemp(prefix="gavd_frame_")
         out_path = Path(temp_dir) / f"frame_{frame_index:06d}.jpg"
+        # Seek to the keyframe before the frame so long videos are not
+        # decoded from the start; output frame n is then video frame base + n
+        seek_index = get_seek_index(video_path)
+        seek_args, base = seek_index.input_seek(frame_index) if seek_index is not None else ([], 0)
         # Build ffmpeg command: select frame by index (0-based)
         # Use 'select' filter with exact frame number matching
         # Note: comma must be escaped in ffmpeg filter expressions
-        select_expr = f"select=eq(n\\,{frame_index})"
+        select_expr = f"select=eq(n\\,{frame_index - base})"
         cmd = [
             "ffmpeg",
             "-v",
             "error",
+            *seek_args,
             "-i",
             str(video_path),
             "-vf",
@@ -814,6 +1103,57 @@ class PoseDataConverter:
             )
         return out_path
 
+    def _extract_frame_array(self, video_path: Path, frame_index: int):
+        """Extract a single frame as an RGB numpy array through an ffmpeg raw pipe.
+
+        frame_index is 0-based, as for _extract_frame_image. No temporary files
+        are written and the frame never passes through a lossy JPEG encode.
+        """
+        return read_frame_ffmpeg_raw(
+            video_path, frame_index, seek_index=get_seek_index(video_path)
+        )
+
+    def _reset_estimator(self) -> None:
+        """Clear per-video state of the estimator (e.g. a tracked ROI), if it has any."""
+        self._last_single_frame = None
+        reset = getattr(self.estimator, "reset", None)
+        if callable(reset):
+            reset()
+
+    def _estimate_single_frame(
+        self,
+        video_path: Path,
+        frame_index: int,
+        model_pose: str,
+        bbox: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Estimate keypoints for one frame using the configured ffmpeg mode."""
+        # Tracking state only carries over to later frames of the same video
+        last = self._last_single_frame
+        if last is None or last[0] != video_path or frame_index <= last[1]:
+            self._reset_estimator()
+        self._last_single_frame = (video_path, frame_index)
+
+        if self.ffmpeg_mode == RAWPIPE_MODE and hasattr(self.estimator, "estimate_array_keypoints"):
+            frame_rgb = self._extract_frame_array(video_path, frame_index)
+            loguru_logger.debug(f"Processing array keypoints: {video_path}::{frame_index}")
+            return self.estimator.estimate_array_keypoints(
+                frame_rgb, model=model_pose, bbox=bbox
+            )
+
+        img_path = self._extract_frame_image(video_path, frame_index)
+        try:
+            loguru_logger.debug(f"Processing image keypoints: {img_path}::{frame_index}")
+            return self.estimator.estimate_image_keypoints(
+                image_path=str(img_path), model=model_pose, bbox=bbox
+            )
+        finally:
+            try:
+                Path(img_path).unlink(missing_ok=True)  # type: ignore[arg-type]
+                Path(img_path).parent.rmdir()
+            except Exception:
+                pass
+
     def convert_sequence_to_pose_format(
         self,
         seq_data: pd.DataFrame,
@@ -840,6 +1180,8 @@ class PoseDataConverter:
             List[Dict[str, Any]]: Pose data in OpenPose-like format
         """
         pose_frames: List[Dict[str, Any]] = []
+        # Each sequence starts without tracking state from the previous one
+        self._last_single_frame = None
 
         # If estimator is available and URLs present, use cached videos for frames
         urls_in_seq = set()
@@ -859,6 +1201,21 @@ class PoseDataConverter:
 
         has_urls = bool(urls_in_seq)
 
+        # Range-aware estimators only see the frames annotated for each URL
+        range_mode = self.estimator is not None and has_urls and self._supports_range_estimation()
+        crop_mode = range_mode and self._uses_bbox_crops()
+        needed_frames: Dict[str, Set[int]] = {}
+        needed_bboxes: Dict[str, Dict[int, Any]] = {}
+        if range_mode:
+            for _, row in seq_data.iterrows():
+                url = row.get("url")
+                if isinstance(url, str) and url in url_to_video:
+                    needed_frames.setdefault(url, set()).add(self._row_frame_index(row))
+                    if isinstance(row.get("bbox"), dict):
+                        needed_bboxes.setdefault(url, {})[self._row_frame_index(row)] = (
+                            row["bbox"], row.get("vid_info")
+                        )
+
         for _, row in seq_data.iterrows():
             bbox = row["bbox"]
             if not isinstance(bbox, dict):
@@ -871,10 +1228,7 @@ class PoseDataConverter:
                 # GAVD CSV uses 1-based frame numbers (starting from 1), so we convert to 0-based.
                 # However, if frame_num values are absolute frame numbers in the video (e.g., 1757),
                 # we use them directly after converting to 0-based.
-                frame_num_val = int(row.get("frame_num", 0))
-                # Convert 1-based frame_num to 0-based frame_index
-                # This handles both cases: frame_num starting at 1, or absolute frame numbers
-                frame_index = frame_num_val - 1 if frame_num_val >= 1 else frame_num_val
+                frame_index = self._row_frame_index(row)
                 url_val = row.get("url")
                 # If URL missing or not cached, skip this row
                 if not isinstance(url_val, str) or not url_val.strip():
@@ -890,21 +1244,21 @@ class PoseDataConverter:
                     estimator_fingerprint = (
                         self.estimator.cache_fingerprint() if hasattr(self.estimator, "cache_fingerprint") else "est"
                     )
+                    if crop_mode:
+                        # Cropped inference gives different keypoints than full frames
+                        estimator_fingerprint += f":bbox_crop{self.bbox_crop_padding}"
                     cache_key = f"{video_path}::{model_pose}::{estimator_fingerprint}"
-                    if not hasattr(self, "_video_kp_cache"):
-                        self._video_kp_cache = {}
-                    if cache_key not in self._video_kp_cache:
-                        # Estimate all frames at once
-                        try:
-                            loguru_logger.debug(f"Processing video keypoints: {video_path}::{model_pose}")
-                            video_result = self.estimator.estimate_video_keypoints(
-                                video_path, model=model_pose
-                            )
-                        except AttributeError:
-                            # Estimator doesn't support video mode; fall back per-frame
-                            video_result = None
-                        self._video_kp_cache[cache_key] = video_result
-                    video_result = self._video_kp_cache.get(cache_key)
+                    if range_mode:
+                        # Estimate only the annotated frames, once per video
+                        video_result = self._estimate_video_ranges(
+                            video_path, url_val, needed_frames[url_val], model_pose,
+                            cache_key, estimator_fingerprint,
+                            bboxes=needed_bboxes.get(url_val, {}) if crop_mode else None
+                        )
+                    else:
+                        video_result = self._estimate_whole_video(
+                            video_path, model_pose, cache_key, estimator_fingerprint
+                        )
 
                     # Handle both old (list) and new (dict) return formats
                     all_frames = None
@@ -918,7 +1272,14 @@ class PoseDataConverter:
                     elif isinstance(video_result, list):
                         all_frames = video_result
                     
-                    if all_frames is not None and 0 <= frame_index < len(all_frames):
+                    if isinstance(all_frames, dict) and frame_index in all_frames:
+                        # Range results are keyed by frame index
+                        pose_keypoints = all_frames[frame_index]
+                        if source_video_width and source_video_height:
+                            for kp in pose_keypoints:
+                                kp['source_width'] = source_video_width
+                                kp['source_height'] = source_video_height
+                    elif isinstance(all_frames, list) and 0 <= frame_index < len(all_frames):
                         pose_keypoints = all_frames[frame_index]
                         # Store source video dimensions with keypoints for proper scaling
                         if source_video_width and source_video_height:
@@ -927,17 +1288,9 @@ class PoseDataConverter:
                                 kp['source_height'] = source_video_height
                     else:
                         # Fallback to ffmpeg + single-frame estimation
-                        img_path = self._extract_frame_image(video_path, frame_index)
-                        try:
-                            loguru_logger.debug(f"Processing image keypoints: {img_path}::{frame_index}")
-                            pose_keypoints = self.estimator.estimate_image_keypoints(
-                                image_path=str(img_path), model=model_pose, bbox=bbox
-                            )
-                        finally:
-                            try:
-                                Path(img_path).unlink(missing_ok=True)  # type: ignore[arg-type]
-                            except Exception:
-                                pass
+                        pose_keypoints = self._estimate_single_frame(
+                            video_path, frame_index, model_pose, bbox
+                        )
                 except Exception:
                     # Fallback to placeholder on any failure
                     pose_keypoints = self.keypoint_extractor.extract_from_bbox(
@@ -1040,6 +1393,12 @@ class GAVDProcessor:
         processed_sequences = {}
         sequence_count = 0
 
+        # Let video estimation cover every selected sequence's frames at once
+        selected = list(sequences.values())
+        if max_sequences:
+            selected = selected[:max_sequences]
+        self.data_converter.plan_video_ranges(selected)
+
         for seq_id, seq_data in sequences.items():
             if max_sequences and sequence_count >= max_sequences:
                 break
@@ -1105,6 +1464,7 @@ class GAVDProcessor:
 
         # Process filtered sequences
         processed_sequences = {}
+        self.data_converter.plan_video_ranges(filtered_sequences.values())
 
         for seq_id, seq_data in filtered_sequences.items():
             pose_data = self.data_converter.convert_sequence_to_pose_format(
@@ -0,0 +1,175 @@
+"""
+Reusable pose landmarker pool for GAVD processing.
+
+Creating a MediaPipe ``PoseLandmarker`` loads its .task model and sets up an
+inference graph, which costs far more than detecting a pose in one image.
+Landmarkers are not thread-safe, so instead of creating one per image, a
+pool keeps one landmarker per worker thread: it is created on the thread's
+first request, reused for every later image, and closed when the thread has
+exited or the pool is shut down.
+
+Pools are shared process-wide by configuration (model path, running mode
+and confidence thresholds), so estimators created per request in the server
+reuse the same landmarkers.
+
+Author: AlexPose Team
+"""
+
+import atexit
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from loguru import logger
+
+
+class LandmarkerPoolError(Exception):
+    """Exception raised for landmarker pool errors."""
+    pass
+
+
+class LandmarkerPool:
+    """
+    Thread-safe pool holding one lazily created landmarker per thread.
+
+    Landmarkers are never shared between threads. A landmarker whose thread
+    has exited is closed the next time the pool creates one, and close()
+    closes all of them; the pool can be used again afterwards.
+    """
+
+    def __init__(self, create: Callable[[], Any], name: str = "landmarker"):
+        """
+        Initialize the pool.
+
+        Args:
+            create: Factory returning a new landmarker with a close() method;
+                shared pools outlive their callers, so it should not hold one
+            name: Name used in logs and statistics
+        """
+        self.name = name
+        self._create = create
+        # Landmarkers keyed by thread ident, with the owning thread
+        self._landmarkers: Dict[int, Tuple["weakref.ref[threading.Thread]", Any]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._closed = 0
+
+    def get(self) -> Any:
+        """
+        Get the calling thread's landmarker, creating it on first use.
+
+        Returns:
+            Landmarker owned by the calling thread
+        """
+        thread = threading.current_thread()
+        with self._lock:
+            entry = self._landmarkers.get(thread.ident)
+            if entry is not None and entry[0]() is thread:
+                self._hits += 1
+                return entry[1]
+
+        # Thread idents are reused, so an entry may belong to an exited thread
+        stale = self._prune()
+        try:
+            landmarker = self._create()
+        except Exception as e:
+            raise LandmarkerPoolError(f"Could not create {self.name}: {e}")
+        with self._lock:
+            self._landmarkers[thread.ident] = (weakref.ref(thread), landmarker)
+            self._misses += 1
+        self._close_all(stale)
+
+        logger.debug(f"Created {self.name} for thread {thread.name}")
+        return landmarker
+
+    def _prune(self) -> List[Any]:
+        """Remove and return the landmarkers of threads that have exited."""
+        with self._lock:
+            dead = [
+                ident for ident, (ref, _) in self._landmarkers.items()
+                if ref() is None or not ref().is_alive()
+            ]
+            return [self._landmarkers.pop(ident)[1] for ident in dead]
+
+    def _close_all(self, landmarkers: List[Any]) -> None:
+        """Close landmarkers, logging failures."""
+        for landmarker in landmarkers:
+            try:
+                landmarker.close()
+            except Exception as e:
+                logger.warning(f"Failed to close {self.name}: {e}")
+        with self._lock:
+            self._closed += len(landmarkers)
+
+    def close(self) -> None:
+        """Close every landmarker in the pool."""
+        with self._lock:
+            landmarkers = [entry[1] for entry in self._landmarkers.values()]
+            self._landmarkers.clear()
+        self._close_all(landmarkers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._lock:
+            active = len(self._landmarkers)
+            hits, misses, closed = self._hits, self._misses, self._closed
+        requests = hits + misses
+        return {
+            'name': self.name,
+            'active': active,
+            'hits': hits,
+            'misses': misses,
+            'closed': closed,
+            'hit_rate': hits / requests if requests else 0.0
+        }
+
+
+# Pools shared within the process, keyed by landmarker configuration
+_pools: Dict[Hashable, LandmarkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_landmarker_pool(
+    key: Hashable,
+    create: Callable[[], Any],
+    name: str = "landmarker"
+) -> LandmarkerPool:
+    """
+    Get the process-wide pool for a landmarker configuration.
+
+    Args:
+        key: Configuration key (e.g. model path, running mode, thresholds)
+        create: Factory used if the pool does not exist yet; it is kept for
+            the life of the process, so pass a function of the configuration
+            rather than a bound method of a short-lived object
+        name: Pool name used in logs and statistics
+
+    Returns:
+        Shared landmarker pool
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = LandmarkerPool(create, name)
+            _pools[key] = pool
+        return pool
+
+
+def get_landmarker_pool_stats() -> List[Dict[str, Any]]:
+    """Get statistics for every shared landmarker pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.get_stats() for pool in pools]
+
+
+def close_landmarker_pools() -> None:
+    """Close and forget every shared landmarker pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_landmarker_pools)
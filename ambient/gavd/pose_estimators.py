@@ -4,11 +4,30 @@ Pose estimator factory and integration for GAVD processing.
 Provides a unified interface for different pose estimation frameworks.
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from pathlib import Path
 from loguru import logger
 from dataclasses import dataclass
+import bisect
+import functools
+import math
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ambient.gavd.landmarker_pool import LandmarkerPool, get_landmarker_pool
+from ambient.utils.video_decoder import VideoDecoderError, VideoDecoderSession
+from ambient.utils.video_metadata import get_video_metadata
+
+# Frames of tracking warm-up decoded before each parallel video segment
+DEFAULT_WARMUP_FRAMES = 30
+
+# Segments shorter than this are not worth a process of their own
+MIN_FRAMES_PER_SEGMENT = 150
+
+# Margin added on each side of the annotated bbox in bbox-guided video mode,
+# as a fraction of the bbox size
+DEFAULT_CROP_PADDING = 0.25
 
 # Suppress TensorFlow Lite verbose warnings (keep errors)
 os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')  # 0=all, 1=info, 2=warning, 3=error
@@ -26,6 +45,211 @@ except ImportError:
     vision = None
 
 
+def plan_video_segments(
+    frame_count: int,
+    workers: int,
+    min_frames_per_segment: int = MIN_FRAMES_PER_SEGMENT
+) -> List[Tuple[int, Optional[int]]]:
+    """
+    Split a video into contiguous time segments for parallel estimation.
+    
+    Args:
+        frame_count: Number of frames in the video
+        workers: Maximum number of segments
+        min_frames_per_segment: Smallest segment worth a separate process
+        
+    Returns:
+        (start, end) frame ranges in order; the last end is None so the
+        final segment reads to the end of the file
+    """
+    by_size = frame_count // max(1, min_frames_per_segment)
+    count = max(1, min(workers, by_size))
+    bounds = [round(k * frame_count / count) for k in range(count)]
+    return [
+        (start, bounds[k + 1] if k + 1 < count else None)
+        for k, start in enumerate(bounds)
+    ]
+
+
+def merge_frame_ranges(
+    frame_indices: Iterable[int],
+    max_gap: int = 0
+) -> List[Tuple[int, int]]:
+    """
+    Merge frame indices into contiguous [start, end) ranges.
+    
+    Ranges separated by at most max_gap missing frames are joined, since
+    decoding through a short gap is cheaper than seeking and warming up
+    tracking again.
+    
+    Args:
+        frame_indices: Frame indices (any order, duplicates allowed)
+        max_gap: Largest number of missing frames bridged within a range
+        
+    Returns:
+        Sorted, non-overlapping (start, end) ranges
+    """
+    ranges: List[Tuple[int, int]] = []
+    for index in sorted(set(int(i) for i in frame_indices if i >= 0)):
+        if ranges and index - ranges[-1][1] <= max_gap:
+            ranges[-1] = (ranges[-1][0], index + 1)
+        else:
+            ranges.append((index, index + 1))
+    return ranges
+
+
+def compare_video_keypoints(
+    reference: List[List[Dict[str, Any]]],
+    candidate: List[List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Compare per-frame keypoints, e.g. parallel against serial video output.
+    
+    This is the accuracy check for parallel video estimation: with enough
+    warm-up, segment-parallel output should match the serial run except for
+    a few frames right after segment boundaries.
+    
+    Args:
+        reference: Per-frame keypoint lists (e.g. serial output)
+        candidate: Per-frame keypoint lists to check
+        
+    Returns:
+        Dictionary with frame counts, frames where detection differs (pose
+        found in one but not the other), and mean/max keypoint distance in
+        pixels over frames detected by both
+    """
+    distances = []
+    detection_mismatches = 0
+    for ref_frame, cand_frame in zip(reference, candidate):
+        if bool(ref_frame) != bool(cand_frame):
+            detection_mismatches += 1
+            continue
+        for ref_kp, cand_kp in zip(ref_frame, cand_frame):
+            distances.append(math.hypot(ref_kp["x"] - cand_kp["x"], ref_kp["y"] - cand_kp["y"]))
+    
+    return {
+        "reference_frames": len(reference),
+        "candidate_frames": len(candidate),
+        "detection_mismatches": detection_mismatches,
+        "mean_error_px": sum(distances) / len(distances) if distances else 0.0,
+        "max_error_px": max(distances) if distances else 0.0
+    }
+
+
+class BBoxCropPlan:
+    """
+    Crop windows of a stable size that follow an annotated subject.
+    
+    The window size is the largest padded bbox of the annotated frames
+    (clipped to the frame), so VIDEO-mode tracking sees the subject at a
+    constant scale; each frame's window is centered on the bbox of the
+    nearest annotated frame and kept inside the frame.
+    """
+    
+    def __init__(
+        self,
+        bboxes: Dict[int, Dict[str, float]],
+        frame_width: int,
+        frame_height: int,
+        padding: float = DEFAULT_CROP_PADDING
+    ):
+        """
+        Plan crops for a set of annotated frames.
+        
+        Args:
+            bboxes: Bounding box (left, top, width, height) per frame index
+            frame_width: Video frame width
+            frame_height: Video frame height
+            padding: Margin on each side as a fraction of the bbox size
+        """
+        valid = {
+            int(index): bbox for index, bbox in bboxes.items()
+            if isinstance(bbox, dict) and bbox.get("width", 0) > 0 and bbox.get("height", 0) > 0
+        }
+        if not valid:
+            raise ValueError("No valid bounding boxes to crop around")
+        
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self._frames = sorted(valid)
+        self._centers = [
+            (
+                valid[i].get("left", 0) + valid[i]["width"] / 2,
+                valid[i].get("top", 0) + valid[i]["height"] / 2
+            )
+            for i in self._frames
+        ]
+        scale = 1 + 2 * max(0.0, padding)
+        self.width = max(1, min(frame_width, math.ceil(max(b["width"] for b in valid.values()) * scale)))
+        self.height = max(1, min(frame_height, math.ceil(max(b["height"] for b in valid.values()) * scale)))
+    
+    def window(self, frame_index: int) -> Tuple[int, int, int, int]:
+        """
+        Get the crop window of a frame.
+        
+        Args:
+            frame_index: Video frame index
+            
+        Returns:
+            (left, top, width, height) in frame pixels
+        """
+        pos = bisect.bisect_left(self._frames, frame_index)
+        if pos == len(self._frames) or (
+            pos > 0 and frame_index - self._frames[pos - 1] <= self._frames[pos] - frame_index
+        ):
+            pos -= 1
+        center_x, center_y = self._centers[pos]
+        left = min(max(0, round(center_x - self.width / 2)), self.frame_width - self.width)
+        top = min(max(0, round(center_y - self.height / 2)), self.frame_height - self.height)
+        return left, top, self.width, self.height
+
+
+def _segment_bboxes(
+    bboxes: Optional[Dict[int, Dict[str, float]]],
+    start: int,
+    end: Optional[int],
+    warmup_frames: int
+) -> Optional[Dict[int, Dict[str, float]]]:
+    """Bounding boxes of the frames a segment decodes (all of them if it has none)."""
+    if not bboxes:
+        return None
+    first = start - max(0, warmup_frames)
+    inside = {i: b for i, b in bboxes.items() if i >= first and (end is None or i < end)}
+    return inside or bboxes
+
+
+def _estimate_video_segment(task: Dict[str, Any]) -> List[List[Dict[str, Any]]]:
+    """Worker: estimate keypoints for one segment with its own landmarker."""
+    estimator = MediaPipeEstimator(**task["config"])
+    return estimator.estimate_video_segment(
+        task["video_path"], task["start"], task["end"], task["warmup_frames"],
+        task["fps"], task["width"], task["height"],
+        bboxes=task["bboxes"], crop_padding=task["crop_padding"]
+    )
+
+
+def _create_image_landmarker(
+    model_path: str,
+    min_pose_detection_confidence: float,
+    min_pose_presence_confidence: float,
+    min_tracking_confidence: float
+):
+    """Create a MediaPipe PoseLandmarker for image processing.
+
+    A module function rather than an estimator method, so the process-wide
+    landmarker pool does not keep the first estimator alive.
+    """
+    base_options = python.BaseOptions(model_asset_path=model_path)
+    options = vision.PoseLandmarkerOptions(
+        base_options=base_options,
+        running_mode=vision.RunningMode.IMAGE,
+        min_pose_detection_confidence=min_pose_detection_confidence,
+        min_pose_presence_confidence=min_pose_presence_confidence,
+        min_tracking_confidence=min_tracking_confidence
+    )
+    return vision.PoseLandmarker.create_from_options(options)
+
+
 @dataclass
 class Keypoint:
     """Keypoint data structure."""
@@ -66,6 +290,38 @@ class PoseEstimator:
         """
         raise NotImplementedError
     
+    def estimate_array_keypoints(
+        self,
+        image: Any,
+        model: str = "BODY_25",
+        bbox: Optional[Dict[str, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Estimate keypoints from an in-memory RGB image.
+        
+        The default implementation writes a lossless temporary PNG and
+        delegates to estimate_image_keypoints; estimators that can consume
+        arrays directly should override it.
+        
+        Args:
+            image: RGB image as a uint8 numpy array (H, W, 3)
+            model: Model name/type
+            bbox: Optional bounding box for region of interest
+            
+        Returns:
+            List of keypoint dictionaries
+        """
+        import tempfile
+        import cv2
+        
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_file:
+            temp_path = temp_file.name
+        try:
+            cv2.imwrite(temp_path, cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+            return self.estimate_image_keypoints(temp_path, model=model, bbox=bbox)
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+    
     def estimate_video_keypoints(
         self,
         video_path: Path,
@@ -153,17 +409,20 @@ class MediaPipeEstimator(PoseEstimator):
         """
         return MEDIAPIPE_AVAILABLE and self.model_path.exists()
     
-    def _get_image_landmarker(self):
-        """Create and return a MediaPipe PoseLandmarker for image processing."""
-        base_options = python.BaseOptions(model_asset_path=str(self.model_path))
-        options = vision.PoseLandmarkerOptions(
-            base_options=base_options,
-            running_mode=vision.RunningMode.IMAGE,
-            min_pose_detection_confidence=self.min_pose_detection_confidence,
-            min_pose_presence_confidence=self.min_pose_presence_confidence,
-            min_tracking_confidence=self.min_tracking_confidence
+    @property
+    def image_landmarker_pool(self) -> LandmarkerPool:
+        """Shared pool of IMAGE-mode landmarkers for this model and thresholds."""
+        settings = (
+            str(self.model_path),
+            self.min_pose_detection_confidence,
+            self.min_pose_presence_confidence,
+            self.min_tracking_confidence
+        )
+        return get_landmarker_pool(
+            ("image",) + settings,
+            functools.partial(_create_image_landmarker, *settings),
+            name=f"{self.model_path.name} image landmarker"
         )
-        return vision.PoseLandmarker.create_from_options(options)
     
     def _get_video_landmarker(self):
         """Create and return a MediaPipe PoseLandmarker for video processing."""
@@ -229,7 +488,6 @@ class MediaPipeEstimator(PoseEstimator):
             List of keypoint dictionaries
         """
         import cv2
-        import numpy as np
         
         # Check if image file exists
         if not Path(image_path).exists():
@@ -240,8 +498,41 @@ class MediaPipeEstimator(PoseEstimator):
         if image is None:
             raise ValueError(f"Failed to read image: {image_path}")
         
+        # Convert BGR to RGB
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        
+        return self._detect_image_keypoints(image_rgb, bbox, source=image_path)
+    
+    def estimate_array_keypoints(
+        self,
+        image: Any,
+        model: str = "BODY_25",
+        bbox: Optional[Dict[str, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Estimate keypoints from an in-memory RGB image.
+        
+        Args:
+            image: RGB image as a uint8 numpy array (H, W, 3)
+            model: Model name (for compatibility, not used)
+            bbox: Optional bounding box for region of interest
+            
+        Returns:
+            List of keypoint dictionaries
+        """
+        return self._detect_image_keypoints(image, bbox, source="array")
+    
+    def _detect_image_keypoints(
+        self,
+        image_rgb: Any,
+        bbox: Optional[Dict[str, float]],
+        source: str
+    ) -> List[Dict[str, Any]]:
+        """Run IMAGE-mode detection on an RGB array, honouring an optional bbox."""
+        import numpy as np
+        
         # Get image dimensions
-        image_height, image_width = image.shape[:2]
+        image_height, image_width = image_rgb.shape[:2]
         
         # Apply bounding box crop if provided
         if bbox:
@@ -256,11 +547,8 @@ class MediaPipeEstimator(PoseEstimator):
             right = min(left + width, image_width)
             bottom = min(top + height, image_height)
             
-            image = image[top:bottom, left:right]
-            image_height, image_width = image.shape[:2]
-        
-        # Convert BGR to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            image_rgb = image_rgb[top:bottom, left:right]
+            image_height, image_width = image_rgb.shape[:2]
         
         # Ensure image is contiguous in memory (required by MediaPipe)
         if not image_rgb.flags['C_CONTIGUOUS']:
@@ -272,42 +560,50 @@ class MediaPipeEstimator(PoseEstimator):
             data=image_rgb
         )
         
-        # Create landmarker and detect
-        landmarker = self._get_image_landmarker()
-        try:
-            result = landmarker.detect(mp_image)
-            
-            if not result.pose_landmarks or len(result.pose_landmarks) == 0:
-                logger.warning(f"No pose detected in image: {image_path}")
-                return []
-            
-            # Parse landmarks with explicit dimensions
-            keypoints = self._parse_mediapipe_landmarks(result, image_width, image_height)
-            
-            # Adjust coordinates if bbox was applied
-            if bbox:
-                left = int(bbox.get("left", 0))
-                top = int(bbox.get("top", 0))
-                for kp in keypoints:
-                    kp["x"] += left
-                    kp["y"] += top
-            
-            return keypoints
-            
-        finally:
-            landmarker.close()
+        # Detect with this thread's pooled landmarker
+        landmarker = self.image_landmarker_pool.get()
+        result = landmarker.detect(mp_image)
+        
+        if not result.pose_landmarks or len(result.pose_landmarks) == 0:
+            logger.warning(f"No pose detected in image: {source}")
+            return []
+        
+        # Parse landmarks with explicit dimensions
+        keypoints = self._parse_mediapipe_landmarks(result, image_width, image_height)
+        
+        # Adjust coordinates if bbox was applied
+        if bbox:
+            left = int(bbox.get("left", 0))
+            top = int(bbox.get("top", 0))
+            for kp in keypoints:
+                kp["x"] += left
+                kp["y"] += top
+        
+        return keypoints
     
     def estimate_video_keypoints(
         self,
         video_path: Path,
-        model: str = "BODY_25"
+        model: str = "BODY_25",
+        workers: int = 1,
+        warmup_frames: int = DEFAULT_WARMUP_FRAMES
     ) -> Dict[str, Any]:
         """
         Estimate keypoints for all frames in a video.
         
+        With workers > 1, the video is split into time segments that are
+        estimated by a process pool, each process with its own VIDEO-mode
+        landmarker. Every segment first runs the landmarker over the
+        warmup_frames frames before its start, without emitting them, so
+        tracking has converged by the segment's first frame; results are
+        stitched in order. Check the output against a serial run with
+        compare_video_keypoints when tuning warmup_frames.
+        
         Args:
             video_path: Path to video file
             model: Model name (for compatibility, not used)
+            workers: Number of processes (1 for a serial pass)
+            warmup_frames: Tracking warm-up frames before each parallel segment
             
         Returns:
             Dictionary with:
@@ -322,6 +618,11 @@ class MediaPipeEstimator(PoseEstimator):
         if not Path(video_path).exists():
             raise FileNotFoundError(f"Video file not found: {video_path}")
         
+        if workers > 1:
+            result = self._estimate_video_keypoints_parallel(video_path, workers, warmup_frames)
+            if result is not None:
+                return result
+        
         # Open video
         cap = cv2.VideoCapture(str(video_path))
         if not cap.isOpened():
@@ -389,13 +690,264 @@ class MediaPipeEstimator(PoseEstimator):
         finally:
             cap.release()
     
+    def _estimate_video_keypoints_parallel(
+        self,
+        video_path: Path,
+        workers: int,
+        warmup_frames: int
+    ) -> Optional[Dict[str, Any]]:
+        """Estimate video keypoints in parallel segments, or None if too short to split."""
+        info = self._video_info(video_path)
+        segments = plan_video_segments(info["frame_count"], workers)
+        if len(segments) == 1:
+            return None
+        
+        logger.info(
+            f"Processing video: {info['frame_count']} frames at {info['fps']} fps "
+            f"({info['width']}x{info['height']}) in {len(segments)} parallel segments"
+        )
+        
+        all_keypoints = []
+        for frames in self._run_video_segments(video_path, segments, warmup_frames, workers, info):
+            all_keypoints.extend(frames)
+        
+        logger.info(f"Processed {len(all_keypoints)} frames")
+        
+        return {
+            'frames': all_keypoints,
+            'video_width': info["width"],
+            'video_height': info["height"]
+        }
+    
+    def estimate_video_frame_ranges(
+        self,
+        video_path: Path,
+        ranges: List[Tuple[int, int]],
+        model: str = "BODY_25",
+        workers: int = 1,
+        warmup_frames: int = DEFAULT_WARMUP_FRAMES,
+        bboxes: Optional[Dict[int, Dict[str, float]]] = None,
+        crop_padding: float = DEFAULT_CROP_PADDING
+    ) -> Dict[str, Any]:
+        """
+        Estimate keypoints for selected frame ranges of a video.
+        
+        Each range is decoded from a seek to warmup_frames frames before its
+        start, so tracking has converged on its first frame; the rest of the
+        video is never decoded. Ranges closer together than the warm-up are
+        estimated as one. With workers > 1, ranges (and long ranges split
+        into parts) are estimated by a process pool.
+        
+        With bboxes, frames are cropped around the annotated subject before
+        inference (see BBoxCropPlan) and keypoints are mapped back to frame
+        coordinates.
+        
+        Args:
+            video_path: Path to video file
+            ranges: [start, end) frame ranges (0-based)
+            model: Model name (for compatibility, not used)
+            workers: Number of processes (1 to estimate in this process)
+            warmup_frames: Tracking warm-up frames before each range
+            bboxes: Optional subject bounding box per annotated frame index
+            crop_padding: Margin around the bboxes as a fraction of their size
+            
+        Returns:
+            Dictionary with:
+                - 'frames': Keypoint list per estimated frame index
+                - 'video_width': Actual video width used for keypoint coordinates
+                - 'video_height': Actual video height used for keypoint coordinates
+        """
+        if not Path(video_path).exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        info = self._video_info(video_path)
+        frame_count = info["frame_count"]
+        
+        indices = [i for start, end in ranges for i in range(start, end)]
+        segments: List[Tuple[int, Optional[int]]] = []
+        for start, end in merge_frame_ranges(indices, max_gap=warmup_frames):
+            if workers > 1:
+                # Split long ranges so every worker gets a share
+                for part_start, part_end in plan_video_segments(end - start, workers):
+                    part_end = end if part_end is None else start + part_end
+                    segments.append((start + part_start, part_end))
+            else:
+                segments.append((start, end))
+        # Ranges reaching the reported end read to the real end of the file
+        segments = [
+            (start, None if frame_count > 0 and end >= frame_count else end)
+            for start, end in segments if frame_count <= 0 or start < frame_count
+        ]
+        
+        logger.info(
+            f"Processing {len(indices)} of {frame_count} frames of {Path(video_path).name} "
+            f"in {len(segments)} ranges"
+        )
+        
+        frames: Dict[int, List[Dict[str, Any]]] = {}
+        results = self._run_video_segments(
+            video_path, segments, warmup_frames, workers, info,
+            bboxes=bboxes, crop_padding=crop_padding
+        )
+        for (start, _), segment_frames in zip(segments, results):
+            for offset, keypoints in enumerate(segment_frames):
+                frames[start + offset] = keypoints
+        
+        return {
+            'frames': frames,
+            'video_width': info["width"],
+            'video_height': info["height"]
+        }
+    
+    def _video_info(self, video_path: Path) -> Dict[str, Any]:
+        """Get cached video metadata, checking the frame rate."""
+        info = get_video_metadata(video_path, "opencv")
+        if info["fps"] <= 0:
+            raise ValueError(f"Failed to read frame rate of video: {video_path}")
+        return info
+    
+    def _run_video_segments(
+        self,
+        video_path: Path,
+        segments: List[Tuple[int, Optional[int]]],
+        warmup_frames: int,
+        workers: int,
+        info: Dict[str, Any],
+        bboxes: Optional[Dict[int, Dict[str, float]]] = None,
+        crop_padding: float = DEFAULT_CROP_PADDING
+    ) -> List[List[List[Dict[str, Any]]]]:
+        """Estimate segments in order, in a process pool when workers > 1."""
+        if workers <= 1 or len(segments) <= 1:
+            return [
+                self.estimate_video_segment(
+                    video_path, start, end, warmup_frames,
+                    info["fps"], info["width"], info["height"],
+                    bboxes=_segment_bboxes(bboxes, start, end, warmup_frames),
+                    crop_padding=crop_padding
+                )
+                for start, end in segments
+            ]
+        
+        config = {
+            "model_path": str(self.model_path),
+            "default_model": self.default_model,
+            "min_pose_detection_confidence": self.min_pose_detection_confidence,
+            "min_pose_presence_confidence": self.min_pose_presence_confidence,
+            "min_tracking_confidence": self.min_tracking_confidence
+        }
+        tasks = [
+            {
+                "config": config,
+                "video_path": str(video_path),
+                "start": start,
+                "end": end,
+                "warmup_frames": warmup_frames,
+                "fps": info["fps"],
+                "width": info["width"],
+                "height": info["height"],
+                "bboxes": _segment_bboxes(bboxes, start, end, warmup_frames),
+                "crop_padding": crop_padding
+            }
+            for start, end in segments
+        ]
+        
+        # Spawned workers do not inherit the parent's threads or MediaPipe graphs
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+            return list(pool.map(_estimate_video_segment, tasks))
+    
+    def estimate_video_segment(
+        self,
+        video_path: Path,
+        start: int,
+        end: Optional[int],
+        warmup_frames: int,
+        fps: float,
+        width: int,
+        height: int,
+        bboxes: Optional[Dict[int, Dict[str, float]]] = None,
+        crop_padding: float = DEFAULT_CROP_PADDING
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Estimate keypoints for frames [start, end) with a fresh VIDEO-mode landmarker.
+        
+        The landmarker is first run over up to warmup_frames frames before
+        start, whose results are discarded, so that its tracking state
+        matches a pass from the beginning of the video.
+        
+        Args:
+            video_path: Path to video file
+            start: First frame to emit
+            end: Frame to stop before (None reads to the end of the file)
+            warmup_frames: Frames to run before start without emitting them
+            fps: Video frame rate, for landmarker timestamps
+            width: Video width for keypoint coordinates
+            height: Video height for keypoint coordinates
+            bboxes: Optional subject bounding box per frame index; frames are
+                cropped around it (see BBoxCropPlan)
+            crop_padding: Margin around the bboxes as a fraction of their size
+            
+        Returns:
+            Per-frame keypoint lists for the segment, in frame coordinates
+        """
+        import numpy as np
+        
+        crops = BBoxCropPlan(bboxes, width, height, crop_padding) if bboxes else None
+        frame_idx = max(0, start - max(0, warmup_frames))
+        session = VideoDecoderSession(video_path, backend="opencv")
+        landmarker = self._get_video_landmarker()
+        try:
+            if frame_idx > 0:
+                session.seek(frame_idx)
+            
+            all_keypoints = []
+            while end is None or frame_idx < end:
+                try:
+                    frame_rgb = session.read(frame_idx)
+                except VideoDecoderError:
+                    if end is None:
+                        break
+                    raise
+                
+                left, top, crop_width, crop_height = 0, 0, width, height
+                if crops is not None:
+                    left, top, crop_width, crop_height = crops.window(frame_idx)
+                    frame_rgb = frame_rgb[top:top + crop_height, left:left + crop_width]
+                
+                # MediaPipe requires contiguous memory
+                mp_image = mp.Image(
+                    image_format=mp.ImageFormat.SRGB,
+                    data=np.ascontiguousarray(frame_rgb)
+                )
+                
+                # Same timestamps as a serial pass, monotonic within the segment
+                timestamp_ms = int((frame_idx / fps) * 1000)
+                result = landmarker.detect_for_video(mp_image, timestamp_ms)
+                
+                if frame_idx >= start:
+                    keypoints = self._parse_mediapipe_landmarks(result, crop_width, crop_height)
+                    for kp in keypoints:
+                        kp["x"] += left
+                        kp["y"] += top
+                    all_keypoints.append(keypoints)
+                frame_idx += 1
+            
+            return all_keypoints
+            
+        finally:
+            landmarker.close()
+            session.close()
+    
     def supports_video_batch(self) -> bool:
         """Check if this estimator supports video batch processing."""
         return True
     
     def cache_fingerprint(self) -> str:
-        """Get cache fingerprint."""
-        return "mediapipe_tasks_v1"
+        """Get cache fingerprint, distinguishing model files and thresholds."""
+        return (
+            f"mediapipe_tasks_v1:{self.model_path.name}:{self.min_pose_detection_confidence}:"
+            f"{self.min_pose_presence_confidence}:{self.min_tracking_confidence}"
+        )
 
 
 class OpenPoseEstimator(PoseEstimator):
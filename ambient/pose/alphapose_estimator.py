@@ -3,6 +3,9 @@ AlphaPose estimator implementation.
 
 This module provides pose estimation using AlphaPose models
 with support for both the new Frame-based API and legacy compatibility.
+By default frames are streamed to a persistent AlphaPose worker process
+(see alphapose_worker) that loads the models once; the per-call demo
+script path remains available with persistent_worker=False.
 
 Author: AlexPose Team
 """
@@ -12,14 +15,18 @@ import subprocess
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Union, Any
 import numpy as np
 from loguru import logger
 
+from ambient.pose.alphapose_worker import AlphaPoseWorker, AlphaPoseWorkerError
+from ambient.utils.video_decoder import FFmpegRawPipe, ffmpeg_on_path
+
 # Import Frame classes with fallback for development
 try:
     from ambient.core.frame import Frame, FrameSequence, FrameError
     from ambient.core.interfaces import IPoseEstimator
+    from ambient.core.pose_sequence import PoseSequence
     FRAME_SUPPORT = True
 except ImportError:
     # Fallback for development/testing
@@ -43,8 +50,9 @@ class AlphaPoseEstimator(IPoseEstimator):
     """
     Pose estimator using AlphaPose models.
     
-    This estimator interfaces with AlphaPose through command-line execution
-    to provide high-accuracy pose estimation. It supports the new Frame-based
+    This estimator interfaces with AlphaPose through a persistent worker
+    process (or, with persistent_worker=False, command-line execution) to
+    provide high-accuracy pose estimation. It supports the new Frame-based
     API while maintaining backward compatibility.
     
     Note: This requires AlphaPose to be installed and properly configured.
@@ -57,7 +65,10 @@ class AlphaPoseEstimator(IPoseEstimator):
         checkpoint: Optional[str] = None,
         detector: str = "yolo",
         confidence_threshold: float = 0.3,
-        nms_threshold: float = 0.6
+        nms_threshold: float = 0.6,
+        persistent_worker: bool = True,
+        device: str = "auto",
+        worker: Optional[AlphaPoseWorker] = None
     ):
         """
         Initialize AlphaPose estimator.
@@ -69,6 +80,11 @@ class AlphaPoseEstimator(IPoseEstimator):
             detector: Person detector to use ('yolo', 'tracker')
             confidence_threshold: Confidence threshold for pose detection
             nms_threshold: NMS threshold for person detection
+            persistent_worker: Stream frames to a long-lived worker process
+                instead of running the demo script per call
+            device: Device of the worker's models ('cpu', 'cuda', 'auto')
+            worker: Worker to use instead of starting one (e.g. the fake
+                backend in tests)
         """
         if not CV2_AVAILABLE:
             raise ImportError("OpenCV is required for AlphaPose estimator")
@@ -80,6 +96,9 @@ class AlphaPoseEstimator(IPoseEstimator):
         self.detector = detector
         self.confidence_threshold = confidence_threshold
         self.nms_threshold = nms_threshold
+        self.persistent_worker = persistent_worker or worker is not None
+        self.device = device
+        self._worker = worker
         
         # Validate installation
         self._validate_installation()
@@ -107,6 +126,49 @@ class AlphaPoseEstimator(IPoseEstimator):
         
         self.main_script = main_script
     
+    def _get_worker(self) -> AlphaPoseWorker:
+        """Get the persistent worker, configured on first use."""
+        if self._worker is None:
+            self._worker = AlphaPoseWorker(
+                alphapose_root=self.alphapose_root,
+                config_file=self.config_file,
+                checkpoint=self.checkpoint,
+                detector=self.detector,
+                device=self.device
+            )
+        return self._worker
+    
+    def close(self) -> None:
+        """Stop the persistent worker, if running."""
+        if self._worker is not None:
+            self._worker.close()
+    
+    @staticmethod
+    def _points_to_keypoints(points: np.ndarray) -> List[Keypoint]:
+        """Convert a (K, 3) keypoint array to keypoint dicts."""
+        return [{"x": x, "y": y, "confidence": c} for x, y, c in points.tolist()]
+    
+    def _worker_estimate(self, image: np.ndarray) -> np.ndarray:
+        """Estimate one RGB image with the worker, restarting it once if it crashed."""
+        worker = self._get_worker()
+        try:
+            return worker.estimate(image)
+        except AlphaPoseWorkerError as e:
+            if worker.is_running:
+                # The worker is alive and failed on this frame only
+                raise
+            logger.warning(f"AlphaPose worker failed ({e}), restarting it")
+            return worker.estimate(image)
+    
+    def _iter_worker_keypoints(self, images: Iterable[np.ndarray]) -> Iterator[List[Keypoint]]:
+        """Stream RGB images through the worker, yielding keypoints per image."""
+        for i, points in enumerate(self._get_worker().estimate_many(images)):
+            if isinstance(points, Exception):
+                logger.warning(f"AlphaPose failed on image {i}: {points}")
+                yield []
+            else:
+                yield self._points_to_keypoints(points)
+    
     # New Frame-based methods
     def estimate_pose(self, frame: Frame) -> Dict[str, Any]:
         """
@@ -121,6 +183,9 @@ class AlphaPoseEstimator(IPoseEstimator):
         if not FRAME_SUPPORT:
             raise RuntimeError("Frame support not available - Frame classes not imported")
         
+        if self.persistent_worker:
+            return self._estimate_pose_with_worker(frame)
+        
         try:
             # Load frame data
             frame_data = frame.load()
@@ -177,6 +242,43 @@ class AlphaPoseEstimator(IPoseEstimator):
                 "num_keypoints": 0
             }
     
+    def _estimate_pose_with_worker(self, frame: Frame) -> Dict[str, Any]:
+        """Estimate pose from a single Frame with the persistent worker."""
+        try:
+            frame_data = frame.as_format("RGB")
+            points = self._worker_estimate(frame_data)
+            geometry = frame.decode_geometry
+            if geometry is not None:
+                geometry.map_points(points)
+            keypoints = self._points_to_keypoints(points)
+            
+            return {
+                "keypoints": keypoints,
+                "estimator": self.get_estimator_name(),
+                "format": self.get_keypoint_format(),
+                "frame_metadata": frame.metadata,
+                "confidence_scores": [kp["confidence"] for kp in keypoints],
+                "num_keypoints": len(keypoints),
+                "processing_metadata": {
+                    "detector": self.detector,
+                    "frame_shape": frame_data.shape,
+                    "frame_format": frame.format,
+                    "confidence_threshold": self.confidence_threshold,
+                    "persistent_worker": True
+                }
+            }
+        except Exception as e:
+            logger.error(f"AlphaPose estimation failed for frame: {e}")
+            return {
+                "keypoints": [],
+                "estimator": self.get_estimator_name(),
+                "format": self.get_keypoint_format(),
+                "error": str(e),
+                "frame_metadata": frame.metadata,
+                "confidence_scores": [],
+                "num_keypoints": 0
+            }
+    
     def estimate_pose_sequence(self, sequence: FrameSequence) -> List[Dict[str, Any]]:
         """
         Estimate poses from a FrameSequence.
@@ -190,6 +292,9 @@ class AlphaPoseEstimator(IPoseEstimator):
         if not FRAME_SUPPORT:
             raise RuntimeError("Frame support not available - Frame classes not imported")
         
+        if self.persistent_worker:
+            return self._estimate_pose_sequence_with_worker(sequence)
+        
         results = []
         
         # For AlphaPose, it's more efficient to save frames to a temporary directory
@@ -251,6 +356,115 @@ class AlphaPoseEstimator(IPoseEstimator):
         
         return results
     
+    def _estimate_pose_sequence_with_worker(self, sequence: FrameSequence) -> List[Dict[str, Any]]:
+        """Estimate poses from a FrameSequence with the persistent worker."""
+        poses = self.estimate_pose_array(sequence)
+        errors = poses.metadata["errors"]
+        
+        results = []
+        for frame_idx in range(len(poses)):
+            if frame_idx in errors:
+                results.append({
+                    "keypoints": [],
+                    "estimator": self.get_estimator_name(),
+                    "format": self.get_keypoint_format(),
+                    "error": errors[frame_idx],
+                    "sequence_index": frame_idx,
+                    "confidence_scores": [],
+                    "num_keypoints": 0
+                })
+                continue
+            
+            keypoints = [
+                {"x": kp["x"], "y": kp["y"], "confidence": kp["confidence"]}
+                for kp in poses.frame_keypoints(frame_idx)
+            ]
+            results.append({
+                "keypoints": keypoints,
+                "estimator": self.get_estimator_name(),
+                "format": self.get_keypoint_format(),
+                "sequence_index": frame_idx,
+                "frame_metadata": sequence.frames[frame_idx].metadata,
+                "confidence_scores": [kp["confidence"] for kp in keypoints],
+                "num_keypoints": len(keypoints),
+                "processing_metadata": {
+                    "detector": self.detector,
+                    "persistent_worker": True
+                }
+            })
+        
+        return results
+    
+    def estimate_pose_array(self, sequence: FrameSequence) -> PoseSequence:
+        """
+        Estimate poses from a FrameSequence into one compact PoseSequence.
+        
+        Frames are decoded as RGB batch tensors and streamed to the
+        persistent worker; only the frames in flight are held in the pipe.
+        If the worker crashes mid-sequence it is restarted once and the
+        remaining frames are resumed.
+        
+        Args:
+            sequence: FrameSequence object containing multiple frames
+            
+        Returns:
+            PoseSequence in source-video pixels; frames without a detection
+            have a keypoint count of 0, and metadata["errors"] maps failed
+            frame indices to their errors
+        """
+        if not FRAME_SUPPORT:
+            raise RuntimeError("Frame support not available - Frame classes not imported")
+        
+        num_frames = len(sequence.frames)
+        frame_points: List[Optional[np.ndarray]] = [None] * num_frames
+        errors: Dict[int, str] = {}
+        
+        def images(start: int) -> Iterator[np.ndarray]:
+            remaining = sequence[start:] if start else sequence
+            for start_idx, batch_tensor in remaining.iter_batch_tensors(color="RGB"):
+                yield from batch_tensor
+        
+        done = 0
+        restarted = False
+        while True:
+            try:
+                for points in self._get_worker().estimate_many(images(done)):
+                    frame_idx, done = done, done + 1
+                    if isinstance(points, Exception):
+                        errors[frame_idx] = str(points)
+                        continue
+                    geometry = sequence.frames[frame_idx].decode_geometry
+                    if geometry is not None:
+                        geometry.map_points(points)
+                    frame_points[frame_idx] = points
+                break
+            except Exception as e:
+                if isinstance(e, AlphaPoseWorkerError) and not restarted and done < num_frames:
+                    # The worker crashed mid-stream: restart it once and resume
+                    logger.warning(f"{e}; restarting the worker at frame {done}")
+                    restarted = True
+                    continue
+                logger.error(f"AlphaPose sequence processing failed: {e}")
+                for frame_idx in range(done, num_frames):
+                    if frame_points[frame_idx] is None:
+                        errors.setdefault(frame_idx, str(e))
+                break
+        
+        found = [points for points in frame_points if points is not None]
+        counts = np.array([0 if points is None else len(points) for points in frame_points], dtype=np.int32)
+        packed = np.concatenate(found) if found else np.zeros((0, 3), dtype=np.float32)
+        
+        return PoseSequence.from_packed(
+            counts,
+            packed,
+            metadata={
+                "estimator": self.get_estimator_name(),
+                "format": self.get_keypoint_format(),
+                "detector": self.detector,
+                "errors": errors
+            }
+        )
+    
     def get_estimator_name(self) -> str:
         """Get the name of this pose estimator."""
         return "AlphaPose"
@@ -316,6 +530,13 @@ class AlphaPoseEstimator(IPoseEstimator):
         if not video_path.exists():
             raise FileNotFoundError(f"Video not found: {video_path}")
         
+        if self.persistent_worker:
+            try:
+                return list(self._iter_worker_keypoints(self._iter_video_frames(video_path)))
+            except Exception as e:
+                logger.error(f"AlphaPose video processing failed: {e}")
+                return []
+        
         with tempfile.TemporaryDirectory(prefix="alphapose_video_") as temp_dir:
             temp_dir_path = Path(temp_dir)
             output_dir = temp_dir_path / "output"
@@ -368,11 +589,53 @@ class AlphaPoseEstimator(IPoseEstimator):
                 logger.error(f"AlphaPose video processing failed: {e}")
                 return []
     
+    @staticmethod
+    def _iter_video_frames(video_path: Path) -> Iterator[np.ndarray]:
+        """Decode a video as RGB frames, through an ffmpeg raw pipe when available."""
+        if ffmpeg_on_path():
+            with FFmpegRawPipe(video_path) as pipe:
+                yield from pipe
+            return
+        
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        finally:
+            cap.release()
+    
+    def _process_image_batch_with_worker(self, image_paths: List[Path]) -> List[List[Keypoint]]:
+        """Process a batch of images with the persistent worker."""
+        results: List[List[Keypoint]] = [[] for _ in image_paths]
+        readable: List[int] = []
+        
+        def images() -> Iterator[np.ndarray]:
+            for i, image_path in enumerate(image_paths):
+                image = cv2.imread(str(image_path))
+                if image is None:
+                    logger.warning(f"Failed to read image {image_path}")
+                    continue
+                readable.append(i)
+                yield cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        
+        try:
+            for n, keypoints in enumerate(self._iter_worker_keypoints(images())):
+                results[readable[n]] = keypoints
+        except Exception as e:
+            logger.error(f"AlphaPose batch processing failed: {e}")
+        return results
+    
     def _process_image_batch(self, image_paths: List[Path]) -> List[List[Keypoint]]:
         """Process a batch of images with AlphaPose."""
         if not image_paths:
             return []
         
+        if self.persistent_worker:
+            return self._process_image_batch_with_worker(image_paths)
+        
         with tempfile.TemporaryDirectory(prefix="alphapose_batch_") as temp_dir:
             temp_dir_path = Path(temp_dir)
             input_dir = temp_dir_path / "input"
@@ -509,6 +772,6 @@ class AlphaPoseEstimator(IPoseEstimator):
             "limitations": [
                 "Requires external installation",
                 "Slower than real-time methods",
-                "Command-line interface dependency"
+                "Runs in a separate worker process"
             ]
         }
\ No newline at end of file
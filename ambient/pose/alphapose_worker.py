@@ -0,0 +1,475 @@
+"""
+Persistent AlphaPose worker process.
+
+Running AlphaPose's demo script per call reloads the detector and pose
+model every time, and round-trips every frame through JPEG files and a JSON
+result file. AlphaPoseWorker instead starts one long-lived process that
+loads the models once, then streams raw RGB frames to it over a pipe and
+reads back one (K, 3) float32 keypoint array per frame.
+
+Protocol (both directions): a message is an 8-byte header ``<4sI`` (kind,
+payload length) followed by the payload.
+
+    FRAM  height, width (``<II``) + height * width * 3 uint8 RGB bytes
+    KPTS  keypoint count (``<I``) + count * 3 float32 (x, y, confidence)
+    ERRO  UTF-8 error message for the frame
+    REDY  sent once by the worker after the model loaded (JSON model info)
+    QUIT  sent by the client to stop the worker
+
+The worker answers every FRAM with exactly one KPTS or ERRO, in order, so
+the client can keep several frames in flight. The ``fake`` backend returns
+deterministic keypoints derived from the frame pixels, which exercises the
+protocol without AlphaPose installed.
+
+Run as ``python -m ambient.pose.alphapose_worker --backend alphapose ...``;
+AlphaPoseWorker does this for you.
+
+Author: AlexPose Team
+"""
+
+import argparse
+import json
+import os
+import struct
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+
+BACKENDS = ("alphapose", "fake")
+DEFAULT_MAX_IN_FLIGHT = 4
+FAKE_NUM_KEYPOINTS = 17
+
+_HEADER = struct.Struct("<4sI")
+_FRAME_SHAPE = struct.Struct("<II")
+_POINT_COUNT = struct.Struct("<I")
+
+MSG_FRAME = b"FRAM"
+MSG_KEYPOINTS = b"KPTS"
+MSG_ERROR = b"ERRO"
+MSG_READY = b"REDY"
+MSG_QUIT = b"QUIT"
+
+
+class AlphaPoseWorkerError(Exception):
+    """Exception raised when the AlphaPose worker fails or breaks protocol."""
+    pass
+
+
+# ----------------------------------------------------------------------
+# Wire format
+# ----------------------------------------------------------------------
+
+def write_message(stream: BinaryIO, kind: bytes, payload: Union[bytes, memoryview] = b"") -> None:
+    """Write one message; the caller flushes."""
+    stream.write(_HEADER.pack(kind, len(payload)))
+    if len(payload):
+        stream.write(payload)
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """Read exactly size bytes, raising on a closed stream."""
+    data = stream.read(size)
+    if data is None or len(data) != size:
+        raise AlphaPoseWorkerError("AlphaPose worker pipe closed unexpectedly")
+    return data
+
+
+def read_message(stream: BinaryIO) -> Tuple[bytes, bytes]:
+    """Read one message as (kind, payload)."""
+    kind, size = _HEADER.unpack(_read_exact(stream, _HEADER.size))
+    return kind, _read_exact(stream, size) if size else b""
+
+
+def encode_frame(image: np.ndarray) -> bytes:
+    """Encode an HxWx3 uint8 RGB image as a FRAM payload."""
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise AlphaPoseWorkerError(f"Frames must have shape (height, width, 3), got {image.shape}")
+    return _FRAME_SHAPE.pack(image.shape[0], image.shape[1]) + image.tobytes()
+
+
+def decode_frame(payload: bytes) -> np.ndarray:
+    """Decode a FRAM payload into a read-only HxWx3 uint8 image."""
+    height, width = _FRAME_SHAPE.unpack_from(payload)
+    return np.frombuffer(payload, dtype=np.uint8, offset=_FRAME_SHAPE.size).reshape(height, width, 3)
+
+
+def encode_keypoints(points: np.ndarray) -> bytes:
+    """Encode a (K, 3) keypoint array as a KPTS payload."""
+    points = np.ascontiguousarray(points, dtype=np.float32).reshape(-1, 3)
+    return _POINT_COUNT.pack(len(points)) + points.tobytes()
+
+
+def decode_keypoints(payload: bytes) -> np.ndarray:
+    """Decode a KPTS payload into a writable (K, 3) float32 array."""
+    (count,) = _POINT_COUNT.unpack_from(payload)
+    points = np.frombuffer(payload, dtype=np.float32, count=count * 3, offset=_POINT_COUNT.size)
+    return points.reshape(count, 3).copy()
+
+
+# ----------------------------------------------------------------------
+# Worker-side backends
+# ----------------------------------------------------------------------
+
+class FakePoseBackend:
+    """
+    Deterministic stand-in for AlphaPose.
+
+    Returns 17 keypoints for any frame with non-zero pixels: keypoint k is
+    at x = mean pixel value + k, y = half the frame height, confidence 0.9.
+    All-black frames have no detection.
+    """
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": "fake", "num_keypoints": FAKE_NUM_KEYPOINTS}
+
+    def estimate(self, image: np.ndarray) -> np.ndarray:
+        if not image.any():
+            return np.zeros((0, 3), dtype=np.float32)
+        points = np.empty((FAKE_NUM_KEYPOINTS, 3), dtype=np.float32)
+        points[:, 0] = float(image.mean()) + np.arange(FAKE_NUM_KEYPOINTS)
+        points[:, 1] = image.shape[0] / 2
+        points[:, 2] = 0.9
+        return points
+
+
+class AlphaPoseBackend:
+    """AlphaPose detector and pose model loaded in-process through its demo API."""
+
+    def __init__(
+        self,
+        alphapose_root: Union[str, Path],
+        config_file: str,
+        checkpoint: str,
+        detector: str = "yolo",
+        device: str = "auto"
+    ):
+        """
+        Load AlphaPose once.
+
+        Args:
+            alphapose_root: Path to the AlphaPose installation
+            config_file: AlphaPose model config (relative to the root or absolute)
+            checkpoint: Pose model checkpoint (relative to the root or absolute)
+            detector: Person detector ('yolo', 'tracker')
+            device: 'cpu', 'cuda' or 'auto'
+        """
+        root = Path(alphapose_root).expanduser().resolve()
+        # AlphaPose resolves detector weights and configs relative to its root
+        os.chdir(root)
+        sys.path[:0] = [str(root), str(root / "scripts")]
+
+        try:
+            import torch
+            from alphapose.utils.config import update_config
+            from demo_api import SingleImageAlphaPose
+        except ImportError as e:
+            raise AlphaPoseWorkerError(f"Failed to import AlphaPose from {root}: {e}")
+
+        use_cuda = device != "cpu" and torch.cuda.is_available()
+        args = SimpleNamespace(
+            cfg=config_file,
+            checkpoint=checkpoint,
+            detector=detector,
+            gpus=[0] if use_cuda else [-1],
+            device=torch.device("cuda:0" if use_cuda else "cpu"),
+            tracking=detector == "tracker",
+            pose_track=False,
+            pose_flow=False,
+            min_box_area=0,
+            format="coco",
+            flip=False,
+            eval=False,
+            save_img=False,
+            vis=False,
+            showbox=False,
+            vis_fast=False,
+            profile=False,
+            debug=False,
+            detbatch=1,
+            posebatch=64
+        )
+        self._model = SingleImageAlphaPose(args, update_config(config_file))
+        self._info = {"backend": "alphapose", "config_file": config_file, "device": str(args.device)}
+
+    def info(self) -> Dict[str, Any]:
+        return self._info
+
+    def estimate(self, image: np.ndarray) -> np.ndarray:
+        pose = self._model.process("frame.jpg", np.array(image))
+        people = (pose or {}).get("result") or []
+        if not people:
+            return np.zeros((0, 3), dtype=np.float32)
+
+        # Keep the highest scoring person, as the JSON parser did
+        best = max(people, key=lambda person: float(person.get("proposal_score", 0)))
+        xy = np.asarray(best["keypoints"].cpu().numpy(), dtype=np.float32).reshape(-1, 2)
+        scores = np.asarray(best["kp_score"].cpu().numpy(), dtype=np.float32).reshape(-1, 1)
+        return np.concatenate([xy, scores], axis=1)
+
+
+def serve(backend: Any, stdin: BinaryIO, stdout: BinaryIO) -> None:
+    """
+    Answer frame messages until QUIT or end of input.
+
+    Args:
+        backend: Object with info() and estimate(image) -> (K, 3) array
+        stdin: Binary stream of client messages
+        stdout: Binary stream for replies
+    """
+    write_message(stdout, MSG_READY, json.dumps(backend.info()).encode("utf-8"))
+    stdout.flush()
+
+    while True:
+        try:
+            kind, payload = read_message(stdin)
+        except AlphaPoseWorkerError:
+            return
+        if kind == MSG_QUIT:
+            return
+        if kind != MSG_FRAME:
+            write_message(stdout, MSG_ERROR, f"Unexpected message {kind!r}".encode("utf-8"))
+        else:
+            try:
+                write_message(stdout, MSG_KEYPOINTS, encode_keypoints(backend.estimate(decode_frame(payload))))
+            except Exception as e:
+                write_message(stdout, MSG_ERROR, str(e).encode("utf-8"))
+        stdout.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Worker process entry point."""
+    parser = argparse.ArgumentParser(description="Persistent AlphaPose worker")
+    parser.add_argument("--backend", choices=BACKENDS, default="alphapose")
+    parser.add_argument("--alphapose-root")
+    parser.add_argument("--cfg")
+    parser.add_argument("--checkpoint")
+    parser.add_argument("--detector", default="yolo")
+    parser.add_argument("--device", default="auto")
+    args = parser.parse_args(argv)
+
+    # Keep the protocol on the original stdout; anything the model prints
+    # (including from native code) goes to stderr instead
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    try:
+        if args.backend == "fake":
+            backend = FakePoseBackend()
+        else:
+            backend = AlphaPoseBackend(
+                args.alphapose_root, args.cfg, args.checkpoint, args.detector, args.device
+            )
+    except Exception as e:
+        write_message(protocol_out, MSG_ERROR, f"Failed to load AlphaPose: {e}".encode("utf-8"))
+        protocol_out.flush()
+        return 1
+
+    serve(backend, sys.stdin.buffer, protocol_out)
+    return 0
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+class AlphaPoseWorker:
+    """
+    Client of a persistent AlphaPose worker process.
+
+    The process is started on first use and kept until close(); if it dies,
+    the next call starts a new one. Frames are RGB uint8 arrays, results are
+    (K, 3) float32 arrays of x, y, confidence (K = 0 without a detection).
+    """
+
+    def __init__(
+        self,
+        backend: str = "alphapose",
+        alphapose_root: Optional[Union[str, Path]] = None,
+        config_file: Optional[str] = None,
+        checkpoint: Optional[str] = None,
+        detector: str = "yolo",
+        device: str = "auto",
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    ):
+        """
+        Configure the worker without starting it.
+
+        Args:
+            backend: 'alphapose', or 'fake' for the protocol test double
+            alphapose_root: Path to the AlphaPose installation
+            config_file: AlphaPose model config
+            checkpoint: Pose model checkpoint
+            detector: Person detector ('yolo', 'tracker')
+            device: 'cpu', 'cuda' or 'auto'
+            max_in_flight: Frames sent ahead of the results read back
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown AlphaPose worker backend: {backend}. Use one of: {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.alphapose_root = alphapose_root
+        self.config_file = config_file
+        self.checkpoint = checkpoint
+        self.detector = detector
+        self.device = device
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.info: Dict[str, Any] = {}
+        self._process: Optional[subprocess.Popen] = None
+
+    def _command(self) -> List[str]:
+        """Command line of the worker process."""
+        cmd = [sys.executable, "-m", "ambient.pose.alphapose_worker", "--backend", self.backend]
+        if self.backend == "alphapose":
+            if self.alphapose_root is None or not self.config_file or not self.checkpoint:
+                raise AlphaPoseWorkerError(
+                    "The AlphaPose worker needs alphapose_root, config_file and checkpoint"
+                )
+            cmd += [
+                "--alphapose-root", str(self.alphapose_root),
+                "--cfg", str(self.config_file),
+                "--checkpoint", str(self.checkpoint),
+                "--detector", self.detector,
+                "--device", self.device
+            ]
+        return cmd
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker process is alive."""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """Start the worker and wait until its model is loaded."""
+        if self.is_running:
+            return
+        self.close()
+
+        # The worker imports this package, whatever the caller's working directory
+        env = dict(os.environ)
+        project_root = str(Path(__file__).parents[2])
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [project_root, env.get("PYTHONPATH")]))
+
+        logger.info(f"Starting {self.backend} pose worker")
+        self._process = subprocess.Popen(
+            self._command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env
+        )
+        try:
+            kind, payload = read_message(self._process.stdout)
+        except AlphaPoseWorkerError:
+            self.close()
+            raise AlphaPoseWorkerError("AlphaPose worker exited during startup")
+        if kind != MSG_READY:
+            self.close()
+            raise AlphaPoseWorkerError(payload.decode("utf-8", "replace") or "AlphaPose worker failed to start")
+        self.info = json.loads(payload.decode("utf-8") or "{}")
+        logger.info(f"Pose worker ready (pid {self._process.pid}): {self.info}")
+
+    def estimate(self, image: np.ndarray) -> np.ndarray:
+        """
+        Estimate keypoints for one RGB frame.
+
+        Args:
+            image: HxWx3 uint8 RGB image
+
+        Returns:
+            (K, 3) float32 array of the best person's keypoints
+        """
+        result = next(self.estimate_many([image]))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def estimate_many(self, images: Iterable[np.ndarray]) -> Iterator[Union[np.ndarray, AlphaPoseWorkerError]]:
+        """
+        Stream frames through the worker, keeping up to max_in_flight in the pipe.
+
+        Args:
+            images: HxWx3 uint8 RGB images
+
+        Yields:
+            Per frame, in order: a (K, 3) float32 keypoint array, or an
+            AlphaPoseWorkerError if the worker failed on that frame
+        """
+        self.start()
+        process = self._process
+        pending = 0
+        try:
+            for image in images:
+                write_message(process.stdin, MSG_FRAME, encode_frame(image))
+                process.stdin.flush()
+                pending += 1
+                if pending >= self.max_in_flight:
+                    result = self._read_result()
+                    pending -= 1
+                    yield result
+            while pending:
+                result = self._read_result()
+                pending -= 1
+                yield result
+        except (BrokenPipeError, AlphaPoseWorkerError) as e:
+            self.close()
+            raise AlphaPoseWorkerError(f"AlphaPose worker failed: {e}")
+        finally:
+            if pending and self.is_running:
+                # Abandoned mid-stream: drain replies so the pipe stays in sync
+                try:
+                    for _ in range(pending):
+                        self._read_result()
+                except AlphaPoseWorkerError:
+                    self.close()
+
+    def _read_result(self) -> Union[np.ndarray, AlphaPoseWorkerError]:
+        """Read the reply to the oldest frame in flight."""
+        kind, payload = read_message(self._process.stdout)
+        if kind == MSG_KEYPOINTS:
+            return decode_keypoints(payload)
+        if kind == MSG_ERROR:
+            return AlphaPoseWorkerError(payload.decode("utf-8", "replace"))
+        raise AlphaPoseWorkerError(f"Unexpected reply {kind!r} from AlphaPose worker")
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.poll() is None:
+                write_message(process.stdin, MSG_QUIT)
+                process.stdin.close()
+                process.wait(timeout=5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            for stream in (process.stdin, process.stdout):
+                try:
+                    stream.close()
+                except (OSError, ValueError):
+                    pass
+
+    def __enter__(self) -> "AlphaPoseWorker":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,7 +38,9 @@ class EnhancedMediaPipeEstimator(IPoseEstimator):
         model_complexity: int = 1,
         min_detection_confidence: float = 0.5,
         min_tracking_confidence: float = 0.5,
-        model_path: Optional[Union[str, Path]] = None
+        model_path: Optional[Union[str, Path]] = None,
+        prefetch_batches: int = 2,
+        input_size: Optional[int] = None
     ):
         """
         Initialize enhanced MediaPipe estimator.
@@ -48,6 +50,9 @@ class EnhancedMediaPipeEstimator(IPoseEstimator):
             min_detection_confidence: Minimum detection confidence
             min_tracking_confidence: Minimum tracking confidence
             model_path: Path to MediaPipe model file (uses default if None)
+            prefetch_batches: Frame batches decoded in the background while
+                frames are being estimated (0 to decode serially)
+            input_size: Longest frame side worth decoding for the model
         """
         if not MEDIAPIPE_AVAILABLE:
             raise ImportError(
@@ -57,6 +62,8 @@ class EnhancedMediaPipeEstimator(IPoseEstimator):
         self.model_complexity = model_complexity
         self.min_detection_confidence = min_detection_confidence
         self.min_tracking_confidence = min_tracking_confidence
+        self.prefetch_batches = max(0, prefetch_batches)
+        self.input_size = input_size
         
         # Use default model path if not provided
         if model_path is None:
@@ -128,9 +135,9 @@ class EnhancedMediaPipeEstimator(IPoseEstimator):
                     # Fallback: create dummy keypoints for now
                     keypoints = self._create_dummy_keypoints(frame)
                 
-                # Convert to enhanced format
+                # Convert to enhanced format, in source-video pixels
                 enhanced_keypoints = []
-                for i, kp in enumerate(keypoints):
+                for i, kp in enumerate(frame.to_source_keypoints(keypoints)):
                     enhanced_keypoints.append({
                         "id": i,
                         "x": kp.get("x", 0),
@@ -196,26 +203,51 @@ class EnhancedMediaPipeEstimator(IPoseEstimator):
         Returns:
             List of pose estimation results, one per frame
         """
-        results = []
+        def process_batch(batch_frames, start_idx):
+            # Frames of the batch are already decoded; estimate_pose reuses them
+            batch_results = []
+            for offset in range(len(batch_frames)):
+                i = start_idx + offset
+                try:
+                    result = self.estimate_pose(sequence.frames[i])
+                    result["frame_index"] = i
+                    batch_results.append(result)
+                except Exception as e:
+                    logger.error(f"Failed to process frame {i}: {e}")
+                    batch_results.append(self._error_result(i, e))
+            return batch_results
         
-        for i, frame in enumerate(sequence.frames):
-            try:
-                result = self.estimate_pose(frame)
-                result["frame_index"] = i
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Failed to process frame {i}: {e}")
-                results.append({
-                    "keypoints": [],
-                    "estimator": self.get_estimator_name(),
-                    "format": self.get_keypoint_format(),
-                    "confidence": 0.0,
-                    "frame_index": i,
-                    "error": str(e)
-                })
+        # Decode upcoming batches in the background while estimating
+        batch_size = 8
+        batch_results = sequence.process_in_batches(
+            process_batch,
+            batch_size=batch_size,
+            unload_after_processing=True,
+            prefetch=self.prefetch_batches
+        )
+        
+        results = []
+        for batch_index, batch in enumerate(batch_results):
+            if batch is not None:
+                results.extend(batch)
+                continue
+            start_idx = batch_index * batch_size
+            for i in range(start_idx, min(start_idx + batch_size, len(sequence.frames))):
+                results.append(self._error_result(i, RuntimeError("Batch processing failed")))
         
         return results
     
+    def _error_result(self, frame_index: int, error: Exception) -> Dict[str, Any]:
+        """Build the result entry for a frame that could not be processed."""
+        return {
+            "keypoints": [],
+            "estimator": self.get_estimator_name(),
+            "format": self.get_keypoint_format(),
+            "confidence": 0.0,
+            "frame_index": frame_index,
+            "error": str(error)
+        }
+    
     def _calculate_overall_confidence(self, keypoints: List[Dict[str, Any]]) -> float:
         """Calculate overall confidence from keypoints."""
         if not keypoints:
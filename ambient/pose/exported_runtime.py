@@ -0,0 +1,381 @@
+"""
+Exported-model CPU runtime for YOLO pose models.
+
+The PyTorch checkpoint is a poor fit for CPU-only nodes: eager execution,
+dynamic shapes and no control over intra-op threading. This module exports
+a ``.pt`` pose model once to ONNX with a fixed input size, caches the
+exported file under ``data/models`` keyed by the checkpoint's content hash,
+and runs it with ONNX Runtime or OpenVINO.
+
+ExportedPoseModel is called like an Ultralytics ``YOLO`` model (images in,
+results with ``keypoints.data`` out), so UltralyticsEstimator swaps it in
+for the PyTorch model without changing its inference paths.
+
+Author: AlexPose Team
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    onnxruntime = None
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    import openvino
+    OPENVINO_AVAILABLE = True
+except ImportError:
+    openvino = None
+    OPENVINO_AVAILABLE = False
+
+
+RUNTIMES = ("torch", "onnx", "openvino")
+DEFAULT_EXPORT_DIR = "data/models"
+DEFAULT_EXPORT_INPUT_SIZE = 640
+
+# Letterbox padding value used by Ultralytics
+_PAD_VALUE = 114
+_HASH_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+class ExportedRuntimeError(Exception):
+    """Exception raised for exported-model runtime errors."""
+    pass
+
+
+def _resolve_export_dir(export_dir: Optional[Union[str, Path]]) -> Path:
+    """Resolve the export directory, relative paths against the project root."""
+    base = Path(export_dir or DEFAULT_EXPORT_DIR)
+    if not base.is_absolute():
+        root = Path(__file__).parents[2]
+        return (root / base).resolve()
+    return base.resolve()
+
+
+def model_file_hash(model_path: Union[str, Path]) -> str:
+    """
+    Get a short content hash of a model file.
+
+    Args:
+        model_path: Path to the model checkpoint
+
+    Returns:
+        First 16 hex digits of the file's SHA-1
+    """
+    digest = hashlib.sha1()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def exported_model_path(
+    model_path: Union[str, Path],
+    input_size: int = DEFAULT_EXPORT_INPUT_SIZE,
+    export_dir: Optional[Union[str, Path]] = None
+) -> Path:
+    """
+    Get the cache path of a model's ONNX export.
+
+    Args:
+        model_path: Path to the ``.pt`` checkpoint
+        input_size: Fixed square input size of the export
+        export_dir: Cache directory (default data/models)
+
+    Returns:
+        Path named after the checkpoint, its content hash and the input size
+    """
+    model_path = Path(model_path)
+    name = f"{model_path.stem}-{model_file_hash(model_path)}-{int(input_size)}.onnx"
+    return _resolve_export_dir(export_dir) / name
+
+
+def export_model(
+    model_path: Union[str, Path],
+    input_size: int = DEFAULT_EXPORT_INPUT_SIZE,
+    export_dir: Optional[Union[str, Path]] = None
+) -> Path:
+    """
+    Export a YOLO pose checkpoint to ONNX once, reusing the cached export.
+
+    Args:
+        model_path: Path to the ``.pt`` checkpoint
+        input_size: Fixed square input size of the export
+        export_dir: Cache directory (default data/models)
+
+    Returns:
+        Path of the cached ONNX file
+    """
+    model_path = Path(model_path)
+    if not model_path.exists():
+        raise ExportedRuntimeError(f"Model checkpoint not found: {model_path}")
+
+    target = exported_model_path(model_path, input_size, export_dir)
+    if target.exists() and target.stat().st_size > 0:
+        logger.debug(f"Using cached ONNX export {target}")
+        return target
+
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        raise ExportedRuntimeError("Exporting requires Ultralytics. Install with: pip install ultralytics")
+
+    logger.info(f"Exporting {model_path} to ONNX at {input_size}x{input_size}")
+    try:
+        exported = Path(YOLO(str(model_path)).export(
+            format="onnx", imgsz=int(input_size), dynamic=False, batch=1
+        ))
+    except Exception as e:
+        raise ExportedRuntimeError(f"Failed to export {model_path} to ONNX: {e}")
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    shutil.move(str(exported), temp_path)
+    os.replace(temp_path, target)
+    logger.info(f"Cached ONNX export {target}")
+    return target
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resize an image to fit a square input, padding the rest.
+
+    Args:
+        image: HxWx3 uint8 image
+        size: Side of the square input
+
+    Returns:
+        (padded image, scale, (pad_x, pad_y)); input coordinates map back to
+        the image as (x - pad_x) / scale
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = max(1, round(width * scale)), max(1, round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    out = np.full((size, size, 3), _PAD_VALUE, dtype=np.uint8)
+    resized = image if (new_w, new_h) == (width, height) else cv2.resize(
+        image, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    out[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return out, scale, (pad_x, pad_y)
+
+
+def _nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float, max_det: int) -> List[int]:
+    """Greedy non-maximum suppression on (x1, y1, x2, y2) boxes."""
+    order = np.argsort(-scores)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep: List[int] = []
+    while order.size and len(keep) < max_det:
+        best = order[0]
+        keep.append(int(best))
+        rest = order[1:]
+        x1 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = inter / np.maximum(areas[best] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return keep
+
+
+def decode_pose_output(
+    output: np.ndarray,
+    scale: float,
+    pad: Tuple[int, int],
+    conf: float = 0.25,
+    iou: float = 0.7,
+    max_det: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode raw YOLO pose output for one image.
+
+    Args:
+        output: Array of shape (4 + 1 + K * 3, anchors): box (cx, cy, w, h),
+            person score and K keypoints (x, y, confidence) per anchor
+        scale: Letterbox scale of the image
+        pad: Letterbox padding (pad_x, pad_y)
+        conf: Person score threshold
+        iou: IoU threshold for non-maximum suppression
+        max_det: Maximum number of people
+
+    Returns:
+        (boxes (N, 5) as x1, y1, x2, y2, score; keypoints (N, K, 3)) in
+        image pixels, best detection first
+    """
+    predictions = np.asarray(output, dtype=np.float32).T
+    num_keypoints = (predictions.shape[1] - 5) // 3
+    predictions = predictions[predictions[:, 4] > conf]
+    if len(predictions) == 0:
+        return np.zeros((0, 5), np.float32), np.zeros((0, num_keypoints, 3), np.float32)
+
+    cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    keep = _nms(boxes, predictions[:, 4], iou, max_det)
+
+    pad_x, pad_y = pad
+    boxes = boxes[keep]
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / scale
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / scale
+    keypoints = predictions[keep, 5:].reshape(len(keep), num_keypoints, 3)
+    keypoints[..., 0] = (keypoints[..., 0] - pad_x) / scale
+    keypoints[..., 1] = (keypoints[..., 1] - pad_y) / scale
+    boxes = np.concatenate([boxes, predictions[keep, 4:5]], axis=1)
+    return boxes, keypoints
+
+
+class ExportedPoseModel:
+    """
+    ONNX export of a YOLO pose model run with ONNX Runtime or OpenVINO.
+
+    Called like an Ultralytics model: takes a BGR image, a list of images or
+    a video path, and returns results with ``boxes.data`` and
+    ``keypoints.data`` arrays (as a generator with stream=True).
+    """
+
+    def __init__(
+        self,
+        onnx_path: Union[str, Path],
+        runtime: str = "onnx",
+        input_size: int = DEFAULT_EXPORT_INPUT_SIZE,
+        num_threads: Optional[int] = None
+    ):
+        """
+        Load the exported model.
+
+        Args:
+            onnx_path: Path to the ONNX export
+            runtime: "onnx" (ONNX Runtime) or "openvino"
+            input_size: Square input size the model was exported with
+            num_threads: Intra-op threads (None for the runtime default)
+        """
+        if not CV2_AVAILABLE:
+            raise ExportedRuntimeError("OpenCV is required for exported-model inference")
+
+        self.onnx_path = Path(onnx_path)
+        self.runtime = runtime
+        self.input_size = int(input_size)
+        self.num_threads = num_threads
+        self.device = "cpu"
+
+        if runtime == "onnx":
+            if not ONNXRUNTIME_AVAILABLE:
+                raise ExportedRuntimeError("ONNX Runtime is not installed. Install with: pip install onnxruntime")
+            options = onnxruntime.SessionOptions()
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if num_threads:
+                options.intra_op_num_threads = int(num_threads)
+                options.inter_op_num_threads = 1
+            session = onnxruntime.InferenceSession(
+                str(self.onnx_path), sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            input_name = session.get_inputs()[0].name
+            self._infer = lambda tensor: session.run(None, {input_name: tensor})[0]
+        elif runtime == "openvino":
+            if not OPENVINO_AVAILABLE:
+                raise ExportedRuntimeError("OpenVINO is not installed. Install with: pip install openvino")
+            config = {"CACHE_DIR": str(self.onnx_path.parent / "openvino_cache")}
+            if num_threads:
+                config["INFERENCE_NUM_THREADS"] = int(num_threads)
+            compiled = openvino.Core().compile_model(str(self.onnx_path), "CPU", config)
+            output = compiled.output(0)
+            self._infer = lambda tensor: compiled([tensor])[output]
+        else:
+            raise ExportedRuntimeError(f"Unsupported runtime: {runtime}. Use one of: onnx, openvino")
+
+        logger.info(f"Loaded {self.onnx_path.name} with {runtime} runtime (threads: {num_threads or 'default'})")
+
+    def __call__(
+        self,
+        source: Any,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 1,
+        verbose: bool = False,
+        stream: bool = False,
+        **kwargs: Any
+    ) -> Union[List[Any], Iterator[Any]]:
+        """
+        Run inference like an Ultralytics model.
+
+        Args:
+            source: BGR image, list of BGR images, or video path
+            conf: Person score threshold
+            iou: IoU threshold for non-maximum suppression
+            max_det: Maximum number of people per image
+            verbose: Unused, for call compatibility
+            stream: Return a generator instead of a list
+
+        Returns:
+            One result per image
+        """
+        results = (self.predict(image, conf, iou, max_det) for image in self._images(source))
+        return results if stream else list(results)
+
+    @staticmethod
+    def _images(source: Any) -> Iterator[np.ndarray]:
+        """Iterate over the images of a source."""
+        if isinstance(source, (str, Path)):
+            cap = cv2.VideoCapture(str(source))
+            if not cap.isOpened():
+                raise ExportedRuntimeError(f"Failed to open video: {source}")
+            try:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    yield frame
+            finally:
+                cap.release()
+        elif isinstance(source, np.ndarray) and source.ndim == 3:
+            yield source
+        else:
+            yield from source
+
+    def predict(
+        self,
+        image: np.ndarray,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 1
+    ) -> Any:
+        """
+        Detect poses in one BGR image.
+
+        Args:
+            image: HxWx3 BGR uint8 image
+            conf: Person score threshold
+            iou: IoU threshold for non-maximum suppression
+            max_det: Maximum number of people
+
+        Returns:
+            Result with boxes.data (N, 5) and keypoints.data (N, K, 3) in
+            image pixels
+        """
+        padded, scale, pad = letterbox(image, self.input_size)
+        tensor = cv2.cvtColor(padded, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)[None]
+        tensor = np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
+        output = self._infer(tensor)
+        boxes, keypoints = decode_pose_output(output[0], scale, pad, conf, iou, max_det)
+        return SimpleNamespace(
+            boxes=SimpleNamespace(data=boxes),
+            keypoints=SimpleNamespace(data=keypoints),
+            orig_shape=image.shape[:2]
+        )
@@ -2,13 +2,21 @@
 Pose estimator factory for creating and managing different pose estimation backends.
 
 This module provides a factory pattern for creating pose estimators with
-automatic discovery and registration capabilities.
+automatic discovery and registration capabilities, and a process-wide pool
+that reuses loaded estimators across requests.
 
 Author: AlexPose Team
 """
 
+import atexit
+import hashlib
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Type, Optional, Any, List
+from typing import Dict, Iterator, Type, Optional, Any, List, Set, Tuple, Union
 from loguru import logger
 
 from ambient.core.interfaces import IPoseEstimator
@@ -96,7 +104,10 @@ class PoseEstimatorFactory:
             RuntimeError: If estimator creation fails
         """
         estimator_type = estimator_type.lower()
-        config = config or {}
+        config = dict(config or {})
+        # ROI tracking and keyframe-only estimation wrap whichever estimator is created
+        roi_config = config.pop("roi_tracking", None)
+        keyframe_config = config.pop("keyframe_estimation", None)
         
         if estimator_type not in self._estimators:
             available = ", ".join(self._estimators.keys())
@@ -110,21 +121,52 @@ class PoseEstimatorFactory:
         try:
             # Create estimator with configuration
             if estimator_type == "openpose":
-                return self._create_openpose_estimator(config)
+                estimator = self._create_openpose_estimator(config)
             elif estimator_type == "mediapipe":
-                return self._create_mediapipe_estimator(config)
+                estimator = self._create_mediapipe_estimator(config)
             elif estimator_type in ["yolov8-pose", "yolov11-pose"]:
-                return self._create_ultralytics_estimator(config, estimator_type)
+                estimator = self._create_ultralytics_estimator(config, estimator_type)
             elif estimator_type == "alphapose":
-                return self._create_alphapose_estimator(config)
+                estimator = self._create_alphapose_estimator(config)
             else:
                 # Generic creation for custom estimators
-                return estimator_class(**config)
+                estimator = estimator_class(**config)
+                return self._wrap_estimator(estimator, roi_config, keyframe_config)
+            
+            # Declared model input size drives reduced-resolution decoding
+            if config.get("input_size"):
+                estimator.input_size = int(config["input_size"])
+            return self._wrap_estimator(estimator, roi_config, keyframe_config)
                 
         except Exception as e:
             logger.error(f"Failed to create {estimator_type} estimator: {e}")
             raise RuntimeError(f"Failed to create {estimator_type} estimator: {e}")
     
+    @staticmethod
+    def _wrapper_config(config: Any) -> Optional[Dict[str, Any]]:
+        """Keyword arguments of an optional wrapper section, or None when disabled."""
+        if not config:
+            return None
+        config = {} if config is True else dict(config)
+        return config if config.pop("enabled", True) else None
+    
+    def _wrap_estimator(
+        self,
+        estimator: IPoseEstimator,
+        roi_config: Any,
+        keyframe_config: Any
+    ) -> IPoseEstimator:
+        """Wrap an estimator for ROI tracking and keyframe-only estimation when configured."""
+        roi_config = self._wrapper_config(roi_config)
+        if roi_config is not None:
+            from ambient.pose.roi_tracking import ROITrackingEstimator
+            estimator = ROITrackingEstimator(estimator, **roi_config)
+        keyframe_config = self._wrapper_config(keyframe_config)
+        if keyframe_config is not None:
+            from ambient.pose.keyframe_estimation import KeyframePoseEstimator
+            estimator = KeyframePoseEstimator(estimator, **keyframe_config)
+        return estimator
+    
     def _create_openpose_estimator(self, config: Dict[str, Any]) -> OpenPoseEstimator:
         """Create OpenPose estimator with configuration."""
         # OpenPose is not yet implemented, so just create with no args
@@ -139,7 +181,9 @@ class PoseEstimatorFactory:
             model_path = Path("data/models/pose_landmarker_lite.task")
         
         default_model = config.get("default_model", "BODY_25")
-        min_pose_detection_confidence = config.get("min_pose_detection_confidence", 0.5)
+        min_pose_detection_confidence = config.get(
+            "min_pose_detection_confidence", config.get("min_detection_confidence", 0.5)
+        )
         min_pose_presence_confidence = config.get("min_pose_presence_confidence", 0.5)
         min_tracking_confidence = config.get("min_tracking_confidence", 0.5)
         
@@ -166,24 +210,35 @@ class PoseEstimatorFactory:
         confidence_threshold = config.get("confidence_threshold", 0.25)
         iou_threshold = config.get("iou_threshold", 0.7)
         max_detections = config.get("max_detections", 1)
+        # "onnx" or "openvino" run a cached export of the checkpoint on CPU
+        runtime = config.get("runtime", "torch")
+        num_threads = config.get("num_threads")
+        input_size = config.get("input_size")
         
         return UltralyticsEstimator(
             model_name=model_name,
             device=device,
             confidence_threshold=confidence_threshold,
             iou_threshold=iou_threshold,
-            max_detections=max_detections
+            max_detections=max_detections,
+            input_size=int(input_size) if input_size else None,
+            runtime=runtime,
+            num_threads=int(num_threads) if num_threads else None,
+            export_dir=config.get("export_dir")
         )
     
     def _create_alphapose_estimator(self, config: Dict[str, Any]) -> AlphaPoseEstimator:
         """Create AlphaPose estimator with configuration."""
         # Extract AlphaPose-specific configuration
-        alphapose_root = config.get("alphapose_root")
+        # alexpose.yaml names the installation directory model_folder
+        alphapose_root = config.get("alphapose_root", config.get("model_folder"))
         config_file = config.get("config_file")
         checkpoint = config.get("checkpoint")
         detector = config.get("detector", "yolo")
         confidence_threshold = config.get("confidence_threshold", 0.3)
         nms_threshold = config.get("nms_threshold", 0.6)
+        persistent_worker = config.get("persistent_worker", True)
+        device = config.get("device", "auto")
         
         return AlphaPoseEstimator(
             alphapose_root=alphapose_root,
@@ -191,7 +246,9 @@ class PoseEstimatorFactory:
             checkpoint=checkpoint,
             detector=detector,
             confidence_threshold=confidence_threshold,
-            nms_threshold=nms_threshold
+            nms_threshold=nms_threshold,
+            persistent_worker=persistent_worker,
+            device=device
         )
     
     def list_available_estimators(self) -> List[str]:
@@ -388,4 +445,494 @@ def create_best_pose_estimator(
         Best available pose estimator or None if none available
     """
     factory = get_pose_estimator_factory()
-    return factory.create_best_available_estimator(preferred_order)
\ No newline at end of file
+    return factory.create_best_available_estimator(preferred_order)
+
+
+class EstimatorPoolError(Exception):
+    """Exception raised for estimator pool errors."""
+    pass
+
+
+PoolKey = Tuple[str, str]
+
+
+class EstimatorPool:
+    """
+    Thread-safe pool of loaded pose estimators shared across requests.
+    
+    Creating an estimator loads its model, which costs far more than
+    estimating a video's poses. The pool keeps estimators keyed by
+    (type, config hash) and leases each one to a single caller at a time,
+    since estimators are not thread-safe. At most max_instances_per_type
+    estimators of a type exist at once; beyond that, callers reuse an idle
+    estimator of another configuration (closing it) or wait for a release.
+    Estimators idle for longer than idle_timeout are closed, except the most
+    recent one of configurations that were warmed up. Callers that pass no
+    config get the estimator type's entry in estimator_configs, typically
+    the pose_estimation.estimators section of alexpose.yaml.
+    """
+    
+    def __init__(
+        self,
+        factory: Optional[PoseEstimatorFactory] = None,
+        max_instances_per_type: int = 2,
+        idle_timeout: Optional[float] = 600.0,
+        acquire_timeout: Optional[float] = None,
+        estimator_configs: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        """
+        Initialize the pool.
+        
+        Args:
+            factory: Factory creating the estimators (default: the global factory)
+            max_instances_per_type: Maximum live estimators per estimator type
+            idle_timeout: Seconds an idle estimator is kept (None to keep forever)
+            acquire_timeout: Seconds acquire() waits for a free estimator
+                (None to wait indefinitely)
+            estimator_configs: Default configuration per estimator type, used
+                when acquire() is given no config
+        """
+        if max_instances_per_type < 1:
+            raise ValueError("max_instances_per_type must be at least 1")
+        self._factory = factory
+        self.max_instances_per_type = max_instances_per_type
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.estimator_configs = {
+            name.lower(): dict(config) for name, config in (estimator_configs or {}).items()
+        }
+        
+        # Idle estimators per key as (last release time, estimator), most recent last
+        self._idle: Dict[PoolKey, List[Tuple[float, IPoseEstimator]]] = {}
+        # Leased estimators by id, with their key
+        self._leased: Dict[int, Tuple[PoolKey, IPoseEstimator]] = {}
+        self._live: Dict[str, int] = {}
+        self._pinned: Set[PoolKey] = set()
+        # Leased when the pool was closed: closed on release
+        self._retired: Set[int] = set()
+        self._cond = threading.Condition()
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._waits = 0
+    
+    @property
+    def factory(self) -> PoseEstimatorFactory:
+        """Factory creating the pooled estimators."""
+        if self._factory is None:
+            self._factory = get_pose_estimator_factory()
+        return self._factory
+    
+    @staticmethod
+    def pool_key(estimator_type: str, config: Optional[Dict[str, Any]] = None) -> PoolKey:
+        """
+        Get the pool key of an estimator configuration.
+        
+        Args:
+            estimator_type: Type of estimator
+            config: Configuration parameters
+            
+        Returns:
+            Tuple of (lowercased type, short hash of the configuration)
+        """
+        encoded = json.dumps(config or {}, sort_keys=True, default=str)
+        return estimator_type.lower(), hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+    
+    def resolve_config(self, estimator_type: str, config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the configuration an estimator is created with.
+        
+        Args:
+            estimator_type: Type of estimator
+            config: Configuration parameters, or None for the type's default
+            
+        Returns:
+            config, or the type's entry in estimator_configs when config is None
+        """
+        if config is not None:
+            return config
+        return self.estimator_configs.get(estimator_type.lower())
+    
+    def acquire(
+        self,
+        estimator_type: str,
+        config: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> IPoseEstimator:
+        """
+        Lease an estimator, reusing an idle one or creating it.
+        
+        Args:
+            estimator_type: Type of estimator
+            config: Configuration parameters (default: the type's entry in
+                estimator_configs)
+            timeout: Seconds to wait when the type is at its limit
+                (default: the pool's acquire_timeout; math.inf to wait
+                indefinitely whatever the default)
+            
+        Returns:
+            Estimator leased to the caller until release()
+            
+        Raises:
+            ValueError: If the estimator type is not registered
+            EstimatorPoolError: If no estimator became free in time
+            RuntimeError: If creating the estimator fails
+        """
+        config = self.resolve_config(estimator_type, config)
+        key = self.pool_key(estimator_type, config)
+        estimator_type = key[0]
+        if estimator_type not in self.factory.list_available_estimators():
+            available = ", ".join(self.factory.list_available_estimators())
+            raise ValueError(f"Unknown estimator type: {estimator_type}. Available types: {available}")
+        
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = None if timeout is None or math.isinf(timeout) else time.monotonic() + timeout
+        self._start_reaper()
+        
+        to_close: List[IPoseEstimator] = []
+        with self._cond:
+            while True:
+                to_close.extend(self._pop_expired())
+                idle = self._idle.get(key)
+                if idle:
+                    _, estimator = idle.pop()
+                    self._leased[id(estimator)] = (key, estimator)
+                    self._hits += 1
+                    break
+                
+                if self._live.get(estimator_type, 0) < self.max_instances_per_type:
+                    self._live[estimator_type] = self._live.get(estimator_type, 0) + 1
+                    estimator = None
+                    break
+                
+                # At the limit: replace the least recently used idle estimator of the type
+                victim = self._pop_least_recent(estimator_type)
+                if victim is not None:
+                    to_close.append(victim)
+                    self._evictions += 1
+                    estimator = None
+                    break
+                
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise EstimatorPoolError(
+                        f"No {estimator_type} estimator became free within {timeout}s "
+                        f"({self.max_instances_per_type} in use)"
+                    )
+                self._waits += 1
+                self._cond.wait(remaining)
+        
+        self._close_all(to_close)
+        if estimator is not None:
+            return estimator
+        
+        # Load the model outside the lock; other types and keys proceed meanwhile
+        try:
+            estimator = self.factory.create_estimator(estimator_type, config)
+        except Exception:
+            with self._cond:
+                self._live[estimator_type] -= 1
+                self._cond.notify_all()
+            raise
+        
+        with self._cond:
+            self._leased[id(estimator)] = (key, estimator)
+            self._misses += 1
+        logger.info(f"Pooled new {estimator_type} estimator ({key[1]})")
+        return estimator
+    
+    def release(self, estimator: IPoseEstimator, discard: bool = False) -> None:
+        """
+        Return a leased estimator to the pool.
+        
+        Estimators that keep state between frames (e.g. ROI tracking)
+        expose reset(), which is called here so the next lease starts
+        fresh; an estimator whose reset fails is discarded.
+        
+        Args:
+            estimator: Estimator returned by acquire()
+            discard: Close the estimator instead of keeping it (e.g. after
+                it failed in a way that may have left it broken)
+        """
+        if not discard and not self._reset(estimator):
+            discard = True
+        
+        with self._cond:
+            entry = self._leased.pop(id(estimator), None)
+            if entry is None:
+                raise EstimatorPoolError("Estimator was not leased from this pool")
+            key = entry[0]
+            retired = id(estimator) in self._retired
+            self._retired.discard(id(estimator))
+            if discard or retired:
+                if not retired:
+                    self._live[key[0]] -= 1
+            else:
+                self._idle.setdefault(key, []).append((time.monotonic(), estimator))
+            self._cond.notify_all()
+        
+        if discard or retired:
+            self._close_all([estimator])
+    
+    @contextmanager
+    def lease(
+        self,
+        estimator_type: str,
+        config: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[IPoseEstimator]:
+        """
+        Lease an estimator for the duration of a with block.
+        
+        Args:
+            estimator_type: Type of estimator
+            config: Configuration parameters
+            timeout: Seconds to wait when the type is at its limit
+                (default: the pool's acquire_timeout; math.inf to wait
+                indefinitely whatever the default)
+            
+        Yields:
+            Leased estimator
+        """
+        estimator = self.acquire(estimator_type, config, timeout)
+        try:
+            yield estimator
+        finally:
+            self.release(estimator)
+    
+    def warm_up(
+        self,
+        estimators: List[Union[str, Tuple[str, Dict[str, Any]]]],
+        run_inference: bool = True
+    ) -> Dict[str, Optional[str]]:
+        """
+        Load estimators ahead of the first request and keep them loaded.
+        
+        Each configuration gets one estimator that idle eviction keeps.
+        With run_inference, a blank frame goes through estimators that
+        implement estimate_pose, so lazily initialized state (inference
+        graphs, worker processes) is ready as well.
+        
+        Args:
+            estimators: Estimator types, or (type, config) tuples
+            run_inference: Run one blank frame through each estimator
+            
+        Returns:
+            Mapping of estimator type to None on success or the error message
+        """
+        results: Dict[str, Optional[str]] = {}
+        for spec in estimators:
+            estimator_type, config = (spec, None) if isinstance(spec, str) else spec
+            config = self.resolve_config(estimator_type, config)
+            start = time.perf_counter()
+            try:
+                estimator = self.acquire(estimator_type, config)
+            except Exception as e:
+                logger.warning(f"Could not warm up {estimator_type} estimator: {e}")
+                results[estimator_type] = str(e)
+                continue
+            
+            try:
+                if run_inference and callable(getattr(estimator, "estimate_pose", None)):
+                    from ambient.core.frame import Frame
+                    estimator.estimate_pose(Frame.empty())
+            except Exception as e:
+                logger.warning(f"Warm-up inference failed for {estimator_type}: {e}")
+            finally:
+                self.release(estimator)
+            
+            with self._cond:
+                self._pinned.add(self.pool_key(estimator_type, config))
+            results[estimator_type] = None
+            logger.info(f"Warmed up {estimator_type} estimator in {time.perf_counter() - start:.2f}s")
+        return results
+    
+    def evict_idle(self) -> int:
+        """
+        Close estimators idle for longer than the idle timeout.
+        
+        Returns:
+            Number of estimators closed
+        """
+        with self._cond:
+            expired = self._pop_expired()
+        self._close_all(expired)
+        return len(expired)
+    
+    def _pop_expired(self) -> List[IPoseEstimator]:
+        """Remove and return expired idle estimators; call with the lock held."""
+        if self.idle_timeout is None:
+            return []
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = []
+        for key, idle in self._idle.items():
+            # Warmed-up configurations keep their most recently used estimator
+            keep_last = key in self._pinned
+            candidates = idle[:-1] if keep_last else idle
+            stale = [entry for entry in candidates if entry[0] < cutoff]
+            for entry in stale:
+                idle.remove(entry)
+                expired.append(entry[1])
+                self._live[key[0]] -= 1
+        self._evictions += len(expired)
+        return expired
+    
+    def _pop_least_recent(self, estimator_type: str) -> Optional[IPoseEstimator]:
+        """Remove the least recently used idle estimator of a type; call with the lock held."""
+        oldest = None
+        for key, idle in self._idle.items():
+            if key[0] == estimator_type and idle and (oldest is None or idle[0][0] < oldest[1][0]):
+                oldest = (key, idle[0])
+        if oldest is None:
+            return None
+        self._idle[oldest[0]].pop(0)
+        return oldest[1][1]
+    
+    def _start_reaper(self) -> None:
+        """Start the background thread that evicts idle estimators."""
+        if self.idle_timeout is None or (self._reaper is not None and self._reaper.is_alive()):
+            return
+        with self._cond:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._stop.clear()
+            interval = max(1.0, self.idle_timeout / 2)
+            self._reaper = threading.Thread(
+                target=self._reap, args=(interval,), name="estimator-pool-reaper", daemon=True
+            )
+            self._reaper.start()
+    
+    def _reap(self, interval: float) -> None:
+        """Evict idle estimators every interval seconds until the pool is closed."""
+        while not self._stop.wait(interval):
+            try:
+                evicted = self.evict_idle()
+                if evicted:
+                    logger.info(f"Evicted {evicted} idle pose estimator(s)")
+            except Exception as e:
+                logger.warning(f"Idle estimator eviction failed: {e}")
+    
+    @staticmethod
+    def _reset(estimator: IPoseEstimator) -> bool:
+        """Clear per-video state of an estimator, if it has any."""
+        reset = getattr(estimator, "reset", None)
+        if not callable(reset):
+            return True
+        try:
+            reset()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to reset {type(estimator).__name__}: {e}")
+            return False
+    
+    @staticmethod
+    def _close_all(estimators: List[IPoseEstimator]) -> None:
+        """Close estimators that hold resources, logging failures."""
+        for estimator in estimators:
+            close = getattr(estimator, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"Failed to close {type(estimator).__name__}: {e}")
+    
+    def close(self) -> None:
+        """
+        Close every idle estimator and stop idle eviction.
+        
+        Leased estimators are closed when released. The pool can be used
+        again afterwards.
+        """
+        self._stop.set()
+        with self._cond:
+            idle = [estimator for entries in self._idle.values() for _, estimator in entries]
+            self._idle.clear()
+            self._pinned.clear()
+            self._live.clear()
+            self._retired.update(self._leased.keys())
+            self._cond.notify_all()
+        self._close_all(idle)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._cond:
+            idle = {}
+            for (estimator_type, _), entries in self._idle.items():
+                idle[estimator_type] = idle.get(estimator_type, 0) + len(entries)
+            requests = self._hits + self._misses
+            return {
+                'live': dict(self._live),
+                'idle': idle,
+                'leased': len(self._leased),
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'waits': self._waits,
+                'hit_rate': self._hits / requests if requests else 0.0
+            }
+
+
+# Global estimator pool
+_pool_instance: Optional[EstimatorPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_estimator_pool() -> EstimatorPool:
+    """
+    Get the process-wide estimator pool.
+    
+    Returns:
+        Global EstimatorPool instance
+    """
+    global _pool_instance
+    with _pool_lock:
+        if _pool_instance is None:
+            _pool_instance = EstimatorPool()
+        return _pool_instance
+
+
+def configure_estimator_pool(
+    max_instances_per_type: int = 2,
+    idle_timeout: Optional[float] = 600.0,
+    acquire_timeout: Optional[float] = None,
+    estimator_configs: Optional[Dict[str, Dict[str, Any]]] = None
+) -> EstimatorPool:
+    """
+    Replace the process-wide estimator pool with a newly configured one.
+    
+    Args:
+        max_instances_per_type: Maximum live estimators per estimator type
+        idle_timeout: Seconds an idle estimator is kept (None to keep forever)
+        acquire_timeout: Seconds acquire() waits for a free estimator
+            (None to wait indefinitely)
+        estimator_configs: Default configuration per estimator type
+        
+    Returns:
+        The new global EstimatorPool
+    """
+    global _pool_instance
+    pool = EstimatorPool(
+        max_instances_per_type=max_instances_per_type,
+        idle_timeout=idle_timeout,
+        acquire_timeout=acquire_timeout,
+        estimator_configs=estimator_configs
+    )
+    with _pool_lock:
+        previous, _pool_instance = _pool_instance, pool
+    if previous is not None:
+        previous.close()
+    return pool
+
+
+def close_estimator_pool() -> None:
+    """Close the process-wide estimator pool's estimators."""
+    with _pool_lock:
+        pool = _pool_instance
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(close_estimator_pool)
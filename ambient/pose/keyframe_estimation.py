@@ -0,0 +1,534 @@
+"""
+Keyframe-only pose estimation with temporal keypoint interpolation.
+
+Gait signals are smooth, so estimating every frame of a 30-60 fps video
+spends most of the model's time on frames that are predictable from their
+neighbours. KeyframePoseEstimator runs the wrapped estimator on every k-th
+frame only and fills the frames in between by interpolating each keypoint
+(linearly or with a cubic Hermite spline) between keyframes where it was
+confidently detected.
+
+The stride k adapts to the sequence: when the body moves a lot between two
+keyframes, or a keyframe has low confidence or no detection, the interval
+is bisected with extra keyframes down to the minimum stride and the stride
+shrinks; in slow or still stretches it grows up to the maximum stride.
+
+Interpolated frames are flagged in the output (PoseSequence.interpolated,
+or ``"interpolated": True`` in result dicts) so TemporalAnalyzer can weight
+them. keyframe_accuracy_report compares keyframe schedules against
+full-rate estimates of the same sequence.
+
+Author: AlexPose Team
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from ambient.core.frame import Frame, FrameSequence
+from ambient.core.interfaces import IPoseEstimator
+from ambient.core.pose_sequence import PoseSequence
+
+
+INTERPOLATION_METHODS = ("linear", "cubic")
+DEFAULT_MIN_CONFIDENCE = 0.3
+# Body movement between keyframes, as a fraction of body size, that
+# triggers a denser (above) or sparser (below) keyframe schedule
+DEFAULT_MOTION_HIGH = 0.15
+DEFAULT_MOTION_LOW = 0.05
+
+
+class KeyframeEstimationError(Exception):
+    """Exception raised for invalid keyframe estimation settings."""
+    pass
+
+
+def _cubic_hermite(t: np.ndarray, values: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Interpolate with a cubic Hermite spline using finite-difference tangents."""
+    slopes = np.diff(values) / np.diff(t)
+    tangents = np.empty_like(values)
+    tangents[0], tangents[-1] = slopes[0], slopes[-1]
+    if len(t) > 2:
+        tangents[1:-1] = (values[2:] - values[:-2]) / (t[2:] - t[:-2])
+
+    i = np.clip(np.searchsorted(t, query, side="right") - 1, 0, len(t) - 2)
+    h = t[i + 1] - t[i]
+    s = (query - t[i]) / h
+    s2, s3 = s * s, s * s * s
+    return (
+        (2 * s3 - 3 * s2 + 1) * values[i]
+        + (s3 - 2 * s2 + s) * h * tangents[i]
+        + (-2 * s3 + 3 * s2) * values[i + 1]
+        + (s3 - s2) * h * tangents[i + 1]
+    )
+
+
+def interpolate_keypoints(
+    keypoints: np.ndarray,
+    estimated: np.ndarray,
+    method: str = "linear",
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    max_gap: Optional[int] = None
+) -> np.ndarray:
+    """
+    Fill frames that were not estimated by interpolating each keypoint.
+
+    For every keypoint, the estimated frames where it has at least
+    min_confidence are the anchors. Frames that were not estimated and lie
+    between two anchors at most max_gap frames apart get interpolated x/y,
+    and a confidence interpolated linearly between the anchors'. Frames
+    outside the anchors' span or in longer gaps are left at zero.
+
+    Args:
+        keypoints: Array of shape (frames, keypoints, 3); only rows of
+            estimated frames are read
+        estimated: Boolean mask of the frames the estimator ran on
+        method: "linear" or "cubic" (Hermite spline through the anchors)
+        min_confidence: Minimum confidence of an anchor keypoint
+        max_gap: Maximum distance in frames between two anchors to
+            interpolate across (None for no limit)
+
+    Returns:
+        New float32 array of the same shape with the gaps filled
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise KeyframeEstimationError(
+            f"Unknown interpolation method: {method}. Use one of: {', '.join(INTERPOLATION_METHODS)}"
+        )
+    keypoints = np.asarray(keypoints, dtype=np.float32)
+    estimated = np.asarray(estimated, dtype=bool)
+    filled = np.where(estimated[:, None, None], keypoints, 0).astype(np.float32)
+    targets = np.flatnonzero(~estimated)
+    if len(targets) == 0:
+        return filled
+
+    frames = np.arange(len(keypoints))
+    for k in range(keypoints.shape[1]):
+        anchors = frames[estimated & (keypoints[:, k, 2] >= min_confidence)]
+        if len(anchors) < 2:
+            continue
+
+        # Targets strictly inside the anchors' span, in gaps short enough to bridge
+        right = np.searchsorted(anchors, targets)
+        inside = (right > 0) & (right < len(anchors))
+        query = targets[inside]
+        if max_gap is not None:
+            gaps = anchors[right[inside]] - anchors[right[inside] - 1]
+            query = query[gaps <= max_gap]
+        if len(query) == 0:
+            continue
+
+        t = anchors.astype(np.float64)
+        for axis in (0, 1):
+            values = keypoints[anchors, k, axis].astype(np.float64)
+            if method == "cubic" and len(anchors) > 2:
+                filled[query, k, axis] = _cubic_hermite(t, values, query)
+            else:
+                filled[query, k, axis] = np.interp(query, t, values)
+        filled[query, k, 2] = np.interp(query, t, keypoints[anchors, k, 2])
+
+    return filled
+
+
+def _body_motion(a: np.ndarray, b: np.ndarray, min_confidence: float) -> float:
+    """Median keypoint displacement between two poses, relative to body size."""
+    both = (a[:, 2] >= min_confidence) & (b[:, 2] >= min_confidence)
+    if both.sum() < 2:
+        return float("inf")
+    xy = a[both, :2]
+    size = float(np.max(xy.max(axis=0) - xy.min(axis=0)))
+    if size <= 0:
+        return float("inf")
+    return float(np.median(np.linalg.norm(b[both, :2] - xy, axis=1)) / size)
+
+
+class KeyframePoseEstimator(IPoseEstimator):
+    """
+    Pose estimator that runs a wrapped estimator on keyframes only.
+
+    Implements IPoseEstimator, so it can replace the wrapped estimator for
+    sequences; single frames are passed straight through.
+    """
+
+    def __init__(
+        self,
+        estimator: IPoseEstimator,
+        initial_stride: int = 4,
+        min_stride: int = 1,
+        max_stride: int = 8,
+        method: str = "linear",
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        motion_high: float = DEFAULT_MOTION_HIGH,
+        motion_low: float = DEFAULT_MOTION_LOW,
+        adaptive: bool = True
+    ):
+        """
+        Initialize the keyframe estimator.
+
+        Args:
+            estimator: Estimator run on the keyframes
+            initial_stride: Frames between the first keyframes
+            min_stride: Smallest keyframe interval (1 estimates every frame
+                where motion or confidence require it)
+            max_stride: Largest keyframe interval
+            method: Keypoint interpolation method ("linear" or "cubic")
+            min_confidence: Minimum confidence for a keypoint to anchor
+                interpolation and to count towards body motion
+            motion_high: Body motion between keyframes, relative to body
+                size, above which the interval is bisected and the stride shrinks
+            motion_low: Body motion below which the stride grows
+            adaptive: Adapt the stride; False keeps initial_stride throughout
+        """
+        if not 1 <= min_stride <= initial_stride <= max_stride:
+            raise KeyframeEstimationError(
+                f"Strides must satisfy 1 <= min_stride <= initial_stride <= max_stride, "
+                f"got {min_stride}, {initial_stride}, {max_stride}"
+            )
+        if method not in INTERPOLATION_METHODS:
+            raise KeyframeEstimationError(
+                f"Unknown interpolation method: {method}. Use one of: {', '.join(INTERPOLATION_METHODS)}"
+            )
+        self.estimator = estimator
+        self.initial_stride = initial_stride
+        self.min_stride = min_stride
+        self.max_stride = max_stride
+        self.method = method
+        self.min_confidence = min_confidence
+        self.motion_high = motion_high
+        self.motion_low = motion_low
+        self.adaptive = adaptive
+        # Reduced-resolution decoding follows the wrapped estimator
+        self.input_size = getattr(estimator, "input_size", None)
+
+    # ------------------------------------------------------------------
+    # Keyframe schedule
+    # ------------------------------------------------------------------
+
+    def _needs_refinement(self, a: Optional[np.ndarray], b: Optional[np.ndarray]) -> Tuple[bool, float]:
+        """Whether the interval between two keyframes needs a keyframe in between."""
+        if a is None or b is None:
+            return True, float("inf")
+        motion = _body_motion(a, b, self.min_confidence)
+        return motion > self.motion_high, motion
+
+    def schedule(
+        self,
+        num_frames: int,
+        estimate_frame: Callable[[int], Optional[np.ndarray]]
+    ) -> Dict[int, Optional[np.ndarray]]:
+        """
+        Choose keyframes adaptively and estimate them.
+
+        Args:
+            num_frames: Number of frames in the sequence
+            estimate_frame: Returns the (K, 3) keypoints of a frame index, or
+                None when nothing was detected
+
+        Returns:
+            Mapping of every estimated frame index to its keypoints
+        """
+        if num_frames == 0:
+            return {}
+        results: Dict[int, Optional[np.ndarray]] = {0: estimate_frame(0)}
+        last = num_frames - 1
+        start, stride = 0, self.initial_stride
+
+        while start < last:
+            end = min(start + stride, last)
+            results[end] = estimate_frame(end)
+            if not self.adaptive:
+                start = end
+                continue
+
+            # Bisect intervals with too much motion or unreliable keyframes
+            refine, motion = self._needs_refinement(results[start], results[end])
+            pending = [(start, end)] if refine else []
+            while pending:
+                left, right = pending.pop()
+                if right - left <= self.min_stride:
+                    continue
+                middle = (left + right) // 2
+                results[middle] = estimate_frame(middle)
+                for a, b in ((left, middle), (middle, right)):
+                    if self._needs_refinement(results[a], results[b])[0]:
+                        pending.append((a, b))
+
+            if refine:
+                stride = max(self.min_stride, stride // 2)
+            elif motion < self.motion_low:
+                stride = min(self.max_stride, stride * 2)
+            start = end
+
+        return results
+
+    def estimate_frames(
+        self,
+        num_frames: int,
+        estimate_frame: Callable[[int], Optional[np.ndarray]],
+        num_keypoints: Optional[int] = None
+    ) -> PoseSequence:
+        """
+        Estimate keyframes and interpolate the frames in between.
+
+        Args:
+            num_frames: Number of frames in the sequence
+            estimate_frame: Returns the (K, 3) keypoints of a frame index, or
+                None when nothing was detected
+            num_keypoints: Keypoints per frame (default: from the first detection)
+
+        Returns:
+            PoseSequence with interpolated frames flagged; metadata holds the
+            number of estimated frames and the resulting speed-up
+        """
+        results = self.schedule(num_frames, estimate_frame)
+        if num_keypoints is None:
+            num_keypoints = next((len(points) for points in results.values() if points is not None), 0)
+
+        keypoints = np.zeros((num_frames, num_keypoints, 3), dtype=np.float32)
+        estimated = np.zeros(num_frames, dtype=bool)
+        for index, points in results.items():
+            estimated[index] = True
+            if points is not None:
+                count = min(len(points), num_keypoints)
+                keypoints[index, :count] = points[:count]
+
+        filled = interpolate_keypoints(keypoints, estimated, self.method, self.min_confidence)
+        counts = np.where(filled[..., 2].max(axis=1, initial=0) > 0, num_keypoints, 0)
+        # Estimated frames keep their keypoints even at low confidence
+        counts[estimated] = [
+            0 if results[i] is None else min(len(results[i]), num_keypoints)
+            for i in np.flatnonzero(estimated)
+        ]
+
+        num_estimated = int(estimated.sum())
+        return PoseSequence(
+            filled,
+            counts=counts,
+            interpolated=~estimated,
+            metadata={
+                "estimated_frames": num_estimated,
+                "interpolation": self.method,
+                "speedup": num_frames / num_estimated if num_estimated else 0.0
+            }
+        )
+
+    # ------------------------------------------------------------------
+    # IPoseEstimator
+    # ------------------------------------------------------------------
+
+    def _frame_points(self, frame: Frame) -> Optional[np.ndarray]:
+        """Run the wrapped estimator on one frame, as a (K, 3) array."""
+        if callable(getattr(self.estimator, "estimate_pose", None)):
+            keypoints = self.estimator.estimate_pose(frame).get("keypoints") or []
+        else:
+            # Array estimators such as the GAVD MediaPipe estimator
+            keypoints = self.estimator.estimate_array_keypoints(frame.as_format("RGB"))
+        if not keypoints:
+            return None
+        return np.array(
+            [[kp.get("x", 0.0), kp.get("y", 0.0), kp.get("confidence", 0.0)] for kp in keypoints],
+            dtype=np.float32
+        )
+
+    def estimate_pose_array(self, sequence: FrameSequence) -> PoseSequence:
+        """
+        Estimate poses from a FrameSequence, running the model on keyframes only.
+
+        Args:
+            sequence: FrameSequence object containing multiple frames
+
+        Returns:
+            PoseSequence of all frames with interpolated frames flagged
+        """
+        # Keyframes are estimated in order; start tracking estimators afresh
+        self.reset()
+        poses = self.estimate_frames(len(sequence.frames), lambda i: self._frame_points(sequence.frames[i]))
+        poses.metadata.update({
+            "estimator": self.get_estimator_name(),
+            "format": self.get_keypoint_format()
+        })
+        logger.debug(
+            f"Estimated {poses.metadata['estimated_frames']}/{len(poses)} frames "
+            f"({poses.metadata['speedup']:.1f}x)"
+        )
+        return poses
+
+    def estimate_pose(self, frame: Frame) -> Dict[str, Any]:
+        """Estimate pose from a single Frame with the wrapped estimator."""
+        return self.estimator.estimate_pose(frame)
+
+    def estimate_pose_sequence(self, sequence: FrameSequence) -> List[Dict[str, Any]]:
+        """
+        Estimate poses from a FrameSequence, running the model on keyframes only.
+
+        Args:
+            sequence: FrameSequence object containing multiple frames
+
+        Returns:
+            List of pose estimation results, one per frame; interpolated
+            frames have "interpolated": True
+        """
+        poses = self.estimate_pose_array(sequence)
+        results = []
+        for index in range(len(poses)):
+            keypoints = [
+                {"x": kp["x"], "y": kp["y"], "confidence": kp["confidence"]}
+                for kp in poses.frame_keypoints(index)
+            ]
+            results.append({
+                "keypoints": keypoints,
+                "estimator": self.get_estimator_name(),
+                "format": self.get_keypoint_format(),
+                "sequence_index": index,
+                "frame_metadata": sequence.frames[index].metadata,
+                "confidence_scores": [kp["confidence"] for kp in keypoints],
+                "num_keypoints": len(keypoints),
+                "interpolated": bool(poses.interpolated[index])
+            })
+        return results
+
+    def estimate_image_keypoints(
+        self,
+        image_path: str,
+        model: str = "BODY_25",
+        bbox: Optional[Dict[str, Union[int, float]]] = None,
+    ) -> List[Dict[str, Union[float, int]]]:
+        """Estimate keypoints for one image with the wrapped estimator."""
+        return self.estimator.estimate_image_keypoints(image_path, model, bbox)
+
+    def estimate_video_keypoints(
+        self,
+        video_path: Union[str, Path],
+        model: str = "BODY_25",
+    ) -> List[List[Dict[str, Union[float, int]]]]:
+        """
+        Estimate keypoints for all frames of a video, running the model on keyframes only.
+
+        Args:
+            video_path: Path to the input video file
+            model: Pose model to use (ignored, kept for interface compatibility)
+
+        Returns:
+            A list where index i holds the keypoints of frame i; frames
+            without a detection or interpolation are empty lists
+        """
+        video_path = Path(video_path)
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video not found: {video_path}")
+
+        # Frames load lazily, so only keyframes are converted and estimated
+        sequence = FrameSequence.from_video(video_path)
+        try:
+            poses = self.estimate_pose_array(sequence)
+        finally:
+            sequence.close()
+        return [poses.frame_keypoints(index) for index in range(len(poses))]
+
+    def get_estimator_name(self) -> str:
+        """Get the name of this pose estimator."""
+        get_name = getattr(self.estimator, "get_estimator_name", None)
+        return get_name() if callable(get_name) else type(self.estimator).__name__
+
+    def get_keypoint_format(self) -> str:
+        """Get the keypoint format used by this estimator."""
+        get_format = getattr(self.estimator, "get_keypoint_format", None)
+        return get_format() if callable(get_format) else "unknown"
+
+    def is_available(self) -> bool:
+        """Check if the wrapped estimator is available."""
+        return self.estimator.is_available()
+
+    def reset(self) -> None:
+        """Clear per-video state of the wrapped estimator, if it has any."""
+        reset = getattr(self.estimator, "reset", None)
+        if callable(reset):
+            reset()
+
+    def close(self) -> None:
+        """Close the wrapped estimator, if it holds resources."""
+        close = getattr(self.estimator, "close", None)
+        if callable(close):
+            close()
+
+
+def keyframe_accuracy_report(
+    full: Union[PoseSequence, np.ndarray],
+    configurations: Optional[Sequence[Dict[str, Any]]] = None,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    pck_threshold: float = 0.05,
+    measured: Optional[Dict[str, PoseSequence]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Compare keyframe schedules against full-rate estimates of a sequence.
+
+    Each configuration replays the keyframe schedule on the full-rate
+    results (a keyframe reads the full-rate estimate of that frame), so the
+    comparison isolates the interpolation error from estimator noise.
+    Sequences actually produced by KeyframePoseEstimator can be scored as
+    well through measured; their error also includes the estimator's own
+    frame-to-frame differences (e.g. tracking state).
+
+    Args:
+        full: Full-rate keypoints, shape (frames, keypoints, 3)
+        configurations: KeyframePoseEstimator keyword arguments per row
+            (default: fixed strides 2, 4 and 8, linear and cubic, and the
+            adaptive schedule)
+        min_confidence: Minimum full-rate confidence of a keypoint to be scored
+        pck_threshold: Error threshold, relative to body size, for PCK
+        measured: Keyframe estimates of the same frames by name, as returned
+            by KeyframePoseEstimator.estimate_pose_array
+
+    Returns:
+        One row per configuration (then per measured sequence, with the
+        name as configuration) with estimated_frames, speedup,
+        mean_error and p95_error (relative to body size), pck, and
+        missing (scored keypoints that interpolation left empty)
+    """
+    keypoints = PoseSequence.coerce(full).keypoints
+    num_frames = len(keypoints)
+    if configurations is None:
+        configurations = [
+            {"initial_stride": stride, "max_stride": stride, "method": method, "adaptive": False}
+            for stride in (2, 4, 8) for method in INTERPOLATION_METHODS
+        ] + [{"initial_stride": 4, "max_stride": 8, "method": method} for method in INTERPOLATION_METHODS]
+
+    def full_rate(index: int) -> Optional[np.ndarray]:
+        points = keypoints[index]
+        return points if points[:, 2].max(initial=0) > 0 else None
+
+    # Body size per frame from the confidently detected keypoints
+    confident = keypoints[..., 2] >= min_confidence
+    low = np.where(confident[..., None], keypoints[..., :2], np.inf).min(axis=1)
+    high = np.where(confident[..., None], keypoints[..., :2], -np.inf).max(axis=1)
+    size = np.where(confident.sum(axis=1) >= 2, (high - low).max(axis=1), 0.0)
+
+    def score(configuration: Any, poses: PoseSequence) -> Dict[str, Any]:
+        # Score interpolated keypoints that the full-rate estimator detected
+        if len(poses) != num_frames:
+            raise KeyframeEstimationError(
+                f"Expected {num_frames} frames for {configuration}, got {len(poses)}"
+            )
+        estimate = poses.keypoints[:, :keypoints.shape[1]]
+        scored = confident & poses.interpolated[:, None] & (size[:, None] > 0)
+        filled = estimate[..., 2] > 0
+        error = np.linalg.norm(estimate[..., :2] - keypoints[..., :2], axis=2)
+        relative = (error / np.where(size > 0, size, 1)[:, None])[scored & filled]
+        return {
+            "configuration": configuration,
+            "estimated_frames": poses.metadata["estimated_frames"],
+            "speedup": poses.metadata["speedup"],
+            "mean_error": float(relative.mean()) if len(relative) else 0.0,
+            "p95_error": float(np.percentile(relative, 95)) if len(relative) else 0.0,
+            "pck": float((relative <= pck_threshold).mean()) if len(relative) else 1.0,
+            "missing": int((scored & ~filled).sum())
+        }
+
+    rows = []
+    for config in configurations:
+        estimator = KeyframePoseEstimator(None, **config)
+        rows.append(score(dict(config), estimator.estimate_frames(num_frames, full_rate, keypoints.shape[1])))
+    for name, poses in (measured or {}).items():
+        rows.append(score(name, poses))
+    return rows
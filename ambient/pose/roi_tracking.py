@@ -0,0 +1,358 @@
+"""
+Adaptive ROI tracking between frames for pose estimators.
+
+Once the subject has been found, most of each frame is background.
+ROITrackingEstimator wraps a pose estimator and, after the first
+detection, runs it on a crop around the subject only: the bounding box of
+the previous frame's confident keypoints, padded on every side. Keypoints
+detected on the crop are shifted back to frame pixels.
+
+The wrapper falls back to the full frame, and derives a new ROI from that
+result, when the crop result is unreliable:
+
+- fewer than min_keypoints keypoints reach min_confidence, or
+- a confident keypoint lies within edge_margin of a crop border that is not
+  also a frame border (the subject is leaving the ROI).
+
+If the full frame has no reliable detection either, tracking stops until
+one is found. With redetect_interval, the full frame is also checked every
+N frames, so a subject that changed size is re-framed.
+
+Works with estimators that implement estimate_pose (Ultralytics YOLO,
+AlphaPose) and with array estimators that implement
+estimate_array_keypoints (the GAVD MediaPipe estimator).
+
+Author: AlexPose Team
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from ambient.core.frame import Frame, FrameSequence
+from ambient.core.interfaces import IPoseEstimator
+
+
+# Margin added on each side of the keypoint bounding box, as a fraction of its size
+DEFAULT_ROI_PADDING = 0.25
+DEFAULT_MIN_CONFIDENCE = 0.5
+DEFAULT_MIN_KEYPOINTS = 4
+# Smallest ROI side in pixels; tiny crops starve the model of context
+DEFAULT_MIN_ROI_SIZE = 96
+# Distance from a crop border, as a fraction of the crop size, within which
+# a keypoint counts as leaving the ROI
+DEFAULT_EDGE_MARGIN = 0.03
+
+ROI = Tuple[int, int, int, int]
+
+
+class ROITrackingError(Exception):
+    """Exception raised for estimators that cannot be tracked."""
+    pass
+
+
+def _keypoint_array(keypoints: List[Any]) -> np.ndarray:
+    """Keypoint dicts (or x/y/confidence objects) as a (K, 3) array."""
+    rows = []
+    for kp in keypoints:
+        if isinstance(kp, dict):
+            rows.append((kp.get("x", 0.0), kp.get("y", 0.0), kp.get("confidence", 0.0)))
+        else:
+            rows.append((kp.x, kp.y, kp.confidence))
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+
+def _shift_keypoints(keypoints: List[Any], dx: int, dy: int) -> List[Any]:
+    """Keypoints moved by (dx, dy), as new dicts or objects."""
+    shifted = []
+    for kp in keypoints:
+        if isinstance(kp, dict):
+            kp = dict(kp)
+            kp["x"] = kp.get("x", 0.0) + dx
+            kp["y"] = kp.get("y", 0.0) + dy
+        else:
+            kp = type(kp)(**{**vars(kp), "x": kp.x + dx, "y": kp.y + dy})
+        shifted.append(kp)
+    return shifted
+
+
+def roi_from_keypoints(
+    points: np.ndarray,
+    frame_size: Tuple[int, int],
+    padding: float = DEFAULT_ROI_PADDING,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    min_size: int = DEFAULT_MIN_ROI_SIZE
+) -> Optional[ROI]:
+    """
+    Padded bounding box of the confident keypoints, clipped to the frame.
+
+    Args:
+        points: (K, 3) array of x, y, confidence in frame pixels
+        frame_size: Frame (width, height)
+        padding: Margin on each side as a fraction of the box size
+        min_confidence: Minimum confidence of a keypoint to frame
+        min_size: Smallest ROI side in pixels (before clipping)
+
+    Returns:
+        (x, y, width, height), or None without confident keypoints
+    """
+    confident = points[points[:, 2] >= min_confidence, :2]
+    if len(confident) == 0:
+        return None
+    frame_w, frame_h = frame_size
+    low, high = confident.min(axis=0), confident.max(axis=0)
+    center = (low + high) / 2
+    size = np.maximum((high - low) * (1 + 2 * max(0.0, padding)), min_size)
+
+    x0, y0 = np.floor(center - size / 2).astype(int)
+    x1, y1 = np.ceil(center + size / 2).astype(int)
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = min(frame_w, x1), min(frame_h, y1)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return int(x0), int(y0), int(x1 - x0), int(y1 - y0)
+
+
+class ROITrackingEstimator(IPoseEstimator):
+    """
+    Pose estimator that runs a wrapped estimator on a tracked region of interest.
+
+    The ROI carries over between calls, so frames must be passed in order;
+    estimate_pose_sequence starts each sequence from the full frame, and
+    reset() does the same for frame-by-frame callers starting a new video.
+    EstimatorPool.release() resets pooled instances between leases.
+    """
+
+    def __init__(
+        self,
+        estimator: Any,
+        padding: float = DEFAULT_ROI_PADDING,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        min_keypoints: int = DEFAULT_MIN_KEYPOINTS,
+        min_roi_size: int = DEFAULT_MIN_ROI_SIZE,
+        edge_margin: float = DEFAULT_EDGE_MARGIN,
+        redetect_interval: Optional[int] = None
+    ):
+        """
+        Initialize the tracking estimator.
+
+        Args:
+            estimator: Estimator with estimate_pose(frame) or
+                estimate_array_keypoints(rgb_image)
+            padding: Margin around the keypoint bounding box as a fraction of its size
+            min_confidence: Minimum confidence of a keypoint to count as detected
+            min_keypoints: Detected keypoints needed to trust a result
+            min_roi_size: Smallest ROI side in pixels
+            edge_margin: Keypoints closer than this fraction of the crop size
+                to an inner crop border mean the subject is leaving the ROI
+            redetect_interval: Check the full frame every N frames (None never)
+        """
+        if not callable(getattr(estimator, "estimate_pose", None)) and not callable(
+            getattr(estimator, "estimate_array_keypoints", None)
+        ):
+            raise ROITrackingError(
+                f"{type(estimator).__name__} has neither estimate_pose nor estimate_array_keypoints"
+            )
+        self.estimator = estimator
+        self.padding = padding
+        self.min_confidence = min_confidence
+        self.min_keypoints = min_keypoints
+        self.min_roi_size = min_roi_size
+        self.edge_margin = edge_margin
+        self.redetect_interval = redetect_interval
+        # Reduced-resolution decoding follows the wrapped estimator
+        self.input_size = getattr(estimator, "input_size", None)
+
+        self.roi: Optional[ROI] = None
+        self._frames_since_detection = 0
+        self.stats = {"roi_frames": 0, "full_frames": 0, "fallbacks": 0}
+
+    def reset(self) -> None:
+        """Forget the ROI, so the next frame is estimated in full."""
+        self.roi = None
+        self._frames_since_detection = 0
+
+    # ------------------------------------------------------------------
+    # Tracking
+    # ------------------------------------------------------------------
+
+    def _run(self, image: np.ndarray, format: str, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Any]]:
+        """Run the wrapped estimator on an image, as (result, keypoints)."""
+        if callable(getattr(self.estimator, "estimate_pose", None)):
+            result = self.estimator.estimate_pose(Frame.from_array(image, format=format, metadata=metadata, copy=False))
+            return result, list(result.get("keypoints") or [])
+
+        if format != "RGB":
+            image = Frame.from_array(image, format=format, copy=False).as_format("RGB")
+        keypoints = self.estimator.estimate_array_keypoints(np.ascontiguousarray(image))
+        return {"keypoints": keypoints}, list(keypoints)
+
+    def _is_tracked(self, points: np.ndarray, roi: Optional[ROI], frame_size: Tuple[int, int]) -> bool:
+        """Whether a result is reliable and, on a crop, clear of its inner borders."""
+        confident = points[points[:, 2] >= self.min_confidence, :2] if len(points) else points
+        if len(confident) < self.min_keypoints:
+            return False
+        if roi is None:
+            return True
+
+        x, y, w, h = roi
+        frame_w, frame_h = frame_size
+        margin_x, margin_y = self.edge_margin * w, self.edge_margin * h
+        leaving = (
+            (x > 0 and np.any(confident[:, 0] < x + margin_x))
+            or (y > 0 and np.any(confident[:, 1] < y + margin_y))
+            or (x + w < frame_w and np.any(confident[:, 0] > x + w - margin_x))
+            or (y + h < frame_h and np.any(confident[:, 1] > y + h - margin_y))
+        )
+        return not leaving
+
+    def _track(self, image: np.ndarray, format: str, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Any], Optional[ROI]]:
+        """Estimate one frame on the ROI, falling back to the full frame."""
+        frame_h, frame_w = image.shape[:2]
+        frame_size = (frame_w, frame_h)
+
+        roi = self.roi
+        if roi is not None and self.redetect_interval and self._frames_since_detection >= self.redetect_interval:
+            roi = None
+
+        if roi is not None:
+            x, y, w, h = roi
+            result, keypoints = self._run(image[y:y + h, x:x + w], format, metadata)
+            keypoints = _shift_keypoints(keypoints, x, y)
+            points = _keypoint_array(keypoints)
+            if self._is_tracked(points, roi, frame_size):
+                self.stats["roi_frames"] += 1
+                self._frames_since_detection += 1
+                self.roi = roi_from_keypoints(points, frame_size, self.padding, self.min_confidence, self.min_roi_size)
+                return result, keypoints, roi
+            self.stats["fallbacks"] += 1
+            logger.debug(f"Subject lost in ROI {roi}; estimating the full frame")
+
+        result, keypoints = self._run(image, format, metadata)
+        points = _keypoint_array(keypoints)
+        self.stats["full_frames"] += 1
+        self._frames_since_detection = 0
+        if self._is_tracked(points, None, frame_size):
+            self.roi = roi_from_keypoints(points, frame_size, self.padding, self.min_confidence, self.min_roi_size)
+        else:
+            self.roi = None
+        return result, keypoints, None
+
+    # ------------------------------------------------------------------
+    # IPoseEstimator
+    # ------------------------------------------------------------------
+
+    def estimate_pose(self, frame: Frame) -> Dict[str, Any]:
+        """
+        Estimate pose from a single Frame, on the tracked ROI when there is one.
+
+        Args:
+            frame: Frame object containing image data
+
+        Returns:
+            Dictionary containing pose estimation results; "roi" holds the
+            (x, y, width, height) crop used, or None for the full frame
+        """
+        result, keypoints, roi = self._track(frame.load(), frame.format, frame.metadata)
+        result = dict(result)
+        # In source-video pixels for reduced-size frames
+        result["keypoints"] = frame.to_source_keypoints(keypoints)
+        result["confidence_scores"] = _keypoint_array(keypoints)[:, 2].tolist()
+        result["num_keypoints"] = len(keypoints)
+        result["frame_metadata"] = frame.metadata
+        result["roi"] = list(roi) if roi else None
+        result.setdefault("estimator", self.get_estimator_name())
+        result.setdefault("format", self.get_keypoint_format())
+        return result
+
+    def estimate_pose_sequence(self, sequence: FrameSequence) -> List[Dict[str, Any]]:
+        """
+        Estimate poses from a FrameSequence, tracking the subject from frame to frame.
+
+        Args:
+            sequence: FrameSequence object containing multiple frames
+
+        Returns:
+            List of pose estimation results for each frame
+        """
+        self.reset()
+        results = []
+        for index, frame in enumerate(sequence.frames):
+            result = self.estimate_pose(frame)
+            result["sequence_index"] = index
+            results.append(result)
+        logger.debug(
+            f"ROI tracking: {self.stats['roi_frames']} cropped, {self.stats['full_frames']} full frames, "
+            f"{self.stats['fallbacks']} fallbacks"
+        )
+        return results
+
+    def estimate_array_keypoints(
+        self,
+        image: Any,
+        model: str = "BODY_25",
+        bbox: Optional[Dict[str, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Estimate keypoints from an in-memory RGB image, on the tracked ROI.
+
+        An explicit bbox overrides tracking and is passed to the wrapped
+        estimator unchanged.
+
+        Args:
+            image: RGB image as a uint8 numpy array (H, W, 3)
+            model: Model name/type
+            bbox: Optional bounding box for region of interest
+
+        Returns:
+            List of keypoint dictionaries
+        """
+        if bbox and callable(getattr(self.estimator, "estimate_array_keypoints", None)):
+            return self.estimator.estimate_array_keypoints(image, model=model, bbox=bbox)
+        return self._track(np.asarray(image), "RGB", {})[1]
+
+    def estimate_image_keypoints(
+        self,
+        image_path: str,
+        model: str = "BODY_25",
+        bbox: Optional[Dict[str, Union[int, float]]] = None,
+    ) -> List[Dict[str, Union[float, int]]]:
+        """Estimate keypoints for one image file with the wrapped estimator."""
+        return self.estimator.estimate_image_keypoints(image_path, model=model, bbox=bbox)
+
+    def estimate_video_keypoints(
+        self,
+        video_path: Union[str, Path],
+        model: str = "BODY_25",
+        **kwargs: Any
+    ) -> Any:
+        """Estimate keypoints for a whole video with the wrapped estimator's video pipeline."""
+        return self.estimator.estimate_video_keypoints(video_path, model=model, **kwargs)
+
+    def get_estimator_name(self) -> str:
+        """Get the name of this pose estimator."""
+        get_name = getattr(self.estimator, "get_estimator_name", None)
+        return get_name() if callable(get_name) else type(self.estimator).__name__
+
+    def get_keypoint_format(self) -> str:
+        """Get the keypoint format used by this estimator."""
+        get_format = getattr(self.estimator, "get_keypoint_format", None)
+        return get_format() if callable(get_format) else "unknown"
+
+    def is_available(self) -> bool:
+        """Check if the wrapped estimator is available."""
+        return self.estimator.is_available()
+
+    def cache_fingerprint(self) -> str:
+        """Fingerprint of the wrapped estimator, marked as ROI-tracked."""
+        fingerprint = getattr(self.estimator, "cache_fingerprint", None)
+        base = fingerprint() if callable(fingerprint) else type(self.estimator).__name__
+        return f"{base}:roi{self.padding:g}"
+
+    def close(self) -> None:
+        """Close the wrapped estimator, if it holds resources."""
+        close = getattr(self.estimator, "close", None)
+        if callable(close):
+            close()
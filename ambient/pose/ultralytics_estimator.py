@@ -10,14 +10,16 @@ Author: AlexPose Team
 import tempfile
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Any
 import numpy as np
+import psutil
 from loguru import logger
 
 # Import Frame classes with fallback for development
 try:
     from ambient.core.frame import Frame, FrameSequence, FrameError
     from ambient.core.interfaces import IPoseEstimator
+    from ambient.core.pose_sequence import PoseSequence
     FRAME_SUPPORT = True
 except ImportError:
     # Fallback for development/testing
@@ -25,6 +27,7 @@ except ImportError:
     FrameSequence = Any
     FrameError = Exception
     IPoseEstimator = object
+    PoseSequence = Any
     FRAME_SUPPORT = False
 
 try:
@@ -34,6 +37,13 @@ try:
 except ImportError:
     ULTRALYTICS_AVAILABLE = False
 
+from ambient.pose.exported_runtime import (
+    DEFAULT_EXPORT_INPUT_SIZE,
+    RUNTIMES,
+    ExportedPoseModel,
+    export_model,
+)
+
 # Import model utilities for path resolution
 try:
     from ambient.utils.model_utils import resolve_yolo_model_path
@@ -45,6 +55,50 @@ except ImportError:
 
 Keypoint = Dict[str, Union[float, int]]
 
+# Keypoints per person of YOLO pose models (COCO_17)
+NUM_KEYPOINTS = 17
+
+# Side of the letterboxed square YOLO runs inference on
+DEFAULT_MODEL_INPUT_SIZE = 640
+
+# Automatic batch sizing: share of available RAM a batch may use, and the
+# approximate inference memory (input tensor and activations on CPU) per
+# pixel of the model input
+BATCH_MEMORY_FRACTION = 0.25
+INFERENCE_BYTES_PER_INPUT_PIXEL = 64
+DEFAULT_MAX_BATCH_SIZE = 32
+
+
+def choose_batch_size(
+    frame_hw: Tuple[int, int],
+    input_size: int = DEFAULT_MODEL_INPUT_SIZE,
+    buffers: int = 3,
+    available_bytes: Optional[int] = None,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+) -> int:
+    """
+    Choose an inference batch size from available RAM and frame size.
+    
+    Each frame in a batch costs its decoded pixels in every batch buffer in
+    flight plus the model's input tensor and activations.
+    
+    Args:
+        frame_hw: (height, width) of the decoded frames
+        input_size: Side of the model's letterboxed input
+        buffers: Batch buffers alive at once (prefetched batches + 2)
+        available_bytes: Available memory (default: current available RAM)
+        max_batch_size: Upper bound on the batch size
+        
+    Returns:
+        Batch size between 1 and max_batch_size
+    """
+    if available_bytes is None:
+        available_bytes = psutil.virtual_memory().available
+    height, width = frame_hw
+    per_frame = height * width * 3 * max(1, buffers) + input_size * input_size * INFERENCE_BYTES_PER_INPUT_PIXEL
+    budget = available_bytes * BATCH_MEMORY_FRACTION
+    return int(max(1, min(max_batch_size, budget // per_frame)))
+
 
 class UltralyticsEstimator(IPoseEstimator):
     """
@@ -61,7 +115,14 @@ class UltralyticsEstimator(IPoseEstimator):
         device: str = "auto",
         confidence_threshold: float = 0.25,
         iou_threshold: float = 0.7,
-        max_detections: int = 1
+        max_detections: int = 1,
+        prefetch_batches: int = 2,
+        input_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        runtime: str = "torch",
+        num_threads: Optional[int] = None,
+        export_dir: Optional[str] = None
     ):
         """
         Initialize Ultralytics pose estimator.
@@ -72,6 +133,17 @@ class UltralyticsEstimator(IPoseEstimator):
             confidence_threshold: Confidence threshold for detections
             iou_threshold: IoU threshold for NMS
             max_detections: Maximum number of people to detect
+            prefetch_batches: Frame batches decoded in the background while a
+                batch is in inference (0 to decode serially)
+            input_size: Longest frame side worth decoding for the model
+                (YOLO letterboxes to its image size, typically 640)
+            batch_size: Frames per inference batch for sequences (None to
+                choose from available RAM and frame size)
+            max_batch_size: Upper bound for automatically chosen batch sizes
+            runtime: "torch" to run the PyTorch checkpoint, or "onnx" /
+                "openvino" to run a cached ONNX export of it on CPU
+            num_threads: Intra-op threads of the exported-model runtime
+            export_dir: Cache directory of exported models (default data/models)
         """
         if not ULTRALYTICS_AVAILABLE:
             raise ImportError(
@@ -95,13 +167,27 @@ class UltralyticsEstimator(IPoseEstimator):
         self.confidence_threshold = confidence_threshold
         self.iou_threshold = iou_threshold
         self.max_detections = max_detections
+        self.prefetch_batches = max(0, prefetch_batches)
+        self.input_size = input_size
+        self.batch_size = batch_size
+        self.max_batch_size = max(1, max_batch_size)
+        if runtime not in RUNTIMES:
+            raise ValueError(f"Unsupported runtime: {runtime}. Use one of: {', '.join(RUNTIMES)}")
+        self.runtime = runtime
+        self.num_threads = num_threads
         
         # Initialize model
         try:
-            self.model = YOLO(resolved_model_path)
-            if device != "auto":
-                self.model.to(device)
-            logger.info(f"Ultralytics YOLO model loaded: {model_name} (from {resolved_model_path})")
+            if runtime == "torch":
+                self.model = YOLO(resolved_model_path)
+                if device != "auto":
+                    self.model.to(device)
+            else:
+                # Exported once per checkpoint and input size, then reused
+                export_size = input_size or DEFAULT_EXPORT_INPUT_SIZE
+                onnx_path = export_model(resolved_model_path, export_size, export_dir)
+                self.model = ExportedPoseModel(onnx_path, runtime, export_size, num_threads)
+            logger.info(f"Ultralytics YOLO model loaded: {model_name} (from {resolved_model_path}, {runtime} runtime)")
         except Exception as e:
             logger.error(f"Failed to load YOLO model {model_name} (resolved: {resolved_model_path}): {e}")
             raise RuntimeError(f"Failed to load YOLO model: {e}")
@@ -121,13 +207,12 @@ class UltralyticsEstimator(IPoseEstimator):
             raise RuntimeError("Frame support not available - Frame classes not imported")
         
         try:
-            # Load frame data
-            frame_data = frame.load()
-            
-            # Convert to BGR if needed (YOLO expects BGR)
+            # Load frame data, as BGR if needed (YOLO expects BGR); the
+            # conversion is memoized on the frame
             if frame.format == "RGB":
-                import cv2
-                frame_data = cv2.cvtColor(frame_data, cv2.COLOR_RGB2BGR)
+                frame_data = frame.as_format("BGR")
+            else:
+                frame_data = frame.load()
             
             # Run YOLO inference
             results = self.model(
@@ -138,8 +223,8 @@ class UltralyticsEstimator(IPoseEstimator):
                 verbose=False
             )
             
-            # Parse results
-            keypoints = self._parse_yolo_results(results)
+            # Parse results, in source-video pixels for reduced-size frames
+            keypoints = frame.to_source_keypoints(self._parse_yolo_results(results))
             
             # Convert to new format
             result = {
@@ -177,6 +262,9 @@ class UltralyticsEstimator(IPoseEstimator):
         """
         Estimate poses from a FrameSequence.
         
+        Builds per-frame result dicts from the streaming batches of
+        iter_pose_batches; use estimate_pose_array for compact output.
+        
         Args:
             sequence: FrameSequence object containing multiple frames
             
@@ -187,107 +275,182 @@ class UltralyticsEstimator(IPoseEstimator):
             raise RuntimeError("Frame support not available - Frame classes not imported")
         
         results = []
+        for batch in self.iter_pose_batches(sequence):
+            errors = batch.metadata.get("errors", {})
+            for i, frame_idx in enumerate(batch.frame_numbers.tolist()):
+                if frame_idx in errors:
+                    results.append({
+                        "keypoints": [],
+                        "estimator": self.get_estimator_name(),
+                        "format": self.get_keypoint_format(),
+                        "error": errors[frame_idx],
+                        "sequence_index": frame_idx,
+                        "confidence_scores": [],
+                        "num_keypoints": 0
+                    })
+                    continue
+                
+                keypoints = [
+                    {"x": kp["x"], "y": kp["y"], "confidence": kp["confidence"]}
+                    for kp in batch.frame_keypoints(i)
+                ]
+                results.append({
+                    "keypoints": keypoints,
+                    "estimator": self.get_estimator_name(),
+                    "format": self.get_keypoint_format(),
+                    "sequence_index": frame_idx,
+                    "frame_metadata": sequence.frames[frame_idx].metadata,
+                    "confidence_scores": [kp["confidence"] for kp in keypoints],
+                    "num_keypoints": len(keypoints),
+                    "processing_metadata": {
+                        "model_name": self.model_name,
+                        "batch_index": i
+                    }
+                })
+        
+        return results
+    
+    def estimate_pose_array(
+        self,
+        sequence: FrameSequence,
+        batch_size: Optional[int] = None
+    ) -> PoseSequence:
+        """
+        Estimate poses from a FrameSequence into one compact PoseSequence.
         
-        # Process frames in batches for memory efficiency
-        def process_batch(batch_frames, start_idx):
-            batch_results = []
+        Args:
+            sequence: FrameSequence object containing multiple frames
+            batch_size: Frames per batch (default: the estimator's batch size,
+                or chosen from available RAM)
             
-            # Prepare batch data
-            batch_images = []
-            valid_indices = []
+        Returns:
+            PoseSequence of shape (frames, 17, 3) in source-video pixels;
+            frames without a detection have a keypoint count of 0, and
+            metadata["errors"] maps failed frame indices to their errors
+        """
+        keypoints = np.zeros((len(sequence.frames), NUM_KEYPOINTS, 3), dtype=np.float32)
+        counts = np.zeros(len(sequence.frames), dtype=np.int32)
+        errors: Dict[int, str] = {}
+        chosen = None
+        
+        for batch in self.iter_pose_batches(sequence, batch_size):
+            start = int(batch.frame_numbers[0])
+            keypoints[start:start + len(batch)] = batch.keypoints
+            counts[start:start + len(batch)] = batch.counts
+            errors.update(batch.metadata.get("errors", {}))
+            chosen = batch.metadata["batch_size"]
+        
+        return PoseSequence(
+            keypoints,
+            counts=counts,
+            metadata={
+                "estimator": self.get_estimator_name(),
+                "format": self.get_keypoint_format(),
+                "model_name": self.model_name,
+                "batch_size": chosen,
+                "errors": errors
+            }
+        )
+    
+    def iter_pose_batches(
+        self,
+        sequence: FrameSequence,
+        batch_size: Optional[int] = None
+    ) -> Iterator[PoseSequence]:
+        """
+        Stream pose estimation over a sequence, one batch at a time.
+        
+        Frames are decoded as BGR batch tensors (in the background when
+        prefetching), and the model's generator interface (stream=True)
+        yields one result at a time, so only the current batch's results
+        are alive. Keypoints go straight from the result tensors into a
+        float32 array.
+        
+        Args:
+            sequence: FrameSequence object containing multiple frames
+            batch_size: Frames per batch (default: the estimator's batch size,
+                or chosen from available RAM)
             
-            for i, frame_data in enumerate(batch_frames):
-                frame_idx = start_idx + i
-                frame = sequence.frames[frame_idx]
-                
-                try:
-                    # Convert to BGR if needed
-                    if frame.format == "RGB":
-                        import cv2
-                        frame_data = cv2.cvtColor(frame_data, cv2.COLOR_RGB2BGR)
-                    
-                    batch_images.append(frame_data)
-                    valid_indices.append(frame_idx)
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to prepare frame {frame_idx}: {e}")
+        Yields:
+            PoseSequence per batch whose frame numbers are sequence indices;
+            metadata holds the batch size and the errors of failed frames
+        """
+        if not FRAME_SUPPORT:
+            raise RuntimeError("Frame support not available - Frame classes not imported")
+        if not sequence.frames:
+            return
+        
+        batch_size = batch_size or self.batch_size or self._auto_batch_size(sequence)
+        batches = sequence.iter_batch_tensors(
+            batch_size=batch_size,
+            color="BGR",
+            prefetch=self.prefetch_batches
+        )
+        for start_idx, batch_tensor in batches:
+            count = len(batch_tensor)
+            keypoints = np.zeros((count, NUM_KEYPOINTS, 3), dtype=np.float32)
+            counts = np.zeros(count, dtype=np.int32)
+            errors: Dict[int, str] = {}
             
-            # Run batch inference
-            if batch_images:
-                try:
-                    batch_results_raw = self.model(
-                        batch_images,
-                        conf=self.confidence_threshold,
-                        iou=self.iou_threshold,
-                        max_det=self.max_detections,
-                        verbose=False
-                    )
-                    
-                    # Process each result
-                    for i, (result_raw, frame_idx) in enumerate(zip(batch_results_raw, valid_indices)):
-                        frame = sequence.frames[frame_idx]
-                        
-                        try:
-                            keypoints = self._parse_yolo_results([result_raw])
-                            
-                            pose_result = {
-                                "keypoints": keypoints,
-                                "estimator": self.get_estimator_name(),
-                                "format": self.get_keypoint_format(),
-                                "sequence_index": frame_idx,
-                                "frame_metadata": frame.metadata,
-                                "confidence_scores": [kp.get("confidence", 0.0) for kp in keypoints],
-                                "num_keypoints": len(keypoints),
-                                "processing_metadata": {
-                                    "model_name": self.model_name,
-                                    "batch_index": i
-                                }
-                            }
-                            
-                            batch_results.append(pose_result)
-                            
-                        except Exception as e:
-                            logger.warning(f"Failed to process result for frame {frame_idx}: {e}")
-                            # Add empty result for failed frame
-                            batch_results.append({
-                                "keypoints": [],
-                                "estimator": self.get_estimator_name(),
-                                "format": self.get_keypoint_format(),
-                                "error": str(e),
-                                "sequence_index": frame_idx,
-                                "confidence_scores": [],
-                                "num_keypoints": 0
-                            })
-                
-                except Exception as e:
-                    logger.error(f"Batch inference failed: {e}")
-                    # Add empty results for all frames in batch
-                    for frame_idx in valid_indices:
-                        batch_results.append({
-                            "keypoints": [],
-                            "estimator": self.get_estimator_name(),
-                            "format": self.get_keypoint_format(),
-                            "error": str(e),
-                            "sequence_index": frame_idx,
-                            "confidence_scores": [],
-                            "num_keypoints": 0
-                        })
+            try:
+                stream = self.model(
+                    list(batch_tensor),
+                    conf=self.confidence_threshold,
+                    iou=self.iou_threshold,
+                    max_det=self.max_detections,
+                    verbose=False,
+                    stream=True
+                )
+                for i, result in enumerate(stream):
+                    frame_idx = start_idx + i
+                    try:
+                        points = self._result_points(result)
+                        if points is None:
+                            continue
+                        geometry = sequence.frames[frame_idx].decode_geometry
+                        if geometry is not None:
+                            geometry.map_points(points)
+                        keypoints[i, :len(points)] = points
+                        counts[i] = len(points)
+                    except Exception as e:
+                        logger.warning(f"Failed to process result for frame {frame_idx}: {e}")
+                        errors[frame_idx] = str(e)
+            except Exception as e:
+                logger.error(f"Batch inference failed: {e}")
+                counts[:] = 0
+                errors = {start_idx + i: str(e) for i in range(count)}
             
-            return batch_results
-        
-        # Process sequence in batches
-        batch_results = sequence.process_in_batches(
-            process_batch, 
-            batch_size=8,  # Process 8 frames at a time
-            unload_after_processing=True
+            yield PoseSequence(
+                keypoints,
+                frame_numbers=np.arange(start_idx, start_idx + count),
+                counts=counts,
+                metadata={"batch_size": batch_size, "errors": errors}
+            )
+    
+    def _auto_batch_size(self, sequence: FrameSequence) -> int:
+        """Choose a batch size for a sequence from available RAM and its frame size."""
+        frame_hw = FrameSequence._native_frame_hw(sequence.frames[0])
+        batch_size = choose_batch_size(
+            frame_hw,
+            input_size=self.input_size or DEFAULT_MODEL_INPUT_SIZE,
+            buffers=self.prefetch_batches + 2,
+            max_batch_size=self.max_batch_size
         )
-        
-        # Flatten batch results
-        for batch in batch_results:
-            if batch:
-                results.extend(batch)
-        
-        return results
+        logger.debug(f"Chose batch size {batch_size} for {frame_hw[1]}x{frame_hw[0]} frames")
+        return batch_size
+    
+    @staticmethod
+    def _result_points(result: Any) -> Optional[np.ndarray]:
+        """First person's keypoints of a YOLO result as a float32 (K, 3) array."""
+        keypoints = getattr(result, "keypoints", None)
+        data = getattr(keypoints, "data", None) if keypoints is not None else None
+        if data is None or len(data) == 0:
+            return None
+        person = data[0]
+        if hasattr(person, "cpu"):
+            person = person.cpu().numpy()
+        points = np.array(person, dtype=np.float32).reshape(-1, 3)[:NUM_KEYPOINTS]
+        return points
     
     def get_estimator_name(self) -> str:
         """Get the name of this pose estimator."""
@@ -439,6 +602,8 @@ class UltralyticsEstimator(IPoseEstimator):
             "confidence_threshold": self.confidence_threshold,
             "iou_threshold": self.iou_threshold,
             "max_detections": self.max_detections,
+            "runtime": self.runtime,
+            "num_threads": self.num_threads,
             "keypoint_format": self.get_keypoint_format(),
             "available": self.is_available()
         }
@@ -188,6 +188,19 @@ class SQLiteStorage:
                 ON pose_analysis_results(data_hash)
             """)
             
+            # Probed video metadata, valid while the file is unchanged
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS video_metadata (
+                    video_path TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    info TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (video_path, source)
+                )
+            """)
+            
             logger.debug("Database schema initialized")
     
     def save_video_analysis(
@@ -530,7 +543,7 @@ class SQLiteStorage:
             
             # Count records in each table
             tables = ['video_analysis', 'pose_sequence', 'classification_result',
-                     'training_dataset', 'training_sample']
+                     'training_dataset', 'training_sample', 'video_metadata']
             
             for table in tables:
                 cursor.execute(f"SELECT COUNT(*) FROM {table}")
@@ -545,6 +558,84 @@ class SQLiteStorage:
             
             return stats
     
+    def save_video_metadata(
+        self,
+        video_path: str,
+        source: str,
+        file_size: int,
+        mtime_ns: int,
+        info: Dict[str, Any]
+    ) -> None:
+        """
+        Save probed metadata for a video file.
+        
+        Args:
+            video_path: Resolved path to video file
+            source: Probe that produced the metadata (e.g. "ffprobe", "opencv")
+            file_size: File size in bytes when probed
+            mtime_ns: File modification time in nanoseconds when probed
+            info: Metadata dictionary
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                INSERT OR REPLACE INTO video_metadata 
+                (video_path, source, file_size, mtime_ns, info, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (video_path, source, file_size, mtime_ns, json.dumps(info),
+                  datetime.now().isoformat()))
+    
+    def get_video_metadata(
+        self,
+        video_path: str,
+        source: str,
+        file_size: int,
+        mtime_ns: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get probed metadata for a video file if the file is unchanged.
+        
+        Args:
+            video_path: Resolved path to video file
+            source: Probe that produced the metadata
+            file_size: Current file size in bytes
+            mtime_ns: Current file modification time in nanoseconds
+            
+        Returns:
+            Metadata dictionary or None if missing or stale
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT info FROM video_metadata 
+                WHERE video_path = ? AND source = ? AND file_size = ? AND mtime_ns = ?
+            """, (video_path, source, file_size, mtime_ns))
+            
+            row = cursor.fetchone()
+            return json.loads(row['info']) if row else None
+    
+    def delete_video_metadata(self, video_path: Optional[str] = None) -> int:
+        """
+        Delete probed video metadata.
+        
+        Args:
+            video_path: Resolved path to video file (None deletes all)
+            
+        Returns:
+            Number of deleted records
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if video_path is None:
+                cursor.execute("DELETE FROM video_metadata")
+            else:
+                cursor.execute("DELETE FROM video_metadata WHERE video_path = ?", (video_path,))
+            
+            return cursor.rowcount
+    
     def vacuum(self) -> None:
         """Vacuum database to reclaim space and optimize."""
         with self._get_connection() as conn:
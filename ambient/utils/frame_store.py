@@ -0,0 +1,330 @@
+"""
+Memory-mapped decoded-frame store for AlexPose.
+
+A frame store keeps the decoded frames of one video in an on-disk
+``np.memmap`` of shape (N, H, W, 3) uint8, optionally at a reduced
+resolution. Frames are written lazily the first time they are decoded and
+served afterwards as zero-copy, read-only views into the map, so dropping a
+loaded frame costs nothing (the OS page cache decides what stays resident)
+and reloading it never re-pays the decode. Worker processes that open the
+store for the same video share the same decoded frames.
+
+Stores are keyed by the video's resolved path, size, modification time and
+frame count, by the stored resolution, and by an optional variant such as a
+crop region.
+
+Author: AlexPose Team
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from ambient.utils.seek_index import get_seek_index
+from ambient.utils.video_metadata import VideoMetadataError, get_video_metadata
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+DEFAULT_FRAME_STORE_DIR = "data/cache/frames"
+
+
+class FrameStoreError(Exception):
+    """Exception raised for frame store errors."""
+    pass
+
+
+def _resolve_store_dir(cache_dir: Optional[Union[str, Path]]) -> Path:
+    """Resolve the store directory, relative paths against the project root."""
+    base = Path(cache_dir or DEFAULT_FRAME_STORE_DIR)
+    if not base.is_absolute():
+        root = Path(__file__).parents[2]
+        return (root / base).resolve()
+    return base.resolve()
+
+
+def store_stem(
+    video_path: Path,
+    frame_count: int,
+    frame_size: Tuple[int, int],
+    variant: str = ""
+) -> str:
+    """Build the file stem identifying a video version, length, stored resolution and variant."""
+    stat = video_path.stat()
+    key = f"{video_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{frame_count}"
+    if variant:
+        key = f"{key}|{variant}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    width, height = frame_size
+    return f"{video_path.stem}_{digest}_{width}x{height}"
+
+
+class DecodedFrameStore:
+    """
+    Lazily filled memory-mapped store of decoded RGB frames for one video.
+
+    The store consists of a data file holding the frame array and a flags
+    file with one byte per frame that is set once the frame has been written.
+    Flags are written after the frame data, so readers in other processes
+    never observe a partially written frame as present.
+    """
+
+    def __init__(
+        self,
+        video_path: Union[str, Path],
+        frame_count: int,
+        frame_size: Tuple[int, int],
+        cache_dir: Optional[Union[str, Path]] = None,
+        variant: str = ""
+    ):
+        """
+        Open or create the store for a video.
+
+        Args:
+            video_path: Path to the source video
+            frame_count: Number of frames in the video
+            frame_size: Stored (width, height); frames of another size are
+                resized on insertion
+            cache_dir: Directory holding store files (default data/cache/frames)
+            variant: Extra key distinguishing stores of differently derived
+                frames at the same size (for example a crop region)
+        """
+        self.video_path = Path(video_path)
+        if not self.video_path.exists():
+            raise FrameStoreError(f"Video file not found: {video_path}")
+        if frame_count <= 0:
+            raise FrameStoreError(f"Invalid frame count for {video_path}: {frame_count}")
+
+        width, height = int(frame_size[0]), int(frame_size[1])
+        if width <= 0 or height <= 0:
+            raise FrameStoreError(f"Invalid frame size: {frame_size}")
+
+        self.frame_count = int(frame_count)
+        self.frame_size = (width, height)
+        self.frame_shape = (height, width, 3)
+        self.cache_dir = _resolve_store_dir(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.variant = variant
+        stem = store_stem(self.video_path, self.frame_count, self.frame_size, variant)
+        self.data_path = self.cache_dir / f"{stem}.frames"
+        self.flags_path = self.cache_dir / f"{stem}.flags"
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+        self._data, self._flags = self._open_files()
+
+    def _create_file(self, path: Path, size: int) -> None:
+        """Create a sparse file of the given size unless it already exists."""
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            f.truncate(size)
+        try:
+            # Linking fails if another process created the file first
+            os.link(temp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    def _open_files(self) -> Tuple[np.memmap, np.memmap]:
+        """Open the data and flags maps, creating them on first use."""
+        data_bytes = self.frame_count * int(np.prod(self.frame_shape))
+
+        if self.data_path.exists() and self.data_path.stat().st_size != data_bytes:
+            logger.warning(f"Discarding frame store with unexpected size: {self.data_path}")
+            self.flags_path.unlink(missing_ok=True)
+            self.data_path.unlink(missing_ok=True)
+
+        # Data first, flags last: a flags file implies a complete data file
+        if not self.flags_path.exists():
+            self._create_file(self.data_path, data_bytes)
+            self._create_file(self.flags_path, self.frame_count)
+
+        data = np.memmap(
+            self.data_path, dtype=np.uint8, mode="r+",
+            shape=(self.frame_count,) + self.frame_shape
+        )
+        flags = np.memmap(self.flags_path, dtype=np.uint8, mode="r+", shape=(self.frame_count,))
+        return data, flags
+
+    def contains(self, frame_index: int) -> bool:
+        """Check if a frame has been stored."""
+        return 0 <= frame_index < self.frame_count and bool(self._flags[frame_index])
+
+    def get(self, frame_index: int) -> Optional[np.ndarray]:
+        """
+        Get a stored frame.
+
+        Args:
+            frame_index: Frame index (0-based)
+
+        Returns:
+            Read-only view into the store, or None if the frame is not stored
+        """
+        if not self.contains(frame_index):
+            self._misses += 1
+            return None
+        self._hits += 1
+        return self._view(frame_index)
+
+    def put(self, frame_index: int, frame: np.ndarray) -> np.ndarray:
+        """
+        Store a decoded frame.
+
+        Args:
+            frame_index: Frame index (0-based)
+            frame: RGB uint8 frame; resized if it differs from the store size
+
+        Returns:
+            Read-only view of the stored frame, or the frame itself if the
+            index lies outside the store
+        """
+        if not 0 <= frame_index < self.frame_count:
+            return frame
+
+        if frame.shape != self.frame_shape:
+            frame = self._fit(frame)
+
+        with self._lock:
+            if not self._flags[frame_index]:
+                self._data[frame_index] = frame
+                self._flags[frame_index] = 1
+                self._writes += 1
+        return self._view(frame_index)
+
+    def _fit(self, frame: np.ndarray) -> np.ndarray:
+        """Resize and convert a frame to the stored shape."""
+        if frame.ndim == 2:
+            frame = np.repeat(frame[:, :, None], 3, axis=2)
+        if frame.shape[:2] != self.frame_shape[:2]:
+            if cv2 is None:
+                raise FrameStoreError("OpenCV is required to store frames at a different resolution")
+            frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+        if frame.shape != self.frame_shape:
+            raise FrameStoreError(f"Cannot store frame of shape {frame.shape} in {self.frame_shape} store")
+        return frame.astype(np.uint8, copy=False)
+
+    def _view(self, frame_index: int) -> np.ndarray:
+        """Read-only ndarray view of one stored frame."""
+        view = np.asarray(self._data[frame_index])
+        view.flags.writeable = False
+        return view
+
+    def owns(self, array: np.ndarray) -> bool:
+        """Check if an array is a view into this store."""
+        return isinstance(array, np.ndarray) and np.may_share_memory(array, self._data)
+
+    @property
+    def filled_count(self) -> int:
+        """Number of frames stored so far, by this or any other process."""
+        return int(np.count_nonzero(self._flags))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get usage statistics for this store."""
+        return {
+            'video_path': str(self.video_path),
+            'data_path': str(self.data_path),
+            'frame_count': self.frame_count,
+            'frame_size': self.frame_size,
+            'filled_frames': self.filled_count,
+            'hits': self._hits,
+            'misses': self._misses,
+            'writes': self._writes,
+            'size_mb': self.frame_count * int(np.prod(self.frame_shape)) / (1024 * 1024)
+        }
+
+    def flush(self) -> None:
+        """Flush written frames and flags to disk."""
+        with self._lock:
+            self._data.flush()
+            self._flags.flush()
+
+    def clear(self) -> None:
+        """Mark every frame as missing so it is decoded again."""
+        with self._lock:
+            self._flags[:] = 0
+            self._flags.flush()
+
+
+# Stores shared within the process, keyed by data file path
+_open_stores: Dict[str, DecodedFrameStore] = {}
+_open_stores_lock = threading.Lock()
+
+
+def _probe_video(video_path: Path) -> Tuple[int, Tuple[int, int]]:
+    """Get (frame_count, (width, height)) for a video."""
+    frame_count = 0
+    index = get_seek_index(video_path)
+    if index is not None:
+        frame_count = index.frame_count
+
+    width = height = 0
+    if cv2 is not None:
+        try:
+            info = get_video_metadata(video_path, "opencv")
+            width, height = int(info["width"]), int(info["height"])
+            if frame_count <= 0:
+                frame_count = int(info["frame_count"])
+        except VideoMetadataError:
+            pass
+
+    if width <= 0 or height <= 0:
+        from ambient.utils.video_decoder import probe_frame_size
+        width, height = probe_frame_size(video_path)
+
+    return frame_count, (width, height)
+
+
+def open_frame_store(
+    video_path: Union[str, Path],
+    cache_dir: Optional[Union[str, Path]] = None,
+    frame_size: Optional[Tuple[int, int]] = None,
+    max_side: Optional[int] = None,
+    variant: str = ""
+) -> DecodedFrameStore:
+    """
+    Open the decoded-frame store for a video, sharing it within the process.
+
+    Args:
+        video_path: Path to video file
+        cache_dir: Directory holding store files (default data/cache/frames)
+        frame_size: Explicit stored (width, height)
+        max_side: Downscale so the longer side is at most this many pixels,
+            keeping the aspect ratio; ignored when frame_size is given
+        variant: Extra store key for differently derived frames (e.g. crops)
+
+    Returns:
+        Decoded-frame store for the video
+    """
+    video_path = Path(video_path)
+    if not video_path.exists():
+        raise FrameStoreError(f"Video file not found: {video_path}")
+
+    frame_count, (width, height) = _probe_video(video_path)
+    if frame_size is None:
+        frame_size = (width, height)
+        if max_side and max(width, height) > max_side:
+            scale = max_side / float(max(width, height))
+            frame_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    key = str(_resolve_store_dir(cache_dir) / store_stem(video_path, frame_count, frame_size, variant))
+    with _open_stores_lock:
+        existing = _open_stores.get(key)
+        if existing is not None:
+            return existing
+        store = DecodedFrameStore(video_path, frame_count, frame_size, cache_dir, variant)
+        _open_stores[key] = store
+        logger.debug(f"Opened frame store {store.data_path} ({frame_count} frames at {frame_size})")
+        return store
@@ -0,0 +1,407 @@
+"""
+Persistent keypoint cache for AlexPose.
+
+Video pose estimation is by far the most expensive step of dataset
+processing, and the same YouTube videos are referenced by many sequences,
+by reprocessing runs and by other datasets. This cache keeps estimated
+keypoints on disk so that none of those repeat inference.
+
+Entries are keyed by the video's content hash (so renamed or re-downloaded
+copies of a video share entries), the estimated frame range, the
+estimator's ``cache_fingerprint()`` and the model name. Each entry is a
+compressed ``.npz`` file holding the keypoints of its frames as float32
+arrays. An index tracks entry sizes and last access times; once the total
+size exceeds the budget, least recently used entries are evicted.
+
+Author: AlexPose Team
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+
+DEFAULT_KEYPOINT_CACHE_DIR = "data/cache/keypoints"
+DEFAULT_KEYPOINT_CACHE_SIZE_MB = 1024
+
+_HASH_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+class KeypointCacheError(Exception):
+    """Exception raised for keypoint cache errors."""
+    pass
+
+
+def _resolve_cache_dir(cache_dir: Optional[Union[str, Path]]) -> Path:
+    """Resolve the cache directory, relative paths against the project root."""
+    base = Path(cache_dir or DEFAULT_KEYPOINT_CACHE_DIR)
+    if not base.is_absolute():
+        root = Path(__file__).parents[2]
+        return (root / base).resolve()
+    return base.resolve()
+
+
+def encode_keypoint_frames(frames: List[List[Dict[str, Any]]]) -> Dict[str, np.ndarray]:
+    """
+    Pack per-frame keypoint lists into flat arrays.
+
+    Args:
+        frames: One list of keypoint dicts (x, y, confidence, id) per frame
+
+    Returns:
+        Arrays "counts" (keypoints per frame), "points" (x, y, confidence
+        as float32) and "ids"
+    """
+    counts = np.array([len(kps) for kps in frames], dtype=np.int32)
+    points = np.array(
+        [[kp.get("x", 0.0), kp.get("y", 0.0), kp.get("confidence", 0.0)] for kps in frames for kp in kps],
+        dtype=np.float32
+    ).reshape(-1, 3)
+    ids = np.array(
+        [kp.get("id", idx) for kps in frames for idx, kp in enumerate(kps)],
+        dtype=np.int32
+    )
+    return {"counts": counts, "points": points, "ids": ids}
+
+
+def decode_keypoint_frames(
+    counts: np.ndarray,
+    points: np.ndarray,
+    ids: np.ndarray
+) -> List[List[Dict[str, Any]]]:
+    """Unpack arrays written by encode_keypoint_frames into per-frame keypoint lists."""
+    frames = []
+    offset = 0
+    values = points.tolist()
+    id_values = ids.tolist()
+    for count in counts.tolist():
+        frames.append([
+            {"x": x, "y": y, "confidence": c, "id": i}
+            for (x, y, c), i in zip(values[offset:offset + count], id_values[offset:offset + count])
+        ])
+        offset += count
+    return frames
+
+
+class KeypointCache:
+    """
+    On-disk cache of estimated keypoints with an LRU size budget.
+
+    The index file maps entry names to their key and bookkeeping, and
+    remembers the content hash of each video version (path, size and
+    modification time) so videos are hashed only once.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_size_mb: float = DEFAULT_KEYPOINT_CACHE_SIZE_MB
+    ):
+        """
+        Open or create the cache.
+
+        Args:
+            cache_dir: Cache directory (default data/cache/keypoints)
+            max_size_mb: Size budget for all entries
+        """
+        if max_size_mb <= 0:
+            raise KeypointCacheError(f"Invalid cache size budget: {max_size_mb}")
+
+        self.cache_dir = _resolve_cache_dir(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._videos, self._entries = self._load_index()
+
+    def _load_index(self) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+        """Load the index, dropping entries whose files are gone."""
+        try:
+            data = json.loads(self.index_path.read_text())
+        except FileNotFoundError:
+            return {}, {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable keypoint cache index {self.index_path}: {e}")
+            return {}, {}
+
+        entries = {
+            name: entry for name, entry in data.get("entries", {}).items()
+            if (self.cache_dir / name).exists()
+        }
+        return data.get("videos", {}), entries
+
+    def _save_index(self) -> None:
+        """Write the index atomically (lock held)."""
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps({"videos": self._videos, "entries": self._entries}))
+        os.replace(temp_path, self.index_path)
+
+    def video_hash(self, video_path: Union[str, Path]) -> str:
+        """
+        Get the content hash of a video, hashing it once per version.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            SHA-1 hex digest of the file contents
+        """
+        path = Path(video_path)
+        try:
+            stat = path.stat()
+        except OSError:
+            raise KeypointCacheError(f"Video file not found: {video_path}")
+        version = f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+
+        cached = self._videos.get(version)
+        if cached is not None:
+            return cached
+
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._lock:
+            self._videos[version] = content_hash
+        return content_hash
+
+    @staticmethod
+    def _entry_name(content_hash: str, estimator: str, model: str, start: int, end: int) -> str:
+        """File name of an entry."""
+        key = f"{content_hash}|{estimator}|{model}|{start}|{end}"
+        return f"{content_hash[:12]}_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.npz"
+
+    def _matching(self, content_hash: str, estimator: str, model: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Entries for a video, estimator and model."""
+        return [
+            (name, entry) for name, entry in self._entries.items()
+            if entry["video"] == content_hash and entry["estimator"] == estimator and entry["model"] == model
+        ]
+
+    def _read(self, name: str) -> List[List[Dict[str, Any]]]:
+        """Read an entry's frames and mark it as recently used (lock held)."""
+        with np.load(self.cache_dir / name) as data:
+            frames = decode_keypoint_frames(data["counts"], data["points"], data["ids"])
+        self._entries[name]["last_access"] = time.time()
+        return frames
+
+    def get(
+        self,
+        video_path: Union[str, Path],
+        estimator: str,
+        model: str,
+        frame_indices: Iterable[int]
+    ) -> Dict[str, Any]:
+        """
+        Get cached keypoints for frames of a video.
+
+        Args:
+            video_path: Path to video file
+            estimator: Estimator cache fingerprint
+            model: Model name
+            frame_indices: Frame indices wanted (0-based)
+
+        Returns:
+            Dictionary with 'frames' (keypoint list per cached frame index;
+            frames not cached are absent), 'video_width' and 'video_height'
+        """
+        wanted: Set[int] = set(int(i) for i in frame_indices)
+        content_hash = self.video_hash(video_path)
+        result: Dict[str, Any] = {"frames": {}, "video_width": None, "video_height": None}
+
+        with self._lock:
+            used = False
+            for name, entry in self._matching(content_hash, estimator, model):
+                covered = [i for i in wanted if entry["start"] <= i < entry["end"]]
+                if not covered:
+                    continue
+                try:
+                    frames = self._read(name)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Dropping unreadable keypoint cache entry {name}: {e}")
+                    self._remove(name)
+                    continue
+                for i in covered:
+                    result["frames"][i] = frames[i - entry["start"]]
+                wanted.difference_update(covered)
+                result["video_width"] = entry.get("video_width")
+                result["video_height"] = entry.get("video_height")
+                used = True
+
+            self._hits += len(result["frames"])
+            self._misses += len(wanted)
+            if used:
+                self._save_index()
+        return result
+
+    def get_video(
+        self,
+        video_path: Union[str, Path],
+        estimator: str,
+        model: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get cached keypoints for every frame of a video.
+
+        Args:
+            video_path: Path to video file
+            estimator: Estimator cache fingerprint
+            model: Model name
+
+        Returns:
+            Dictionary with 'frames' (keypoint list per frame), 'video_width'
+            and 'video_height', or None if the whole video is not cached
+        """
+        content_hash = self.video_hash(video_path)
+        with self._lock:
+            for name, entry in self._matching(content_hash, estimator, model):
+                if not entry.get("complete"):
+                    continue
+                try:
+                    frames = self._read(name)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Dropping unreadable keypoint cache entry {name}: {e}")
+                    self._remove(name)
+                    continue
+                self._hits += len(frames)
+                self._save_index()
+                return {
+                    "frames": frames,
+                    "video_width": entry.get("video_width"),
+                    "video_height": entry.get("video_height")
+                }
+        return None
+
+    def put(
+        self,
+        video_path: Union[str, Path],
+        estimator: str,
+        model: str,
+        start: int,
+        frames: List[List[Dict[str, Any]]],
+        video_width: Optional[int] = None,
+        video_height: Optional[int] = None,
+        complete: bool = False
+    ) -> None:
+        """
+        Store keypoints for the frames [start, start + len(frames)) of a video.
+
+        Args:
+            video_path: Path to video file
+            estimator: Estimator cache fingerprint
+            model: Model name
+            start: Index of the first frame
+            frames: Keypoint list per frame
+            video_width: Video width the coordinates refer to
+            video_height: Video height the coordinates refer to
+            complete: Whether frames cover the whole video
+        """
+        if not frames:
+            return
+        content_hash = self.video_hash(video_path)
+        end = start + len(frames)
+        name = self._entry_name(content_hash, estimator, model, start, end)
+        path = self.cache_dir / name
+
+        temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(temp_path, **encode_keypoint_frames(frames))
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._entries[name] = {
+                "video": content_hash,
+                "estimator": estimator,
+                "model": model,
+                "start": int(start),
+                "end": int(end),
+                "complete": bool(complete),
+                "video_width": video_width,
+                "video_height": video_height,
+                "size_bytes": path.stat().st_size,
+                "last_access": time.time()
+            }
+            self._evict(keep=name)
+            self._save_index()
+
+    def _remove(self, name: str) -> None:
+        """Delete an entry (lock held)."""
+        self._entries.pop(name, None)
+        (self.cache_dir / name).unlink(missing_ok=True)
+
+    def _evict(self, keep: str) -> None:
+        """Evict least recently used entries until within budget (lock held)."""
+        total = sum(entry["size_bytes"] for entry in self._entries.values())
+        for name in sorted(self._entries, key=lambda n: self._entries[n]["last_access"]):
+            if total <= self.max_size_bytes:
+                break
+            if name == keep:
+                continue
+            total -= self._entries[name]["size_bytes"]
+            self._remove(name)
+            self._evictions += 1
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of all entries."""
+        return sum(entry["size_bytes"] for entry in self._entries.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            'cache_dir': str(self.cache_dir),
+            'entries': len(self._entries),
+            'size_mb': self.size_bytes / (1024 * 1024),
+            'max_size_mb': self.max_size_bytes / (1024 * 1024),
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions
+        }
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock:
+            for name in list(self._entries):
+                self._remove(name)
+            self._save_index()
+
+
+# Caches shared within the process, keyed by directory
+_open_caches: Dict[str, KeypointCache] = {}
+_open_caches_lock = threading.Lock()
+
+
+def get_keypoint_cache(
+    cache_dir: Optional[Union[str, Path]] = None,
+    max_size_mb: float = DEFAULT_KEYPOINT_CACHE_SIZE_MB
+) -> KeypointCache:
+    """
+    Get the keypoint cache for a directory, sharing it within the process.
+
+    Args:
+        cache_dir: Cache directory (default data/cache/keypoints)
+        max_size_mb: Size budget used if the cache is opened now
+
+    Returns:
+        Shared keypoint cache
+    """
+    key = str(_resolve_cache_dir(cache_dir))
+    with _open_caches_lock:
+        cache = _open_caches.get(key)
+        if cache is None:
+            cache = KeypointCache(cache_dir, max_size_mb)
+            _open_caches[key] = cache
+            logger.debug(f"Opened keypoint cache {cache.cache_dir} ({len(cache._entries)} entries)")
+        return cache
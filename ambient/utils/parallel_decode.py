@@ -0,0 +1,302 @@
+"""
+Segment-parallel multi-process video decoding for AlexPose.
+
+A long video is split into K segments at keyframe boundaries, so that every
+segment starts with a keyframe and no group of pictures is decoded by two
+workers. Each segment is decoded by its own process with a sequential
+decoder session, and frames are written straight into a buffer shared by
+all processes: a ``multiprocessing.shared_memory`` block for in-memory
+results, or the memory-mapped decoded-frame store of the video. Frames are
+placed by their position in the request, so reassembly is ordered without
+any copying between workers.
+
+Author: AlexPose Team
+"""
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from ambient.utils.frame_store import DecodedFrameStore, FrameStoreError
+from ambient.utils.seek_index import SeekIndex, get_seek_index
+from ambient.utils.video_decoder import (
+    DecodeGeometry,
+    VideoDecoderError,
+    VideoDecoderSession,
+    probe_frame_size,
+)
+
+
+# Segments smaller than this are not worth a process of their own
+MIN_FRAMES_PER_WORKER = 32
+
+
+class ParallelDecodeError(Exception):
+    """Exception raised for parallel decoding errors."""
+    pass
+
+
+def plan_segments(
+    frame_indices: List[int],
+    workers: int,
+    seek_index: Optional[SeekIndex] = None
+) -> List[List[int]]:
+    """
+    Split frame indices into contiguous segments that start at keyframes.
+
+    Segments are balanced by frame count. With a keyframe index, each split
+    point moves forward to the first requested frame of the next group of
+    pictures, so workers never decode the same frames twice; without one,
+    the indices are split evenly.
+
+    Args:
+        frame_indices: Frame indices to decode
+        workers: Maximum number of segments
+        seek_index: Optional seek index with keyframe positions
+
+    Returns:
+        Non-empty segments of ascending frame indices, in order
+    """
+    indices = sorted(set(int(i) for i in frame_indices))
+    if not indices:
+        return []
+    workers = max(1, min(workers, len(indices)))
+
+    use_keyframes = seek_index is not None and seek_index.has_keyframes
+
+    def gop(frame_index: int) -> int:
+        if use_keyframes and frame_index < seek_index.frame_count:
+            return seek_index.keyframe_before(frame_index)
+        return frame_index
+
+    target = len(indices) / float(workers)
+    segments: List[List[int]] = []
+    start = 0
+    for k in range(1, workers):
+        split = max(start + 1, round(k * target))
+        if use_keyframes:
+            # Move the split to the start of the next group of pictures
+            while split < len(indices) and gop(indices[split]) == gop(indices[split - 1]):
+                split += 1
+        if split >= len(indices):
+            break
+        segments.append(indices[start:split])
+        start = split
+    segments.append(indices[start:])
+    return segments
+
+
+def _decode_segment(task: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Worker: decode one segment into the shared destination.
+
+    Returns:
+        (frames written, frames decoded including skipped ones)
+    """
+    session = VideoDecoderSession(
+        task["video_path"], backend=task["backend"], geometry=task["geometry"],
+        frame_indices=task["indices"]
+    )
+    shm = None
+    block = None
+    store = None
+    try:
+        if task.get("shm_name"):
+            shm = shared_memory.SharedMemory(name=task["shm_name"])
+            block = np.ndarray(task["shape"], dtype=np.uint8, buffer=shm.buf)
+        else:
+            store = DecodedFrameStore(
+                task["video_path"], task["store_frame_count"], task["store_frame_size"],
+                task["store_dir"], task["store_variant"]
+            )
+
+        if task["indices"][0] > 0:
+            session.seek(task["indices"][0])
+
+        written = 0
+        for slot, frame_index in zip(task["slots"], task["indices"]):
+            if block is not None:
+                session.read_into(frame_index, block[slot])
+            elif not store.contains(frame_index):
+                store.put(frame_index, session.read(frame_index))
+            written += 1
+
+        if store is not None:
+            store.flush()
+        return written, session.get_stats()["frames_decoded"]
+    finally:
+        session.close()
+        if shm is not None:
+            # Release the view before unmapping
+            block = None
+            shm.close()
+
+
+def _effective_workers(frame_count: int, workers: int, min_frames_per_worker: int) -> int:
+    """Number of processes worth starting for frame_count frames."""
+    by_size = math.ceil(frame_count / float(max(1, min_frames_per_worker)))
+    return max(1, min(workers, by_size))
+
+
+def _run_segments(tasks: List[Dict[str, Any]], workers: int) -> Tuple[int, int]:
+    """Decode segment tasks in a process pool, or in-process for one task."""
+    if len(tasks) == 1 or workers <= 1:
+        results = [_decode_segment(task) for task in tasks]
+    else:
+        # Spawned workers do not inherit the parent's threads or open captures
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(_decode_segment, tasks))
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def _segment_tasks(
+    video_path: Path,
+    frame_indices: List[int],
+    workers: int,
+    backend: str,
+    geometry: Optional[DecodeGeometry],
+    **destination: Any
+) -> List[Dict[str, Any]]:
+    """Build one worker task per segment, with each frame's output slot."""
+    slot_of = {index: slot for slot, index in enumerate(frame_indices)}
+    segments = plan_segments(frame_indices, workers, get_seek_index(video_path))
+    return [
+        {
+            "video_path": str(video_path),
+            "backend": backend,
+            "geometry": geometry,
+            "indices": segment,
+            "slots": [slot_of[i] for i in segment],
+            **destination
+        }
+        for segment in segments
+    ]
+
+
+def decode_frames_parallel(
+    video_path: Union[str, Path],
+    frame_indices: List[int],
+    workers: int,
+    backend: str = "opencv",
+    geometry: Optional[DecodeGeometry] = None,
+    out: Optional[np.ndarray] = None,
+    min_frames_per_worker: int = MIN_FRAMES_PER_WORKER
+) -> np.ndarray:
+    """
+    Decode frames with several processes into one (N, H, W, 3) RGB array.
+
+    Args:
+        video_path: Path to video file
+        frame_indices: Ascending, unique frame indices to decode
+        workers: Maximum number of decoder processes
+        backend: Decoding backend for each worker ("opencv" or "ffmpeg")
+        geometry: Optional decode-time crop/downscale
+        out: Optional preallocated (N, H, W, 3) uint8 buffer
+        min_frames_per_worker: Smallest segment worth a separate process
+
+    Returns:
+        Array of decoded frames in frame_indices order
+    """
+    video_path = Path(video_path)
+    if not video_path.exists():
+        raise ParallelDecodeError(f"Video file not found: {video_path}")
+
+    frame_indices = [int(i) for i in frame_indices]
+    if frame_indices != sorted(set(frame_indices)):
+        raise ParallelDecodeError("Frame indices must be ascending and unique")
+
+    if geometry is not None and not geometry.is_identity:
+        width, height = geometry.output_size
+    else:
+        geometry = None
+        width, height = probe_frame_size(video_path)
+    shape = (len(frame_indices), height, width, 3)
+
+    if out is not None and (out.shape != shape or out.dtype != np.uint8):
+        raise ParallelDecodeError(f"Output buffer must be uint8 with shape {shape}")
+    if not frame_indices:
+        return out if out is not None else np.empty(shape, dtype=np.uint8)
+
+    workers = _effective_workers(len(frame_indices), workers, min_frames_per_worker)
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+    try:
+        tasks = _segment_tasks(
+            video_path, frame_indices, workers, backend, geometry,
+            shm_name=shm.name, shape=shape
+        )
+        try:
+            written, decoded = _run_segments(tasks, workers)
+        except (VideoDecoderError, FrameStoreError, BrokenProcessPool, OSError) as e:
+            raise ParallelDecodeError(f"Parallel decoding of {video_path} failed: {e}")
+
+        block = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        if out is None:
+            out = block.copy()
+        else:
+            np.copyto(out, block)
+        del block
+    finally:
+        shm.close()
+        shm.unlink()
+
+    logger.debug(
+        f"Decoded {written} frames of {video_path.name} in {len(tasks)} segments "
+        f"({decoded} frames decoded)"
+    )
+    return out
+
+
+def fill_frame_store_parallel(
+    store: DecodedFrameStore,
+    frame_indices: List[int],
+    workers: int,
+    backend: str = "opencv",
+    geometry: Optional[DecodeGeometry] = None,
+    min_frames_per_worker: int = MIN_FRAMES_PER_WORKER
+) -> int:
+    """
+    Decode frames with several processes straight into a frame store.
+
+    Frames already in the store are skipped. Workers open the same
+    memory-mapped store, so the decoded frames are visible to this process
+    without any copying.
+
+    Args:
+        store: Decoded-frame store of the video
+        frame_indices: Frame indices to decode
+        workers: Maximum number of decoder processes
+        backend: Decoding backend for each worker ("opencv" or "ffmpeg")
+        geometry: Decode-time crop/downscale matching the store's frames
+        min_frames_per_worker: Smallest segment worth a separate process
+
+    Returns:
+        Number of frames written
+    """
+    missing = sorted(i for i in set(frame_indices) if 0 <= i < store.frame_count and not store.contains(i))
+    if not missing:
+        return 0
+
+    workers = _effective_workers(len(missing), workers, min_frames_per_worker)
+    tasks = _segment_tasks(
+        store.video_path, missing, workers, backend, geometry,
+        store_frame_count=store.frame_count, store_frame_size=store.frame_size,
+        store_dir=str(store.cache_dir), store_variant=store.variant
+    )
+    try:
+        written, decoded = _run_segments(tasks, workers)
+    except (VideoDecoderError, FrameStoreError, BrokenProcessPool, OSError) as e:
+        raise ParallelDecodeError(f"Parallel decoding of {store.video_path} failed: {e}")
+
+    logger.debug(
+        f"Filled {written} frames of {store.video_path.name} in {len(tasks)} segments "
+        f"({decoded} frames decoded)"
+    )
+    return written
@@ -0,0 +1,144 @@
+"""
+Background prefetching for AlexPose batch pipelines.
+
+A prefetcher runs a loader function over a sequence of work items on a
+bounded producer thread, so that item k+1 is being produced (for example
+decoded) while the consumer is still processing item k (for example running
+pose inference). The queue depth bounds how far the producer may run ahead,
+which applies backpressure and caps the memory held by prefetched results.
+
+Author: AlexPose Team
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class PrefetchError(Exception):
+    """Exception raised for prefetch pipeline errors."""
+    pass
+
+
+# Sentinel marking the end of the producer's output
+_DONE = object()
+
+
+class BackgroundPrefetcher(Generic[T, R]):
+    """
+    Bounded single-producer prefetch pipeline.
+
+    Iterating yields ``(item, result)`` pairs in item order. Exceptions raised
+    by the loader are re-raised in the consumer when the failing item is
+    reached. Closing the prefetcher, leaving its context, or abandoning the
+    iteration cancels the producer and joins its thread.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[T], R],
+        items: Iterable[T],
+        depth: int = 2,
+        name: str = "prefetch"
+    ):
+        """
+        Initialize and start the prefetcher.
+
+        Args:
+            loader: Function producing the result for one item
+            items: Work items, produced in order
+            depth: Maximum number of results buffered ahead of the consumer
+            name: Producer thread name, for logs
+        """
+        if depth < 1:
+            raise PrefetchError(f"Prefetch depth must be at least 1, got {depth}")
+
+        self.loader = loader
+        self.depth = depth
+        self._items: List[T] = list(items)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+        self._cancelled = threading.Event()
+        self._produced = 0
+        self._consumed = 0
+
+        self._thread = threading.Thread(target=self._produce, name=name, daemon=True)
+        self._thread.start()
+
+    def _put(self, entry: Any) -> bool:
+        """Enqueue an entry, waiting for space unless cancelled."""
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        """Producer thread: load items in order until done or cancelled."""
+        for item in self._items:
+            if self._cancelled.is_set():
+                return
+            try:
+                entry: Tuple[Any, Any, Optional[BaseException]] = (item, self.loader(item), None)
+            except Exception as e:  # Delivered to the consumer
+                entry = (item, None, e)
+            if not self._put(entry):
+                return
+            self._produced += 1
+        self._put(_DONE)
+
+    def __iter__(self) -> Iterator[Tuple[T, R]]:
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is _DONE:
+                    return
+                item, result, error = entry
+                self._consumed += 1
+                if error is not None:
+                    raise error
+                yield item, result
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Cancel the producer, drop buffered results and join the thread."""
+        self._cancelled.set()
+        # Drain so a producer blocked on a full queue can observe cancellation
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5.0)
+            if self._thread.is_alive():
+                logger.warning(f"Prefetch thread {self._thread.name} did not stop within 5s")
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Check if the prefetcher has been cancelled."""
+        return self._cancelled.is_set()
+
+    def get_stats(self) -> dict:
+        """Get producer/consumer progress."""
+        return {
+            'items': len(self._items),
+            'produced': self._produced,
+            'consumed': self._consumed,
+            'depth': self.depth,
+            'cancelled': self._cancelled.is_set()
+        }
+
+    def __enter__(self) -> "BackgroundPrefetcher[T, R]":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,603 @@
+"""
+Persistent keyframe/seek index for random frame access in AlexPose.
+
+A seek index records, for one video file, the presentation timestamp of every
+frame and which frames are keyframes. Frame extractors use it to jump to the
+nearest keyframe at or before a requested frame and decode forward from
+there, instead of relying on container-level frame-number seeks that are slow
+and sometimes inaccurate on long MP4s.
+
+Indexes are built once from packet metadata (ffprobe, or ffmpeg's framecrc
+muxer when ffprobe is missing; neither decodes any pixels), persisted as JSON
+next to the video and keyed by the video's size and modification time so a
+replaced file is re-indexed automatically.
+
+Author: AlexPose Team
+"""
+
+import json
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+SEEK_INDEX_VERSION = 1
+SEEK_INDEX_SUFFIX = ".seekidx.json"
+
+
+class SeekIndexError(Exception):
+    """Exception raised for seek index errors."""
+    pass
+
+
+class SeekIndex:
+    """
+    Keyframe positions and pts-to-frame mapping for one video.
+
+    Frame indices are 0-based and in presentation order. Timestamps are in
+    seconds relative to the first presented frame.
+    """
+
+    def __init__(
+        self,
+        video_path: Union[str, Path],
+        file_size: int,
+        mtime_ns: int,
+        pts: np.ndarray,
+        keyframes: Optional[np.ndarray],
+        start_time: float = 0.0,
+        source: str = "unknown"
+    ):
+        """
+        Initialize a seek index.
+
+        Args:
+            video_path: Path to the indexed video
+            file_size: Video size in bytes when indexed
+            mtime_ns: Video modification time (ns) when indexed
+            pts: Relative presentation time of each frame, ascending
+            keyframes: Sorted keyframe indices, or None if unknown
+            start_time: Offset of the first frame from the start of the
+                container timeline, which is what ffmpeg -ss measures against
+            source: Tool the index was built with
+        """
+        self.video_path = Path(video_path)
+        self.file_size = int(file_size)
+        self.mtime_ns = int(mtime_ns)
+        self.pts = np.asarray(pts, dtype=np.float64)
+        self.keyframes = None if keyframes is None else np.asarray(keyframes, dtype=np.int64)
+        self.start_time = float(start_time)
+        self.source = source
+
+    @property
+    def frame_count(self) -> int:
+        """Number of frames in the video."""
+        return len(self.pts)
+
+    @property
+    def has_keyframes(self) -> bool:
+        """Check if keyframe positions are known."""
+        return self.keyframes is not None and len(self.keyframes) > 0
+
+    @property
+    def fps(self) -> float:
+        """Average frame rate derived from the timestamps."""
+        if self.frame_count < 2 or self.pts[-1] <= 0:
+            return 0.0
+        return (self.frame_count - 1) / float(self.pts[-1])
+
+    def keyframe_before(self, frame_index: int) -> int:
+        """
+        Get the nearest keyframe at or before a frame.
+
+        Args:
+            frame_index: Target frame index
+
+        Returns:
+            Keyframe index; 0 when keyframes are unknown
+        """
+        if not self.has_keyframes:
+            return 0
+        pos = int(np.searchsorted(self.keyframes, frame_index, side="right")) - 1
+        return int(self.keyframes[max(pos, 0)])
+
+    def needs_seek(self, current_index: int, frame_index: int) -> bool:
+        """
+        Check if reaching frame_index from current_index crosses a keyframe.
+
+        When no keyframe lies in (current_index, frame_index], decoding forward
+        from the current position is never more work than seeking.
+        """
+        if frame_index < current_index:
+            return True
+        if not self.has_keyframes:
+            return False
+        return self.keyframe_before(frame_index) > current_index
+
+    def seek_time(self, frame_index: int) -> float:
+        """
+        Get an ffmpeg input seek time that lands on the keyframe before a frame.
+
+        The time lies half a frame after the keyframe so that rounding cannot
+        make a backward keyframe seek land on the previous keyframe.
+        """
+        keyframe = self.keyframe_before(frame_index)
+        offset = 0.0
+        if keyframe + 1 < self.frame_count:
+            offset = 0.5 * (self.pts[keyframe + 1] - self.pts[keyframe])
+        return self.start_time + float(self.pts[keyframe]) + offset
+
+    def input_seek(self, frame_index: int) -> Tuple[List[str], int]:
+        """
+        Get ffmpeg input options that seek to the keyframe before a frame.
+
+        Input seeking without accurate trimming lands on the keyframe, so
+        output frame n of the seeked decode is video frame base + n.
+
+        Args:
+            frame_index: First frame the decode needs
+
+        Returns:
+            Tuple of (options to place before -i, base frame index)
+        """
+        if not self.has_keyframes or not 0 < frame_index < self.frame_count:
+            return [], 0
+        base = self.keyframe_before(frame_index)
+        if base == 0:
+            return [], 0
+        return ["-noaccurate_seek", "-ss", f"{self.seek_time(frame_index):.6f}"], base
+
+    def frame_time(self, frame_index: int) -> float:
+        """Relative presentation time of a frame in seconds."""
+        if not 0 <= frame_index < self.frame_count:
+            raise SeekIndexError(
+                f"Frame {frame_index} out of range for {self.video_path} ({self.frame_count} frames)"
+            )
+        return float(self.pts[frame_index])
+
+    def frame_at_time(self, timestamp: float) -> int:
+        """
+        Map a relative timestamp to the frame being displayed at that time.
+
+        Args:
+            timestamp: Time in seconds from the first frame
+
+        Returns:
+            Index of the last frame whose pts is <= timestamp
+        """
+        if self.frame_count == 0:
+            raise SeekIndexError(f"Seek index for {self.video_path} has no frames")
+        # Tolerate float noise in stored timestamps
+        pos = int(np.searchsorted(self.pts, timestamp + 1e-6, side="right")) - 1
+        return min(max(pos, 0), self.frame_count - 1)
+
+    def frames_at_rate(self, frame_rate: float) -> List[int]:
+        """
+        Select frames sampling the video at a target rate by timestamp.
+
+        Args:
+            frame_rate: Target frames per second
+
+        Returns:
+            Ascending frame indices; exact for variable frame rate videos
+        """
+        return sample_timestamps(self.pts, frame_rate)
+
+    def is_valid_for(self, video_path: Union[str, Path]) -> bool:
+        """Check if this index still describes the file at video_path."""
+        try:
+            stat = Path(video_path).stat()
+        except OSError:
+            return False
+        return stat.st_size == self.file_size and stat.st_mtime_ns == self.mtime_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to a JSON-compatible dictionary."""
+        return {
+            "version": SEEK_INDEX_VERSION,
+            "video": self.video_path.name,
+            "file_size": self.file_size,
+            "mtime_ns": self.mtime_ns,
+            "source": self.source,
+            "start_time": self.start_time,
+            "keyframes": None if self.keyframes is None else self.keyframes.tolist(),
+            "pts": [round(float(t), 6) for t in self.pts],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], video_path: Union[str, Path]) -> "SeekIndex":
+        """Create an index from a dictionary produced by to_dict."""
+        if data.get("version") != SEEK_INDEX_VERSION:
+            raise SeekIndexError(f"Unsupported seek index version: {data.get('version')}")
+        try:
+            return cls(
+                video_path=video_path,
+                file_size=data["file_size"],
+                mtime_ns=data["mtime_ns"],
+                pts=np.asarray(data["pts"], dtype=np.float64),
+                keyframes=data.get("keyframes"),
+                start_time=data.get("start_time", 0.0),
+                source=data.get("source", "unknown"),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise SeekIndexError(f"Malformed seek index: {e}")
+
+    def save(self, index_path: Optional[Union[str, Path]] = None) -> Path:
+        """
+        Write the index as JSON.
+
+        Args:
+            index_path: Destination; defaults to the file next to the video
+
+        Returns:
+            Path the index was written to
+        """
+        index_path = Path(index_path) if index_path else seek_index_path(self.video_path)
+        temp_path = index_path.with_name(index_path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        temp_path.replace(index_path)
+        return index_path
+
+    @classmethod
+    def load(
+        cls,
+        video_path: Union[str, Path],
+        index_path: Optional[Union[str, Path]] = None
+    ) -> "SeekIndex":
+        """Read an index from JSON."""
+        index_path = Path(index_path) if index_path else seek_index_path(video_path)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise SeekIndexError(f"Could not read seek index {index_path}: {e}")
+        return cls.from_dict(data, video_path)
+
+
+def sample_timestamps(timestamps: np.ndarray, frame_rate: float) -> List[int]:
+    """
+    Pick the frames that sample a timeline at a fixed rate.
+
+    For each output slot ``t0 + k / frame_rate`` the first frame presented at
+    or after the slot is selected, so a 60 fps video sampled at 15 fps keeps
+    every fourth frame and a variable frame rate video keeps the frames
+    nearest to evenly spaced instants.
+
+    Args:
+        timestamps: Ascending frame presentation times in seconds
+        frame_rate: Target frames per second
+
+    Returns:
+        Ascending, de-duplicated frame indices
+    """
+    if frame_rate <= 0:
+        raise SeekIndexError(f"Frame rate must be positive, got {frame_rate}")
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if len(timestamps) == 0:
+        return []
+
+    period = 1.0 / frame_rate
+    start = timestamps[0]
+    slots = start + period * np.arange(int(np.floor((timestamps[-1] - start) / period + 1e-9)) + 1)
+    # Tolerate float noise in stored timestamps
+    positions = np.searchsorted(timestamps, slots - 1e-4, side="left")
+    positions = positions[positions < len(timestamps)]
+    return [int(i) for i in np.unique(positions)]
+
+
+def seek_index_path(video_path: Union[str, Path]) -> Path:
+    """Get the path of the persisted index for a video."""
+    video_path = Path(video_path)
+    return video_path.with_name(video_path.name + SEEK_INDEX_SUFFIX)
+
+
+def _packets_to_index(
+    video_path: Path,
+    packets: List[Tuple[float, bool]],
+    source: str,
+    container_start: float = 0.0
+) -> SeekIndex:
+    """Build an index from (pts seconds, is_keyframe) packets in decode order."""
+    if not packets:
+        raise SeekIndexError(f"No video packets found in {video_path}")
+
+    pts = np.array([p[0] for p in packets], dtype=np.float64)
+    is_key = np.array([p[1] for p in packets], dtype=bool)
+
+    # Presentation order is pts order; decode order differs with B-frames
+    order = np.argsort(pts, kind="stable")
+    pts = pts[order]
+    is_key = is_key[order]
+
+    start_time = float(pts[0]) - container_start
+    keyframes = np.flatnonzero(is_key)
+    if len(keyframes) == 0 or keyframes[0] != 0:
+        # The first presented frame is always a valid decode start point
+        keyframes = np.concatenate([[0], keyframes])
+
+    stat = video_path.stat()
+    return SeekIndex(
+        video_path=video_path,
+        file_size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        pts=pts - pts[0],
+        keyframes=keyframes,
+        start_time=start_time,
+        source=source,
+    )
+
+
+def _build_with_ffprobe(video_path: Path) -> SeekIndex:
+    """Build an index from ffprobe packet metadata."""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,dts_time,flags:format=start_time",
+        "-of", "json",
+        str(video_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise SeekIndexError(f"ffprobe failed for {video_path}: {result.stderr.strip()}")
+
+    data = json.loads(result.stdout)
+    packets = []
+    for packet in data.get("packets", []):
+        time_str = packet.get("pts_time", "N/A")
+        if time_str in ("", "N/A"):
+            time_str = packet.get("dts_time", "N/A")
+        if time_str in ("", "N/A"):
+            continue
+        packets.append((float(time_str), "K" in packet.get("flags", "")))
+
+    # ffprobe reports absolute timestamps; ffmpeg -ss is relative to the
+    # container start time
+    container_start = data.get("format", {}).get("start_time", "0")
+    try:
+        container_start = float(container_start)
+    except ValueError:
+        container_start = 0.0
+
+    return _packets_to_index(video_path, packets, "ffprobe", container_start)
+
+
+def _build_with_ffmpeg(video_path: Path) -> SeekIndex:
+    """Build an index from ffmpeg's framecrc muxer with stream copy.
+
+    Stream-copied timestamps are already shifted to the container start time.
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-v", "error",
+        "-i", str(video_path),
+        "-map", "0:v:0",
+        "-c", "copy",
+        "-f", "framecrc",
+        "-"
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise SeekIndexError(f"ffmpeg failed for {video_path}: {result.stderr.strip()}")
+
+    time_base = None
+    packets = []
+    for line in result.stdout.splitlines():
+        if line.startswith("#tb 0:"):
+            num, den = line.split(":", 1)[1].strip().split("/")
+            time_base = float(num) / float(den)
+            continue
+        if line.startswith("#") or time_base is None:
+            continue
+        fields = [f.strip() for f in line.split(",")]
+        if len(fields) < 6:
+            continue
+        # stream, dts, pts, duration, size, crc[, F=flags]; keyframes carry no F=
+        ts = fields[2] if fields[2].lstrip("-").isdigit() else fields[1]
+        if not ts.lstrip("-").isdigit():
+            continue
+        packets.append((int(ts) * time_base, len(fields) < 7))
+
+    return _packets_to_index(video_path, packets, "ffmpeg")
+
+
+def _build_with_opencv(video_path: Path) -> SeekIndex:
+    """Build a timestamp-only index by scanning the video with OpenCV."""
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            raise SeekIndexError(f"Could not open video: {video_path}")
+        pts = []
+        while cap.grab():
+            pts.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+    finally:
+        cap.release()
+
+    if not pts:
+        raise SeekIndexError(f"No frames found in {video_path}")
+
+    stat = video_path.stat()
+    pts = np.maximum.accumulate(np.asarray(pts, dtype=np.float64))
+    return SeekIndex(
+        video_path=video_path,
+        file_size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        pts=pts - pts[0],
+        keyframes=None,
+        start_time=0.0,
+        source="opencv",
+    )
+
+
+def build_seek_index(video_path: Union[str, Path], method: str = "auto") -> SeekIndex:
+    """
+    Build a seek index for a video.
+
+    Args:
+        video_path: Path to video file
+        method: "ffprobe", "ffmpeg", "opencv" or "auto". Auto tries ffprobe
+            then ffmpeg, which read packet headers only. The OpenCV scan
+            decodes the whole video and cannot locate keyframes, so it is
+            only used when requested explicitly.
+
+    Returns:
+        Seek index for the video
+    """
+    video_path = Path(video_path)
+    if not video_path.exists():
+        raise SeekIndexError(f"Video file not found: {video_path}")
+
+    builders = {
+        "ffprobe": (_build_with_ffprobe, lambda: shutil.which("ffprobe") is not None),
+        "ffmpeg": (_build_with_ffmpeg, lambda: shutil.which("ffmpeg") is not None),
+        "opencv": (_build_with_opencv, lambda: cv2 is not None),
+    }
+    if method == "auto":
+        methods = ["ffprobe", "ffmpeg"]
+    elif method in builders:
+        methods = [method]
+    else:
+        raise SeekIndexError(f"Unsupported seek index method: {method}")
+
+    errors = []
+    for name in methods:
+        builder, available = builders[name]
+        if not available():
+            errors.append(f"{name} not available")
+            continue
+        try:
+            index = builder(video_path)
+            logger.debug(
+                f"Built seek index for {video_path} with {name}: "
+                f"{index.frame_count} frames, "
+                f"{len(index.keyframes) if index.has_keyframes else 0} keyframes"
+            )
+            return index
+        except (SeekIndexError, subprocess.TimeoutExpired, OSError, ValueError) as e:
+            errors.append(f"{name}: {e}")
+
+    raise SeekIndexError(f"Could not build seek index for {video_path}: {'; '.join(errors)}")
+
+
+# Process-wide cache of loaded indexes, keyed by resolved video path
+_index_cache: Dict[str, Optional[SeekIndex]] = {}
+_index_cache_stat: Dict[str, Tuple[int, int]] = {}
+_index_cache_lock = threading.Lock()
+# Per-video locks held while an index is loaded or built
+_index_path_locks: Dict[str, threading.Lock] = {}
+
+
+def get_seek_index(
+    video_path: Union[str, Path],
+    build: bool = True,
+    persist: bool = True
+) -> Optional[SeekIndex]:
+    """
+    Get the seek index for a video, loading or building it as needed.
+
+    Indexes are cached per process, read from the JSON file next to the video
+    when it matches the video's size and mtime, and otherwise built and
+    written back. Failures are remembered until the video changes. Building
+    holds a per-video lock only, so lookups of other videos never wait on it.
+
+    Args:
+        video_path: Path to video file
+        build: Build the index if no valid persisted index exists
+        persist: Write newly built indexes next to the video
+
+    Returns:
+        Seek index, or None if no index is available
+    """
+    video_path = Path(video_path)
+    try:
+        stat = video_path.stat()
+    except OSError:
+        return None
+
+    key = str(video_path.resolve())
+    stamp = (stat.st_size, stat.st_mtime_ns)
+
+    with _index_cache_lock:
+        if _index_cache_stat.get(key) == stamp and key in _index_cache:
+            return _index_cache[key]
+        path_lock = _index_path_locks.setdefault(key, threading.Lock())
+
+    # Building can take minutes: serialise per video, not across videos
+    with path_lock:
+        with _index_cache_lock:
+            if _index_cache_stat.get(key) == stamp and key in _index_cache:
+                # Built by another thread while this one waited
+                return _index_cache[key]
+
+        index = None
+        index_path = seek_index_path(video_path)
+        if index_path.exists():
+            try:
+                loaded = SeekIndex.load(video_path, index_path)
+                if loaded.is_valid_for(video_path):
+                    index = loaded
+                else:
+                    logger.debug(f"Stale seek index for {video_path}, rebuilding")
+            except SeekIndexError as e:
+                logger.debug(f"Ignoring unreadable seek index: {e}")
+
+        if index is None and build:
+            try:
+                index = build_seek_index(video_path)
+            except SeekIndexError as e:
+                logger.debug(f"No seek index for {video_path}: {e}")
+            if index is not None and persist:
+                try:
+                    index.save(index_path)
+                except OSError as e:
+                    logger.debug(f"Could not persist seek index for {video_path}: {e}")
+
+        if index is not None or build:
+            with _index_cache_lock:
+                _index_cache[key] = index
+                _index_cache_stat[key] = stamp
+        return index
+
+
+def clear_seek_index_cache() -> None:
+    """Drop all in-process cached seek indexes."""
+    with _index_cache_lock:
+        _index_cache.clear()
+        _index_cache_stat.clear()
+
+
+def seek_capture(capture, frame_index: int, index: Optional[SeekIndex] = None) -> None:
+    """
+    Position an OpenCV capture so its next read returns frame_index.
+
+    With a keyframe index the capture is positioned on the nearest preceding
+    keyframe, where container seeks are exact, and decoded forward with
+    grab(); otherwise it falls back to a frame-number seek.
+
+    Args:
+        capture: Open cv2.VideoCapture
+        frame_index: Target frame index (0-based)
+        index: Optional seek index for the capture's video
+    """
+    if index is None or not index.has_keyframes or frame_index >= index.frame_count:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        return
+
+    keyframe = index.keyframe_before(frame_index)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+    for _ in range(frame_index - keyframe):
+        if not capture.grab():
+            break
@@ -0,0 +1,1050 @@
+"""
+Sequential video decoder sessions and raw-pipe FFmpeg decoding for AlexPose.
+
+This module provides a decoder session that keeps a single capture open for a
+video and serves frame requests by continuing decode for forward-sequential
+access. The capture is only re-positioned on backward jumps or large forward
+gaps, so walking a whole video costs one decode per frame instead of one
+decode-from-start per frame.
+
+It also provides an FFmpeg raw-video pipe reader that streams rgb24 frames
+from ffmpeg's stdout straight into preallocated numpy buffers, avoiding the
+JPEG encode/decode round trip and temp files of image-based extraction.
+
+Both use the persistent seek index from ambient.utils.seek_index, when one is
+available, to start decoding at the keyframe preceding a requested frame.
+
+Both can also crop and downscale at decode time (DecodeGeometry), so pose
+estimators with a small input size never receive full-resolution frames;
+keypoints found on reduced frames are mapped back to source pixels.
+
+Author: AlexPose Team
+"""
+
+import bisect
+import copy
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from ambient.utils.seek_index import SeekIndex, get_seek_index, sample_timestamps
+from ambient.utils.video_metadata import VideoMetadataError, executable_available, get_video_metadata
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+class VideoDecoderError(Exception):
+    """Exception raised for video decoder errors."""
+    pass
+
+
+# FFmpeg frame extraction modes
+RAWPIPE_MODE = "rawpipe"  # rgb24 frames streamed over stdout
+JPEG_MODE = "jpeg"  # legacy temp-JPEG extraction
+FFMPEG_MODES = (RAWPIPE_MODE, JPEG_MODE)
+
+
+# Colour orders supported for batch tensors
+TENSOR_COLORS = ("RGB", "BGR")
+
+
+def convert_frame_into(
+    src: np.ndarray,
+    out: np.ndarray,
+    src_color: str = "RGB",
+    color: str = "BGR"
+) -> np.ndarray:
+    """
+    Resize and colour-convert a frame into a preallocated buffer.
+
+    Resizing writes straight into ``out`` and the channel swap is then done
+    in place, so no intermediate frame is allocated.
+
+    Args:
+        src: Source frame (H, W, 3) or grayscale (H, W)
+        out: Destination uint8 buffer of shape (h, w, 3)
+        src_color: Channel order of src ("RGB", "BGR" or "GRAY")
+        color: Channel order to write ("RGB" or "BGR")
+
+    Returns:
+        The out buffer
+    """
+    if color not in TENSOR_COLORS:
+        raise VideoDecoderError(f"Unsupported tensor color: {color}")
+    if out.ndim != 3 or out.shape[2] != 3 or out.dtype != np.uint8:
+        raise VideoDecoderError(f"Output buffer must be uint8 (H, W, 3), got {out.shape} {out.dtype}")
+
+    if src.ndim == 3 and src.shape[2] == 1:
+        src = src[:, :, 0]
+    if src.ndim == 2:
+        src_color = "GRAY"
+    elif src_color not in TENSOR_COLORS:
+        raise VideoDecoderError(f"Unsupported source color: {src_color}")
+
+    same_size = src.shape[:2] == out.shape[:2]
+    if not same_size and cv2 is None:
+        raise VideoDecoderError("OpenCV is required to resize frames into a batch tensor")
+
+    if src_color == "GRAY":
+        if not same_size:
+            src = cv2.resize(src, (out.shape[1], out.shape[0]), interpolation=_interpolation(src, out))
+        out[...] = src[:, :, None]
+        return out
+
+    if same_size:
+        if src_color == color:
+            np.copyto(out, src)
+        elif cv2 is not None:
+            cv2.cvtColor(src, cv2.COLOR_RGB2BGR, dst=out)
+        else:
+            np.copyto(out, src[:, :, ::-1])
+        return out
+
+    cv2.resize(src, (out.shape[1], out.shape[0]), dst=out, interpolation=_interpolation(src, out))
+    if src_color != color:
+        # RGB<->BGR is the same swap in both directions
+        cv2.cvtColor(out, cv2.COLOR_RGB2BGR, dst=out)
+    return out
+
+
+def _interpolation(src: np.ndarray, out: np.ndarray) -> int:
+    """Area interpolation for downscaling, linear for upscaling."""
+    if out.shape[0] * out.shape[1] < src.shape[0] * src.shape[1]:
+        return cv2.INTER_AREA
+    return cv2.INTER_LINEAR
+
+
+@dataclass(frozen=True)
+class DecodeGeometry:
+    """
+    Crop and downscale applied to frames at decode time.
+
+    Frames are first cropped to ``crop`` (x, y, width, height) in source
+    pixels, when given, and then resized to ``output_size``. Coordinates
+    measured on decoded frames map back to the source video through
+    ``to_source``.
+    """
+
+    source_size: Tuple[int, int]
+    output_size: Tuple[int, int]
+    crop: Optional[Tuple[int, int, int, int]] = None
+
+    @classmethod
+    def fit(
+        cls,
+        source_size: Tuple[int, int],
+        max_side: Optional[int] = None,
+        crop: Optional[Tuple[int, int, int, int]] = None
+    ) -> "DecodeGeometry":
+        """
+        Build the geometry that fits a (cropped) source within max_side.
+
+        Args:
+            source_size: Source (width, height)
+            max_side: Longest output side in pixels; frames are never upscaled
+            crop: Optional (x, y, width, height) region, clipped to the source
+
+        Returns:
+            Decode geometry
+        """
+        src_w, src_h = int(source_size[0]), int(source_size[1])
+        if src_w <= 0 or src_h <= 0:
+            raise VideoDecoderError(f"Invalid source size: {source_size}")
+
+        if crop is not None:
+            x, y, w, h = (int(v) for v in crop)
+            x, y = max(0, x), max(0, y)
+            w, h = min(w, src_w - x), min(h, src_h - y)
+            if w <= 0 or h <= 0:
+                raise VideoDecoderError(f"Crop {crop} lies outside the {src_w}x{src_h} source")
+            crop = (x, y, w, h)
+            if crop == (0, 0, src_w, src_h):
+                crop = None
+        region_w, region_h = (crop[2], crop[3]) if crop else (src_w, src_h)
+
+        out_w, out_h = region_w, region_h
+        if max_side and max(region_w, region_h) > max_side:
+            scale = max_side / float(max(region_w, region_h))
+            out_w = max(1, round(region_w * scale))
+            out_h = max(1, round(region_h * scale))
+
+        return cls(source_size=(src_w, src_h), output_size=(out_w, out_h), crop=crop)
+
+    @property
+    def is_identity(self) -> bool:
+        """Check if decoded frames are the unmodified source frames."""
+        return self.crop is None and self.output_size == self.source_size
+
+    @property
+    def output_shape(self) -> Tuple[int, int, int]:
+        """Decoded frame shape (height, width, 3)."""
+        return (self.output_size[1], self.output_size[0], 3)
+
+    def _region(self) -> Tuple[int, int, int, int]:
+        return self.crop or (0, 0, self.source_size[0], self.source_size[1])
+
+    def to_source(self, x: float, y: float) -> Tuple[float, float]:
+        """Map a point on a decoded frame to source-frame pixels."""
+        rx, ry, rw, rh = self._region()
+        return (
+            rx + x * rw / float(self.output_size[0]),
+            ry + y * rh / float(self.output_size[1])
+        )
+
+    def map_points(self, points: np.ndarray) -> np.ndarray:
+        """
+        Map an array of points on decoded frames to source-frame pixels in place.
+
+        Args:
+            points: Array whose last axis starts with x, y (e.g. (K, 3) keypoints)
+
+        Returns:
+            The same array, mapped
+        """
+        if not self.is_identity:
+            rx, ry, rw, rh = self._region()
+            points[..., 0] = rx + points[..., 0] * (rw / float(self.output_size[0]))
+            points[..., 1] = ry + points[..., 1] * (rh / float(self.output_size[1]))
+        return points
+
+    def map_keypoints(self, keypoints: List[Any]) -> List[Any]:
+        """
+        Map keypoints measured on decoded frames to source-frame pixels.
+
+        Args:
+            keypoints: Keypoint dicts with "x"/"y" entries, or objects with
+                x/y attributes; other fields are kept
+
+        Returns:
+            New list of mapped keypoints
+        """
+        if self.is_identity:
+            return list(keypoints)
+
+        mapped = []
+        for kp in keypoints:
+            if isinstance(kp, dict):
+                if "x" in kp and "y" in kp:
+                    kp = dict(kp)
+                    kp["x"], kp["y"] = self.to_source(kp["x"], kp["y"])
+            elif hasattr(kp, "x") and hasattr(kp, "y"):
+                kp = copy.copy(kp)
+                kp.x, kp.y = self.to_source(kp.x, kp.y)
+            mapped.append(kp)
+        return mapped
+
+    def ffmpeg_filter(self) -> str:
+        """ffmpeg crop/scale filter chain producing the output size."""
+        filters = []
+        if self.crop is not None:
+            x, y, w, h = self.crop
+            filters.append(f"crop={w}:{h}:{x}:{y}")
+        region = self._region()
+        if self.output_size != (region[2], region[3]):
+            filters.append(f"scale={self.output_size[0]}:{self.output_size[1]}:flags=area")
+        return ",".join(filters)
+
+    def apply(
+        self,
+        frame: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        src_color: str = "RGB",
+        color: str = "RGB"
+    ) -> np.ndarray:
+        """
+        Crop and resize a full source frame.
+
+        Args:
+            frame: Source frame
+            out: Optional output buffer of output_shape
+            src_color: Channel order of frame
+            color: Channel order to write
+
+        Returns:
+            Frame at the output size
+        """
+        x, y, w, h = self._region()
+        region = frame[y:y + h, x:x + w]
+        if out is None:
+            if self.output_size == (w, h) and src_color == color:
+                return np.ascontiguousarray(region)
+            out = np.empty(self.output_shape, dtype=np.uint8)
+        return convert_frame_into(region, out, src_color, color)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a dictionary."""
+        return {
+            "source_size": list(self.source_size),
+            "output_size": list(self.output_size),
+            "crop": list(self.crop) if self.crop else None
+        }
+
+
+def ffmpeg_on_path() -> bool:
+    """Check if the ffmpeg executable is on PATH (cached per PATH)."""
+    return executable_available("ffmpeg")
+
+
+def probe_frame_size(video_path: Union[str, Path]) -> Tuple[int, int]:
+    """
+    Get the decoded frame size of a video.
+
+    Answered from the process-wide metadata cache, so repeated calls for
+    the same file do not re-probe it.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        Tuple of (width, height)
+    """
+    try:
+        info = get_video_metadata(video_path)
+    except VideoMetadataError as e:
+        raise VideoDecoderError(f"Could not determine frame size of {video_path}: {e}")
+
+    width, height = int(info.get("width") or 0), int(info.get("height") or 0)
+    if width <= 0 or height <= 0:
+        raise VideoDecoderError(f"Could not determine frame size of {video_path}")
+    return width, height
+
+
+def build_select_filter(start: int = 0, end: Optional[int] = None, step: int = 1) -> str:
+    """
+    Build an ffmpeg select filter for a frame range.
+
+    Args:
+        start: First frame index (0-based, inclusive)
+        end: Last frame index (exclusive), None for end of video
+        step: Frame step size
+
+    Returns:
+        Filter expression selecting frames start, start+step, ... < end
+    """
+    step = max(1, step)
+    terms = [f"gte(n\\,{start})"]
+    if end is not None:
+        terms.append(f"lt(n\\,{end})")
+    if step > 1:
+        terms.append(f"not(mod(n-{start}\\,{step}))")
+    return "select=" + "*".join(terms)
+
+
+def build_index_select_filter(frame_indices: List[int]) -> str:
+    """
+    Build an ffmpeg select filter for an explicit set of frame indices.
+
+    Args:
+        frame_indices: Frame indices to select (0-based)
+
+    Returns:
+        Filter expression selecting exactly the given frames
+    """
+    terms = []
+    for first, last, step in _index_runs(frame_indices):
+        if first == last:
+            terms.append(f"eq(n\\,{first})")
+        elif step == 1:
+            terms.append(f"between(n\\,{first}\\,{last})")
+        else:
+            terms.append(f"between(n\\,{first}\\,{last})*not(mod(n-{first}\\,{step}))")
+    return "select=" + "+".join(terms)
+
+
+def _index_runs(frame_indices: List[int]) -> List[Tuple[int, int, int]]:
+    """Split indices into arithmetic runs of (first, last, step), keeping filters short."""
+    indices = sorted(set(int(i) for i in frame_indices))
+    runs: List[Tuple[int, int, int]] = []
+    pos = 0
+    while pos < len(indices):
+        first = indices[pos]
+        if pos + 1 == len(indices):
+            runs.append((first, first, 1))
+            break
+        step = indices[pos + 1] - first
+        end = pos + 1
+        while end + 1 < len(indices) and indices[end + 1] - indices[end] == step:
+            end += 1
+        runs.append((first, indices[end], step))
+        pos = end + 1
+    return runs
+
+
+def sample_frame_indices(
+    frame_rate: float,
+    frame_count: int,
+    source_fps: float,
+    seek_index: Optional[SeekIndex] = None
+) -> List[int]:
+    """
+    Select the frames that sample a video at a target frame rate.
+
+    Selection uses the per-frame timestamps of the seek index when available,
+    which is exact for variable frame rate videos, and the nominal source
+    frame rate otherwise.
+
+    Args:
+        frame_rate: Target frames per second
+        frame_count: Number of frames in the video
+        source_fps: Nominal source frames per second
+        seek_index: Optional seek index with per-frame timestamps
+
+    Returns:
+        Ascending frame indices
+    """
+    if frame_rate <= 0:
+        raise VideoDecoderError(f"Frame rate must be positive, got {frame_rate}")
+
+    if seek_index is not None and seek_index.frame_count > 0:
+        indices = seek_index.frames_at_rate(frame_rate)
+        return [i for i in indices if i < frame_count] if frame_count > 0 else indices
+
+    if frame_count <= 0:
+        return []
+    if source_fps <= 0:
+        raise VideoDecoderError("Source frame rate is required to sample without a seek index")
+    return sample_timestamps(np.arange(frame_count) / float(source_fps), frame_rate)
+
+
+class FFmpegRawPipe:
+    """
+    Stream of RGB frames decoded by ffmpeg into a raw-video pipe.
+
+    One ffmpeg process serves the whole requested range; frames are read from
+    its stdout directly into caller-provided or preallocated uint8 buffers of
+    shape (height, width, 3).
+    """
+
+    def __init__(
+        self,
+        video_path: Union[str, Path],
+        start: int = 0,
+        end: Optional[int] = None,
+        step: int = 1,
+        frame_size: Optional[Tuple[int, int]] = None,
+        frame_indices: Optional[List[int]] = None,
+        seek_index: Optional[SeekIndex] = None,
+        geometry: Optional[DecodeGeometry] = None
+    ):
+        """
+        Start an ffmpeg raw-video pipe.
+
+        Args:
+            video_path: Path to video file
+            start: First frame index (0-based, inclusive)
+            end: Last frame index (exclusive), None for end of video
+            step: Frame step size
+            frame_size: Decoded (width, height); probed when None
+            frame_indices: Explicit frame indices to decode instead of a
+                range; frames are produced in ascending index order
+            seek_index: Optional keyframe index; when given, ffmpeg seeks to
+                the keyframe before the first requested frame instead of
+                decoding the video from the start
+            geometry: Optional crop/downscale applied by ffmpeg, so frames
+                leave the pipe at the reduced size
+        """
+        self.video_path = Path(video_path)
+        if not self.video_path.exists():
+            raise VideoDecoderError(f"Video file not found: {video_path}")
+        if not ffmpeg_on_path():
+            raise VideoDecoderError("FFmpeg is not available for raw-pipe decoding")
+
+        self.start = max(0, start)
+        self.end = end
+        self.step = max(1, step)
+
+        if geometry is not None and not geometry.is_identity:
+            width, height = geometry.output_size
+        else:
+            geometry = None
+            width, height = frame_size or probe_frame_size(self.video_path)
+        self.geometry = geometry
+        self.frame_shape = (height, width, 3)
+        self.frame_bytes = width * height * 3
+
+        first_frame = min(frame_indices) if frame_indices else self.start
+        seek_args: List[str] = []
+        self.base_frame = 0
+        if seek_index is not None:
+            # Output frame n is video frame base_frame + n
+            seek_args, self.base_frame = seek_index.input_seek(first_frame)
+
+        base = self.base_frame
+        if frame_indices is not None:
+            select_filter = build_index_select_filter([i - base for i in frame_indices])
+        else:
+            select_filter = build_select_filter(
+                self.start - base, None if self.end is None else self.end - base, self.step
+            )
+        if geometry is not None:
+            # Crop and scale only the selected frames
+            select_filter = f"{select_filter},{geometry.ffmpeg_filter()}"
+
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-v", "error",
+            *seek_args,
+            "-i", str(self.video_path),
+            "-an", "-sn",
+            "-vf", select_filter,
+            "-vsync", "0",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-"
+        ]
+        self._process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=self.frame_bytes
+        )
+        self.frames_read = 0
+
+    def read_into(self, out: np.ndarray) -> bool:
+        """
+        Read the next frame into an existing buffer.
+
+        Args:
+            out: Contiguous uint8 array of shape frame_shape
+
+        Returns:
+            True if a frame was read, False at end of stream
+        """
+        if out.shape != self.frame_shape or out.dtype != np.uint8 or not out.flags['C_CONTIGUOUS']:
+            raise VideoDecoderError(
+                f"Output buffer must be contiguous uint8 with shape {self.frame_shape}"
+            )
+
+        view = memoryview(out.reshape(-1))
+        filled = 0
+        while filled < self.frame_bytes:
+            n = self._process.stdout.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+
+        if filled == 0:
+            return False
+        if filled < self.frame_bytes:
+            raise VideoDecoderError(
+                f"Truncated frame from ffmpeg ({filled}/{self.frame_bytes} bytes) for {self.video_path}"
+            )
+
+        self.frames_read += 1
+        return True
+
+    def read(self) -> Optional[np.ndarray]:
+        """Read the next frame into a new buffer, or None at end of stream."""
+        frame = np.empty(self.frame_shape, dtype=np.uint8)
+        return frame if self.read_into(frame) else None
+
+    def skip(self, count: int) -> int:
+        """
+        Discard frames from the stream.
+
+        Args:
+            count: Number of frames to discard
+
+        Returns:
+            Number of frames actually discarded
+        """
+        scratch = np.empty(self.frame_shape, dtype=np.uint8)
+        skipped = 0
+        while skipped < count and self.read_into(scratch):
+            skipped += 1
+        return skipped
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self) -> None:
+        """Terminate the ffmpeg process and release its pipes."""
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        try:
+            if process.poll() is None:
+                process.kill()
+            process.communicate(timeout=5)
+        except Exception:
+            pass
+
+    def __enter__(self) -> "FFmpegRawPipe":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass  # Ignore errors during cleanup
+
+
+def read_frames_ffmpeg_raw(
+    video_path: Union[str, Path],
+    start: int = 0,
+    end: Optional[int] = None,
+    step: int = 1,
+    out: Optional[np.ndarray] = None,
+    seek_index: Optional[SeekIndex] = None,
+    geometry: Optional[DecodeGeometry] = None
+) -> np.ndarray:
+    """
+    Decode a frame range with a single ffmpeg process.
+
+    Args:
+        video_path: Path to video file
+        start: First frame index (0-based, inclusive)
+        end: Last frame index (exclusive), None for end of video
+        step: Frame step size
+        out: Optional preallocated (N, H, W, 3) uint8 buffer to decode into
+        seek_index: Optional keyframe index used to seek to start
+        geometry: Optional decode-time crop/downscale
+
+    Returns:
+        Array of shape (N, H, W, 3) in RGB order; a view of out when given
+    """
+    frame_size = None
+    if out is not None:
+        frame_size = (out.shape[2], out.shape[1])
+
+    with FFmpegRawPipe(video_path, start=start, end=end, step=step, frame_size=frame_size,
+                       seek_index=seek_index, geometry=geometry) as pipe:
+        if out is None and end is not None:
+            count = len(range(pipe.start, max(pipe.start, end), pipe.step))
+            out = np.empty((count,) + pipe.frame_shape, dtype=np.uint8)
+
+        if out is not None:
+            filled = 0
+            while filled < len(out) and pipe.read_into(out[filled]):
+                filled += 1
+            return out[:filled]
+
+        # Unknown length: fill fixed-size preallocated chunks
+        chunks: List[np.ndarray] = []
+        chunk_size = 64
+        while True:
+            chunk = np.empty((chunk_size,) + pipe.frame_shape, dtype=np.uint8)
+            filled = 0
+            while filled < chunk_size and pipe.read_into(chunk[filled]):
+                filled += 1
+            if filled:
+                chunks.append(chunk[:filled])
+            if filled < chunk_size:
+                break
+
+        if not chunks:
+            return np.empty((0,) + pipe.frame_shape, dtype=np.uint8)
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+def read_frame_ffmpeg_raw(
+    video_path: Union[str, Path],
+    frame_index: int,
+    seek_index: Optional[SeekIndex] = None,
+    geometry: Optional[DecodeGeometry] = None
+) -> np.ndarray:
+    """
+    Decode a single frame through the ffmpeg raw-video pipe.
+
+    Args:
+        video_path: Path to video file
+        frame_index: Frame index to decode (0-based)
+        seek_index: Optional keyframe index used to seek to the frame
+        geometry: Optional decode-time crop/downscale
+
+    Returns:
+        Frame data as an RGB numpy array
+    """
+    frames = read_frames_ffmpeg_raw(
+        video_path, start=frame_index, end=frame_index + 1, seek_index=seek_index,
+        geometry=geometry
+    )
+    if len(frames) == 0:
+        raise VideoDecoderError(f"Could not read frame {frame_index} from {video_path}")
+    return frames[0]
+
+
+class VideoDecoderSession:
+    """
+    Decoder session shared by all frames of one video.
+
+    The session keeps one OpenCV capture (or one ffmpeg raw-video pipe) open
+    and remembers the index of the next frame it will produce. Requests at or
+    slightly ahead of that index are served by decoding forward (skipped
+    frames are grabbed but not converted); backward requests and large
+    forward jumps trigger a seek.
+
+    Sessions are thread-safe: concurrent reads are serialised on an internal
+    lock because the underlying capture is stateful.
+    """
+
+    def __init__(
+        self,
+        video_path: Union[str, Path],
+        backend: str = "opencv",
+        max_forward_gap: int = 64,
+        use_seek_index: bool = True,
+        geometry: Optional[DecodeGeometry] = None,
+        frame_indices: Optional[List[int]] = None
+    ):
+        """
+        Initialize a decoder session.
+
+        Args:
+            video_path: Path to video file
+            backend: Decoding backend ("opencv" or "ffmpeg")
+            max_forward_gap: Largest forward jump served by decoding forward
+                instead of seeking
+            use_seek_index: Load (or build) the persistent seek index the
+                first time the session needs to seek
+            geometry: Optional crop/downscale applied to every decoded frame
+                (by ffmpeg's filters, or by OpenCV into a reused buffer)
+            frame_indices: Optional plan of the frames that will be read; the
+                ffmpeg backend then selects only these frames in the decoder,
+                so the pipe never carries frames that are dropped
+        """
+        self.video_path = Path(video_path)
+        if not self.video_path.exists():
+            raise VideoDecoderError(f"Video file not found: {video_path}")
+
+        if backend not in ("opencv", "ffmpeg"):
+            raise VideoDecoderError(f"Unsupported decoder backend: {backend}")
+        if backend == "opencv" and cv2 is None:
+            raise VideoDecoderError("OpenCV is required for the opencv decoder backend")
+        if backend == "ffmpeg" and not ffmpeg_on_path():
+            raise VideoDecoderError("FFmpeg is required for the ffmpeg decoder backend")
+
+        self.backend = backend
+        self.max_forward_gap = max(0, max_forward_gap)
+        self.use_seek_index = use_seek_index
+        self.geometry = geometry if geometry is not None and not geometry.is_identity else None
+        self._seek_index: Optional[SeekIndex] = None
+        self._seek_index_loaded = False
+        self.frame_indices = sorted(set(int(i) for i in frame_indices)) if frame_indices else None
+
+        self._capture = None
+        self._pipe: Optional[FFmpegRawPipe] = None
+        self._pipe_frames: Optional[List[int]] = None  # Frames a planned pipe yields, in order
+        self._pipe_pos = 0
+        self._scratch: Optional[np.ndarray] = None  # Reused decode buffer for read_into
+        self._frame_size: Optional[Tuple[int, int]] = None
+        self._next_index = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Decode statistics
+        self._reads = 0
+        self._frames_decoded = 0
+        self._seeks = 0
+
+    def _open(self) -> None:
+        """Open the underlying capture if it is not open yet."""
+        if self.backend == "ffmpeg":
+            if self._pipe is None:
+                if self.frame_indices:
+                    self._open_planned_pipe(0)
+                else:
+                    self._pipe = FFmpegRawPipe(self.video_path, geometry=self.geometry)
+                    self._next_index = 0
+            return
+
+        if self._capture is not None:
+            return
+
+        capture = cv2.VideoCapture(str(self.video_path))
+        if not capture.isOpened():
+            capture.release()
+            raise VideoDecoderError(f"Could not open video: {self.video_path}")
+
+        self._capture = capture
+        self._next_index = 0
+
+    @property
+    def seek_index(self) -> Optional[SeekIndex]:
+        """Seek index for the video, loaded on first use."""
+        if self.use_seek_index and not self._seek_index_loaded:
+            self._seek_index = get_seek_index(self.video_path)
+            self._seek_index_loaded = True
+        return self._seek_index
+
+    def _open_planned_pipe(self, frame_index: int, frame_size: Optional[Tuple[int, int]] = None) -> None:
+        """Open an ffmpeg pipe yielding the planned frames from frame_index on."""
+        remaining = self.frame_indices[bisect.bisect_left(self.frame_indices, frame_index):]
+        self._pipe = FFmpegRawPipe(
+            self.video_path, frame_size=frame_size, frame_indices=remaining,
+            seek_index=self.seek_index if frame_index > 0 else None, geometry=self.geometry
+        )
+        self._pipe_frames = remaining
+        self._pipe_pos = 0
+        self._next_index = remaining[0] if remaining else frame_index
+
+    def _needs_seek(self, frame_index: int) -> bool:
+        """Decide whether reaching frame_index requires a seek."""
+        if self._pipe_frames is not None:
+            # Planned pipes can only move forward through their own frames
+            pos = bisect.bisect_left(self._pipe_frames, frame_index, self._pipe_pos)
+            if pos >= len(self._pipe_frames) or self._pipe_frames[pos] != frame_index:
+                return True
+            return pos - self._pipe_pos > self.max_forward_gap
+
+        gap = frame_index - self._next_index
+        if gap < 0:
+            return True
+        if gap <= self.max_forward_gap:
+            return False
+
+        index = self.seek_index
+        if index is not None and index.has_keyframes:
+            return index.needs_seek(self._next_index, frame_index)
+        return True
+
+    def _seek(self, frame_index: int) -> None:
+        """Reposition the capture so the next decoded frame is frame_index."""
+        index = self.seek_index
+        if self.backend == "ffmpeg":
+            frame_size = None
+            if self._pipe is not None:
+                frame_size = (self._pipe.frame_shape[1], self._pipe.frame_shape[0])
+                self._pipe.close()
+            if self.frame_indices and frame_index in self.frame_indices:
+                self._open_planned_pipe(frame_index, frame_size)
+            else:
+                self._pipe = FFmpegRawPipe(
+                    self.video_path, start=frame_index, frame_size=frame_size, seek_index=index,
+                    geometry=self.geometry
+                )
+                self._pipe_frames = None
+                self._next_index = frame_index
+        elif index is not None and index.has_keyframes and frame_index < index.frame_count:
+            # Land on the preceding keyframe; read() decodes forward from there
+            keyframe = index.keyframe_before(frame_index)
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            self._next_index = keyframe
+        else:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            self._next_index = frame_index
+        self._seeks += 1
+
+    def _read_next_ffmpeg(self, frame_index: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Decode forward through the raw-video pipe to frame_index, optionally into out."""
+        if self._pipe_frames is not None:
+            # Position within the planned frames, not the video
+            pos = bisect.bisect_left(self._pipe_frames, frame_index, self._pipe_pos)
+            gap = pos - self._pipe_pos
+        else:
+            pos = None
+            gap = frame_index - self._next_index
+        if gap > 0:
+            skipped = self._pipe.skip(gap)
+            self._frames_decoded += skipped
+            if skipped < gap:
+                raise VideoDecoderError(
+                    f"Could not read frame {frame_index} from {self.video_path}"
+                )
+
+        if out is None:
+            frame = self._pipe.read()
+        else:
+            frame = out if self._pipe.read_into(out) else None
+        if frame is None:
+            raise VideoDecoderError(
+                f"Could not read frame {frame_index} from {self.video_path}"
+            )
+        self._frames_decoded += 1
+        if pos is not None:
+            self._pipe_pos = pos + 1
+            planned = self._pipe_frames
+            self._next_index = planned[pos + 1] if pos + 1 < len(planned) else frame_index + 1
+        else:
+            self._next_index = frame_index + 1
+        return frame
+
+    def read(self, frame_index: int) -> np.ndarray:
+        """
+        Decode a single frame.
+
+        Args:
+            frame_index: Frame index to decode (0-based)
+
+        Returns:
+            Frame data as an RGB numpy array
+        """
+        with self._lock:
+            self._prepare(frame_index)
+            
+            if self.backend == "ffmpeg":
+                return self._read_next_ffmpeg(frame_index)
+            
+            frame = self._read_next_opencv(frame_index)
+            if self.geometry is not None:
+                return self.geometry.apply(frame, src_color="BGR", color="RGB")
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def read_into(self, frame_index: int, out: np.ndarray, color: str = "RGB") -> np.ndarray:
+        """
+        Decode a single frame into a preallocated buffer.
+
+        Frames are decoded into a buffer owned by the session and then
+        resized and colour-converted straight into ``out``, so repeated calls
+        allocate nothing per frame.
+
+        Args:
+            frame_index: Frame index to decode (0-based)
+            out: Destination uint8 buffer of shape (h, w, 3); frames are
+                resized to fit it
+            color: Channel order to write ("RGB" or "BGR")
+
+        Returns:
+            The out buffer
+        """
+        with self._lock:
+            self._prepare(frame_index)
+            
+            if self.backend == "ffmpeg":
+                shape = self._pipe.frame_shape
+                if out.shape == shape and color == "RGB" and out.flags['C_CONTIGUOUS']:
+                    return self._read_next_ffmpeg(frame_index, out)
+                if self._scratch is None or self._scratch.shape != shape:
+                    self._scratch = np.empty(shape, dtype=np.uint8)
+                frame = self._read_next_ffmpeg(frame_index, self._scratch)
+                return convert_frame_into(frame, out, "RGB", color)
+            
+            frame = self._read_next_opencv(frame_index)
+            if self.geometry is not None and self.geometry.crop is not None:
+                x, y, w, h = self.geometry.crop
+                frame = frame[y:y + h, x:x + w]
+            return convert_frame_into(frame, out, "BGR", color)
+
+    def _prepare(self, frame_index: int) -> None:
+        """Open the capture and seek if needed before decoding frame_index (lock held)."""
+        if frame_index < 0:
+            raise VideoDecoderError(f"Invalid frame index: {frame_index}")
+        if self._closed:
+            raise VideoDecoderError("Decoder session is closed")
+
+        self._open()
+        self._reads += 1
+
+        if self._needs_seek(frame_index):
+            self._seek(frame_index)
+
+    def seek(self, frame_index: int) -> None:
+        """
+        Position the session so decoding starts at frame_index.
+
+        Useful before reading a segment that starts far into the video, where
+        decoding forward from the current position would waste work.
+
+        Args:
+            frame_index: Frame index to decode next (0-based)
+        """
+        with self._lock:
+            if frame_index < 0:
+                raise VideoDecoderError(f"Invalid frame index: {frame_index}")
+            if self._closed:
+                raise VideoDecoderError("Decoder session is closed")
+            if self.backend == "ffmpeg" and self._pipe is None:
+                # Start the pipe at the target instead of at frame 0
+                self._seek(frame_index)
+                return
+            self._open()
+            if frame_index != self._next_index:
+                self._seek(frame_index)
+
+    def _read_next_opencv(self, frame_index: int) -> np.ndarray:
+        """Decode forward to frame_index into the session's BGR buffer."""
+        # Decode forward, skipping colour conversion for unwanted frames
+        while self._next_index < frame_index:
+            if not self._capture.grab():
+                raise VideoDecoderError(
+                    f"Could not read frame {self._next_index} from {self.video_path}"
+                )
+            self._next_index += 1
+            self._frames_decoded += 1
+
+        ret, frame = self._capture.read(self._scratch)
+        if not ret or frame is None:
+            raise VideoDecoderError(
+                f"Could not read frame {frame_index} from {self.video_path}"
+            )
+        self._scratch = frame
+        self._next_index = frame_index + 1
+        self._frames_decoded += 1
+        return frame
+
+    @property
+    def frame_size(self) -> Tuple[int, int]:
+        """Decoded (width, height) of frames, after any decode geometry."""
+        if self.geometry is not None:
+            return self.geometry.output_size
+        if self._frame_size is None:
+            self._frame_size = probe_frame_size(self.video_path)
+        return self._frame_size
+
+    @property
+    def position(self) -> int:
+        """Index of the next frame the session will decode without seeking."""
+        return self._next_index
+
+    @property
+    def is_closed(self) -> bool:
+        """Check if the session has been closed."""
+        return self._closed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get decode statistics for this session."""
+        return {
+            'video_path': str(self.video_path),
+            'backend': self.backend,
+            'reads': self._reads,
+            'frames_decoded': self._frames_decoded,
+            'seeks': self._seeks,
+            'position': self._next_index
+        }
+
+    def close(self) -> None:
+        """Release the underlying capture."""
+        with self._lock:
+            if self._capture is not None:
+                self._capture.release()
+                self._capture = None
+            if self._pipe is not None:
+                self._pipe.close()
+                self._pipe = None
+            self._closed = True
+        logger.debug(f"Closed decoder session for {self.video_path}")
+
+    def __enter__(self) -> "VideoDecoderSession":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __del__(self):
+        """Release the capture when the session is garbage collected."""
+        try:
+            if self._capture is not None:
+                self._capture.release()
+                self._capture = None
+            if self._pipe is not None:
+                self._pipe.close()
+                self._pipe = None
+        except Exception:
+            pass  # Ignore errors during cleanup
@@ -0,0 +1,342 @@
+"""
+Cached video metadata and capability probes for AlexPose.
+
+Probing a video (ffprobe or a fresh ``cv2.VideoCapture``) and checking for
+backend executables (``ffmpeg -version``) cost milliseconds to tens of
+milliseconds each, and were repeated for every frame count, fps or duration
+query and on every frame load. This module answers them from a process-wide
+cache instead:
+
+- Video metadata is keyed by the file's resolved path, size and
+  modification time, and by the probe that produced it, so an edited or
+  replaced file is re-probed automatically. Entries can be persisted to the
+  SQLite store, which makes repeated runs over the same files free as well.
+- Executable availability is keyed by name and the current PATH.
+
+Author: AlexPose Team
+"""
+
+import json
+import shutil
+import subprocess
+import threading
+from fractions import Fraction
+from os import environ
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from loguru import logger
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+METADATA_SOURCES = ("ffprobe", "opencv")
+
+
+class VideoMetadataError(Exception):
+    """Exception raised for video metadata probing errors."""
+    pass
+
+
+# Capability checks keyed by (executable, run check, PATH)
+_capabilities: Dict[Tuple[str, bool, str], bool] = {}
+_capabilities_lock = threading.Lock()
+
+
+def executable_available(name: str, verify: bool = False) -> bool:
+    """
+    Check if an executable is available, caching the answer per PATH.
+
+    Args:
+        name: Executable name (e.g. "ffmpeg", "ffprobe")
+        verify: Also run ``<name> -version`` once to check it works
+
+    Returns:
+        True if the executable is available
+    """
+    key = (name, verify, environ.get("PATH", ""))
+    cached = _capabilities.get(key)
+    if cached is not None:
+        return cached
+
+    with _capabilities_lock:
+        cached = _capabilities.get(key)
+        if cached is not None:
+            return cached
+
+        available = shutil.which(name) is not None
+        if available and verify:
+            try:
+                result = subprocess.run([name, "-version"], capture_output=True, timeout=10)
+                available = result.returncode == 0
+            except (OSError, subprocess.TimeoutExpired):
+                available = False
+        _capabilities[key] = available
+        return available
+
+
+def clear_capability_cache() -> None:
+    """Forget cached executable checks."""
+    with _capabilities_lock:
+        _capabilities.clear()
+
+
+def probe_video_info_ffprobe(video_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Probe video metadata with ffprobe (uncached).
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        Dictionary with duration, frame_count, width, height, fps, codec,
+        format and size_bytes
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "quiet",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        str(video_path)
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise VideoMetadataError(f"FFprobe failed: {e}")
+    if result.returncode != 0:
+        raise VideoMetadataError(f"FFprobe failed: {result.stderr}")
+
+    probe_data = json.loads(result.stdout)
+
+    # Find video stream
+    video_stream = None
+    for stream in probe_data.get("streams", []):
+        if stream.get("codec_type") == "video":
+            video_stream = stream
+            break
+
+    if not video_stream:
+        raise VideoMetadataError("No video stream found")
+
+    format_info = probe_data.get("format", {})
+
+    try:
+        fps = float(Fraction(video_stream.get("r_frame_rate", "0/1")))
+    except (ValueError, ZeroDivisionError):
+        fps = 0.0
+
+    return {
+        "duration": float(format_info.get("duration", 0)),
+        "frame_count": int(video_stream.get("nb_frames", 0)),
+        "width": int(video_stream.get("width", 0)),
+        "height": int(video_stream.get("height", 0)),
+        "fps": fps,
+        "codec": video_stream.get("codec_name", "unknown"),
+        "format": format_info.get("format_name", "unknown"),
+        "size_bytes": int(format_info.get("size", 0))
+    }
+
+
+def probe_video_info_opencv(video_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Probe video metadata with OpenCV (uncached).
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        Dictionary with the same keys as probe_video_info_ffprobe
+    """
+    if cv2 is None:
+        raise VideoMetadataError("OpenCV is not available")
+
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise VideoMetadataError(f"Could not open video: {video_path}")
+
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        duration = frame_count / fps if fps > 0 else 0
+
+        return {
+            "duration": duration,
+            "frame_count": frame_count,
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "codec": "unknown",  # OpenCV doesn't provide codec info easily
+            "format": "unknown",
+            "size_bytes": Path(video_path).stat().st_size
+        }
+    finally:
+        cap.release()
+
+
+_PROBES: Dict[str, Callable[[Union[str, Path]], Dict[str, Any]]] = {
+    "ffprobe": probe_video_info_ffprobe,
+    "opencv": probe_video_info_opencv,
+}
+
+
+class VideoMetadataCache:
+    """
+    Process-wide cache of probed video metadata.
+
+    Lookups stat the file and return the cached metadata if its size and
+    modification time are unchanged; otherwise the persistent store is
+    consulted and, failing that, the video is probed once. Callers receive
+    copies, so modifying a result never affects the cache.
+    """
+
+    def __init__(self, storage: Optional[Any] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            storage: Optional SQLiteStorage used to persist metadata
+        """
+        self.storage = storage
+        self._entries: Dict[Tuple[str, str], Tuple[int, int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._persistent_hits = 0
+
+    def set_storage(self, storage: Optional[Any]) -> None:
+        """Set (or clear, with None) the SQLite store used for persistence."""
+        self.storage = storage
+
+    def get(
+        self,
+        video_path: Union[str, Path],
+        source: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Get metadata for a video, probing it only if not cached.
+
+        Args:
+            video_path: Path to video file
+            source: Probe to use ("ffprobe", "opencv", or "auto" for ffprobe
+                when available with OpenCV as fallback)
+
+        Returns:
+            Copy of the metadata dictionary
+        """
+        if source == "auto":
+            sources = [s for s in METADATA_SOURCES if s != "ffprobe" or executable_available("ffprobe")]
+        elif source in METADATA_SOURCES:
+            sources = [source]
+        else:
+            raise VideoMetadataError(f"Unsupported metadata source: {source}")
+
+        path = Path(video_path)
+        try:
+            stat = path.stat()
+        except OSError:
+            raise VideoMetadataError(f"Video file not found: {video_path}")
+        resolved = str(path.resolve())
+
+        errors = []
+        for name in sources:
+            try:
+                return dict(self._get(resolved, name, stat.st_size, stat.st_mtime_ns))
+            except VideoMetadataError as e:
+                errors.append(f"{name}: {e}")
+        raise VideoMetadataError(f"Could not probe {video_path} ({'; '.join(errors)})")
+
+    def _get(self, resolved: str, source: str, file_size: int, mtime_ns: int) -> Dict[str, Any]:
+        """Get metadata from memory, the persistent store, or a probe."""
+        key = (resolved, source)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == file_size and entry[1] == mtime_ns:
+            self._hits += 1
+            return entry[2]
+
+        info = None
+        if self.storage is not None:
+            try:
+                info = self.storage.get_video_metadata(resolved, source, file_size, mtime_ns)
+            except Exception as e:
+                logger.debug(f"Could not read persisted metadata for {resolved}: {e}")
+            if info is not None:
+                self._persistent_hits += 1
+
+        if info is None:
+            self._misses += 1
+            info = _PROBES[source](resolved)
+            if self.storage is not None:
+                try:
+                    self.storage.save_video_metadata(resolved, source, file_size, mtime_ns, info)
+                except Exception as e:
+                    logger.debug(f"Could not persist metadata for {resolved}: {e}")
+
+        with self._lock:
+            self._entries[key] = (file_size, mtime_ns, info)
+        return info
+
+    def invalidate(self, video_path: Optional[Union[str, Path]] = None) -> None:
+        """
+        Drop cached metadata.
+
+        Args:
+            video_path: Video to forget (None forgets all videos)
+        """
+        with self._lock:
+            if video_path is None:
+                self._entries.clear()
+            else:
+                resolved = str(Path(video_path).resolve())
+                for key in [k for k in self._entries if k[0] == resolved]:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            'entries': len(self._entries),
+            'hits': self._hits,
+            'persistent_hits': self._persistent_hits,
+            'misses': self._misses,
+            'persistent': self.storage is not None
+        }
+
+
+# Global metadata cache
+_metadata_cache = VideoMetadataCache()
+
+
+def get_metadata_cache() -> VideoMetadataCache:
+    """Get the process-wide video metadata cache."""
+    return _metadata_cache
+
+
+def get_video_metadata(video_path: Union[str, Path], source: str = "auto") -> Dict[str, Any]:
+    """
+    Get cached metadata for a video.
+
+    Args:
+        video_path: Path to video file
+        source: Probe to use ("ffprobe", "opencv" or "auto")
+
+    Returns:
+        Copy of the metadata dictionary
+    """
+    return _metadata_cache.get(video_path, source)
+
+
+def configure_metadata_persistence(storage: Optional[Any]) -> None:
+    """
+    Persist the process-wide metadata cache to a SQLite store.
+
+    Args:
+        storage: SQLiteStorage instance, or None to keep metadata in memory only
+    """
+    _metadata_cache.set_storage(storage)
@@ -22,6 +22,24 @@ try:
 except ImportError:
     cv2 = None
 
+from ambient.utils.seek_index import get_seek_index, seek_capture
+from ambient.utils.video_decoder import (
+    FFMPEG_MODES,
+    RAWPIPE_MODE,
+    FFmpegRawPipe,
+    VideoDecoderError,
+    read_frame_ffmpeg_raw,
+    read_frames_ffmpeg_raw,
+)
+from ambient.utils.parallel_decode import ParallelDecodeError, decode_frames_parallel
+from ambient.utils.video_metadata import (
+    VideoMetadataError,
+    executable_available,
+    get_video_metadata,
+    probe_video_info_ffprobe,
+    probe_video_info_opencv,
+)
+
 
 class VideoProcessingError(Exception):
     """Exception raised for video processing errors."""
@@ -36,8 +54,18 @@ class VideoProcessor:
     for robust video processing across different environments.
     """
     
-    def __init__(self):
-        """Initialize video processor with capability detection."""
+    def __init__(self, ffmpeg_mode: str = RAWPIPE_MODE):
+        """
+        Initialize video processor with capability detection.
+        
+        Args:
+            ffmpeg_mode: How FFmpeg hands frames back when no output path is
+                given ("rawpipe" streams rgb24 over stdout, "jpeg" uses temp files)
+        """
+        if ffmpeg_mode not in FFMPEG_MODES:
+            raise VideoProcessingError(f"Unsupported FFmpeg mode: {ffmpeg_mode}")
+        
+        self.ffmpeg_mode = ffmpeg_mode
         self.ffmpeg_available = self._check_ffmpeg_availability()
         self.opencv_available = cv2 is not None
         
@@ -50,22 +78,16 @@ class VideoProcessor:
         logger.info(f"Video processor initialized - FFmpeg: {self.ffmpeg_available}, OpenCV: {self.opencv_available}")
     
     def _check_ffmpeg_availability(self) -> bool:
-        """Check if FFmpeg is available on the system."""
-        try:
-            result = subprocess.run(
-                ["ffmpeg", "-version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            return result.returncode == 0
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
-            return False
+        """Check if FFmpeg is available on the system (cached per PATH)."""
+        return executable_available("ffmpeg", verify=True)
     
     def get_video_info(self, video_path: Union[str, Path]) -> Dict[str, Union[int, float, str]]:
         """
         Get video information including duration, frame count, resolution, etc.
         
+        Results come from the process-wide metadata cache, so repeated calls
+        for an unchanged file do not re-probe it.
+        
         Args:
             video_path: Path to video file
             
@@ -76,90 +98,35 @@ class VideoProcessor:
         if not video_path.exists():
             raise VideoProcessingError(f"Video file not found: {video_path}")
         
-        # Try FFmpeg first for more accurate information
-        if self.ffmpeg_available:
+        # Try FFprobe first for more accurate information
+        if self.ffmpeg_available and executable_available("ffprobe"):
             try:
-                return self._get_video_info_ffmpeg(video_path)
+                return get_video_metadata(video_path, "ffprobe")
             except Exception as e:
                 logger.warning(f"FFmpeg failed to get video info: {e}")
         
         # Fallback to OpenCV
         if self.opencv_available:
             try:
-                return self._get_video_info_opencv(video_path)
+                return get_video_metadata(video_path, "opencv")
             except Exception as e:
                 logger.warning(f"OpenCV failed to get video info: {e}")
         
         raise VideoProcessingError("Could not get video information with available tools")
     
     def _get_video_info_ffmpeg(self, video_path: Path) -> Dict[str, Union[int, float, str]]:
-        """Get video info using FFmpeg."""
-        cmd = [
-            "ffprobe",
-            "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
-            str(video_path)
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode != 0:
-            raise VideoProcessingError(f"FFprobe failed: {result.stderr}")
-        
-        import json
-        probe_data = json.loads(result.stdout)
-        
-        # Find video stream
-        video_stream = None
-        for stream in probe_data.get("streams", []):
-            if stream.get("codec_type") == "video":
-                video_stream = stream
-                break
-        
-        if not video_stream:
-            raise VideoProcessingError("No video stream found")
-        
-        format_info = probe_data.get("format", {})
-        
-        return {
-            "duration": float(format_info.get("duration", 0)),
-            "frame_count": int(video_stream.get("nb_frames", 0)),
-            "width": int(video_stream.get("width", 0)),
-            "height": int(video_stream.get("height", 0)),
-            "fps": eval(video_stream.get("r_frame_rate", "0/1")),  # Fraction to float
-            "codec": video_stream.get("codec_name", "unknown"),
-            "format": format_info.get("format_name", "unknown"),
-            "size_bytes": int(format_info.get("size", 0))
-        }
+        """Get video info using FFprobe (uncached)."""
+        try:
+            return probe_video_info_ffprobe(video_path)
+        except VideoMetadataError as e:
+            raise VideoProcessingError(str(e))
     
     def _get_video_info_opencv(self, video_path: Path) -> Dict[str, Union[int, float, str]]:
-        """Get video info using OpenCV."""
-        cap = cv2.VideoCapture(str(video_path))
-        
-        if not cap.isOpened():
-            raise VideoProcessingError(f"Could not open video: {video_path}")
-        
+        """Get video info using OpenCV (uncached)."""
         try:
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            duration = frame_count / fps if fps > 0 else 0
-            
-            return {
-                "duration": duration,
-                "frame_count": frame_count,
-                "width": width,
-                "height": height,
-                "fps": fps,
-                "codec": "unknown",  # OpenCV doesn't provide codec info easily
-                "format": "unknown",
-                "size_bytes": video_path.stat().st_size
-            }
-        finally:
-            cap.release()
+            return probe_video_info_opencv(video_path)
+        except VideoMetadataError as e:
+            raise VideoProcessingError(str(e))
     
     def extract_frame(
         self,
@@ -205,6 +172,14 @@ class VideoProcessor:
         output_path: Optional[Path]
     ) -> Union[np.ndarray, Path]:
         """Extract frame using FFmpeg."""
+        if output_path is None and self.ffmpeg_mode == RAWPIPE_MODE:
+            try:
+                return read_frame_ffmpeg_raw(
+                    video_path, frame_index, seek_index=get_seek_index(video_path)
+                )
+            except VideoDecoderError as e:
+                raise VideoProcessingError(f"FFmpeg error: {e}")
+        
         if output_path is None:
             # Create temporary file
             temp_file = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
@@ -268,8 +243,8 @@ class VideoProcessor:
             raise VideoProcessingError(f"Could not open video: {video_path}")
         
         try:
-            # Set frame position
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            # Seek to the preceding keyframe and decode forward
+            seek_capture(cap, frame_index, get_seek_index(video_path))
             
             ret, frame = cap.read()
             if not ret or frame is None:
@@ -327,6 +302,15 @@ class VideoProcessor:
                 logger.warning(f"OpenCV batch extraction failed: {e}")
                 results = []
         
+        # Fallback to a single raw-pipe FFmpeg process for in-memory results
+        if not results and self.ffmpeg_available and output_dir is None \
+                and self.ffmpeg_mode == RAWPIPE_MODE and frame_indices:
+            try:
+                results = self._extract_frames_batch_rawpipe(video_path, frame_indices)
+            except Exception as e:
+                logger.warning(f"FFmpeg raw-pipe batch extraction failed: {e}")
+                results = []
+        
         # Fallback to individual FFmpeg extractions
         if not results and self.ffmpeg_available:
             for i, frame_idx in enumerate(frame_indices):
@@ -347,6 +331,143 @@ class VideoProcessor:
         
         return results
     
+    def _extract_frames_batch_rawpipe(
+        self,
+        video_path: Path,
+        frame_indices: List[int]
+    ) -> List[np.ndarray]:
+        """Extract multiple frames with one FFmpeg raw-video pipe."""
+        unique_indices = sorted(set(frame_indices))
+        decoded = {}
+        
+        with FFmpegRawPipe(video_path, frame_indices=unique_indices) as pipe:
+            for frame_idx in unique_indices:
+                frame = pipe.read()
+                if frame is None:
+                    raise VideoProcessingError(f"Could not read frame {frame_idx}")
+                decoded[frame_idx] = frame
+        
+        # Return in requested order; repeated indices share one decoded array
+        return [decoded[frame_idx] for frame_idx in frame_indices]
+    
+    def extract_frame_range(
+        self,
+        video_path: Union[str, Path],
+        start: int = 0,
+        end: Optional[int] = None,
+        step: int = 1,
+        out: Optional[np.ndarray] = None,
+        workers: int = 1
+    ) -> np.ndarray:
+        """
+        Extract a range of frames into a single (N, H, W, 3) RGB array.
+        
+        Uses one FFmpeg raw-video pipe when available, otherwise decodes
+        sequentially with OpenCV. With workers > 1, keyframe-aligned segments
+        of the range are decoded by separate processes into shared memory.
+        
+        Args:
+            video_path: Path to video file
+            start: First frame index (0-based, inclusive)
+            end: Last frame index (exclusive), None for end of video
+            step: Frame step size
+            out: Optional preallocated (N, H, W, 3) uint8 buffer
+            workers: Number of decoder processes
+            
+        Returns:
+            Array of decoded frames
+        """
+        video_path = Path(video_path)
+        if not video_path.exists():
+            raise VideoProcessingError(f"Video file not found: {video_path}")
+        
+        if workers > 1:
+            try:
+                return self._extract_frame_range_parallel(video_path, start, end, step, out, workers)
+            except ParallelDecodeError as e:
+                logger.warning(f"Parallel range extraction failed: {e}")
+        
+        if self.ffmpeg_available and self.ffmpeg_mode == RAWPIPE_MODE:
+            try:
+                return read_frames_ffmpeg_raw(video_path, start=start, end=end, step=step, out=out)
+            except Exception as e:
+                logger.warning(f"FFmpeg raw-pipe range extraction failed: {e}")
+        
+        if self.opencv_available:
+            return self._extract_frame_range_opencv(video_path, start, end, step, out)
+        
+        raise VideoProcessingError("Could not extract frame range with available tools")
+    
+    def _extract_frame_range_parallel(
+        self,
+        video_path: Path,
+        start: int,
+        end: Optional[int],
+        step: int,
+        out: Optional[np.ndarray],
+        workers: int
+    ) -> np.ndarray:
+        """Extract a range of frames with a pool of decoder processes."""
+        if end is None:
+            end = int(self.get_video_info(video_path).get("frame_count", 0))
+        indices = list(range(max(0, start), max(0, end), max(1, step)))
+        if out is not None:
+            indices = indices[:len(out)]
+            out = out[:len(indices)]
+        
+        backend = "ffmpeg" if self.ffmpeg_available and self.ffmpeg_mode == RAWPIPE_MODE else "opencv"
+        return decode_frames_parallel(video_path, indices, workers, backend=backend, out=out)
+    
+    def _extract_frame_range_opencv(
+        self,
+        video_path: Path,
+        start: int,
+        end: Optional[int],
+        step: int,
+        out: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Extract a range of frames using OpenCV sequential decoding."""
+        cap = cv2.VideoCapture(str(video_path))
+        
+        if not cap.isOpened():
+            raise VideoProcessingError(f"Could not open video: {video_path}")
+        
+        try:
+            step = max(1, step)
+            if end is None:
+                end = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            indices = range(start, max(start, end), step)
+            
+            if out is None:
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                out = np.empty((len(indices), height, width, 3), dtype=np.uint8)
+            
+            if start > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            
+            filled = 0
+            current = start
+            for frame_idx in indices:
+                if filled >= len(out):
+                    break
+                # Skip unwanted frames without decoding them to BGR
+                while current < frame_idx:
+                    if not cap.grab():
+                        return out[:filled]
+                    current += 1
+                ret, frame = cap.read()
+                if not ret or frame is None:
+                    break
+                current += 1
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out[filled])
+                filled += 1
+            
+            return out[:filled]
+            
+        finally:
+            cap.release()
+    
     def _extract_frames_batch_opencv(
         self,
         video_path: Path,
@@ -364,12 +485,16 @@ class VideoProcessor:
         try:
             # Sort indices for efficient sequential reading
             sorted_indices = sorted(enumerate(frame_indices), key=lambda x: x[1])
+            index = get_seek_index(video_path)
             
             current_frame = 0
             for original_idx, frame_idx in sorted_indices:
-                # Seek to frame if needed
-                if frame_idx != current_frame:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                # Decode forward within a GOP, seek via keyframes otherwise
+                if index is not None and not index.needs_seek(current_frame, frame_idx):
+                    while current_frame < frame_idx and cap.grab():
+                        current_frame += 1
+                elif frame_idx != current_frame:
+                    seek_capture(cap, frame_idx, index)
                     current_frame = frame_idx
                 
                 ret, frame = cap.read()
@@ -553,10 +678,16 @@ def detect_ffmpeg() -> bool:
 
 
 def get_video_info_ffmpeg(video_path: Union[str, Path]) -> Dict[str, Union[int, float, str]]:
-    """Get video info using FFmpeg."""
-    return get_video_processor()._get_video_info_ffmpeg(Path(video_path))
+    """Get cached video info probed with FFprobe."""
+    try:
+        return get_video_metadata(video_path, "ffprobe")
+    except VideoMetadataError as e:
+        raise VideoProcessingError(str(e))
 
 
 def get_video_info_opencv(video_path: Union[str, Path]) -> Dict[str, Union[int, float, str]]:
-    """Get video info using OpenCV."""
-    return get_video_processor()._get_video_info_opencv(Path(video_path))
\ No newline at end of file
+    """Get cached video info probed with OpenCV."""
+    try:
+        return get_video_metadata(video_path, "opencv")
+    except VideoMetadataError as e:
+        raise VideoProcessingError(str(e))
\ No newline at end of file
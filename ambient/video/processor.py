@@ -8,15 +8,22 @@ with OpenCV fallback.
 Author: AlexPose Team
 """
 
-import subprocess
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from loguru import logger
 
 from ambient.core.interfaces import IVideoProcessor
 from ambient.core.frame import Frame, FrameSequence
-from ambient.utils.video_utils import detect_ffmpeg, get_video_info_ffmpeg, get_video_info_opencv
+from ambient.utils.seek_index import get_seek_index, seek_capture
+from ambient.utils.video_decoder import read_frame_ffmpeg_raw
+from ambient.utils.video_metadata import executable_available
+from ambient.utils.video_utils import (
+    VideoProcessingError,
+    detect_ffmpeg,
+    get_video_info_ffmpeg,
+    get_video_info_opencv,
+)
 from ambient.video.youtube_handler import YouTubeHandler
 
 try:
@@ -72,12 +79,26 @@ class VideoProcessor(IVideoProcessor):
         if self.opencv_available:
             logger.info("OpenCV available for video processing")
     
-    def load_video(self, video_path: Union[str, Path]) -> FrameSequence:
+    def load_video(
+        self,
+        video_path: Union[str, Path],
+        decode_size: Optional[int] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None,
+        frame_rate: Optional[float] = None,
+        workers: int = 1
+    ) -> FrameSequence:
         """
         Load video as a FrameSequence.
         
         Args:
             video_path: Path to video file or YouTube URL
+            decode_size: Decode frames downscaled so the longer side is at
+                most this many pixels (e.g. a pose estimator's input_size)
+            roi: Decode only this (x, y, width, height) region of each frame
+            frame_rate: Subsample the video to this many frames per second
+                while decoding (None keeps every frame)
+            workers: Decode keyframe-aligned segments up front with this
+                many processes (1 decodes lazily on demand)
             
         Returns:
             FrameSequence object containing video frames
@@ -102,7 +123,46 @@ class VideoProcessor(IVideoProcessor):
         return FrameSequence.from_video(
             video_path=video_path,
             video_info=video_info,
-            backend=self.backend
+            backend=self.backend,
+            decode_size=decode_size,
+            roi=roi,
+            frame_rate=frame_rate,
+            workers=workers
+        )
+    
+    def extract_frames(
+        self,
+        video_path: Union[str, Path],
+        frame_rate: Optional[float] = None,
+        decode_size: Optional[int] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None,
+        workers: int = 1
+    ) -> FrameSequence:
+        """
+        Extract frames from a video at a target frame rate.
+        
+        Frames are selected by presentation timestamp before any pixels are
+        converted: OpenCV grabs skipped frames without retrieving them, and
+        FFmpeg drops them in its select filter, so unused frames never reach
+        Python. Videos whose source rate is at or below frame_rate keep all
+        their frames.
+        
+        Args:
+            video_path: Path to video file or YouTube URL
+            frame_rate: Target frames per second (None keeps every frame)
+            decode_size: Decode frames downscaled so the longer side is at
+                most this many pixels
+            roi: Decode only this (x, y, width, height) region of each frame
+            workers: Number of processes decoding the video in parallel
+            
+        Returns:
+            FrameSequence of the sampled frames
+        """
+        if frame_rate is not None and frame_rate <= 0:
+            raise ValueError(f"Frame rate must be positive, got {frame_rate}")
+        
+        return self.load_video(
+            video_path, decode_size=decode_size, roi=roi, frame_rate=frame_rate, workers=workers
         )
     
     def extract_frame(self, video_path: Union[str, Path], frame_index: int) -> Frame:
@@ -138,6 +198,9 @@ class VideoProcessor(IVideoProcessor):
         """
         Get video metadata information.
         
+        Metadata is cached per file version, so get_frame_count, get_fps and
+        get_duration do not re-probe the video.
+        
         Args:
             video_path: Path to video file
             
@@ -156,11 +219,13 @@ class VideoProcessor(IVideoProcessor):
         if not video_path.exists():
             raise FileNotFoundError(f"Video file not found: {video_path}")
         
-        # Get info using appropriate backend
-        if self.backend == "ffmpeg":
-            return get_video_info_ffmpeg(video_path)
-        else:
-            return get_video_info_opencv(video_path)
+        # Get info using appropriate backend; FFprobe falls back to OpenCV
+        if self.backend == "ffmpeg" and executable_available("ffprobe"):
+            try:
+                return get_video_info_ffmpeg(video_path)
+            except VideoProcessingError as e:
+                logger.warning(f"FFprobe failed to get video info: {e}")
+        return get_video_info_opencv(video_path)
     
     def _is_youtube_url(self, url: str) -> bool:
         """Check if URL is a YouTube URL."""
@@ -169,33 +234,11 @@ class VideoProcessor(IVideoProcessor):
     def _extract_frame_ffmpeg(self, video_path: Path, frame_index: int) -> Frame:
         """Extract frame using FFmpeg."""
         try:
-            import tempfile
-            
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
-                temp_path = temp_file.name
-            
-            # Use FFmpeg to extract specific frame
-            cmd = [
-                "ffmpeg",
-                "-i", str(video_path),
-                "-vf", f"select=eq(n\\,{frame_index})",
-                "-vframes", "1",
-                "-y",
-                temp_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                raise RuntimeError(f"FFmpeg failed: {result.stderr}")
-            
-            # Create Frame from extracted image
-            frame = Frame.from_file(temp_path)
-            
-            # Clean up temporary file
-            Path(temp_path).unlink(missing_ok=True)
-            
-            return frame
+            # Decode through a raw-video pipe, seeking via the keyframe index
+            frame_data = read_frame_ffmpeg_raw(
+                video_path, frame_index, seek_index=get_seek_index(video_path)
+            )
+            return Frame.from_array(frame_data, format="RGB")
             
         except Exception as e:
             logger.error(f"FFmpeg frame extraction failed: {e}")
@@ -217,8 +260,8 @@ class VideoProcessor(IVideoProcessor):
             if not cap.isOpened():
                 raise RuntimeError(f"Failed to open video: {video_path}")
             
-            # Set frame position
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            # Seek to the preceding keyframe and decode forward
+            seek_capture(cap, frame_index, get_seek_index(video_path))
             
             # Read frame
             ret, frame_data = cap.read()
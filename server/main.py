@@ -17,6 +17,7 @@ Author: AlexPose Team
 # Project variables
 #-------------------------
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -102,6 +103,8 @@ except ImportError as e:
 
 # Import configuration and logging
 from ambient.core.config import ConfigurationManager
+from ambient.gavd.landmarker_pool import close_landmarker_pools
+from ambient.pose.factory import close_estimator_pool, configure_estimator_pool
 from ambient.utils.logging import (
     setup_logging, 
     create_component_logger,
@@ -192,6 +195,28 @@ async def lifespan(app: FastAPI):
                       directories_created=len(created_dirs), 
                       total_directories=len(directories))
     
+    # Load pose estimators once for all requests
+    try:
+        pose_config = config_manager.config.pose_estimation
+        pool_config = pose_config.pool
+        estimator_pool = configure_estimator_pool(
+            max_instances_per_type=pool_config.max_instances_per_type,
+            idle_timeout=pool_config.idle_timeout_seconds,
+            acquire_timeout=pool_config.acquire_timeout_seconds,
+            # Requests name an estimator type; its settings come from alexpose.yaml
+            estimator_configs={
+                name: estimator.to_estimator_config()
+                for name, estimator in pose_config.estimators.items()
+            }
+        )
+        if pool_config.warm_up:
+            warmed = await asyncio.to_thread(estimator_pool.warm_up, list(pool_config.warm_up))
+            server_logger.info("Pose estimators warmed up", operation="startup",
+                              estimators=[name for name, error in warmed.items() if error is None],
+                              failed=[name for name, error in warmed.items() if error is not None])
+    except Exception as e:
+        server_logger.warning(f"Pose estimator pool warm-up failed: {e}", operation="startup")
+    
     log_system_event("server_startup_complete", "AlexPose server startup completed",
                     "server", {"directories_created": len(created_dirs)})
     
@@ -200,6 +225,8 @@ async def lifespan(app: FastAPI):
     # Shutdown
     server_logger.info("Shutting down AlexPose FastAPI server", operation="shutdown")
     log_system_event("server_shutdown", "AlexPose server shutdown initiated", "server")
+    close_estimator_pool()
+    close_landmarker_pools()
 
 
 # Create FastAPI application
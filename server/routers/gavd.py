@@ -9,6 +9,7 @@ from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, B
 from fastapi.responses import JSONResponse
 from typing import Optional, Dict, Any, List
 from pathlib import Path
+import asyncio
 import uuid
 import shutil
 from datetime import datetime
@@ -516,7 +517,8 @@ async def get_frame_pose_data(
     gavd_service = GAVDService(config_manager)
     
     try:
-        pose_data = gavd_service.get_frame_pose_data(dataset_id, sequence_id, frame_num)
+        # May re-run pose estimation, which blocks: keep it off the event loop
+        pose_data = await asyncio.to_thread(gavd_service.get_frame_pose_data, dataset_id, sequence_id, frame_num)
         
         if pose_data is None:
             raise HTTPException(status_code=404, detail="Pose data not found")
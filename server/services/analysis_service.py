@@ -14,7 +14,7 @@ from loguru import logger
 from ambient.core.config import ConfigurationManager
 from ambient.core.frame import Frame, FrameSequence
 from ambient.video.processor import VideoProcessor
-from ambient.pose.factory import PoseEstimatorFactory
+from ambient.pose.factory import PoseEstimatorFactory, get_estimator_pool
 from ambient.analysis.gait_analyzer import GaitAnalyzer
 from ambient.classification.llm_classifier import LLMClassifier
 
@@ -183,14 +183,12 @@ class AnalysisService:
             
             # Step 2: Pose estimation
             logger.info(f"Running pose estimation with {metadata['pose_estimator']}")
-            pose_estimator = self.pose_factory.create_estimator(
-                estimator_type=metadata['pose_estimator']
-            )
-            
-            # Estimate poses for all frames
-            for frame in frame_sequence.frames:
-                keypoints = pose_estimator.estimate_pose(frame)
-                frame.pose_landmarks = keypoints
+            # Loaded estimators are shared across jobs through the server-wide pool
+            with get_estimator_pool().lease(metadata['pose_estimator']) as pose_estimator:
+                # Estimate poses for all frames
+                for frame in frame_sequence.frames:
+                    keypoints = pose_estimator.estimate_pose(frame)
+                    frame.pose_landmarks = keypoints
             
             self._update_status(analysis_id, "running", "gait_analysis", 60)
             
@@ -6,6 +6,7 @@ Handles GAVD CSV file processing, pose estimation, and training data preparation
 
 from pathlib import Path
 from typing import Dict, Any, List, Optional
+import asyncio
 import json
 import shutil
 from datetime import datetime
@@ -17,8 +18,11 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from ambient.gavd.gavd_processor import GAVDProcessor, create_gavd_processor
-from ambient.gavd.pose_estimators import get_pose_estimator
 from ambient.core.config import ConfigurationManager
+from ambient.pose.factory import EstimatorPoolError, get_estimator_pool
+
+# Seconds a per-frame pose fallback waits for a pooled estimator
+POSE_FALLBACK_ACQUIRE_TIMEOUT = 2.0
 
 
 class GAVDService:
@@ -119,6 +123,7 @@ class GAVDService:
             max_sequences: Maximum number of sequences to process
             pose_estimator: Pose estimator to use
         """
+        estimator = None
         try:
             logger.info(f"Starting GAVD dataset processing for {dataset_id}")
             
@@ -136,14 +141,13 @@ class GAVDService:
                 "progress": "Initializing..."
             })
             
-            # Create pose estimator if specified
-            estimator = None
+            # Lease a loaded pose estimator from the server-wide pool if specified
             if pose_estimator and pose_estimator != "none":
                 try:
                     self.update_dataset_metadata(dataset_id, {
                         "progress": f"Loading {pose_estimator} pose estimator..."
                     })
-                    estimator = get_pose_estimator(pose_estimator)
+                    estimator = await asyncio.to_thread(get_estimator_pool().acquire, pose_estimator)
                     logger.info(f"Using pose estimator: {pose_estimator}")
                 except Exception as e:
                     logger.warning(f"Failed to load pose estimator {pose_estimator}: {str(e)}")
@@ -153,7 +157,10 @@ class GAVDService:
             processor = create_gavd_processor()
             if estimator:
                 from ambient.gavd.gavd_processor import PoseDataConverter
-                processor.data_converter = PoseDataConverter(estimator=estimator)
+                # Reprocessing, or other datasets with the same videos, reuse keypoints
+                processor.data_converter = PoseDataConverter(
+                    estimator=estimator, keypoint_cache=True, bbox_crop=True
+                )
             
             # Update progress
             self.update_dataset_metadata(dataset_id, {
@@ -169,7 +176,6 @@ class GAVDService:
             })
             
             # CRITICAL FIX: Run blocking operation in thread pool to avoid blocking event loop
-            import asyncio
             results = await asyncio.to_thread(
                 processor.process_gavd_file,
                 csv_file_path=csv_file_path,
@@ -274,6 +280,9 @@ class GAVDService:
                 "error_at": datetime.utcnow().isoformat(),
                 "progress": f"Error: {str(e)}"
             })
+        finally:
+            if estimator is not None:
+                get_estimator_pool().release(estimator)
     
     def get_dataset_results(self, dataset_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -656,7 +665,6 @@ class GAVDService:
             
             # Load and process the specific sequence
             from ambient.gavd.gavd_processor import GAVDDataLoader, PoseDataConverter
-            from ambient.gavd.pose_estimators import get_pose_estimator
             
             loader = GAVDDataLoader()
             df = loader.load_gavd_data(csv_file_path, verbose=False)
@@ -672,19 +680,29 @@ class GAVDService:
             if frame_row.empty:
                 return None
             
-            # Try to use pose estimator if available
+            # Try to use a pooled pose estimator if one is free soon
+            pool = get_estimator_pool()
             try:
-                estimator = get_pose_estimator("mediapipe")
-                converter = PoseDataConverter(estimator=estimator)
+                estimator = pool.acquire("mediapipe", timeout=POSE_FALLBACK_ACQUIRE_TIMEOUT)
+            except EstimatorPoolError as e:
+                # All estimators are busy: don't hold up the request, use placeholder keypoints
+                logger.warning(f"No pooled estimator free for pose fallback: {e}")
+                estimator = None
             except Exception:
                 # Fallback to placeholder keypoints
-                converter = PoseDataConverter()
+                estimator = None
             
-            # Convert just this frame
-            pose_frames = converter.convert_sequence_to_pose_format(
-                frame_row,
-                include_metadata=False
-            )
+            try:
+                converter = PoseDataConverter(estimator=estimator)
+                
+                # Convert just this frame
+                pose_frames = converter.convert_sequence_to_pose_format(
+                    frame_row,
+                    include_metadata=False
+                )
+            finally:
+                if estimator is not None:
+                    pool.release(estimator)
             
             if pose_frames and len(pose_frames) > 0:
                 return pose_frames[0].get('pose_keypoints_2d', [])
@@ -752,9 +770,10 @@ class GAVDService:
         if not video_path:
             return None
         
-        # Extract frame from video
+        # Extract frame from video, seeking via the persistent keyframe index
+        from ambient.utils.seek_index import get_seek_index, seek_capture
         cap = cv2.VideoCapture(str(video_path))
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num - 1)  # Convert to 0-based
+        seek_capture(cap, frame_num - 1, get_seek_index(video_path))  # Convert to 0-based
         ret, frame = cap.read()
         cap.release()
         
@@ -22,7 +22,9 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from ambient.analysis.gait_analyzer import EnhancedGaitAnalyzer
+from ambient.gavd.landmarker_pool import get_landmarker_pool_stats
 from ambient.storage.sqlite_storage import SQLiteStorage
+from ambient.utils.video_metadata import configure_metadata_persistence
 from server.services.gavd_service import GAVDService
 
 
@@ -69,6 +71,9 @@ class PoseAnalysisServiceAPI:
         )) / 'storage' / 'alexpose.db'
         self.db_storage = SQLiteStorage(db_path)
         
+        # Persist probed video metadata alongside analysis results
+        configure_metadata_persistence(self.db_storage)
+        
         logger.info("Pose analysis service initialized")
         logger.debug(f"Cache directory: {self.cache_dir}")
         logger.debug(f"Database path: {db_path}")
@@ -633,6 +638,7 @@ class PoseAnalysisServiceAPI:
                     "recent_analyses": db_results[:5] if db_results else []
                 },
                 "cache": cache_stats,
+                "landmarker_pools": get_landmarker_pool_stats(),
                 "service": {
                     "analyzer_type": type(self.analyzer).__name__,
                     "keypoint_format": "COCO_17",
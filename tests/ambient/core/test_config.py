@@ -75,6 +75,7 @@ class TestPoseEstimatorConfig:
         assert config.model_name is None
         assert config.device is None
         assert config.detector is None
+        assert config.input_size is None
     
     def test_pose_estimator_config_mediapipe(self):
         """Test PoseEstimatorConfig for MediaPipe."""
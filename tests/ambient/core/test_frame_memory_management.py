@@ -7,17 +7,20 @@ This module tests the enhanced memory management features including:
 - LRU cache management
 - Memory usage tracking
 - Batch processing with memory optimization
+- Copy-on-write frame data and memoized format conversions
 """
 
 import numpy as np
 import pytest
 import tempfile
+import threading
 import time
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 from ambient.core.frame import (
     Frame, 
+    FrameError,
     FrameSequence, 
     MemoryOptimizedFrameSequence,
     TemporaryMemorySettings,
@@ -161,6 +164,103 @@ class TestMemoryManager:
         assert restored_stats['max_loaded_frames'] == original_stats['max_loaded_frames']
 
 
+    def test_hit_miss_and_byte_accounting(self):
+        """Test that loads, hits and bytes are counted without re-summing."""
+        force_global_cleanup()
+        _memory_manager.reset_stats()
+        
+        frames = [
+            Frame.from_array(np.zeros((40, 40, 3), dtype=np.uint8))
+            for _ in range(3)
+        ]
+        for _ in range(4):
+            frames[0].load()
+        
+        stats = get_global_memory_stats()
+        assert stats['misses'] == 3
+        assert stats['hits'] == 4
+        assert stats['total_bytes'] == 3 * 40 * 40 * 3
+        assert stats['hit_rate'] == pytest.approx(4 / 7)
+        
+        frames[1].lazy_load = True
+        frames[1].unload()
+        assert get_global_memory_stats()['total_bytes'] == 2 * 40 * 40 * 3
+    
+    def test_lru_eviction_respects_hits(self):
+        """Test that a recently hit frame survives eviction."""
+        force_global_cleanup()
+        _memory_manager.reset_stats()
+        
+        with TemporaryMemorySettings(max_frames=3):
+            frames = [
+                Frame.from_array(np.zeros((10, 10, 3), dtype=np.uint8))
+                for _ in range(3)
+            ]
+            frames[0].load()  # Promote the oldest frame
+            frames.append(Frame.from_array(np.zeros((10, 10, 3), dtype=np.uint8)))
+            
+            assert frames[0].is_loaded
+            assert not frames[1].is_loaded
+            
+            stats = get_global_memory_stats()
+            assert stats['evictions'] == 1
+            assert stats['loaded_frames'] == 3
+            assert stats['total_bytes'] == 3 * 10 * 10 * 3
+    
+    def test_concurrent_hits(self):
+        """Test that hits from many threads are all counted."""
+        force_global_cleanup()
+        _memory_manager.reset_stats()
+        
+        frames = [
+            Frame.from_array(np.zeros((8, 8, 3), dtype=np.uint8))
+            for _ in range(4)
+        ]
+        
+        def worker():
+            for _ in range(500):
+                for frame in frames:
+                    frame.load()
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        stats = get_global_memory_stats()
+        assert stats['hits'] == 4 * 500 * len(frames)
+        assert stats['loaded_frames'] == len(frames)
+    
+    def test_promotion_queue_is_bounded_while_lock_is_busy(self):
+        """Test that hits drain the promotion queue once it reaches the limit."""
+        force_global_cleanup()
+        _memory_manager.reset_stats()
+        
+        frame = Frame.from_array(np.zeros((8, 8, 3), dtype=np.uint8))
+        limit = _memory_manager._PROMOTION_LIMIT
+        
+        with _memory_manager._cleanup_lock:
+            for _ in range(limit - 1):
+                frame.load()
+            assert len(_memory_manager._pending_promotions) == limit - 1
+            
+            # The hit that reaches the limit waits for the lock
+            hit = threading.Thread(target=frame.load)
+            hit.start()
+            hit.join(0.2)
+            assert hit.is_alive()
+        
+        hit.join(5.0)
+        assert not hit.is_alive()
+        assert len(_memory_manager._pending_promotions) == 0
+        assert get_global_memory_stats()['hits'] == limit
+    
+    def test_no_background_monitor_thread(self):
+        """Test that system memory is not polled from a daemon thread."""
+        assert not hasattr(_memory_manager, '_monitor_thread')
+
+
 class TestFrameSequenceMemoryManagement:
     """Test memory management in FrameSequence objects."""
     
@@ -194,7 +294,37 @@ class TestFrameSequenceMemoryManagement:
         # Most frames should be unloaded after processing
         loaded_count = sum(1 for frame in frames if frame.is_loaded)
         assert loaded_count < len(frames)
-    
+
+    def test_batch_processing_with_prefetch(self):
+        """Prefetched batch processing matches serial processing."""
+        frames = [
+            Frame.from_array(np.full((20, 20, 3), i, dtype=np.uint8))
+            for i in range(23)
+        ]
+        sequence = FrameSequence(frames=frames)
+
+        def first_pixels(batch_data, start_idx):
+            return start_idx, [int(data[0, 0, 0]) for data in batch_data]
+
+        serial = sequence.process_in_batches(first_pixels, batch_size=5)
+        prefetched = sequence.process_in_batches(first_pixels, batch_size=5, prefetch=2)
+
+        assert prefetched == serial
+        assert prefetched[-1] == (20, [20, 21, 22])
+
+    def test_prefetch_failed_batch_yields_none(self):
+        """A failing processor yields None for its batch and processing continues."""
+        frames = [Frame.from_array(np.zeros((10, 10, 3), dtype=np.uint8)) for _ in range(6)]
+        sequence = FrameSequence(frames=frames)
+        sequence.set_prefetch_depth(1)
+
+        def processor(batch_data, start_idx):
+            if start_idx == 2:
+                raise RuntimeError("inference failed")
+            return start_idx
+
+        assert sequence.process_in_batches(processor, batch_size=2) == [0, None, 4]
+
     def test_smart_preloading(self):
         """Test smart preloading around current position."""
         # Create sequence with lazy loading
@@ -221,6 +351,120 @@ class TestFrameSequenceMemoryManagement:
         assert not frames[0].is_loaded
         assert not frames[9].is_loaded
     
+    def test_preload_window_follows_direction(self):
+        """Test that forward playback preloads more frames ahead than behind."""
+        frames = [
+            Frame.from_array(np.zeros((20, 20, 3), dtype=np.uint8))
+            for _ in range(20)
+        ]
+        for frame in frames:
+            frame.lazy_load = True
+            frame.unload()
+        
+        sequence = FrameSequence(frames=frames, lazy_load=True)
+        sequence.set_preload_window(2)
+        sequence[5]
+        sequence[6]
+        
+        loaded = [i for i, frame in enumerate(frames) if frame.is_loaded]
+        assert loaded == [5, 6, 7, 8, 9]
+        
+        sequence[5]
+        loaded = [i for i, frame in enumerate(frames) if frame.is_loaded]
+        assert loaded == [2, 3, 4, 5, 6]
+    
+    def test_sequential_preload_is_incremental(self):
+        """Test that each access only touches frames entering or leaving the window."""
+        class CountingFrame(Frame):
+            checks = 0
+            
+            @property
+            def is_loaded(self):
+                CountingFrame.checks += 1
+                return self._is_loaded
+        
+        frames = [
+            CountingFrame(np.zeros((4, 4, 3), dtype=np.uint8), lazy_load=True)
+            for _ in range(500)
+        ]
+        sequence = FrameSequence(frames=frames, lazy_load=True)
+        sequence.set_preload_window(3)
+        sequence[0]
+        
+        CountingFrame.checks = 0
+        for i in range(1, len(frames)):
+            sequence[i]
+        
+        # A full sweep per access would check ~500 * 500 frames
+        assert CountingFrame.checks < 10 * len(frames)
+    
+    def test_async_preload(self):
+        """Test that neighbours are preloaded in the background."""
+        frames = [
+            Frame.from_array(np.zeros((20, 20, 3), dtype=np.uint8))
+            for _ in range(10)
+        ]
+        for frame in frames:
+            frame.lazy_load = True
+            frame.unload()
+        
+        sequence = FrameSequence(frames=frames, lazy_load=True)
+        sequence.set_preload_window(2)
+        sequence.set_async_preload(True)
+        
+        try:
+            sequence[5]
+            deadline = time.time() + 5.0
+            neighbours = [3, 4, 6, 7]
+            while time.time() < deadline and not all(frames[i].is_loaded for i in neighbours):
+                time.sleep(0.01)
+            
+            assert all(frames[i].is_loaded for i in neighbours)
+            assert not frames[0].is_loaded
+        finally:
+            sequence.close()
+        
+        assert not any(t.name == "frame-preload" and t.is_alive() for t in threading.enumerate())
+    
+    def test_async_preload_drops_frames_that_left_the_window_while_loading(self):
+        """Test that a frame finishing its preload after the window moved on is unloaded."""
+        started, release = threading.Event(), threading.Event()
+        
+        class BlockingFrame(Frame):
+            def load(self):
+                if not self._is_loaded:
+                    started.set()
+                    release.wait(5.0)
+                return super().load()
+        
+        frames = [
+            Frame(np.zeros((20, 20, 3), dtype=np.uint8), lazy_load=True)
+            for _ in range(20)
+        ]
+        frames[7] = BlockingFrame(np.zeros((20, 20, 3), dtype=np.uint8), lazy_load=True)
+        
+        sequence = FrameSequence(frames=frames, lazy_load=True)
+        sequence.set_preload_window(2)
+        sequence.set_async_preload(True)
+        
+        try:
+            sequence[5]
+            assert started.wait(5.0)
+            # Frame 7 leaves the window while it is still loading
+            sequence[15]
+            release.set()
+            
+            deadline = time.time() + 5.0
+            neighbours = [13, 14, 16, 17]
+            while time.time() < deadline and not all(frames[i].is_loaded for i in neighbours):
+                time.sleep(0.01)
+            
+            assert all(frames[i].is_loaded for i in neighbours)
+            assert not frames[7].is_loaded
+        finally:
+            release.set()
+            sequence.close()
+    
     def test_memory_optimization(self):
         """Test memory optimization functionality."""
         # Create sequence with frames
@@ -266,6 +510,77 @@ class TestFrameSequenceMemoryManagement:
         assert stats['memory_efficiency'] == 1.0  # All frames loaded
 
 
+class TestBatchTensor:
+    """Test contiguous batch tensors built from FrameSequence."""
+    
+    def _rgb_sequence(self, count=5, shape=(24, 32, 3)):
+        arrays = [
+            np.random.randint(0, 255, shape, dtype=np.uint8) for _ in range(count)
+        ]
+        return arrays, FrameSequence(frames=[Frame.from_array(a) for a in arrays])
+    
+    def test_bgr_tensor_from_loaded_frames(self):
+        arrays, sequence = self._rgb_sequence()
+        
+        tensor = sequence.load_batch_tensor(1, 3)
+        
+        assert tensor.shape == (3, 24, 32, 3)
+        assert tensor.flags['C_CONTIGUOUS']
+        for k in range(3):
+            np.testing.assert_array_equal(tensor[k], arrays[1 + k][:, :, ::-1])
+    
+    def test_reuses_out_buffer(self):
+        arrays, sequence = self._rgb_sequence()
+        buffer = np.empty((4, 24, 32, 3), dtype=np.uint8)
+        
+        first = sequence.load_batch_tensor(0, 4, out=buffer, color="RGB")
+        last = sequence.load_batch_tensor(4, 4, out=buffer, color="RGB")
+        
+        assert np.shares_memory(first, buffer) and np.shares_memory(last, buffer)
+        assert last.shape[0] == 1
+        np.testing.assert_array_equal(last[0], arrays[4])
+    
+    def test_resize(self):
+        _, sequence = self._rgb_sequence()
+        
+        tensor = sequence.load_batch_tensor(0, 2, size_hw=(12, 16))
+        
+        assert tensor.shape == (2, 12, 16, 3)
+    
+    def test_invalid_buffer(self):
+        _, sequence = self._rgb_sequence()
+        
+        with pytest.raises(FrameError):
+            sequence.load_batch_tensor(0, 4, out=np.empty((2, 24, 32, 3), dtype=np.uint8))
+        with pytest.raises(FrameError):
+            sequence.load_batch_tensor(0, 2, out=np.empty((2, 24, 32, 3), dtype=np.float32))
+        with pytest.raises(FrameError):
+            sequence.load_batch_tensor(0, 2, color="GRAY")
+    
+    def test_iter_batch_tensors_with_prefetch(self):
+        arrays, sequence = self._rgb_sequence(count=11)
+        
+        seen = []
+        for start, tensor in sequence.iter_batch_tensors(batch_size=4, color="RGB", prefetch=2):
+            for k in range(tensor.shape[0]):
+                np.testing.assert_array_equal(tensor[k], arrays[start + k])
+            seen.append((start, tensor.shape[0]))
+        
+        assert seen == [(0, 4), (4, 4), (8, 3)]
+    
+    def test_decodes_video_frames_without_loading_them(self, sample_video_file):
+        sequence = FrameSequence.from_video(sample_video_file)
+        reference = FrameSequence.from_video(sample_video_file, shared_decoder=False)
+        
+        tensor = sequence.load_batch_tensor(2, 4, color="RGB")
+        
+        assert not any(frame.is_loaded for frame in sequence.frames)
+        for k in range(4):
+            np.testing.assert_array_equal(tensor[k], reference.frames[2 + k].load())
+        sequence.close()
+
+
+
 class TestMemoryOptimizedFrameSequence:
     """Test the memory-optimized frame sequence."""
     
@@ -343,5 +658,126 @@ class TestFrameAccessStats:
         assert abs(frame.memory_usage_mb - expected_size_mb) < 0.01
 
 
+class TestFrameCopyOnWrite:
+    """Test zero-copy frame data and memoized conversions."""
+    
+    def test_array_frames_copy_and_load_writable(self):
+        """Test that array frames own a copy of the caller's array by default."""
+        test_array = np.zeros((40, 60, 3), dtype=np.uint8)
+        frame = Frame.from_array(test_array)
+        
+        data = frame.load()
+        assert not np.shares_memory(data, test_array)
+        assert data.flags.writeable
+        test_array[:] = 9
+        assert frame.load().max() == 0
+    
+    def test_in_place_consumers_modify_owned_data(self):
+        """Test that consumers drawing on load() and to_array() results keep working."""
+        frame = Frame.from_array(np.zeros((40, 60, 3), dtype=np.uint8))
+        
+        frame.load()[0, 0] = 255
+        frame.to_array()[1, 1] = 128
+        
+        assert frame.load()[0, 0, 0] == 255
+        assert frame.to_array()[1, 1, 0] == 128
+    
+    def test_decoded_frames_load_writable(self, tmp_path):
+        """Test that buffers decoded by the frame are returned writable."""
+        cv2 = pytest.importorskip("cv2")
+        image_path = tmp_path / "frame.png"
+        cv2.imwrite(str(image_path), np.zeros((40, 60, 3), dtype=np.uint8))
+        frame = Frame.from_file(image_path)
+        
+        data = frame.load()
+        data[:] = 3
+        
+        assert frame.load().max() == 3
+    
+    def test_array_frames_share_data_read_only(self):
+        """Test that copy=False exposes the caller's array as a read-only view."""
+        test_array = np.random.randint(0, 255, (40, 60, 3), dtype=np.uint8)
+        frame = Frame.from_array(test_array, copy=False)
+        
+        data = frame.load()
+        assert np.shares_memory(data, test_array)
+        assert not data.flags.writeable
+        with pytest.raises(ValueError):
+            data[0, 0, 0] = 1
+        # The caller's array stays writable
+        assert test_array.flags.writeable
+    
+    def test_writable_copies_shared_data(self):
+        """Test that writable() copies shared data once, leaving the source untouched."""
+        test_array = np.zeros((40, 60, 3), dtype=np.uint8)
+        frame = Frame.from_array(test_array, copy=False)
+        
+        buffer = frame.writable()
+        buffer[0, 0] = 255
+        
+        assert not np.shares_memory(buffer, test_array)
+        assert test_array[0, 0, 0] == 0
+        assert frame.load()[0, 0, 0] == 255
+        assert frame.writable() is buffer
+    
+    def test_copy_shares_buffer_until_written(self):
+        """Test that copies share a shared buffer and account no extra memory."""
+        test_array = np.zeros((40, 60, 3), dtype=np.uint8)
+        frame = Frame.from_array(test_array, copy=False)
+        copied = frame.copy()
+        
+        assert np.shares_memory(copied.load(), frame.load())
+        assert copied.memory_usage_mb == 0.0
+        
+        copied.writable()[:] = 7
+        assert frame.load().max() == 0
+        assert copied.memory_usage_mb == pytest.approx(test_array.nbytes / (1024 * 1024))
+    
+    def test_copy_of_owned_data_is_independent(self):
+        """Test that copies of data load() returns writable don't share it."""
+        frame = Frame.from_array(np.zeros((40, 60, 3), dtype=np.uint8))
+        copied = frame.copy()
+        
+        frame.load()[:] = 5
+        
+        assert not np.shares_memory(copied.load(), frame.load())
+        assert copied.load().max() == 0
+        assert copied.load().flags.writeable
+    
+    def test_conversions_are_memoized_and_accounted(self):
+        """Test that format and size conversions run once and count towards memory."""
+        test_array = np.random.randint(0, 255, (40, 60, 3), dtype=np.uint8)
+        frame = Frame.from_array(test_array, format="RGB")
+        base_mb = frame.memory_usage_mb
+        
+        bgr = frame.as_format("BGR")
+        np.testing.assert_array_equal(bgr, test_array[:, :, ::-1])
+        assert not bgr.flags.writeable
+        assert frame.as_format("BGR") is bgr
+        assert frame.as_format("RGB") is frame.load()
+        
+        small = frame.as_format("GRAY", (30, 20))
+        assert small.shape == (20, 30)
+        
+        expected_mb = base_mb + (bgr.nbytes + small.nbytes) / (1024 * 1024)
+        assert frame.memory_usage_mb == pytest.approx(expected_mb)
+        
+        # Modifying the frame drops stale conversions
+        frame.writable()[:] = 0
+        assert frame.as_format("BGR").max() == 0
+    
+    def test_resize_reuses_memoized_conversion(self):
+        """Test that resizing twice to the same size converts once."""
+        test_array = np.random.randint(0, 255, (40, 60, 3), dtype=np.uint8)
+        frame = Frame.from_array(test_array)
+        
+        first = frame.resize(30, 20)
+        second = frame.resize(30, 20)
+        
+        assert first.load().shape == (20, 30, 3)
+        assert np.shares_memory(first.load(), second.load())
+        assert second.memory_usage_mb == 0.0
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Tests for the array-backed PoseSequence.
+
+Tests conversion from keypoint dicts and packed arrays (including the
+zero-copy paths), lazy dict views, source dimension metadata, analyzer
+input coercion, and the memory footprint against dict lists.
+"""
+
+import sys
+
+import numpy as np
+import pytest
+
+from ambient.core.pose_sequence import PoseSequence, PoseSequenceError, poses_to_array
+
+
+def _keypoints(num_keypoints, offset=0.0):
+    return [
+        {"x": float(i) + offset, "y": float(i) * 2 + offset, "confidence": 0.5, "id": i}
+        for i in range(num_keypoints)
+    ]
+
+
+class TestPoseSequenceConstruction:
+    """Test building sequences."""
+
+    def test_from_keypoint_frames(self):
+        frames = [_keypoints(3), [], _keypoints(3, offset=10.0)]
+        poses = PoseSequence.from_keypoint_frames(frames, frame_numbers=[5, 6, 7])
+
+        assert poses.keypoints.shape == (3, 3, 3)
+        assert poses.keypoints.dtype == np.float32
+        assert poses.keypoints.flags["C_CONTIGUOUS"]
+        assert poses.counts.tolist() == [3, 0, 3]
+        assert poses.frame_numbers.tolist() == [5, 6, 7]
+        assert poses.keypoints[2, 1].tolist() == [11.0, 12.0, 0.5]
+        assert not poses.keypoints[1].any()
+
+    def test_longer_frames_are_truncated(self):
+        poses = PoseSequence.from_keypoint_frames([[], _keypoints(2), _keypoints(4)])
+
+        assert poses.num_keypoints == 2
+        assert poses.counts.tolist() == [0, 2, 2]
+
+    def test_from_poses_moves_source_dimensions_to_metadata(self):
+        frames = [_keypoints(2), _keypoints(2)]
+        for kp in frames[0]:
+            kp["source_width"] = 1280
+            kp["source_height"] = 720
+        pose_dicts = [{"frame_num": n, "keypoints": kps} for n, kps in zip([3, 4], frames)]
+
+        poses = PoseSequence.from_poses(pose_dicts, frame_key="frame_num")
+
+        assert poses.metadata == {"source_width": 1280, "source_height": 720}
+        assert poses.frame_numbers.tolist() == [3, 4]
+
+    def test_array_is_not_copied(self):
+        array = np.zeros((4, 25, 3), dtype=np.float32)
+        poses = PoseSequence(array)
+
+        assert np.shares_memory(poses.keypoints, array)
+        assert PoseSequence.coerce(poses) is poses
+
+    def test_array_protocol_honours_copy_and_dtype(self):
+        poses = PoseSequence(np.ones((2, 25, 3), dtype=np.float32))
+
+        assert np.shares_memory(np.asarray(poses), poses.keypoints)
+        assert not np.shares_memory(np.array(poses, copy=True), poses.keypoints)
+        as_float64 = np.asarray(poses, dtype=np.float64)
+        assert as_float64.dtype == np.float64
+        assert not np.shares_memory(as_float64, poses.keypoints)
+
+    def test_dense_packed_arrays_are_not_copied(self):
+        points = np.arange(2 * 3 * 3, dtype=np.float32).reshape(-1, 3)
+        poses = PoseSequence.from_packed(np.array([3, 3]), points)
+
+        assert np.shares_memory(poses.keypoints, points)
+        assert poses.keypoints[1, 0].tolist() == [9.0, 10.0, 11.0]
+
+    def test_sparse_packed_arrays(self):
+        points = np.ones((3, 3), dtype=np.float32)
+        poses = PoseSequence.from_packed(np.array([2, 0, 1]), points)
+
+        assert poses.keypoints.shape == (3, 2, 3)
+        assert poses.keypoints[:, :, 0].tolist() == [[1, 1], [0, 0], [1, 0]]
+
+    def test_invalid_input(self):
+        with pytest.raises(PoseSequenceError):
+            PoseSequence(np.zeros((4, 25, 2)))
+        with pytest.raises(PoseSequenceError):
+            PoseSequence(np.zeros((2, 3, 3)), frame_numbers=[1])
+        with pytest.raises(PoseSequenceError):
+            PoseSequence.from_packed(np.array([2]), np.zeros((3, 3)))
+
+
+class TestPoseSequenceViews:
+    """Test array views and lazy dict views."""
+
+    def test_frame_dicts_round_trip(self):
+        frames = [_keypoints(3), [], _keypoints(3, offset=1.0)]
+        poses = PoseSequence.from_keypoint_frames(frames)
+
+        assert [pose["keypoints"] for pose in poses] == frames
+        assert poses[-1] == {"frame_num": 2, "keypoints": frames[2]}
+        with pytest.raises(IndexError):
+            poses[3]
+
+    def test_slices_share_the_array(self):
+        poses = PoseSequence.from_keypoint_frames([_keypoints(2)] * 5, frame_numbers=range(10, 15))
+        part = poses[1:3]
+
+        assert isinstance(part, PoseSequence)
+        assert len(part) == 2
+        assert part.frame_numbers.tolist() == [11, 12]
+        assert np.shares_memory(part.keypoints, poses.keypoints)
+
+    def test_coordinate_views(self):
+        poses = PoseSequence.from_keypoint_frames([_keypoints(2)])
+
+        assert poses.xy.shape == (1, 2, 2)
+        assert poses.confidence.tolist() == [[0.5, 0.5]]
+        assert np.shares_memory(poses.xy, poses.keypoints)
+
+    def test_source_dimensions_on_request(self):
+        poses = PoseSequence.from_keypoint_frames(
+            [_keypoints(2)], metadata={"source_width": 640, "source_height": 480}
+        )
+
+        assert "source_width" not in poses.frame_keypoints(0)[0]
+        stamped = poses.frame_keypoints(0, include_source=True)
+        assert stamped[1]["source_width"] == 640
+        assert stamped[1]["source_height"] == 480
+
+    def test_interpolated_flags(self):
+        pose_dicts = [
+            {"frame_num": 0, "keypoints": _keypoints(2)},
+            {"frame_num": 1, "keypoints": _keypoints(2), "interpolated": True},
+            {"frame_num": 2, "keypoints": _keypoints(2)},
+        ]
+        poses = PoseSequence.from_poses(pose_dicts, frame_key="frame_num")
+
+        assert poses.interpolated.tolist() == [False, True, False]
+        assert poses[1:].interpolated.tolist() == [True, False]
+        assert [pose for pose in poses] == pose_dicts
+        with pytest.raises(PoseSequenceError):
+            PoseSequence(np.zeros((2, 3, 3)), interpolated=[True])
+
+    def test_to_dict(self):
+        poses = PoseSequence.from_keypoint_frames([_keypoints(1)], metadata={"fps": 30})
+
+        assert poses.to_dict() == {
+            "metadata": {"fps": 30},
+            "frames": [{"frame_num": 0, "keypoints": _keypoints(1)}]
+        }
+
+
+class TestPoseSequenceAnalysis:
+    """Test analyzers accept PoseSequence input."""
+
+    def test_analyzers_accept_sequences_and_dicts(self):
+        rng = np.random.default_rng(0)
+        frames = [
+            [{"x": float(x), "y": float(y), "confidence": 0.9} for x, y in rng.uniform(0, 500, (25, 2))]
+            for _ in range(40)
+        ]
+        from_dicts = poses_to_array([{"keypoints": kps} for kps in frames])
+        from_sequence = poses_to_array(PoseSequence.from_keypoint_frames(frames))
+
+        assert from_dicts.shape == (40, 25, 3)
+        assert from_dicts.dtype == np.float64
+        np.testing.assert_array_equal(from_dicts, from_sequence)
+        assert poses_to_array([]) is None
+        assert poses_to_array([{"keypoints": []}]) is None
+
+
+def _deep_size(frames):
+    """Approximate memory held by per-frame keypoint dict lists."""
+    total = sys.getsizeof(frames)
+    for kps in frames:
+        total += sys.getsizeof(kps)
+        for kp in kps:
+            total += sys.getsizeof(kp) + sum(sys.getsizeof(v) for v in kp.values())
+    return total
+
+
+class TestPoseSequenceMemory:
+    """Test the memory footprint of long sequences."""
+
+    def test_body25_sequence_is_an_order_of_magnitude_smaller(self):
+        rng = np.random.default_rng(0)
+        values = rng.uniform(0, 1000, (10000, 25, 3)).tolist()
+        frames = [
+            [{"x": x, "y": y, "confidence": c, "id": i} for i, (x, y, c) in enumerate(frame)]
+            for frame in values
+        ]
+
+        poses = PoseSequence.from_keypoint_frames(frames)
+
+        assert poses.nbytes * 10 < _deep_size(frames)
@@ -0,0 +1,258 @@
+"""
+Tests for PoseDataConverter frame extraction and estimation paths.
+"""
+
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.conftest import skip_if_no_opencv
+
+from ambient.gavd.gavd_processor import PoseDataConverter
+from ambient.gavd.pose_estimators import PoseEstimator
+from ambient.utils.seek_index import get_seek_index
+from ambient.utils.video_decoder import ffmpeg_on_path, read_frames_ffmpeg_raw
+
+
+class RecordingEstimator(PoseEstimator):
+    """Image-only estimator that records what it was given."""
+
+    def __init__(self):
+        self.arrays = []
+        self.images = []
+
+    def estimate_image_keypoints(self, image_path, model="BODY_25", bbox=None):
+        self.images.append(image_path)
+        return [{"x": 1.0, "y": 2.0, "confidence": 1.0}]
+
+    def estimate_array_keypoints(self, image, model="BODY_25", bbox=None):
+        self.arrays.append(image)
+        return [{"x": 1.0, "y": 2.0, "confidence": 1.0}]
+
+
+def _sequence_rows(url: str, frames):
+    return pd.DataFrame([
+        {
+            "seq": "s1",
+            "frame_num": f,
+            "url": url,
+            "bbox": {"left": 0, "top": 0, "width": 100, "height": 100},
+        }
+        for f in frames
+    ])
+
+
+class TestPoseDataConverterInit:
+    """Test PoseDataConverter construction."""
+
+    def test_default_mode_is_rawpipe(self, tmp_path):
+        converter = PoseDataConverter(video_cache_dir=tmp_path)
+        assert converter.ffmpeg_mode == "rawpipe"
+
+    def test_invalid_mode_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            PoseDataConverter(video_cache_dir=tmp_path, ffmpeg_mode="png")
+
+
+@skip_if_no_opencv()
+@pytest.mark.skipif(not ffmpeg_on_path(), reason="FFmpeg not available")
+class TestPerFrameFallback:
+    """Test the per-frame estimation fallback for image-only estimators."""
+
+    def _converter(self, sample_video_file, mode):
+        estimator = RecordingEstimator()
+        video_path = sample_video_file.parent / "abcdefghijk.mp4"
+        video_path.write_bytes(sample_video_file.read_bytes())
+        converter = PoseDataConverter(
+            estimator=estimator, video_cache_dir=video_path.parent, ffmpeg_mode=mode
+        )
+        return converter, estimator
+
+    def test_rawpipe_mode_passes_arrays(self, sample_video_file):
+        """Raw-pipe mode hands decoded RGB arrays to the estimator."""
+        converter, estimator = self._converter(sample_video_file, "rawpipe")
+        seq = _sequence_rows("https://www.youtube.com/watch?v=abcdefghijk", [1, 5])
+
+        frames = converter.convert_sequence_to_pose_format(seq)
+
+        assert len(frames) == 2
+        assert estimator.images == []
+        assert len(estimator.arrays) == 2
+        assert estimator.arrays[0].shape == (200, 200, 3)
+        assert estimator.arrays[0].dtype == np.uint8
+
+    def test_tracking_state_is_reset_per_sequence_and_video(self, sample_video_file):
+        """Estimators with reset() start over for each sequence and video."""
+        converter, estimator = self._converter(sample_video_file, "rawpipe")
+        other_video = sample_video_file.parent / "bcdefghijkl.mp4"
+        other_video.write_bytes(sample_video_file.read_bytes())
+        estimator.resets = 0
+        estimator.reset = lambda: setattr(estimator, "resets", estimator.resets + 1)
+
+        converter.convert_sequence_to_pose_format(
+            _sequence_rows("https://www.youtube.com/watch?v=abcdefghijk", [1, 2, 3])
+        )
+        assert estimator.resets == 1
+
+        converter.convert_sequence_to_pose_format(pd.concat([
+            _sequence_rows("https://www.youtube.com/watch?v=abcdefghijk", [1, 2]),
+            _sequence_rows("https://www.youtube.com/watch?v=bcdefghijkl", [3]),
+        ]))
+        assert estimator.resets == 3
+
+    def test_jpeg_mode_passes_image_paths(self, sample_video_file):
+        """JPEG mode keeps the temp-file image path."""
+        converter, estimator = self._converter(sample_video_file, "jpeg")
+        seq = _sequence_rows("https://www.youtube.com/watch?v=abcdefghijk", [1])
+
+        converter.convert_sequence_to_pose_format(seq)
+
+        assert estimator.arrays == []
+        assert len(estimator.images) == 1
+
+
+@skip_if_no_opencv()
+@pytest.mark.skipif(not ffmpeg_on_path(), reason="FFmpeg not available")
+class TestFrameExtractionSeeking:
+    """Test that single-frame extraction seeks through the keyframe index."""
+
+    def test_extracted_frames_match_full_decode(self, sample_video_file):
+        cv2 = pytest.importorskip("cv2")
+        converter = PoseDataConverter(video_cache_dir=sample_video_file.parent)
+        all_frames = read_frames_ffmpeg_raw(sample_video_file)
+        index = get_seek_index(sample_video_file)
+        frame_index = len(all_frames) - 1
+        assert index.keyframe_before(frame_index) > 0
+
+        frame = converter._extract_frame_array(sample_video_file, frame_index)
+        np.testing.assert_array_equal(frame, all_frames[frame_index])
+
+        image_path = converter._extract_frame_image(sample_video_file, frame_index)
+        try:
+            image = cv2.cvtColor(cv2.imread(str(image_path)), cv2.COLOR_BGR2RGB)
+        finally:
+            shutil.rmtree(image_path.parent, ignore_errors=True)
+        # JPEG is lossy, but the wrong frame would move the circle
+        assert np.abs(image.astype(int) - all_frames[frame_index]).mean() < 4
+
+
+class RangeEstimator(PoseEstimator):
+    """Estimator that supports frame-range video estimation and records calls."""
+
+    def __init__(self):
+        self.range_calls = []
+        self.video_calls = 0
+
+    def estimate_video_keypoints(self, video_path, model="BODY_25"):
+        self.video_calls += 1
+        return {"frames": [], "video_width": 200, "video_height": 200}
+
+    def estimate_video_frame_ranges(self, video_path, ranges, model="BODY_25"):
+        self.range_calls.append(list(ranges))
+        frames = {
+            i: [{"x": float(i), "y": 0.0, "confidence": 1.0, "id": 0}]
+            for start, end in ranges for i in range(start, end)
+        }
+        return {"frames": frames, "video_width": 200, "video_height": 200}
+
+
+class CroppingRangeEstimator(RangeEstimator):
+    """Range estimator that accepts subject bounding boxes."""
+
+    def __init__(self):
+        super().__init__()
+        self.bbox_calls = []
+
+    def estimate_video_frame_ranges(self, video_path, ranges, model="BODY_25", bboxes=None, crop_padding=0.25):
+        self.bbox_calls.append(bboxes)
+        return super().estimate_video_frame_ranges(video_path, ranges, model)
+
+    def cache_fingerprint(self):
+        return "cropping"
+
+
+class TestRangeAwareEstimation:
+    """Test estimating only the annotated frames of cached videos."""
+
+    URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+    def _converter(self, tmp_path):
+        (tmp_path / "abcdefghijk.mp4").write_bytes(b"cached video")
+        estimator = RangeEstimator()
+        return PoseDataConverter(estimator=estimator, video_cache_dir=tmp_path), estimator
+
+    def test_estimates_only_sequence_frames(self, tmp_path):
+        converter, estimator = self._converter(tmp_path)
+
+        frames = converter.convert_sequence_to_pose_format(_sequence_rows(self.URL, [101, 102, 103]))
+
+        assert estimator.video_calls == 0
+        assert estimator.range_calls == [[(100, 103)]]
+        assert [f["pose_keypoints_2d"][0]["x"] for f in frames] == [100.0, 101.0, 102.0]
+        assert frames[0]["pose_keypoints_2d"][0]["source_width"] == 200
+
+    def test_planned_sequences_share_one_pass(self, tmp_path):
+        converter, estimator = self._converter(tmp_path)
+        first = _sequence_rows(self.URL, [11, 12])
+        second = _sequence_rows(self.URL, [5001, 5002])
+        converter.plan_video_ranges([first, second])
+
+        converter.convert_sequence_to_pose_format(first)
+        frames = converter.convert_sequence_to_pose_format(second)
+
+        # One call covering both annotated ranges, never the frames between
+        assert estimator.range_calls == [[(10, 12), (5000, 5002)]]
+        assert frames[1]["pose_keypoints_2d"][0]["x"] == 5001.0
+
+    def test_unplanned_frames_are_estimated_later(self, tmp_path):
+        converter, estimator = self._converter(tmp_path)
+
+        converter.convert_sequence_to_pose_format(_sequence_rows(self.URL, [1, 2]))
+        converter.convert_sequence_to_pose_format(_sequence_rows(self.URL, [1, 2, 900]))
+
+        assert estimator.range_calls == [[(0, 2)], [(899, 900)]]
+
+    def test_persistent_cache_skips_inference(self, tmp_path):
+        """A second converter, e.g. on reprocessing, reads keypoints from disk."""
+        _, estimator = self._converter(tmp_path)
+        cached = PoseDataConverter(
+            estimator=estimator, video_cache_dir=tmp_path,
+            keypoint_cache=True, keypoint_cache_dir=tmp_path / "keypoints"
+        )
+        seq = _sequence_rows(self.URL, [101, 102, 103])
+
+        first = cached.convert_sequence_to_pose_format(seq)
+        again = PoseDataConverter(
+            estimator=estimator, video_cache_dir=tmp_path,
+            keypoint_cache=True, keypoint_cache_dir=tmp_path / "keypoints"
+        ).convert_sequence_to_pose_format(seq)
+
+        assert estimator.range_calls == [[(100, 103)]]
+        assert [f["pose_keypoints_2d"] for f in again] == [f["pose_keypoints_2d"] for f in first]
+
+    def test_bbox_crop_passes_annotated_bboxes(self, tmp_path):
+        (tmp_path / "abcdefghijk.mp4").write_bytes(b"cached video")
+        estimator = CroppingRangeEstimator()
+        converter = PoseDataConverter(estimator=estimator, video_cache_dir=tmp_path, bbox_crop=True)
+        first = _sequence_rows(self.URL, [11, 12])
+        second = _sequence_rows(self.URL, [41])
+        second.at[0, "bbox"] = {"left": 50, "top": 20, "width": 30, "height": 60}
+        converter.plan_video_ranges([first, second])
+
+        frames = converter.convert_sequence_to_pose_format(first)
+
+        assert sorted(estimator.bbox_calls[0]) == [10, 11, 40]
+        assert estimator.bbox_calls[0][40]["left"] == 50
+        assert frames[0]["pose_keypoints_2d"][0]["x"] == 10.0
+        assert next(iter(converter._video_range_cache)).endswith(":bbox_crop0.25")
+
+    def test_bbox_crop_needs_estimator_support(self, tmp_path):
+        converter, estimator = self._converter(tmp_path)
+        converter.bbox_crop = True
+
+        converter.convert_sequence_to_pose_format(_sequence_rows(self.URL, [1, 2]))
+
+        assert estimator.range_calls == [[(0, 2)]]
+        assert not converter._uses_bbox_crops()
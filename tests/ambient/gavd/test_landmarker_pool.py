@@ -0,0 +1,119 @@
+"""
+Tests for the reusable landmarker pool.
+
+Tests that landmarkers are created once per thread and reused, that the
+landmarkers of exited threads and of a closed pool are closed, and that
+pools are shared by configuration.
+"""
+
+import threading
+
+import pytest
+
+from ambient.gavd.landmarker_pool import (
+    LandmarkerPool,
+    LandmarkerPoolError,
+    close_landmarker_pools,
+    get_landmarker_pool,
+    get_landmarker_pool_stats,
+)
+
+
+class FakeLandmarker:
+    """Landmarker stand-in recording whether it was closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _run_in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+class TestLandmarkerPool:
+    """Test per-thread landmarker reuse."""
+
+    def test_reuses_landmarker_within_thread(self):
+        created = []
+        pool = LandmarkerPool(lambda: created.append(FakeLandmarker()) or created[-1])
+
+        assert pool.get() is pool.get()
+        assert len(created) == 1
+        stats = pool.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['active'] == 1
+
+    def test_one_landmarker_per_thread(self):
+        pool = LandmarkerPool(FakeLandmarker)
+        main = pool.get()
+        other = _run_in_thread(pool.get)
+
+        assert other is not main
+        assert pool.get_stats()['misses'] == 2
+
+        # The exited thread's landmarker is closed on the next creation
+        _run_in_thread(pool.get)
+        assert other.closed
+        assert not main.closed
+        assert pool.get_stats()['active'] == 2
+
+    def test_concurrent_hits_are_counted(self):
+        pool = LandmarkerPool(FakeLandmarker)
+
+        def worker():
+            for _ in range(1000):
+                pool.get()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = pool.get_stats()
+        assert stats['misses'] == 4
+        assert stats['hits'] == 4 * 999
+
+    def test_close_closes_all(self):
+        pool = LandmarkerPool(FakeLandmarker)
+        first = pool.get()
+        pool.close()
+
+        assert first.closed
+        assert pool.get_stats()['active'] == 0
+        assert pool.get() is not first
+
+    def test_factory_errors(self):
+        def fail():
+            raise RuntimeError("model missing")
+
+        with pytest.raises(LandmarkerPoolError):
+            LandmarkerPool(fail).get()
+
+
+class TestSharedPools:
+    """Test process-wide pools."""
+
+    def test_pools_shared_by_key(self):
+        close_landmarker_pools()
+        first = get_landmarker_pool(("image", "a.task"), FakeLandmarker, name="a")
+        second = get_landmarker_pool(("image", "a.task"), FakeLandmarker, name="a")
+        other = get_landmarker_pool(("image", "b.task"), FakeLandmarker, name="b")
+
+        assert first is second
+        assert other is not first
+
+        landmarker = first.get()
+        assert sorted(s['name'] for s in get_landmarker_pool_stats()) == ["a", "b"]
+
+        close_landmarker_pools()
+        assert landmarker.closed
+        assert get_landmarker_pool_stats() == []
@@ -0,0 +1,195 @@
+"""
+Tests for segment-parallel MediaPipe video keypoint extraction.
+
+Tests segment planning, the keypoint comparison used as the accuracy check
+against serial output, bbox-guided crop windows, and that a segment runs its
+warm-up frames through the landmarker without emitting them.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from tests.conftest import skip_if_no_opencv
+
+from ambient.gavd.pose_estimators import (
+    MEDIAPIPE_AVAILABLE,
+    BBoxCropPlan,
+    MediaPipeEstimator,
+    compare_video_keypoints,
+    merge_frame_ranges,
+    plan_video_segments,
+)
+
+
+class TestPlanVideoSegments:
+    """Test splitting videos into time segments."""
+
+    def test_even_segments(self):
+        segments = plan_video_segments(1000, 4)
+
+        assert segments == [(0, 250), (250, 500), (500, 750), (750, None)]
+
+    def test_short_videos_are_not_split(self):
+        assert plan_video_segments(200, 4) == [(0, None)]
+        assert plan_video_segments(0, 4) == [(0, None)]
+
+    def test_segment_count_limited_by_size(self):
+        segments = plan_video_segments(300, 8, min_frames_per_segment=100)
+
+        assert [start for start, _ in segments] == [0, 100, 200]
+
+
+class TestMergeFrameRanges:
+    """Test merging annotated frames into ranges."""
+
+    def test_contiguous_ranges(self):
+        assert merge_frame_ranges([7, 5, 6, 6, 20, 21]) == [(5, 8), (20, 22)]
+
+    def test_short_gaps_are_bridged(self):
+        assert merge_frame_ranges([5, 6, 20, 100], max_gap=30) == [(5, 21), (100, 101)]
+        assert merge_frame_ranges([]) == []
+
+
+class TestCompareVideoKeypoints:
+    """Test the serial/parallel accuracy check."""
+
+    def test_identical_output(self):
+        frames = [[{"x": 1.0, "y": 2.0}], [], [{"x": 3.0, "y": 4.0}]]
+        report = compare_video_keypoints(frames, frames)
+
+        assert report["detection_mismatches"] == 0
+        assert report["mean_error_px"] == 0.0
+        assert report["reference_frames"] == report["candidate_frames"] == 3
+
+    def test_reports_errors_and_mismatches(self):
+        reference = [[{"x": 0.0, "y": 0.0}], [{"x": 0.0, "y": 0.0}], []]
+        candidate = [[{"x": 3.0, "y": 4.0}], [], [{"x": 0.0, "y": 0.0}]]
+        report = compare_video_keypoints(reference, candidate)
+
+        assert report["detection_mismatches"] == 2
+        assert report["mean_error_px"] == pytest.approx(5.0)
+        assert report["max_error_px"] == pytest.approx(5.0)
+
+
+class TestBBoxCropPlan:
+    """Test crop windows around annotated subjects."""
+
+    def test_stable_size_from_largest_padded_bbox(self):
+        plan = BBoxCropPlan(
+            {10: {"left": 100, "top": 100, "width": 40, "height": 80},
+             20: {"left": 300, "top": 120, "width": 60, "height": 100}},
+            frame_width=640, frame_height=480, padding=0.25
+        )
+
+        assert (plan.width, plan.height) == (90, 150)
+        assert plan.window(10)[2:] == plan.window(20)[2:] == (90, 150)
+
+    def test_window_follows_nearest_annotation(self):
+        plan = BBoxCropPlan(
+            {10: {"left": 100, "top": 100, "width": 40, "height": 80},
+             20: {"left": 300, "top": 100, "width": 40, "height": 80}},
+            frame_width=640, frame_height=480, padding=0.0
+        )
+
+        assert plan.window(10)[:2] == (100, 100)
+        assert plan.window(14)[:2] == (100, 100)
+        assert plan.window(16)[:2] == (300, 100)
+        # Warm-up frames before the first annotation use the first bbox
+        assert plan.window(0)[:2] == (100, 100)
+
+    def test_window_stays_inside_frame(self):
+        plan = BBoxCropPlan(
+            {0: {"left": 600, "top": 450, "width": 40, "height": 30}},
+            frame_width=640, frame_height=480, padding=0.5
+        )
+
+        left, top, width, height = plan.window(0)
+        assert left + width == 640
+        assert top + height == 480
+
+    def test_requires_valid_bboxes(self):
+        with pytest.raises(ValueError):
+            BBoxCropPlan({0: {"left": 0, "top": 0, "width": 0, "height": 10}}, 640, 480)
+
+
+@skip_if_no_opencv()
+@pytest.mark.skipif(not MEDIAPIPE_AVAILABLE, reason="MediaPipe is not installed")
+class TestVideoSegment:
+    """Test estimating one segment with tracking warm-up."""
+
+    def test_warmup_frames_are_not_emitted(self, sample_video_file, tmp_path):
+        model_file = tmp_path / "model.task"
+        model_file.write_bytes(b"dummy")
+        estimator = MediaPipeEstimator(model_path=str(model_file))
+
+        with patch.object(estimator, '_get_video_landmarker') as mock_get:
+            mock_landmarker = Mock()
+            mock_result = Mock()
+            mock_result.pose_landmarks = []
+            mock_landmarker.detect_for_video.return_value = mock_result
+            mock_get.return_value = mock_landmarker
+
+            frames = estimator.estimate_video_segment(
+                sample_video_file, start=10, end=15, warmup_frames=4,
+                fps=30.0, width=200, height=200
+            )
+
+            assert len(frames) == 5
+            timestamps = [c.args[1] for c in mock_landmarker.detect_for_video.call_args_list]
+            assert timestamps == [int(i / 30.0 * 1000) for i in range(6, 15)]
+            mock_landmarker.close.assert_called_once()
+
+    def test_last_segment_reads_to_end(self, sample_video_file, tmp_path):
+        model_file = tmp_path / "model.task"
+        model_file.write_bytes(b"dummy")
+        estimator = MediaPipeEstimator(model_path=str(model_file))
+
+        with patch.object(estimator, '_get_video_landmarker') as mock_get:
+            mock_result = Mock()
+            mock_result.pose_landmarks = []
+            mock_get.return_value.detect_for_video.return_value = mock_result
+
+            frames = estimator.estimate_video_segment(
+                sample_video_file, start=12, end=None, warmup_frames=30,
+                fps=30.0, width=200, height=200
+            )
+
+            assert len(frames) == 8
+
+    def test_frame_ranges_skip_the_rest_of_the_video(self, sample_video_file, tmp_path):
+        model_file = tmp_path / "model.task"
+        model_file.write_bytes(b"dummy")
+        estimator = MediaPipeEstimator(model_path=str(model_file))
+
+        with patch.object(estimator, '_get_video_landmarker') as mock_get:
+            mock_result = Mock()
+            mock_result.pose_landmarks = []
+            mock_get.return_value.detect_for_video.return_value = mock_result
+
+            result = estimator.estimate_video_frame_ranges(
+                sample_video_file, [(2, 4), (15, 25)], warmup_frames=1
+            )
+
+            assert sorted(result["frames"]) == [2, 3] + list(range(15, 20))
+            assert mock_get.return_value.detect_for_video.call_count == 2 + 1 + 5 + 1
+
+    def test_bbox_crops_map_keypoints_back(self, sample_video_file, tmp_path):
+        model_file = tmp_path / "model.task"
+        model_file.write_bytes(b"dummy")
+        estimator = MediaPipeEstimator(model_path=str(model_file))
+        bboxes = {2: {"left": 40, "top": 50, "width": 60, "height": 80}}
+
+        with patch.object(estimator, '_get_video_landmarker') as mock_get, \
+                patch.object(estimator, '_parse_mediapipe_landmarks') as mock_parse:
+            mock_parse.side_effect = lambda result, w, h: [{"x": w / 2, "y": h / 2, "confidence": 1.0, "id": 0}]
+
+            frames = estimator.estimate_video_segment(
+                sample_video_file, start=2, end=3, warmup_frames=0,
+                fps=30.0, width=200, height=200, bboxes=bboxes, crop_padding=0.0
+            )
+
+            image = mock_get.return_value.detect_for_video.call_args.args[0]
+            assert image.width == 60
+            assert image.height == 80
+            assert frames == [[{"x": 70.0, "y": 90.0, "confidence": 1.0, "id": 0}]]
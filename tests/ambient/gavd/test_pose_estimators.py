@@ -7,8 +7,10 @@ This module includes:
 - Property-based tests using Hypothesis
 """
 
+import gc
 import pytest
 import tempfile
+import weakref
 from pathlib import Path
 from typing import List, Dict, Any
 from unittest.mock import Mock, patch, MagicMock
@@ -156,7 +158,7 @@ class TestMediaPipeEstimatorImageProcessing:
         estimator = MediaPipeEstimator(model_path=str(model_file))
         
         # Mock the landmarker to avoid needing actual MediaPipe model
-        with patch.object(estimator, '_get_image_landmarker') as mock_get:
+        with patch('ambient.gavd.pose_estimators._create_image_landmarker') as mock_get:
             mock_landmarker = Mock()
             mock_result = Mock()
             mock_landmark = Mock()
@@ -176,6 +178,45 @@ class TestMediaPipeEstimatorImageProcessing:
             # Should return 33 keypoints
             assert len(keypoints) == 33
             assert all("x" in kp and "y" in kp and "confidence" in kp for kp in keypoints)
+    
+    @pytest.mark.skipif(not CV2_AVAILABLE, reason="OpenCV not available")
+    def test_landmarker_reused_across_images(self, sample_image, tmp_path):
+        """Test that one pooled landmarker serves repeated images."""
+        model_file = tmp_path / "reuse_model.task"
+        model_file.write_bytes(b"dummy")
+        
+        estimator = MediaPipeEstimator(model_path=str(model_file))
+        
+        with patch('ambient.gavd.pose_estimators._create_image_landmarker') as mock_get:
+            mock_landmarker = Mock()
+            mock_result = Mock()
+            mock_result.pose_landmarks = []
+            mock_landmarker.detect.return_value = mock_result
+            mock_get.return_value = mock_landmarker
+            
+            for _ in range(3):
+                estimator.estimate_image_keypoints(str(sample_image))
+            
+            assert mock_get.call_count == 1
+            assert mock_landmarker.detect.call_count == 3
+            mock_landmarker.close.assert_not_called()
+            assert estimator.image_landmarker_pool.get_stats()['hits'] == 2
+    
+    @pytest.mark.skipif(not CV2_AVAILABLE, reason="OpenCV not available")
+    def test_shared_pool_does_not_keep_estimator_alive(self, sample_image, tmp_path):
+        """Test that the process-wide pool holds no reference to the estimator."""
+        model_file = tmp_path / "pool_model.task"
+        model_file.write_bytes(b"dummy")
+        
+        estimator = MediaPipeEstimator(model_path=str(model_file))
+        with patch('ambient.gavd.pose_estimators._create_image_landmarker') as mock_get:
+            mock_get.return_value.detect.return_value.pose_landmarks = []
+            estimator.estimate_image_keypoints(str(sample_image))
+        
+        estimator_ref = weakref.ref(estimator)
+        del estimator
+        gc.collect()
+        assert estimator_ref() is None
 
 
 class TestMediaPipeEstimatorVideoProcessing:
@@ -0,0 +1 @@
+"""Tests for pose estimators in ambient.pose."""
@@ -0,0 +1,252 @@
+"""
+Tests for the persistent AlphaPose worker.
+
+Tests the pipe protocol in-process, the worker client against the fake
+backend in a real subprocess (ordering, frames in flight, restart after a
+crash), AlphaPoseEstimator driving an injected fake worker, and its worker
+settings in alexpose.yaml.
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+from ambient.core.frame import Frame, FrameSequence
+from ambient.pose.alphapose_worker import (
+    MSG_FRAME,
+    MSG_KEYPOINTS,
+    MSG_QUIT,
+    MSG_READY,
+    AlphaPoseWorker,
+    AlphaPoseWorkerError,
+    FakePoseBackend,
+    decode_frame,
+    decode_keypoints,
+    encode_frame,
+    encode_keypoints,
+    read_message,
+    serve,
+    write_message,
+)
+
+cv2 = pytest.importorskip("cv2")
+
+
+def _image(value, shape=(48, 64)):
+    return np.full(shape + (3,), value, dtype=np.uint8)
+
+
+@pytest.fixture
+def fake_worker():
+    worker = AlphaPoseWorker(backend="fake", max_in_flight=3)
+    yield worker
+    worker.close()
+
+
+class TestProtocol:
+    """Test the message format and the worker loop in-process."""
+
+    def test_frame_and_keypoint_round_trip(self):
+        image = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+        np.testing.assert_array_equal(decode_frame(encode_frame(image)), image)
+
+        points = np.random.default_rng(0).random((17, 3), dtype=np.float32)
+        decoded = decode_keypoints(encode_keypoints(points))
+        np.testing.assert_array_equal(decoded, points)
+        assert decoded.flags.writeable
+
+    def test_invalid_frame(self):
+        with pytest.raises(AlphaPoseWorkerError):
+            encode_frame(np.zeros((4, 4), dtype=np.uint8))
+
+    def test_serve_answers_frames_in_order(self):
+        requests = io.BytesIO()
+        for value in (10, 0, 20):
+            write_message(requests, MSG_FRAME, encode_frame(_image(value)))
+        write_message(requests, MSG_QUIT)
+        requests.seek(0)
+        replies = io.BytesIO()
+
+        serve(FakePoseBackend(), requests, replies)
+
+        replies.seek(0)
+        assert read_message(replies)[0] == MSG_READY
+        results = []
+        for _ in range(3):
+            kind, payload = read_message(replies)
+            assert kind == MSG_KEYPOINTS
+            results.append(decode_keypoints(payload))
+        assert [len(points) for points in results] == [17, 0, 17]
+        assert results[0][0, 0] == 10.0 and results[2][0, 0] == 20.0
+
+
+class TestAlphaPoseWorker:
+    """Test the worker client against the fake backend process."""
+
+    def test_streams_frames_in_order(self, fake_worker):
+        images = [_image(value) for value in range(1, 11)]
+
+        results = list(fake_worker.estimate_many(images))
+
+        assert [points[0, 0] for points in results] == [float(v) for v in range(1, 11)]
+        assert fake_worker.info["backend"] == "fake"
+
+    def test_model_is_loaded_once(self, fake_worker):
+        fake_worker.estimate(_image(1))
+        pid = fake_worker._process.pid
+        fake_worker.estimate(_image(2))
+
+        assert fake_worker._process.pid == pid
+
+    def test_abandoned_stream_keeps_pipe_in_sync(self, fake_worker):
+        stream = fake_worker.estimate_many([_image(v) for v in (1, 2, 3, 4, 5)])
+        next(stream)
+        stream.close()
+
+        assert fake_worker.estimate(_image(7))[0, 0] == 7.0
+
+    def test_restarts_after_crash(self, fake_worker):
+        fake_worker.estimate(_image(1))
+        fake_worker._process.kill()
+        fake_worker._process.wait()
+
+        assert fake_worker.estimate(_image(3))[0, 0] == 3.0
+
+    def test_close(self, fake_worker):
+        fake_worker.start()
+        fake_worker.close()
+
+        assert not fake_worker.is_running
+
+    def test_configuration_errors(self):
+        with pytest.raises(ValueError):
+            AlphaPoseWorker(backend="openpose")
+        with pytest.raises(AlphaPoseWorkerError):
+            AlphaPoseWorker(backend="alphapose").start()
+
+
+class TestAlphaPoseEstimatorWorker:
+    """Test AlphaPoseEstimator on top of the persistent worker."""
+
+    @pytest.fixture
+    def estimator(self, tmp_path, fake_worker):
+        from ambient.pose.alphapose_estimator import AlphaPoseEstimator
+
+        root = tmp_path / "AlphaPose"
+        (root / "scripts").mkdir(parents=True)
+        (root / "scripts" / "demo_inference.py").touch()
+        return AlphaPoseEstimator(alphapose_root=root, worker=fake_worker)
+
+    def test_estimate_pose_array(self, estimator):
+        frames = [Frame.from_array(_image(v), format="RGB") for v in (5, 0, 9)]
+
+        poses = estimator.estimate_pose_array(FrameSequence(frames))
+
+        assert poses.counts.tolist() == [17, 0, 17]
+        assert poses.keypoints[2, 0].tolist() == pytest.approx([9.0, 24.0, 0.9])
+        assert not poses.metadata["errors"]
+
+    def test_estimate_pose_sequence(self, estimator):
+        frames = [Frame.from_array(_image(v), format="RGB") for v in (5, 6)]
+
+        results = estimator.estimate_pose_sequence(FrameSequence(frames))
+
+        assert [r["sequence_index"] for r in results] == [0, 1]
+        assert results[1]["keypoints"][0]["x"] == pytest.approx(6.0)
+        assert results[1]["processing_metadata"]["persistent_worker"]
+
+    def test_estimate_pose(self, estimator):
+        result = estimator.estimate_pose(Frame.from_array(_image(4), format="RGB"))
+
+        assert result["num_keypoints"] == 17
+        assert result["keypoints"][1]["x"] == pytest.approx(5.0)
+
+    def test_worker_crash_is_restarted_for_a_frame(self, estimator, fake_worker, monkeypatch):
+        estimate = fake_worker.estimate
+
+        def crash_once(image):
+            monkeypatch.setattr(fake_worker, "estimate", estimate)
+            fake_worker.close()
+            raise AlphaPoseWorkerError("AlphaPose worker pipe closed unexpectedly")
+
+        monkeypatch.setattr(fake_worker, "estimate", crash_once)
+        result = estimator.estimate_pose(Frame.from_array(_image(4), format="RGB"))
+
+        assert "error" not in result
+        assert result["keypoints"][0]["x"] == pytest.approx(4.0)
+
+    def test_worker_crash_mid_sequence_is_resumed(self, estimator, fake_worker):
+        class CrashingFrame(Frame):
+            crashed = False
+
+            def load(self):
+                if not CrashingFrame.crashed and fake_worker.is_running:
+                    CrashingFrame.crashed = True
+                    fake_worker._process.kill()
+                    fake_worker._process.wait()
+                return super().load()
+
+        frames = [Frame.from_array(_image(v), format="RGB") for v in range(1, 13)]
+        frames[11] = CrashingFrame(_image(12), format="RGB")
+        sequence = FrameSequence(frames)
+        sequence.set_batch_size(4)
+
+        poses = estimator.estimate_pose_array(sequence)
+
+        assert CrashingFrame.crashed
+        assert not poses.metadata["errors"]
+        assert poses.keypoints[:, 0, 0].tolist() == [float(v) for v in range(1, 13)]
+
+    def test_image_and_video_keypoints(self, estimator, tmp_path):
+        image_path = tmp_path / "frame.png"
+        cv2.imwrite(str(image_path), _image(8))
+        assert estimator.estimate_image_keypoints(str(image_path))[0]["x"] == pytest.approx(8.0)
+
+        video_path = tmp_path / "clip.avi"
+        writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+        for value in (0, 100, 100):
+            writer.write(_image(value))
+        writer.release()
+
+        frames = estimator.estimate_video_keypoints(video_path)
+
+        assert [len(keypoints) for keypoints in frames] == [0, 17, 17]
+
+
+class TestAlphaPoseConfiguration:
+    """Test AlphaPose worker settings from alexpose.yaml."""
+
+    def test_pool_creates_the_estimator_configured_in_yaml(self, tmp_path):
+        from ambient.core.config import ConfigurationManager
+        from ambient.pose.alphapose_estimator import AlphaPoseEstimator
+        from ambient.pose.factory import EstimatorPool
+
+        root = tmp_path / "AlphaPose"
+        (root / "scripts").mkdir(parents=True)
+        (root / "scripts" / "demo_inference.py").touch()
+        (tmp_path / "alexpose.yaml").write_text(
+            "pose_estimation:\n"
+            "  estimators:\n"
+            "    alphapose:\n"
+            f"      model_folder: \"{root}\"\n"
+            "      detector: \"tracker\"\n"
+            "      device: \"cpu\"\n"
+            "      confidence_threshold: 0.4\n"
+            "      persistent_worker: false\n"
+            "      enabled: true\n"
+        )
+        estimators = ConfigurationManager(config_dir=tmp_path).config.pose_estimation.estimators
+        pool = EstimatorPool(
+            estimator_configs={name: config.to_estimator_config() for name, config in estimators.items()}
+        )
+
+        try:
+            with pool.lease("alphapose") as estimator:
+                assert isinstance(estimator, AlphaPoseEstimator)
+                assert estimator.alphapose_root == root
+                assert not estimator.persistent_worker
+                assert (estimator.detector, estimator.device) == ("tracker", "cpu")
+                assert estimator.confidence_threshold == 0.4
+        finally:
+            pool.close()
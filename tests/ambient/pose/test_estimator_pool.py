@@ -0,0 +1,223 @@
+"""
+Tests for the server-wide pose estimator pool.
+
+Tests reuse by (type, config), the per-type instance limit, waiting for
+and replacing estimators at the limit, idle eviction, and warm-up, using a
+lightweight estimator registered with a real factory.
+"""
+
+import math
+import threading
+import time
+
+import pytest
+
+from ambient.pose.factory import EstimatorPool, EstimatorPoolError, PoseEstimatorFactory
+
+
+class FakeEstimator:
+    """Estimator that records model loads, inference and closing."""
+
+    loads = 0
+
+    def __init__(self, model="small", fail=False):
+        if fail:
+            raise RuntimeError("model file missing")
+        FakeEstimator.loads += 1
+        self.model = model
+        self.calls = 0
+        self.closed = False
+
+    def estimate_pose(self, frame):
+        self.calls += 1
+        return {"keypoints": []}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def factory():
+    factory = PoseEstimatorFactory()
+    factory.register_estimator("fake", FakeEstimator)
+    FakeEstimator.loads = 0
+    return factory
+
+
+@pytest.fixture
+def make_pool(factory):
+    pools = []
+
+    def make(**kwargs):
+        pool = EstimatorPool(factory=factory, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+class TestEstimatorPoolReuse:
+    """Test reusing loaded estimators."""
+
+    def test_released_estimator_is_reused(self, make_pool):
+        pool = make_pool()
+        with pool.lease("fake") as first:
+            pass
+        with pool.lease("FAKE") as second:
+            pass
+
+        assert second is first
+        assert FakeEstimator.loads == 1
+        stats = pool.get_stats()
+        assert (stats["hits"], stats["misses"], stats["leased"]) == (1, 1, 0)
+
+    def test_configs_are_pooled_separately(self, make_pool):
+        pool = make_pool()
+        assert EstimatorPool.pool_key("fake", {"a": 1, "b": 2}) == EstimatorPool.pool_key("fake", {"b": 2, "a": 1})
+
+        with pool.lease("fake", {"model": "small"}) as small:
+            pass
+        with pool.lease("fake", {"model": "large"}) as large:
+            pass
+
+        assert small is not large
+        assert large.model == "large"
+
+    def test_concurrent_leases_get_distinct_estimators(self, make_pool):
+        pool = make_pool()
+        first = pool.acquire("fake")
+        second = pool.acquire("fake")
+
+        assert first is not second
+        pool.release(first)
+        pool.release(second)
+
+    def test_release_resets_tracking_state(self, make_pool):
+        pool = make_pool()
+        with pool.lease("fake", {"roi_tracking": True}) as tracker:
+            tracker.roi = (10, 10, 100, 200)
+        with pool.lease("fake", {"roi_tracking": True}) as again:
+            assert again is tracker
+            assert again.roi is None
+
+    def test_failed_reset_discards_the_estimator(self, make_pool):
+        pool = make_pool()
+        with pool.lease("fake", {"roi_tracking": True}) as tracker:
+            tracker.reset = lambda: 1 / 0
+        with pool.lease("fake", {"roi_tracking": True}) as again:
+            assert again is not tracker
+        assert tracker.estimator.closed
+
+    def test_unknown_type(self, make_pool):
+        with pytest.raises(ValueError):
+            make_pool().acquire("nonexistent")
+
+    def test_failed_creation_frees_the_slot(self, make_pool):
+        pool = make_pool(max_instances_per_type=1)
+        with pytest.raises(RuntimeError):
+            pool.acquire("fake", {"fail": True})
+
+        with pool.lease("fake") as estimator:
+            assert estimator.model == "small"
+
+
+class TestEstimatorPoolLimits:
+    """Test the per-type instance limit."""
+
+    def test_acquire_times_out_at_the_limit(self, make_pool):
+        pool = make_pool(max_instances_per_type=1)
+        estimator = pool.acquire("fake")
+
+        with pytest.raises(EstimatorPoolError):
+            pool.acquire("fake", timeout=0.05)
+        pool.release(estimator)
+
+    def test_waiter_gets_the_released_estimator(self, make_pool):
+        pool = make_pool(max_instances_per_type=1)
+        estimator = pool.acquire("fake")
+        acquired = []
+
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire("fake", timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(estimator)
+        waiter.join(5)
+
+        assert acquired == [estimator]
+        assert pool.get_stats()["waits"] >= 1
+        pool.release(estimator)
+
+    def test_infinite_timeout_overrides_the_pool_default(self, make_pool):
+        pool = make_pool(max_instances_per_type=1, acquire_timeout=0.01)
+        estimator = pool.acquire("fake")
+        acquired = []
+
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire("fake", timeout=math.inf)))
+        waiter.start()
+        time.sleep(0.1)
+        pool.release(estimator)
+        waiter.join(5)
+
+        assert acquired == [estimator]
+        pool.release(estimator)
+
+    def test_idle_estimator_of_another_config_is_replaced(self, make_pool):
+        pool = make_pool(max_instances_per_type=1)
+        with pool.lease("fake", {"model": "small"}) as small:
+            pass
+        with pool.lease("fake", {"model": "large"}) as large:
+            pass
+
+        assert small.closed
+        assert not large.closed
+        assert pool.get_stats()["live"] == {"fake": 1}
+
+
+class TestEstimatorPoolLifecycle:
+    """Test idle eviction, warm-up and closing."""
+
+    def test_idle_estimators_are_evicted(self, make_pool):
+        pool = make_pool(idle_timeout=0.01)
+        with pool.lease("fake") as estimator:
+            pass
+        time.sleep(0.03)
+
+        assert pool.evict_idle() == 1
+        assert estimator.closed
+        assert pool.get_stats()["live"] == {"fake": 0}
+
+    def test_warm_up_loads_runs_and_keeps_estimators(self, make_pool):
+        pool = make_pool(idle_timeout=0.01)
+
+        results = pool.warm_up(["fake", "nonexistent"])
+
+        assert results["fake"] is None
+        assert "Unknown estimator type" in results["nonexistent"]
+        time.sleep(0.03)
+        assert pool.evict_idle() == 0
+        with pool.lease("fake") as estimator:
+            assert estimator.calls == 1
+        assert FakeEstimator.loads == 1
+
+    def test_discarded_estimator_is_closed(self, make_pool):
+        pool = make_pool()
+        estimator = pool.acquire("fake")
+        pool.release(estimator, discard=True)
+
+        assert estimator.closed
+        with pytest.raises(EstimatorPoolError):
+            pool.release(estimator)
+
+    def test_close(self, make_pool):
+        pool = make_pool()
+        leased = pool.acquire("fake")
+        with pool.lease("fake") as idle:
+            pass
+        pool.close()
+
+        assert idle.closed
+        assert not leased.closed
+        pool.release(leased)
+        assert leased.closed
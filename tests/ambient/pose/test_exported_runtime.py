@@ -0,0 +1,200 @@
+"""
+Tests for the exported-model YOLO pose runtime.
+
+Tests letterboxing, decoding of raw pose output back to image pixels,
+the export cache keyed by model hash and input size, and that the runtime
+is selected through estimator, factory and alexpose.yaml configuration.
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from ambient.pose import exported_runtime, ultralytics_estimator
+from ambient.pose.exported_runtime import (
+    ExportedPoseModel,
+    ExportedRuntimeError,
+    decode_pose_output,
+    export_model,
+    exported_model_path,
+    letterbox,
+)
+
+
+def _raw_output(detections, num_keypoints=17, anchors=10):
+    """Raw (5 + K * 3, anchors) output with one anchor per (box, score, keypoint) detection."""
+    output = np.zeros((5 + num_keypoints * 3, anchors), dtype=np.float32)
+    for anchor, (box, score, point) in enumerate(detections):
+        output[:4, anchor] = box
+        output[4, anchor] = score
+        output[5:, anchor] = np.tile([point[0], point[1], 0.9], num_keypoints)
+    return output
+
+
+class TestLetterbox:
+    """Test fitting images into the square model input."""
+
+    def test_wide_image_is_padded_vertically(self):
+        image = np.zeros((320, 640, 3), dtype=np.uint8)
+        padded, scale, pad = letterbox(image, 320)
+
+        assert padded.shape == (320, 320, 3)
+        assert scale == 0.5
+        assert pad == (0, 80)
+        assert padded[0, 0].tolist() == [114, 114, 114]
+        assert padded[160, 160].tolist() == [0, 0, 0]
+
+
+class TestDecodePoseOutput:
+    """Test decoding raw YOLO pose output."""
+
+    def test_maps_back_to_image_pixels(self):
+        output = _raw_output([((200, 160, 40, 80), 0.9, (210, 170))])
+        boxes, keypoints = decode_pose_output(output, scale=0.5, pad=(0, 80))
+
+        assert boxes.shape == (1, 5)
+        np.testing.assert_allclose(boxes[0], [360, 80, 440, 240, 0.9], rtol=1e-6)
+        assert keypoints.shape == (1, 17, 3)
+        np.testing.assert_allclose(keypoints[0, 0], [420, 180, 0.9], rtol=1e-6)
+
+    def test_threshold_and_suppression(self):
+        output = _raw_output([
+            ((100, 100, 50, 50), 0.6, (1, 1)),
+            ((102, 100, 50, 50), 0.9, (2, 2)),  # overlaps the first, higher score
+            ((300, 300, 50, 50), 0.8, (3, 3)),
+            ((500, 500, 50, 50), 0.1, (4, 4)),  # below the threshold
+        ])
+        boxes, keypoints = decode_pose_output(output, 1.0, (0, 0), conf=0.25, iou=0.5, max_det=5)
+
+        assert keypoints[:, 0, 0].tolist() == [2.0, 3.0]
+        assert decode_pose_output(output, 1.0, (0, 0), max_det=1)[1][:, 0, 0].tolist() == [2.0]
+
+    def test_no_detections(self):
+        boxes, keypoints = decode_pose_output(_raw_output([]), 1.0, (0, 0))
+
+        assert boxes.shape == (0, 5)
+        assert keypoints.shape == (0, 17, 3)
+
+
+class TestExportCache:
+    """Test the cache of exported models."""
+
+    def test_path_keyed_by_content_and_size(self, tmp_path):
+        model = tmp_path / "yolov8n-pose.pt"
+        model.write_bytes(b"weights v1")
+        first = exported_model_path(model, 640, tmp_path)
+
+        assert first.parent == tmp_path
+        assert first.name.startswith("yolov8n-pose-") and first.name.endswith("-640.onnx")
+        assert exported_model_path(model, 320, tmp_path) != first
+
+        model.write_bytes(b"weights v2")
+        assert exported_model_path(model, 640, tmp_path) != first
+
+    def test_cached_export_is_reused(self, tmp_path):
+        model = tmp_path / "yolov8n-pose.pt"
+        model.write_bytes(b"weights")
+        cached = exported_model_path(model, 640, tmp_path)
+        cached.write_bytes(b"onnx")
+
+        assert export_model(model, 640, tmp_path) == cached
+
+    def test_missing_checkpoint(self, tmp_path):
+        with pytest.raises(ExportedRuntimeError):
+            export_model(tmp_path / "missing.pt", 640, tmp_path)
+
+    def test_unsupported_runtime(self, tmp_path):
+        with pytest.raises(ExportedRuntimeError):
+            ExportedPoseModel(tmp_path / "model.onnx", runtime="tensorrt")
+
+    @pytest.mark.skipif(exported_runtime.ONNXRUNTIME_AVAILABLE, reason="ONNX Runtime is installed")
+    def test_missing_runtime(self, tmp_path):
+        with pytest.raises(ExportedRuntimeError):
+            ExportedPoseModel(tmp_path / "model.onnx", runtime="onnx")
+
+
+class FakeExportedModel:
+    """Stand-in recording how the exported model was loaded."""
+
+    def __init__(self, onnx_path, runtime, input_size, num_threads):
+        self.args = (onnx_path, runtime, input_size, num_threads)
+        self.device = "cpu"
+
+
+class TestRuntimeSelection:
+    """Test choosing the runtime through configuration."""
+
+    def test_estimator_runs_cached_export(self, tmp_path):
+        model = tmp_path / "yolov8n-pose.pt"
+        model.write_bytes(b"weights")
+        exported_model_path(model, 320, tmp_path).write_bytes(b"onnx")
+
+        with patch.object(ultralytics_estimator, "ULTRALYTICS_AVAILABLE", True), \
+                patch.object(ultralytics_estimator, "YOLO", create=True) as yolo, \
+                patch.object(ultralytics_estimator, "ExportedPoseModel", FakeExportedModel):
+            estimator = ultralytics_estimator.UltralyticsEstimator(
+                model_name=str(model), runtime="onnx", num_threads=2,
+                input_size=320, export_dir=str(tmp_path)
+            )
+
+        yolo.assert_not_called()
+        onnx_path, runtime, input_size, num_threads = estimator.model.args
+        assert onnx_path == exported_model_path(model, 320, tmp_path)
+        assert (runtime, input_size, num_threads) == ("onnx", 320, 2)
+        assert estimator.get_model_info()["runtime"] == "onnx"
+
+    def test_invalid_runtime(self):
+        with patch.object(ultralytics_estimator, "ULTRALYTICS_AVAILABLE", True):
+            with pytest.raises(ValueError):
+                ultralytics_estimator.UltralyticsEstimator(runtime="tensorrt")
+
+    def test_factory_passes_runtime_config(self):
+        from ambient.pose.factory import PoseEstimatorFactory
+
+        factory = PoseEstimatorFactory()
+        with patch("ambient.pose.factory.UltralyticsEstimator") as estimator_class:
+            factory.create_estimator(
+                "yolov8-pose", {"runtime": "onnx", "num_threads": 4, "input_size": 640}
+            )
+
+        kwargs = estimator_class.call_args.kwargs
+        assert kwargs["runtime"] == "onnx"
+        assert kwargs["num_threads"] == 4
+        assert kwargs["input_size"] == 640
+
+    def test_pool_creates_the_runtime_configured_in_yaml(self, tmp_path):
+        from ambient.core.config import ConfigurationManager
+        from ambient.pose.factory import EstimatorPool
+
+        model = tmp_path / "yolov8n-pose.pt"
+        model.write_bytes(b"weights")
+        (tmp_path / "alexpose.yaml").write_text(
+            "pose_estimation:\n"
+            "  estimators:\n"
+            "    yolov8-pose:\n"
+            f"      model_name: \"{model}\"\n"
+            "      input_size: 320\n"
+            "      runtime: \"onnx\"\n"
+            "      num_threads: 2\n"
+            "      enabled: true\n"
+        )
+        estimators = ConfigurationManager(config_dir=tmp_path).config.pose_estimation.estimators
+        pool = EstimatorPool(
+            estimator_configs={name: config.to_estimator_config() for name, config in estimators.items()}
+        )
+
+        with patch.object(ultralytics_estimator, "ULTRALYTICS_AVAILABLE", True), \
+                patch.object(ultralytics_estimator, "YOLO", create=True), \
+                patch.object(ultralytics_estimator, "ExportedPoseModel", FakeExportedModel), \
+                patch.object(ultralytics_estimator, "export_model", return_value=tmp_path / "model.onnx") as export:
+            estimator = pool.acquire("yolov8-pose")
+
+        try:
+            export.assert_called_once_with(str(model), 320, None)
+            onnx_path, runtime, input_size, num_threads = estimator.model.args
+            assert (runtime, input_size, num_threads) == ("onnx", 320, 2)
+            assert estimator.input_size == 320
+        finally:
+            pool.release(estimator)
+            pool.close()
@@ -0,0 +1,286 @@
+"""
+Tests for keyframe-only pose estimation.
+
+Tests keypoint interpolation (linear, cubic, confidence gating, gaps),
+the adaptive keyframe schedule, the IPoseEstimator wrapper on a synthetic
+walking sequence and through the factory and alexpose.yaml, the accuracy report, and
+interpolation weighting in TemporalAnalyzer.
+"""
+
+import numpy as np
+import pytest
+
+from ambient.analysis.temporal_analyzer import TemporalAnalyzer
+from ambient.core.config import ConfigurationManager
+from ambient.core.frame import Frame, FrameSequence
+from ambient.core.pose_sequence import PoseSequence
+from ambient.pose.factory import EstimatorPool, PoseEstimatorFactory
+from ambient.pose.keyframe_estimation import (
+    KeyframeEstimationError,
+    KeyframePoseEstimator,
+    interpolate_keypoints,
+    keyframe_accuracy_report,
+)
+
+
+def _walking_keypoints(num_frames=120, num_keypoints=17, period=30.0):
+    """Keypoints swinging sinusoidally around a body translating across the frame."""
+    t = np.arange(num_frames)[:, None]
+    k = np.arange(num_keypoints)[None, :]
+    keypoints = np.empty((num_frames, num_keypoints, 3), dtype=np.float32)
+    keypoints[..., 0] = 100 + 2 * t + 5 * k + 20 * np.sin(2 * np.pi * t / period + k)
+    keypoints[..., 1] = 50 + 10 * k + 10 * np.cos(2 * np.pi * t / period + k)
+    keypoints[..., 2] = 0.9
+    return keypoints
+
+
+class FakeEstimator:
+    """Estimator that reads keypoints from frame metadata and counts calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def estimate_pose(self, frame):
+        self.calls.append(frame.metadata["index"])
+        points = frame.metadata["points"]
+        return {
+            "keypoints": [{"x": float(x), "y": float(y), "confidence": float(c)} for x, y, c in points]
+        }
+
+    def estimate_pose_sequence(self, sequence):
+        return [self.estimate_pose(frame) for frame in sequence.frames]
+
+    def get_estimator_name(self):
+        return "fake"
+
+    def get_keypoint_format(self):
+        return "COCO_17"
+
+    def is_available(self):
+        return True
+
+
+def _sequence(keypoints):
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    return FrameSequence([
+        Frame(image, metadata={"index": i, "points": points}) for i, points in enumerate(keypoints)
+    ])
+
+
+class TestInterpolateKeypoints:
+    """Test per-keypoint interpolation between keyframes."""
+
+    def test_linear_fills_between_keyframes(self):
+        keypoints = _walking_keypoints(9)
+        estimated = np.zeros(9, dtype=bool)
+        estimated[[0, 4, 8]] = True
+
+        filled = interpolate_keypoints(keypoints, estimated)
+
+        np.testing.assert_allclose(filled[2, :, :2], (keypoints[0, :, :2] + keypoints[4, :, :2]) / 2, rtol=1e-5)
+        np.testing.assert_array_equal(filled[estimated], keypoints[estimated])
+        assert np.allclose(filled[..., 2], 0.9)
+
+    def test_cubic_is_exact_for_smooth_motion_where_linear_is_not(self):
+        keypoints = _walking_keypoints(61)
+        estimated = np.zeros(61, dtype=bool)
+        estimated[::4] = True
+        estimated[-1] = True
+
+        errors = {}
+        for method in ("linear", "cubic"):
+            filled = interpolate_keypoints(keypoints, estimated, method=method)
+            errors[method] = np.abs(filled[..., :2] - keypoints[..., :2]).mean()
+
+        assert errors["cubic"] < errors["linear"] / 2
+
+    def test_low_confidence_keyframes_are_not_anchors(self):
+        keypoints = _walking_keypoints(9)
+        keypoints[4, 3, 2] = 0.1
+        estimated = np.zeros(9, dtype=bool)
+        estimated[[0, 4, 8]] = True
+
+        filled = interpolate_keypoints(keypoints, estimated, min_confidence=0.3)
+
+        # Keypoint 3 is interpolated straight from frame 0 to frame 8
+        np.testing.assert_allclose(filled[2, 3, 0], keypoints[0, 3, 0] + (keypoints[8, 3, 0] - keypoints[0, 3, 0]) / 4, rtol=1e-5)
+        # The estimated low-confidence keypoint itself is kept
+        assert filled[4, 3, 2] == pytest.approx(0.1)
+
+    def test_no_extrapolation_and_max_gap(self):
+        keypoints = _walking_keypoints(12)
+        estimated = np.zeros(12, dtype=bool)
+        estimated[[2, 4, 10]] = True
+
+        filled = interpolate_keypoints(keypoints, estimated, max_gap=3)
+
+        assert not filled[[0, 1, 11]].any()
+        assert filled[3, :, 2].min() > 0
+        assert not filled[5:10].any()
+
+    def test_unknown_method(self):
+        with pytest.raises(KeyframeEstimationError):
+            interpolate_keypoints(np.zeros((2, 1, 3)), np.ones(2, dtype=bool), method="quintic")
+
+
+class TestKeyframeSchedule:
+    """Test the adaptive keyframe schedule."""
+
+    def test_fixed_stride(self):
+        estimator = KeyframePoseEstimator(None, initial_stride=4, max_stride=4, adaptive=False)
+        keypoints = _walking_keypoints(10)
+
+        results = estimator.schedule(10, lambda i: keypoints[i])
+
+        assert sorted(results) == [0, 4, 8, 9]
+
+    def test_still_sequences_grow_the_stride(self):
+        estimator = KeyframePoseEstimator(None, initial_stride=2, max_stride=16)
+        still = np.tile(_walking_keypoints(1), (100, 1, 1))
+
+        results = estimator.schedule(100, lambda i: still[i])
+
+        assert len(results) < 100 / 8
+
+    def test_fast_motion_is_bisected(self):
+        estimator = KeyframePoseEstimator(None, initial_stride=8, max_stride=8, motion_high=0.05)
+        keypoints = _walking_keypoints(64, period=8.0)
+
+        results = estimator.schedule(64, lambda i: keypoints[i])
+
+        assert len(results) > 64 / 4
+
+    def test_missing_detections_are_refined_down_to_min_stride(self):
+        estimator = KeyframePoseEstimator(None, initial_stride=8, min_stride=2, max_stride=8)
+        keypoints = _walking_keypoints(17, period=1000.0)
+
+        results = estimator.schedule(17, lambda i: None if i == 8 else keypoints[i])
+
+        assert {6, 10}.issubset(results)
+
+    def test_invalid_strides(self):
+        with pytest.raises(KeyframeEstimationError):
+            KeyframePoseEstimator(None, initial_stride=16, max_stride=8)
+
+
+class TestKeyframePoseEstimator:
+    """Test the IPoseEstimator wrapper."""
+
+    def test_estimates_a_fraction_of_frames(self):
+        keypoints = _walking_keypoints(120)
+        inner = FakeEstimator()
+        estimator = KeyframePoseEstimator(inner, method="cubic")
+
+        poses = estimator.estimate_pose_array(_sequence(keypoints))
+
+        assert len(poses) == 120
+        assert len(inner.calls) == poses.metadata["estimated_frames"] < 60
+        assert poses.interpolated.sum() == 120 - len(inner.calls)
+        assert not poses.interpolated[inner.calls].any()
+        body = np.ptp(keypoints[..., 1], axis=1).mean()
+        assert np.abs(poses.keypoints[..., :2] - keypoints[..., :2]).mean() < 0.02 * body
+
+    def test_sequence_results_flag_interpolated_frames(self):
+        keypoints = _walking_keypoints(20)
+        estimator = KeyframePoseEstimator(FakeEstimator(), adaptive=False)
+
+        results = estimator.estimate_pose_sequence(_sequence(keypoints))
+
+        assert [r["interpolated"] for r in results[:5]] == [False, True, True, True, False]
+        assert results[2]["num_keypoints"] == 17
+        assert PoseSequence.from_poses(results).interpolated.tolist() == [r["interpolated"] for r in results]
+
+    def test_factory_wraps_configured_estimators(self):
+        factory = PoseEstimatorFactory()
+        factory.register_estimator("fake", FakeEstimator)
+
+        estimator = factory.create_estimator("fake", {"keyframe_estimation": {"max_stride": 16, "method": "cubic"}})
+
+        assert isinstance(estimator, KeyframePoseEstimator)
+        assert isinstance(estimator.estimator, FakeEstimator)
+        assert (estimator.max_stride, estimator.method) == (16, "cubic")
+        assert isinstance(factory.create_estimator("fake", {"keyframe_estimation": {"enabled": False}}), FakeEstimator)
+
+    def test_pool_wraps_estimators_enabled_in_yaml(self, tmp_path):
+        (tmp_path / "alexpose.yaml").write_text(
+            "pose_estimation:\n"
+            "  estimators:\n"
+            "    fake:\n"
+            "      keyframe_estimation:\n"
+            "        enabled: true\n"
+            "        max_stride: 16\n"
+            "        method: \"cubic\"\n"
+            "      enabled: true\n"
+        )
+        estimators = ConfigurationManager(config_dir=tmp_path).config.pose_estimation.estimators
+        factory = PoseEstimatorFactory()
+        factory.register_estimator("fake", FakeEstimator)
+        pool = EstimatorPool(
+            factory=factory,
+            estimator_configs={name: config.to_estimator_config() for name, config in estimators.items()}
+        )
+
+        try:
+            with pool.lease("fake") as estimator:
+                assert isinstance(estimator, KeyframePoseEstimator)
+                assert (estimator.max_stride, estimator.method) == (16, "cubic")
+        finally:
+            pool.close()
+
+
+class TestAccuracyReport:
+    """Test the accuracy-versus-speed report."""
+
+    def test_report_trades_accuracy_for_speed(self):
+        rows = keyframe_accuracy_report(_walking_keypoints(150))
+        fixed = {
+            (row["configuration"]["initial_stride"], row["configuration"]["method"]): row
+            for row in rows if row["configuration"].get("adaptive") is False
+        }
+
+        assert fixed[(2, "linear")]["speedup"] == pytest.approx(150 / 76)
+        assert fixed[(2, "linear")]["mean_error"] < fixed[(8, "linear")]["mean_error"]
+        assert fixed[(8, "cubic")]["mean_error"] < fixed[(8, "linear")]["mean_error"]
+        assert all(0 <= row["pck"] <= 1 and row["missing"] == 0 for row in rows)
+
+    def test_measured_keyframe_estimates(self):
+        keypoints = _walking_keypoints(60)
+        measured = KeyframePoseEstimator(FakeEstimator(), method="cubic").estimate_pose_array(_sequence(keypoints))
+
+        row = keyframe_accuracy_report(keypoints, configurations=[], measured={"cubic": measured})[0]
+
+        assert row["configuration"] == "cubic"
+        assert row["estimated_frames"] == measured.metadata["estimated_frames"]
+        assert row["speedup"] > 2
+        assert row["mean_error"] < 0.01 and row["pck"] == 1.0
+        with pytest.raises(KeyframeEstimationError):
+            keyframe_accuracy_report(keypoints[:10], configurations=[], measured={"cubic": measured})
+
+
+class TestTemporalWeighting:
+    """Test interpolated frames are down-weighted in cycle statistics."""
+
+    def test_cycles_record_interpolated_frames(self):
+        analyzer = TemporalAnalyzer(interpolated_weight=0.25)
+        interpolated = np.zeros(40, dtype=bool)
+        interpolated[10:20] = True
+        cycle = {"start_frame": 10, "end_frame": 29}
+
+        analyzer._weight_cycle(cycle, interpolated)
+
+        assert cycle["interpolated_frames"] == 10
+        assert cycle["weight"] == pytest.approx(1 - 0.75 * 0.5)
+
+    def test_weighted_duration_statistics(self):
+        analyzer = TemporalAnalyzer()
+        cycles = [
+            {"duration_seconds": 1.0, "start_frame": 0, "end_frame": 30, "foot": "left", "weight": 1.0},
+            {"duration_seconds": 2.0, "start_frame": 30, "end_frame": 90, "foot": "left", "weight": 0.5},
+        ]
+
+        timing = analyzer.analyze_cycle_timing(cycles)
+
+        assert timing["cycle_duration_mean"] == pytest.approx(4 / 3)
+        for cycle in cycles:
+            cycle["weight"] = 1.0
+        assert analyzer.analyze_cycle_timing(cycles)["cycle_duration_mean"] == pytest.approx(1.5)
@@ -0,0 +1,219 @@
+"""
+Tests for adaptive ROI tracking.
+
+Tests ROI derivation from keypoints, estimating crops after the first
+detection with keypoints mapped back to frame pixels, falling back to the
+full frame when the subject leaves the ROI or is lost, periodic
+re-detection, frame and array estimators, and factory and alexpose.yaml
+configuration.
+"""
+
+import numpy as np
+import pytest
+
+from ambient.core.config import ConfigurationManager
+from ambient.core.frame import Frame, FrameSequence
+from ambient.pose.factory import EstimatorPool, PoseEstimatorFactory
+from ambient.pose.keyframe_estimation import KeyframePoseEstimator
+from ambient.pose.roi_tracking import ROITrackingError, ROITrackingEstimator, roi_from_keypoints
+
+
+FRAME_WIDTH, FRAME_HEIGHT = 640, 480
+
+
+def _blob_keypoints(image):
+    """Corners and centre of the bright rectangle in an image, or none."""
+    ys, xs = np.nonzero(image[..., 0] > 128)
+    if len(xs) == 0:
+        return []
+    x0, x1, y0, y1 = xs.min(), xs.max(), ys.min(), ys.max()
+    corners = [(x0, y0), (x1, y0), (x0, y1), (x1, y1), ((x0 + x1) / 2, (y0 + y1) / 2)]
+    return [{"x": float(x), "y": float(y), "confidence": 0.9, "id": i} for i, (x, y) in enumerate(corners)]
+
+
+def _frame_image(x, y, width=60, height=150):
+    image = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+    if x is not None:
+        image[y:y + height, x:x + width] = 255
+    return image
+
+
+class FrameEstimator:
+    """Estimator with estimate_pose that records the image sizes it sees."""
+
+    def __init__(self):
+        self.shapes = []
+
+    def estimate_pose(self, frame):
+        image = frame.load()
+        self.shapes.append(image.shape[:2])
+        return {"keypoints": _blob_keypoints(image), "estimator": "frame"}
+
+    def get_estimator_name(self):
+        return "frame"
+
+    def get_keypoint_format(self):
+        return "BLOB_5"
+
+    def is_available(self):
+        return True
+
+
+class ArrayEstimator:
+    """Estimator with estimate_array_keypoints, like the GAVD MediaPipe estimator."""
+
+    def __init__(self, model="lite"):
+        self.model = model
+        self.shapes = []
+        self.bboxes = []
+
+    def estimate_array_keypoints(self, image, model="BODY_25", bbox=None):
+        self.shapes.append(image.shape[:2])
+        self.bboxes.append(bbox)
+        return _blob_keypoints(image)
+
+
+class TestRoiFromKeypoints:
+    """Test ROI derivation."""
+
+    def test_padded_box_of_confident_keypoints(self):
+        points = np.array([[100, 100, 0.9], [200, 300, 0.9], [600, 20, 0.1]])
+
+        assert roi_from_keypoints(points, (640, 480), padding=0.25) == (75, 50, 150, 300)
+
+    def test_clipped_to_frame_and_minimum_size(self):
+        points = np.array([[5, 470, 0.9], [10, 475, 0.9]])
+
+        assert roi_from_keypoints(points, (640, 480), min_size=96) == (0, 424, 56, 56)
+        assert roi_from_keypoints(np.zeros((2, 3)), (640, 480)) is None
+
+
+class TestROITrackingEstimator:
+    """Test tracking with crops and full-frame fallback."""
+
+    def test_crops_after_first_detection(self):
+        inner = FrameEstimator()
+        estimator = ROITrackingEstimator(inner, min_keypoints=3)
+
+        results = [estimator.estimate_pose(Frame.from_array(_frame_image(200 + 4 * i, 100))) for i in range(5)]
+
+        assert inner.shapes[0] == (FRAME_HEIGHT, FRAME_WIDTH)
+        assert all(h * w < FRAME_HEIGHT * FRAME_WIDTH / 4 for h, w in inner.shapes[1:])
+        assert results[0]["roi"] is None and results[1]["roi"] is not None
+        for i, result in enumerate(results):
+            assert result["keypoints"] == _blob_keypoints(_frame_image(200 + 4 * i, 100))
+        assert estimator.stats == {"roi_frames": 4, "full_frames": 1, "fallbacks": 0}
+
+    def test_subject_leaving_the_roi_falls_back_to_full_frame(self):
+        inner = FrameEstimator()
+        estimator = ROITrackingEstimator(inner, min_keypoints=3)
+
+        estimator.estimate_pose(Frame.from_array(_frame_image(100, 100)))
+        result = estimator.estimate_pose(Frame.from_array(_frame_image(160, 100)))
+
+        assert estimator.stats["fallbacks"] == 1
+        assert result["roi"] is None
+        assert result["keypoints"] == _blob_keypoints(_frame_image(160, 100))
+        assert inner.shapes[-1] == (FRAME_HEIGHT, FRAME_WIDTH)
+
+    def test_lost_subject_stops_tracking(self):
+        inner = FrameEstimator()
+        estimator = ROITrackingEstimator(inner, min_keypoints=3)
+
+        estimator.estimate_pose(Frame.from_array(_frame_image(100, 100)))
+        lost = estimator.estimate_pose(Frame.from_array(_frame_image(None, None)))
+
+        assert lost["keypoints"] == []
+        assert estimator.roi is None
+        estimator.estimate_pose(Frame.from_array(_frame_image(400, 200)))
+        assert inner.shapes[-1] == (FRAME_HEIGHT, FRAME_WIDTH)
+        assert estimator.roi is not None
+
+    def test_redetect_interval(self):
+        inner = FrameEstimator()
+        estimator = ROITrackingEstimator(inner, min_keypoints=3, redetect_interval=2)
+
+        for _ in range(6):
+            estimator.estimate_pose(Frame.from_array(_frame_image(100, 100)))
+
+        assert estimator.stats["full_frames"] == 2
+
+    def test_sequences_start_from_the_full_frame(self):
+        inner = FrameEstimator()
+        estimator = ROITrackingEstimator(inner, min_keypoints=3)
+        sequence = FrameSequence([Frame.from_array(_frame_image(100 + i, 100)) for i in range(3)])
+
+        estimator.estimate_pose_sequence(sequence)
+        results = estimator.estimate_pose_sequence(sequence)
+
+        assert [r["sequence_index"] for r in results] == [0, 1, 2]
+        assert estimator.stats["full_frames"] == 2
+
+    def test_array_estimators(self):
+        inner = ArrayEstimator()
+        estimator = ROITrackingEstimator(inner, min_keypoints=3)
+
+        first = estimator.estimate_array_keypoints(_frame_image(300, 200))
+        second = estimator.estimate_array_keypoints(_frame_image(302, 200))
+        bbox = {"left": 0, "top": 0, "width": 100, "height": 100}
+        estimator.estimate_array_keypoints(_frame_image(302, 200), bbox=bbox)
+
+        assert first == _blob_keypoints(_frame_image(300, 200))
+        assert second == _blob_keypoints(_frame_image(302, 200))
+        assert inner.shapes[1][0] < FRAME_HEIGHT
+        # An explicit bbox bypasses tracking
+        assert inner.bboxes == [None, None, bbox]
+        assert estimator.estimate_pose(Frame.from_array(_frame_image(302, 200)))["roi"] is not None
+
+    def test_untrackable_estimator(self):
+        with pytest.raises(ROITrackingError):
+            ROITrackingEstimator(object())
+
+
+class TestFactoryConfiguration:
+    """Test enabling ROI tracking per estimator."""
+
+    def test_factory_wraps_configured_estimators(self):
+        factory = PoseEstimatorFactory()
+        factory.register_estimator("array", ArrayEstimator)
+
+        tracked = factory.create_estimator("array", {"model": "full", "roi_tracking": {"padding": 0.5}})
+        plain = factory.create_estimator("array", {"roi_tracking": {"enabled": False}})
+        both = factory.create_estimator("array", {"roi_tracking": True, "keyframe_estimation": True})
+
+        assert isinstance(tracked, ROITrackingEstimator)
+        assert tracked.padding == 0.5 and tracked.estimator.model == "full"
+        assert isinstance(plain, ArrayEstimator)
+        assert isinstance(both, KeyframePoseEstimator)
+        assert isinstance(both.estimator, ROITrackingEstimator)
+
+    def test_pool_wraps_estimators_enabled_in_yaml(self, tmp_path):
+        (tmp_path / "alexpose.yaml").write_text(
+            "pose_estimation:\n"
+            "  estimators:\n"
+            "    array:\n"
+            "      roi_tracking:\n"
+            "        enabled: true\n"
+            "        padding: 0.5\n"
+            "      enabled: true\n"
+            "    plain:\n"
+            "      roi_tracking:\n"
+            "        enabled: false\n"
+            "      enabled: true\n"
+        )
+        estimators = ConfigurationManager(config_dir=tmp_path).config.pose_estimation.estimators
+        factory = PoseEstimatorFactory()
+        factory.register_estimator("array", ArrayEstimator)
+        factory.register_estimator("plain", ArrayEstimator)
+        pool = EstimatorPool(
+            factory=factory,
+            estimator_configs={name: config.to_estimator_config() for name, config in estimators.items()}
+        )
+
+        try:
+            with pool.lease("array") as tracked, pool.lease("plain") as plain:
+                assert isinstance(tracked, ROITrackingEstimator)
+                assert tracked.padding == 0.5
+                assert isinstance(plain, ArrayEstimator)
+        finally:
+            pool.close()
@@ -0,0 +1,118 @@
+"""
+Tests for streaming batch inference in UltralyticsEstimator.
+
+Tests automatic batch sizing and that streamed batches produce compact
+keypoint arrays, using a stand-in for the YOLO model so the tests run
+without Ultralytics installed.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from ambient.core.frame import Frame, FrameSequence
+from ambient.core.pose_sequence import PoseSequence
+from ambient.pose import ultralytics_estimator
+from ambient.pose.ultralytics_estimator import NUM_KEYPOINTS, choose_batch_size
+
+
+class FakeYOLO:
+    """YOLO stand-in whose first keypoint's x is the frame's mean pixel value."""
+
+    def __init__(self, path, fail_on_call=None):
+        self.device = "cpu"
+        self.calls = []
+        self.fail_on_call = fail_on_call
+
+    def __call__(self, images, stream=False, **kwargs):
+        self.calls.append({"count": len(images), "stream": stream})
+        if self.fail_on_call == len(self.calls):
+            raise RuntimeError("inference failed")
+        return (self._result(image) for image in images)
+
+    @staticmethod
+    def _result(image):
+        if image.mean() == 0:
+            return SimpleNamespace(keypoints=SimpleNamespace(data=np.zeros((0, NUM_KEYPOINTS, 3))))
+        data = np.ones((1, NUM_KEYPOINTS, 3), dtype=np.float32)
+        data[0, 0, 0] = image.mean()
+        return SimpleNamespace(keypoints=SimpleNamespace(data=data))
+
+
+@pytest.fixture
+def estimator():
+    with patch.object(ultralytics_estimator, "ULTRALYTICS_AVAILABLE", True), \
+            patch.object(ultralytics_estimator, "YOLO", FakeYOLO, create=True):
+        yield ultralytics_estimator.UltralyticsEstimator(batch_size=4, prefetch_batches=0)
+
+
+def _sequence(values):
+    frames = [Frame.from_array(np.full((48, 64, 3), v, dtype=np.uint8), format="BGR") for v in values]
+    return FrameSequence(frames)
+
+
+class TestChooseBatchSize:
+    """Test automatic batch sizing."""
+
+    def test_scales_with_available_memory(self):
+        small = choose_batch_size((720, 1280), available_bytes=256 * 1024 ** 2)
+        large = choose_batch_size((720, 1280), available_bytes=2 * 1024 ** 3)
+
+        assert 1 <= small < large
+
+    def test_larger_frames_get_smaller_batches(self):
+        memory = 2 * 1024 ** 3
+        assert choose_batch_size((2160, 3840), available_bytes=memory) < choose_batch_size((480, 640), available_bytes=memory)
+
+    def test_bounds(self):
+        assert choose_batch_size((480, 640), available_bytes=0) == 1
+        assert choose_batch_size((48, 64), available_bytes=1024 ** 4, max_batch_size=16) == 16
+
+
+class TestStreamingInference:
+    """Test streaming batches into compact arrays."""
+
+    def test_batches_stream_through_the_model(self, estimator):
+        batches = list(estimator.iter_pose_batches(_sequence([10, 20, 30, 40, 50, 60])))
+
+        assert [len(b) for b in batches] == [4, 2]
+        assert all(call["stream"] for call in estimator.model.calls)
+        assert batches[1].frame_numbers.tolist() == [4, 5]
+        assert batches[1].keypoints[:, 0, 0].tolist() == [50.0, 60.0]
+
+    def test_estimate_pose_array(self, estimator):
+        poses = estimator.estimate_pose_array(_sequence([10, 0, 30]))
+
+        assert isinstance(poses, PoseSequence)
+        assert poses.keypoints.shape == (3, NUM_KEYPOINTS, 3)
+        assert poses.keypoints.dtype == np.float32
+        assert poses.counts.tolist() == [NUM_KEYPOINTS, 0, NUM_KEYPOINTS]
+        assert poses.metadata["batch_size"] == 4
+        assert poses.metadata["errors"] == {}
+
+    def test_automatic_batch_size(self, estimator):
+        estimator.batch_size = None
+        with patch.object(ultralytics_estimator, "choose_batch_size", return_value=2) as choose:
+            poses = estimator.estimate_pose_array(_sequence([10, 20, 30]))
+
+        assert choose.call_args.args[0] == (48, 64)
+        assert poses.metadata["batch_size"] == 2
+        assert [call["count"] for call in estimator.model.calls] == [2, 1]
+
+    def test_pose_sequence_results(self, estimator):
+        results = estimator.estimate_pose_sequence(_sequence([10, 0]))
+
+        assert [r["sequence_index"] for r in results] == [0, 1]
+        assert results[0]["num_keypoints"] == NUM_KEYPOINTS
+        assert results[0]["keypoints"][0] == {"x": 10.0, "y": 1.0, "confidence": 1.0}
+        assert results[1]["keypoints"] == []
+
+    def test_failed_batches_are_reported(self, estimator):
+        estimator.model.fail_on_call = 1
+        results = estimator.estimate_pose_sequence(_sequence([10, 20, 30, 40, 50]))
+
+        assert [r.get("error") for r in results[:4]] == ["inference failed"] * 4
+        assert "error" not in results[4]
+        assert results[4]["num_keypoints"] == NUM_KEYPOINTS
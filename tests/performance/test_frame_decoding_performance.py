@@ -0,0 +1,166 @@
+"""Performance tests for frame decoding paths."""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tests.performance.benchmark_framework import PerformanceBenchmark
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    from ambient.core.frame import FrameSequence
+    from ambient.utils.seek_index import build_seek_index
+    from ambient.utils.video_decoder import ffmpeg_on_path, read_frame_ffmpeg_raw
+    AMBIENT_AVAILABLE = True
+except ImportError:
+    AMBIENT_AVAILABLE = False
+
+
+def _create_decode_test_video(video_path: Path, frame_count: int, fps: float = 30.0,
+                              size: tuple = (320, 240)) -> Path:
+    """Create a synthetic video with a moving subject for decode benchmarks."""
+    width, height = size
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(str(video_path), fourcc, fps, (width, height))
+
+    for frame_num in range(frame_count):
+        frame = np.full((height, width, 3), 30, dtype=np.uint8)
+        x = int(20 + (frame_num * 3) % (width - 40))
+        cv2.circle(frame, (x, height // 2), 15, (255, 255, 255), -1)
+        out.write(frame)
+
+    out.release()
+    return video_path
+
+
+@pytest.mark.performance
+@pytest.mark.skipif(not CV2_AVAILABLE, reason="OpenCV not available")
+@pytest.mark.skipif(not AMBIENT_AVAILABLE, reason="Ambient frame module not available")
+class TestSequentialDecodePerformance:
+    """Benchmarks for shared decoder sessions in FrameSequence."""
+
+    def setup_method(self):
+        """Set up performance testing framework."""
+        self.benchmark = PerformanceBenchmark()
+
+    def test_full_sequence_load_is_linear(self, tmp_path):
+        """Loading a whole sequence decodes each frame once and scales linearly."""
+        short_video = _create_decode_test_video(tmp_path / "short.mp4", 150)
+        long_video = _create_decode_test_video(tmp_path / "long.mp4", 600)
+
+        def load_sequence(video_path):
+            sequence = FrameSequence.from_video(video_path)
+            sequence.process_in_batches(lambda batch, start: len(batch), batch_size=16)
+            stats = sequence.decoder.get_stats()
+            sequence.close()
+            return stats
+
+        short_stats = load_sequence(short_video)
+        long_stats = load_sequence(long_video)
+
+        # One decode per frame and no re-seeking for sequential access
+        assert short_stats['frames_decoded'] == 150
+        assert long_stats['frames_decoded'] == 600
+        assert long_stats['seeks'] == 0
+
+        short_metrics = self.benchmark.benchmark_function(load_sequence, short_video)
+        long_metrics = self.benchmark.benchmark_function(load_sequence, long_video)
+
+        # 4x the frames should cost roughly 4x the time, far from the 16x of
+        # quadratic decode-from-start loading
+        ratio = long_metrics.execution_time / max(short_metrics.execution_time, 1e-3)
+        print(f"\nShared decoder: 150 frames {short_metrics.execution_time:.3f}s, "
+              f"600 frames {long_metrics.execution_time:.3f}s (ratio {ratio:.1f}x)")
+        assert ratio < 10.0, f"Full-sequence load scaled {ratio:.1f}x for 4x frames"
+
+    def test_shared_decoder_faster_than_independent(self, tmp_path):
+        """Shared sequential decoding beats per-frame independent decoding."""
+        video_path = _create_decode_test_video(tmp_path / "compare.mp4", 120)
+
+        def load_shared():
+            sequence = FrameSequence.from_video(video_path)
+            sequence.load_all()
+            sequence.close()
+
+        def load_independent():
+            sequence = FrameSequence.from_video(video_path, shared_decoder=False)
+            sequence.load_all()
+
+        shared_metrics = self.benchmark.benchmark_function(load_shared)
+        independent_metrics = self.benchmark.benchmark_function(load_independent)
+
+        print(f"\nShared: {shared_metrics.execution_time:.3f}s, "
+              f"independent: {independent_metrics.execution_time:.3f}s")
+        assert shared_metrics.execution_time <= independent_metrics.execution_time
+
+
+@pytest.mark.performance
+@pytest.mark.skipif(not CV2_AVAILABLE, reason="OpenCV not available")
+@pytest.mark.skipif(not AMBIENT_AVAILABLE, reason="Ambient frame module not available")
+class TestRandomAccessPerformance:
+    """Benchmarks for keyframe-indexed random frame access."""
+
+    def setup_method(self):
+        """Set up performance testing framework."""
+        self.benchmark = PerformanceBenchmark()
+
+    @pytest.mark.skipif(AMBIENT_AVAILABLE and not ffmpeg_on_path(), reason="FFmpeg not available")
+    def test_indexed_seek_faster_than_decode_from_start(self, tmp_path):
+        """Seeking via the keyframe index beats decoding from the first frame."""
+        video_path = _create_decode_test_video(tmp_path / "random.mp4", 1800)
+        index = build_seek_index(video_path)
+        target = 1780
+
+        indexed = read_frame_ffmpeg_raw(video_path, target, seek_index=index)
+        unindexed = read_frame_ffmpeg_raw(video_path, target)
+        np.testing.assert_array_equal(indexed, unindexed)
+
+        indexed_metrics = self.benchmark.benchmark_function(
+            read_frame_ffmpeg_raw, video_path, target, index, iterations=5
+        )
+        unindexed_metrics = self.benchmark.benchmark_function(
+            read_frame_ffmpeg_raw, video_path, target, iterations=5
+        )
+
+        print(f"\nFrame {target}: indexed {indexed_metrics.execution_time:.3f}s, "
+              f"from start {unindexed_metrics.execution_time:.3f}s")
+        assert indexed_metrics.execution_time < unindexed_metrics.execution_time
+
+
+@pytest.mark.performance
+@pytest.mark.skipif(not CV2_AVAILABLE, reason="OpenCV not available")
+@pytest.mark.skipif(not AMBIENT_AVAILABLE, reason="Ambient frame module not available")
+class TestPrefetchPerformance:
+    """Benchmarks for background batch prefetching."""
+
+    def setup_method(self):
+        """Set up performance testing framework."""
+        self.benchmark = PerformanceBenchmark()
+
+    def test_prefetch_hides_decode_latency(self, tmp_path):
+        """Decoding the next batch overlaps with processing the current one."""
+        video_path = _create_decode_test_video(tmp_path / "prefetch.mp4", 240, size=(640, 480))
+
+        def slow_inference(batch, start):
+            time.sleep(0.002 * len(batch))
+            return len(batch)
+
+        def run(prefetch):
+            sequence = FrameSequence.from_video(video_path)
+            results = sequence.process_in_batches(slow_inference, batch_size=8, prefetch=prefetch)
+            sequence.close()
+            assert sum(results) == 240
+
+        serial_metrics = self.benchmark.benchmark_function(run, 0)
+        prefetch_metrics = self.benchmark.benchmark_function(run, 2)
+
+        print(f"\nSerial: {serial_metrics.execution_time:.3f}s, "
+              f"prefetch: {prefetch_metrics.execution_time:.3f}s")
+        assert prefetch_metrics.execution_time < serial_metrics.execution_time
@@ -0,0 +1,216 @@
+"""Performance tests for pose estimation paths."""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tests.performance.benchmark_framework import PerformanceBenchmark
+
+try:
+    from ambient.gavd.pose_estimators import (
+        MEDIAPIPE_AVAILABLE,
+        MediaPipeEstimator,
+        compare_video_keypoints,
+    )
+    AMBIENT_AVAILABLE = True
+except ImportError:
+    MEDIAPIPE_AVAILABLE = False
+    AMBIENT_AVAILABLE = False
+
+try:
+    from ambient.core.frame import Frame, FrameSequence
+    from ambient.core.pose_sequence import PoseSequence
+    from ambient.pose.keyframe_estimation import KeyframePoseEstimator, keyframe_accuracy_report
+    from ambient.pose.exported_runtime import ONNXRUNTIME_AVAILABLE
+    from ambient.pose.ultralytics_estimator import ULTRALYTICS_AVAILABLE, UltralyticsEstimator
+except ImportError:
+    ULTRALYTICS_AVAILABLE = False
+    ONNXRUNTIME_AVAILABLE = False
+
+
+PROJECT_ROOT = Path(__file__).parents[2]
+MEDIAPIPE_MODEL = PROJECT_ROOT / "data/models/pose_landmarker_lite.task"
+GAVD_VIDEO_DIR = PROJECT_ROOT / "data/youtube"
+YOLO_POSE_MODEL = PROJECT_ROOT / "data/models/yolov8n-pose.pt"
+
+
+def _gavd_video():
+    """First cached GAVD video, if any."""
+    videos = sorted(GAVD_VIDEO_DIR.glob("*.mp4")) if GAVD_VIDEO_DIR.exists() else []
+    return videos[0] if videos else None
+
+
+def _benchmark_sequence(num_frames):
+    """Frames of a cached GAVD video, or synthetic 640x480 frames."""
+    video = _gavd_video()
+    if video is not None:
+        return FrameSequence.from_video(video, end_frame=num_frames)
+    rng = np.random.default_rng(0)
+    frames = [
+        Frame.from_array(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8), format="BGR")
+        for _ in range(num_frames)
+    ]
+    return FrameSequence(frames)
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.skipif(not AMBIENT_AVAILABLE, reason="Ambient pose estimators not available")
+@pytest.mark.skipif(not MEDIAPIPE_AVAILABLE, reason="MediaPipe is not installed")
+@pytest.mark.skipif(not MEDIAPIPE_MODEL.exists(), reason="MediaPipe model not downloaded")
+@pytest.mark.skipif(_gavd_video() is None, reason="No cached GAVD video")
+class TestParallelVideoKeypointPerformance:
+    """Benchmarks for segment-parallel MediaPipe video estimation."""
+
+    def setup_method(self):
+        """Set up performance testing framework."""
+        self.benchmark = PerformanceBenchmark()
+
+    def test_parallel_matches_serial_and_is_faster(self):
+        """Parallel segments with warm-up track the serial output and scale with workers."""
+        video = _gavd_video()
+        estimator = MediaPipeEstimator(model_path=str(MEDIAPIPE_MODEL))
+
+        start = time.perf_counter()
+        serial = estimator.estimate_video_keypoints(video)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = estimator.estimate_video_keypoints(video, workers=4)
+        parallel_time = time.perf_counter() - start
+
+        report = compare_video_keypoints(serial["frames"], parallel["frames"])
+        print(f"\nSerial {serial_time:.1f}s, 4 workers {parallel_time:.1f}s "
+              f"({serial_time / parallel_time:.2f}x); accuracy: {report}")
+
+        assert report["candidate_frames"] == report["reference_frames"]
+        # Warm-up lets tracking converge, so boundaries barely change detections
+        assert report["detection_mismatches"] <= 0.01 * report["reference_frames"] + 3
+        assert report["mean_error_px"] < 2.0
+        assert parallel_time < serial_time
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.skipif(not AMBIENT_AVAILABLE, reason="Ambient pose estimators not available")
+@pytest.mark.skipif(not MEDIAPIPE_AVAILABLE, reason="MediaPipe is not installed")
+@pytest.mark.skipif(not MEDIAPIPE_MODEL.exists(), reason="MediaPipe model not downloaded")
+@pytest.mark.skipif(_gavd_video() is None, reason="No cached GAVD video")
+class TestKeyframeEstimationPerformance:
+    """Accuracy versus speed of keyframe-only estimation on a GAVD sample."""
+
+    NUM_FRAMES = 300
+
+    def test_keyframe_accuracy_against_full_rate(self):
+        """Report keyframe error and speed-up against full-rate MediaPipe."""
+        estimator = MediaPipeEstimator(model_path=str(MEDIAPIPE_MODEL))
+        sequence = FrameSequence.from_video(_gavd_video(), end_frame=self.NUM_FRAMES)
+        # Warm up the landmarker so neither run pays for model loading
+        estimator.estimate_array_keypoints(sequence.frames[0].as_format("RGB"))
+
+        start = time.perf_counter()
+        full = PoseSequence.from_keypoint_frames(
+            [estimator.estimate_array_keypoints(frame.as_format("RGB")) for frame in sequence.frames]
+        )
+        full_time = time.perf_counter() - start
+
+        keyframe_estimator = KeyframePoseEstimator(estimator, method="cubic")
+        start = time.perf_counter()
+        keyframes = keyframe_estimator.estimate_pose_array(sequence)
+        keyframe_time = time.perf_counter() - start
+        sequence.close()
+
+        rows = keyframe_accuracy_report(full, measured={"adaptive cubic (measured)": keyframes})
+        print(f"\nFull rate: {len(full)} frames in {full_time:.1f}s; keyframes: "
+              f"{keyframes.metadata['estimated_frames']} frames in {keyframe_time:.1f}s "
+              f"({full_time / keyframe_time:.2f}x)")
+        for row in rows:
+            print(f"{row['configuration']}: {row['estimated_frames']} frames ({row['speedup']:.1f}x), "
+                  f"mean error {row['mean_error']:.3f}, p95 {row['p95_error']:.3f}, "
+                  f"PCK@0.05 {row['pck']:.2f}, missing {row['missing']}")
+
+        measured = rows[-1]
+        assert measured["speedup"] > 1.5
+        assert keyframe_time < full_time / 1.5
+        # Errors relative to body size
+        assert measured["mean_error"] < 0.05
+        assert measured["pck"] >= 0.8
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.skipif(not ULTRALYTICS_AVAILABLE, reason="Ultralytics is not installed")
+@pytest.mark.skipif(not YOLO_POSE_MODEL.exists(), reason="YOLO pose model not downloaded")
+class TestUltralyticsBatchPerformance:
+    """Benchmarks for streaming batch inference with Ultralytics on CPU."""
+
+    NUM_FRAMES = 64
+
+    def test_frames_per_second_by_batch_size(self):
+        """Report CPU throughput for fixed batch sizes and the automatic choice."""
+        estimator = UltralyticsEstimator(model_name=str(YOLO_POSE_MODEL), device="cpu")
+        sequence = _benchmark_sequence(self.NUM_FRAMES)
+
+        # Warm up the model once
+        estimator.estimate_pose_array(FrameSequence(sequence.frames[:2]), batch_size=2)
+
+        rows = []
+        for batch_size in (1, 2, 4, 8, 16, None):
+            start = time.perf_counter()
+            poses = estimator.estimate_pose_array(sequence, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            rows.append((poses.metadata["batch_size"], batch_size is None, len(poses) / elapsed))
+            assert len(poses) == len(sequence.frames)
+            assert not poses.metadata["errors"]
+
+        print("\nbatch size  frames/s")
+        for chosen, automatic, fps in rows:
+            label = f"{chosen} (auto)" if automatic else str(chosen)
+            print(f"{label:>11}  {fps:8.1f}")
+
+        best = max(fps for _, _, fps in rows)
+        automatic_fps = rows[-1][2]
+        # The automatic choice should be close to the best fixed batch size
+        assert automatic_fps >= 0.7 * best
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.skipif(not ULTRALYTICS_AVAILABLE, reason="Ultralytics is not installed")
+@pytest.mark.skipif(not ONNXRUNTIME_AVAILABLE, reason="ONNX Runtime is not installed")
+@pytest.mark.skipif(not YOLO_POSE_MODEL.exists(), reason="YOLO pose model not downloaded")
+class TestExportedRuntimePerformance:
+    """Benchmarks for the ONNX export of YOLO pose against PyTorch on CPU."""
+
+    NUM_FRAMES = 64
+
+    def _throughput(self, estimator, sequence):
+        """Frames per second of one estimator, after a warm-up call."""
+        estimator.estimate_pose_array(FrameSequence(sequence.frames[:2]), batch_size=1)
+        start = time.perf_counter()
+        poses = estimator.estimate_pose_array(sequence, batch_size=1)
+        elapsed = time.perf_counter() - start
+        assert len(poses) == len(sequence.frames)
+        assert not poses.metadata["errors"]
+        return poses, len(poses) / elapsed
+
+    def test_onnx_speedup_over_torch(self, tmp_path):
+        """Report CPU frames/s of the PyTorch model and its cached ONNX export."""
+        sequence = _benchmark_sequence(self.NUM_FRAMES)
+        torch_estimator = UltralyticsEstimator(model_name=str(YOLO_POSE_MODEL), device="cpu")
+        onnx_estimator = UltralyticsEstimator(
+            model_name=str(YOLO_POSE_MODEL), runtime="onnx", export_dir=str(tmp_path)
+        )
+
+        torch_poses, torch_fps = self._throughput(torch_estimator, sequence)
+        onnx_poses, onnx_fps = self._throughput(onnx_estimator, sequence)
+
+        print(f"\ntorch {torch_fps:.1f} frames/s, onnx {onnx_fps:.1f} frames/s "
+              f"({onnx_fps / torch_fps:.2f}x)")
+
+        # Both runtimes should find the same people in the same frames
+        detected = (torch_poses.confidence.max(axis=1) > 0) == (onnx_poses.confidence.max(axis=1) > 0)
+        assert detected.mean() >= 0.9
+        assert onnx_fps >= 0.9 * torch_fps
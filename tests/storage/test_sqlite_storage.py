@@ -182,6 +182,16 @@ class TestSQLiteStorage:
         assert stats["training_dataset_count"] >= 1
         assert "database_size_mb" in stats
     
+    def test_video_metadata(self, storage):
+        """Test saving and validating probed video metadata."""
+        storage.save_video_metadata("/videos/a.mp4", "opencv", 100, 5, {"frame_count": 20})
+        
+        assert storage.get_video_metadata("/videos/a.mp4", "opencv", 100, 5) == {"frame_count": 20}
+        assert storage.get_video_metadata("/videos/a.mp4", "opencv", 100, 6) is None
+        assert storage.get_video_metadata("/videos/a.mp4", "ffprobe", 100, 5) is None
+        assert storage.delete_video_metadata("/videos/a.mp4") == 1
+        assert storage.get_video_metadata("/videos/a.mp4", "opencv", 100, 5) is None
+    
     def test_backup(self, storage, temp_db_path):
         """Test database backup."""
         storage.save_video_analysis("analysis_1", "/path/1.mp4", "pending")
@@ -285,6 +285,36 @@ class TestGAVDVisualizationFix:
         assert pose_data['source_width'] is None
         assert pose_data['source_height'] is None
     
+    @patch('ambient.gavd.gavd_processor.PoseDataConverter')
+    @patch('ambient.gavd.gavd_processor.GAVDDataLoader')
+    @patch('server.services.gavd_service.get_estimator_pool')
+    def test_pose_fallback_uses_placeholders_when_pool_is_busy(
+        self, mock_get_pool, mock_loader_class, mock_converter_class, gavd_service, sample_dataset_metadata
+    ):
+        """Test the per-frame pose fallback doesn't wait indefinitely for a pooled estimator."""
+        from ambient.pose.factory import EstimatorPoolError
+        from server.services.gavd_service import POSE_FALLBACK_ACQUIRE_TIMEOUT
+        import pandas as pd
+        
+        dataset_id, _ = sample_dataset_metadata
+        mock_df = pd.DataFrame({'frame_num': [1, 2]})
+        mock_loader = mock_loader_class.return_value
+        mock_loader.load_gavd_data.return_value = mock_df
+        mock_loader.organize_by_sequence.return_value = {'seq_001': mock_df}
+        mock_pool = mock_get_pool.return_value
+        mock_pool.acquire.side_effect = EstimatorPoolError("busy")
+        placeholder = [{'x': 0.0, 'y': 0.0, 'confidence': 0.0}]
+        mock_converter_class.return_value.convert_sequence_to_pose_format.return_value = [
+            {'pose_keypoints_2d': placeholder}
+        ]
+        
+        keypoints = gavd_service._extract_pose_from_processor(dataset_id, 'seq_001', 1)
+        
+        assert keypoints == placeholder
+        mock_pool.acquire.assert_called_once_with("mediapipe", timeout=POSE_FALLBACK_ACQUIRE_TIMEOUT)
+        mock_converter_class.assert_called_once_with(estimator=None)
+        mock_pool.release.assert_not_called()
+    
     def test_error_handling_missing_csv_file(self, gavd_service, sample_dataset_metadata):
         """Test error handling when CSV file is missing."""
         dataset_id, metadata = sample_dataset_metadata
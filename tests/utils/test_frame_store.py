@@ -0,0 +1,146 @@
+"""
+Tests for the memory-mapped decoded-frame store.
+
+Tests lazy filling, zero-copy read-only views, reduced-resolution storage,
+sharing between processes, and FrameSequence integration.
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from tests.conftest import skip_if_no_opencv
+
+from ambient.core.frame import FrameSequence
+from ambient.utils.frame_store import (
+    DecodedFrameStore,
+    FrameStoreError,
+    open_frame_store,
+)
+
+
+def _fill_in_child(video_path, cache_dir, frame_index, value):
+    """Store a constant frame from a separate process."""
+    store = DecodedFrameStore(video_path, 20, (200, 200), cache_dir)
+    store.put(frame_index, np.full((200, 200, 3), value, dtype=np.uint8))
+    store.flush()
+
+
+class TestDecodedFrameStore:
+    """Test DecodedFrameStore behaviour."""
+
+    def test_lazy_fill_and_views(self, sample_video_file, tmp_path):
+        store = DecodedFrameStore(sample_video_file, 20, (200, 200), tmp_path)
+        frame = np.random.randint(0, 255, (200, 200, 3), dtype=np.uint8)
+
+        assert store.get(3) is None
+        stored = store.put(3, frame)
+
+        assert store.contains(3)
+        assert store.owns(stored)
+        assert not stored.flags.writeable
+        np.testing.assert_array_equal(store.get(3), frame)
+
+        stats = store.get_stats()
+        assert stats['filled_frames'] == 1
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['writes'] == 1
+
+    def test_reopen_keeps_frames(self, sample_video_file, tmp_path):
+        frame = np.full((200, 200, 3), 7, dtype=np.uint8)
+        DecodedFrameStore(sample_video_file, 20, (200, 200), tmp_path).put(0, frame)
+
+        reopened = DecodedFrameStore(sample_video_file, 20, (200, 200), tmp_path)
+        np.testing.assert_array_equal(reopened.get(0), frame)
+
+    def test_out_of_range_index_is_not_stored(self, sample_video_file, tmp_path):
+        store = DecodedFrameStore(sample_video_file, 20, (200, 200), tmp_path)
+        frame = np.zeros((200, 200, 3), dtype=np.uint8)
+
+        assert store.put(25, frame) is frame
+        assert store.get(25) is None
+
+    def test_clear(self, sample_video_file, tmp_path):
+        store = DecodedFrameStore(sample_video_file, 20, (200, 200), tmp_path)
+        store.put(1, np.zeros((200, 200, 3), dtype=np.uint8))
+        store.clear()
+
+        assert store.filled_count == 0
+
+    def test_invalid_arguments(self, sample_video_file, tmp_path):
+        with pytest.raises(FrameStoreError):
+            DecodedFrameStore(tmp_path / "missing.mp4", 20, (200, 200), tmp_path)
+        with pytest.raises(FrameStoreError):
+            DecodedFrameStore(sample_video_file, 0, (200, 200), tmp_path)
+
+    def test_shared_between_processes(self, sample_video_file, tmp_path):
+        """Frames written by another process are visible without decoding."""
+        store = DecodedFrameStore(sample_video_file, 20, (200, 200), tmp_path)
+
+        ctx = multiprocessing.get_context("spawn")
+        child = ctx.Process(
+            target=_fill_in_child, args=(sample_video_file, tmp_path, 5, 42)
+        )
+        child.start()
+        child.join(timeout=60)
+        assert child.exitcode == 0
+
+        stored = store.get(5)
+        assert stored is not None
+        assert int(stored[0, 0, 0]) == 42
+
+
+@skip_if_no_opencv()
+class TestFrameStoreIntegration:
+    """Test frame stores with real videos and FrameSequence."""
+
+    def test_reduced_resolution(self, sample_video_file, tmp_path):
+        store = open_frame_store(sample_video_file, cache_dir=tmp_path, max_side=100)
+
+        assert store.frame_size == (100, 100)
+        stored = store.put(0, np.zeros((200, 200, 3), dtype=np.uint8))
+        assert stored.shape == (100, 100, 3)
+
+    def test_open_frame_store_is_shared_in_process(self, sample_video_file, tmp_path):
+        first = open_frame_store(sample_video_file, cache_dir=tmp_path)
+        second = open_frame_store(sample_video_file, cache_dir=tmp_path)
+
+        assert first is second
+        assert first.frame_count == 20
+
+    def test_sequence_loads_views_into_store(self, sample_video_file, tmp_path):
+        sequence = FrameSequence.from_video(
+            sample_video_file, frame_cache=True, frame_cache_dir=tmp_path
+        )
+        store = sequence.frame_store
+        assert store is not None
+
+        frame = sequence.frames[4]
+        data = frame.load()
+        assert store.owns(data)
+        assert frame.memory_usage_mb == 0.0
+
+        # Eviction is free and reloading does not decode again
+        frame._force_unload()
+        decoded = sequence.decoder.get_stats()['frames_decoded']
+        np.testing.assert_array_equal(frame.load(), data)
+        assert sequence.decoder.get_stats()['frames_decoded'] == decoded
+
+        sequence.close()
+
+    def test_new_sequence_reuses_stored_frames(self, sample_video_file, tmp_path):
+        first = FrameSequence.from_video(
+            sample_video_file, end_frame=5, frame_cache=True, frame_cache_dir=tmp_path
+        )
+        expected = [a.copy() for a in first.load_all()]
+        first.close()
+
+        second = FrameSequence.from_video(
+            sample_video_file, end_frame=5, frame_cache=True, frame_cache_dir=tmp_path
+        )
+        for a, b in zip(second.load_all(), expected):
+            np.testing.assert_array_equal(a, b)
+        assert second.decoder.get_stats()['frames_decoded'] == 0
+        second.close()
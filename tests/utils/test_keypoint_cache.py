@@ -0,0 +1,117 @@
+"""
+Tests for the persistent keypoint cache.
+
+Tests round-tripping keypoints through compressed entries, partial range
+lookups, sharing entries between copies of the same video, persistence
+across reopening, and LRU eviction under the size budget.
+"""
+
+import pytest
+
+from ambient.utils.keypoint_cache import (
+    KeypointCache,
+    KeypointCacheError,
+    decode_keypoint_frames,
+    encode_keypoint_frames,
+)
+
+
+def _frames(start, count, points=33):
+    return [
+        [{"x": float(i), "y": float(k), "confidence": 0.5, "id": k} for k in range(points)]
+        if i % 5 else []
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"video contents" * 100)
+    return path
+
+
+class TestEncoding:
+    """Test packing keypoint lists into arrays."""
+
+    def test_round_trip(self):
+        frames = _frames(0, 7)
+        arrays = encode_keypoint_frames(frames)
+
+        assert arrays["points"].dtype.name == "float32"
+        assert decode_keypoint_frames(**arrays) == frames
+
+    def test_empty_frames(self):
+        arrays = encode_keypoint_frames([[], []])
+
+        assert decode_keypoint_frames(**arrays) == [[], []]
+
+
+class TestKeypointCache:
+    """Test cache lookups, persistence and eviction."""
+
+    def test_partial_range_lookup(self, video, tmp_path):
+        cache = KeypointCache(tmp_path / "cache")
+        cache.put(video, "est", "BODY_25", 100, _frames(100, 50), 640, 480)
+
+        result = cache.get(video, "est", "BODY_25", [120, 149, 150, 10])
+
+        assert sorted(result["frames"]) == [120, 149]
+        assert result["frames"][149] == _frames(149, 1)[0]
+        assert result["video_width"] == 640
+        assert cache.get_stats()["hits"] == 2
+        assert cache.get_stats()["misses"] == 2
+
+    def test_key_includes_estimator_and_model(self, video, tmp_path):
+        cache = KeypointCache(tmp_path / "cache")
+        cache.put(video, "est", "BODY_25", 0, _frames(0, 10))
+
+        assert cache.get(video, "other", "BODY_25", [1])["frames"] == {}
+        assert cache.get(video, "est", "COCO", [1])["frames"] == {}
+
+    def test_copies_of_a_video_share_entries(self, video, tmp_path):
+        cache = KeypointCache(tmp_path / "cache")
+        cache.put(video, "est", "BODY_25", 0, _frames(0, 10))
+
+        copy = tmp_path / "copy.mp4"
+        copy.write_bytes(video.read_bytes())
+
+        assert sorted(cache.get(copy, "est", "BODY_25", range(10))["frames"]) == list(range(10))
+
+    def test_persists_across_instances(self, video, tmp_path):
+        KeypointCache(tmp_path / "cache").put(
+            video, "est", "BODY_25", 0, _frames(0, 30), 640, 480, complete=True
+        )
+
+        reopened = KeypointCache(tmp_path / "cache")
+        result = reopened.get_video(video, "est", "BODY_25")
+
+        assert result["frames"] == _frames(0, 30)
+        assert result["video_height"] == 480
+
+    def test_whole_video_requires_complete_entry(self, video, tmp_path):
+        cache = KeypointCache(tmp_path / "cache")
+        cache.put(video, "est", "BODY_25", 0, _frames(0, 30))
+
+        assert cache.get_video(video, "est", "BODY_25") is None
+
+    def test_lru_eviction(self, video, tmp_path):
+        cache = KeypointCache(tmp_path / "cache")
+        cache.put(video, "est", "BODY_25", 0, _frames(0, 200))
+        entry_mb = cache.get_stats()["size_mb"]
+
+        cache = KeypointCache(tmp_path / "cache", max_size_mb=entry_mb * 2.5)
+        cache.put(video, "est", "BODY_25", 1000, _frames(1000, 200))
+        # Touch the first entry so the second is the least recently used
+        cache.get(video, "est", "BODY_25", [0])
+        cache.put(video, "est", "BODY_25", 2000, _frames(2000, 200))
+
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get(video, "est", "BODY_25", [0, 1000, 2000])["frames"].keys() == {0, 2000}
+        assert cache.size_bytes <= cache.max_size_bytes
+
+    def test_errors(self, tmp_path):
+        with pytest.raises(KeypointCacheError):
+            KeypointCache(tmp_path / "cache", max_size_mb=0)
+        with pytest.raises(KeypointCacheError):
+            KeypointCache(tmp_path / "cache").get(tmp_path / "missing.mp4", "est", "BODY_25", [0])
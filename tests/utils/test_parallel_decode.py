@@ -0,0 +1,103 @@
+"""
+Tests for segment-parallel multi-process video decoding.
+
+Tests keyframe-aligned segment planning, ordered reassembly of frames decoded
+by a process pool into shared memory and into the frame store, and the
+FrameSequence and VideoProcessor entry points.
+"""
+
+import numpy as np
+import pytest
+
+from tests.conftest import skip_if_no_opencv
+
+from ambient.core.frame import FrameSequence
+from ambient.utils.parallel_decode import (
+    ParallelDecodeError,
+    decode_frames_parallel,
+    plan_segments,
+)
+from ambient.utils.seek_index import SeekIndex
+from ambient.utils.video_utils import VideoProcessor
+
+
+def _make_index(tmp_path, keyframes, count):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"not really a video")
+    stat = video.stat()
+    return SeekIndex(
+        video_path=video,
+        file_size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        pts=np.arange(count) / 30.0,
+        keyframes=np.array(keyframes),
+        source="test",
+    )
+
+
+class TestPlanSegments:
+    """Test splitting frame indices into segments."""
+
+    def test_even_split_without_index(self):
+        segments = plan_segments(list(range(10)), 3)
+
+        assert [s[0] for s in segments] == [0, 3, 7]
+        assert sum(segments, []) == list(range(10))
+
+    def test_splits_at_keyframes(self, tmp_path):
+        index = _make_index(tmp_path, keyframes=[0, 12, 24, 36], count=48)
+        segments = plan_segments(list(range(48)), 4, index)
+
+        assert [s[0] for s in segments] == [0, 12, 24, 36]
+        assert sum(segments, []) == list(range(48))
+
+    def test_split_moves_forward_to_next_keyframe(self, tmp_path):
+        index = _make_index(tmp_path, keyframes=[0, 30], count=40)
+        segments = plan_segments(list(range(40)), 2, index)
+
+        assert [s[0] for s in segments] == [0, 30]
+
+    def test_fewer_segments_than_workers(self, tmp_path):
+        index = _make_index(tmp_path, keyframes=[0], count=20)
+
+        assert plan_segments(list(range(20)), 4, index) == [list(range(20))]
+        assert plan_segments([], 4) == []
+
+
+@skip_if_no_opencv()
+class TestParallelDecoding:
+    """Test decoding with a process pool."""
+
+    def test_matches_serial_decoding(self, sample_video_file):
+        indices = list(range(0, 20, 2))
+        parallel = decode_frames_parallel(
+            sample_video_file, indices, workers=2, min_frames_per_worker=1
+        )
+        serial = decode_frames_parallel(sample_video_file, indices, workers=1)
+
+        assert parallel.shape == (10, 200, 200, 3)
+        np.testing.assert_array_equal(parallel, serial)
+
+    def test_rejects_unordered_indices(self, sample_video_file):
+        with pytest.raises(ParallelDecodeError):
+            decode_frames_parallel(sample_video_file, [3, 1], workers=2)
+
+    def test_sequence_fills_store_in_parallel(self, sample_video_file, tmp_path):
+        sequence = FrameSequence.from_video(
+            sample_video_file, workers=2, frame_cache_dir=tmp_path
+        )
+        store = sequence.frame_store
+
+        assert store is not None
+        assert store.filled_count == 20
+        data = sequence.frames[7].load()
+        assert store.owns(data)
+        assert sequence.decoder.get_stats()['frames_decoded'] == 0
+        sequence.close()
+
+    def test_processor_range(self, sample_video_file):
+        processor = VideoProcessor(ffmpeg_mode="jpeg")
+        frames = processor.extract_frame_range(sample_video_file, start=1, end=17, step=3, workers=2)
+        expected = processor._extract_frame_range_opencv(sample_video_file, 1, 17, 3, None)
+
+        np.testing.assert_array_equal(frames, expected)
@@ -0,0 +1,81 @@
+"""
+Tests for the background prefetch pipeline.
+
+Tests ordering, bounded look-ahead, error propagation and cancellation of
+BackgroundPrefetcher.
+"""
+
+import threading
+import time
+
+import pytest
+
+from ambient.utils.prefetch import BackgroundPrefetcher, PrefetchError
+
+
+class TestBackgroundPrefetcher:
+    """Test BackgroundPrefetcher behaviour."""
+
+    def test_yields_results_in_order(self):
+        with BackgroundPrefetcher(lambda x: x * x, range(10), depth=3) as prefetcher:
+            results = list(prefetcher)
+
+        assert results == [(i, i * i) for i in range(10)]
+
+    def test_producer_runs_ahead_by_at_most_depth(self):
+        loaded = []
+
+        def loader(item):
+            loaded.append(item)
+            return item
+
+        prefetcher = BackgroundPrefetcher(loader, range(20), depth=2)
+        iterator = iter(prefetcher)
+        next(iterator)
+        time.sleep(0.3)
+
+        # One consumed, two buffered, one blocked in put
+        assert len(loaded) <= 1 + 2 + 1
+        prefetcher.close()
+
+    def test_overlaps_loading_with_processing(self):
+        def slow_load(item):
+            time.sleep(0.05)
+            return item
+
+        start = time.perf_counter()
+        with BackgroundPrefetcher(slow_load, range(6), depth=2) as prefetcher:
+            for _ in prefetcher:
+                time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+        # Serial would take ~0.6s; overlapped roughly half of that
+        assert elapsed < 0.5
+
+    def test_loader_error_is_raised_in_consumer(self):
+        def loader(item):
+            if item == 3:
+                raise ValueError("bad item")
+            return item
+
+        seen = []
+        with pytest.raises(ValueError, match="bad item"):
+            for item, _ in BackgroundPrefetcher(loader, range(6)):
+                seen.append(item)
+
+        assert seen == [0, 1, 2]
+
+    def test_abandoned_iteration_stops_producer(self):
+        prefetcher = BackgroundPrefetcher(lambda x: x, range(1000), depth=1)
+        for item, _ in prefetcher:
+            if item == 2:
+                break
+
+        prefetcher.close()
+        assert prefetcher.is_cancelled
+        assert not any(t.name == "prefetch" and t.is_alive() for t in threading.enumerate())
+        assert prefetcher.get_stats()['produced'] < 1000
+
+    def test_invalid_depth(self):
+        with pytest.raises(PrefetchError):
+            BackgroundPrefetcher(lambda x: x, range(3), depth=0)
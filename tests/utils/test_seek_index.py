@@ -0,0 +1,257 @@
+"""
+Tests for the persistent keyframe/seek index.
+
+Tests index lookups, JSON persistence keyed by file size and mtime, building
+from packet metadata, and keyframe-based random access in frame extractors.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from tests.conftest import skip_if_no_opencv
+
+from ambient.utils import seek_index as seek_index_module
+from ambient.utils.seek_index import (
+    SeekIndex,
+    SeekIndexError,
+    build_seek_index,
+    clear_seek_index_cache,
+    get_seek_index,
+    sample_timestamps,
+    seek_index_path,
+)
+from ambient.utils.video_decoder import (
+    VideoDecoderSession,
+    ffmpeg_on_path,
+    read_frame_ffmpeg_raw,
+    read_frames_ffmpeg_raw,
+)
+
+
+skip_if_no_ffmpeg = pytest.mark.skipif(not ffmpeg_on_path(), reason="FFmpeg not available")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index_cache():
+    clear_seek_index_cache()
+    yield
+    clear_seek_index_cache()
+
+
+def _make_index(tmp_path, keyframes=(0, 10, 20), count=30, fps=10.0):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"not really a video")
+    stat = video.stat()
+    return SeekIndex(
+        video_path=video,
+        file_size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        pts=np.arange(count) / fps,
+        keyframes=None if keyframes is None else np.array(keyframes),
+        source="test",
+    )
+
+
+class TestSeekIndexLookups:
+    """Test keyframe and timestamp lookups."""
+
+    def test_keyframe_before(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        assert index.keyframe_before(0) == 0
+        assert index.keyframe_before(9) == 0
+        assert index.keyframe_before(10) == 10
+        assert index.keyframe_before(29) == 20
+
+    def test_needs_seek(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        assert not index.needs_seek(3, 9)    # same GOP
+        assert not index.needs_seek(10, 19)  # keyframe is the current position
+        assert index.needs_seek(5, 12)       # crosses keyframe 10
+        assert index.needs_seek(12, 3)       # backward
+
+    def test_unknown_keyframes(self, tmp_path):
+        index = _make_index(tmp_path, keyframes=None)
+
+        assert not index.has_keyframes
+        assert index.keyframe_before(25) == 0
+        assert not index.needs_seek(0, 25)
+
+    def test_frame_at_time(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        assert index.frame_at_time(0.0) == 0
+        assert index.frame_at_time(1.05) == 10
+        assert index.frame_at_time(1.1) == 11
+        assert index.frame_at_time(100.0) == 29
+        assert index.fps == pytest.approx(10.0)
+
+    def test_frame_time_out_of_range(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        with pytest.raises(SeekIndexError):
+            index.frame_time(30)
+
+    def test_seek_time_lands_inside_keyframe(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        # Half a frame after keyframe 10, before frame 11
+        assert index.seek_time(15) == pytest.approx(1.05)
+
+    def test_input_seek(self, tmp_path):
+        index = _make_index(tmp_path)
+
+        args, base = index.input_seek(15)
+        assert base == 10
+        assert args[:2] == ["-noaccurate_seek", "-ss"]
+        assert float(args[2]) == pytest.approx(1.05)
+        # Frames in the first GOP and unknown keyframes decode from the start
+        assert index.input_seek(5) == ([], 0)
+        assert _make_index(tmp_path, keyframes=None).input_seek(15) == ([], 0)
+
+    def test_frames_at_rate(self, tmp_path):
+        index = _make_index(tmp_path, count=30, fps=10.0)
+
+        assert index.frames_at_rate(5.0) == list(range(0, 30, 2))
+        assert index.frames_at_rate(20.0) == list(range(30))
+
+    def test_sample_variable_frame_rate(self):
+        # 10 fps for one second, then 2 fps
+        timestamps = np.concatenate([np.arange(10) / 10.0, 1.0 + np.arange(4) / 2.0])
+
+        assert sample_timestamps(timestamps, 2.0) == [0, 5, 10, 11, 12, 13]
+        with pytest.raises(SeekIndexError):
+            sample_timestamps(timestamps, 0)
+
+
+class TestSeekIndexPersistence:
+    """Test JSON persistence and invalidation."""
+
+    def test_round_trip(self, tmp_path):
+        index = _make_index(tmp_path)
+        path = index.save()
+
+        assert path == seek_index_path(index.video_path)
+        loaded = SeekIndex.load(index.video_path)
+        np.testing.assert_array_equal(loaded.keyframes, index.keyframes)
+        np.testing.assert_allclose(loaded.pts, index.pts)
+        assert loaded.is_valid_for(index.video_path)
+
+    def test_modified_video_invalidates_index(self, tmp_path):
+        index = _make_index(tmp_path)
+        index.video_path.write_bytes(b"a different, longer video file")
+
+        assert not index.is_valid_for(index.video_path)
+
+    def test_unreadable_index_raises(self, tmp_path):
+        index = _make_index(tmp_path)
+        seek_index_path(index.video_path).write_text("{broken")
+
+        with pytest.raises(SeekIndexError):
+            SeekIndex.load(index.video_path)
+
+    def test_persisted_index_is_reused(self, tmp_path):
+        index = _make_index(tmp_path)
+        index.save()
+
+        loaded = get_seek_index(index.video_path, build=False)
+        assert loaded is not None
+        assert loaded.source == "test"
+
+    def test_no_tools_returns_none(self, tmp_path, monkeypatch):
+        index = _make_index(tmp_path)
+        monkeypatch.setattr(seek_index_module.shutil, "which", lambda name: None)
+
+        assert get_seek_index(index.video_path) is None
+        assert not seek_index_path(index.video_path).exists()
+
+    def test_slow_build_does_not_block_other_videos(self, tmp_path, monkeypatch):
+        index = _make_index(tmp_path)
+        index.save()
+        slow_video = tmp_path / "slow.mp4"
+        slow_video.write_bytes(b"also not a video")
+        building, release = threading.Event(), threading.Event()
+
+        def slow_build(video_path, method="auto"):
+            building.set()
+            release.wait(5.0)
+            raise SeekIndexError("no tools")
+
+        monkeypatch.setattr(seek_index_module, "build_seek_index", slow_build)
+        found = []
+        builder = threading.Thread(target=get_seek_index, args=(slow_video,))
+        reader = threading.Thread(target=lambda: found.append(get_seek_index(index.video_path, build=False)))
+        builder.start()
+        try:
+            assert building.wait(5.0)
+            reader.start()
+            # Answered while the other video's build is still running
+            reader.join(1.0)
+            assert not release.is_set() and [i.source for i in found] == ["test"]
+        finally:
+            release.set()
+            builder.join(5.0)
+            reader.join(5.0)
+
+
+@skip_if_no_opencv()
+class TestSeekIndexBuild:
+    """Test building indexes from real videos."""
+
+    def test_opencv_scan_has_timestamps_only(self, sample_video_file):
+        index = build_seek_index(sample_video_file, method="opencv")
+
+        assert index.frame_count == 20
+        assert not index.has_keyframes
+        assert index.fps == pytest.approx(30.0, rel=0.05)
+
+    @skip_if_no_ffmpeg
+    def test_packet_index(self, sample_video_file):
+        index = build_seek_index(sample_video_file)
+
+        assert index.frame_count == 20
+        assert index.keyframes[0] == 0
+        assert np.all(np.diff(index.pts) > 0)
+
+    @skip_if_no_ffmpeg
+    def test_get_seek_index_persists_and_rebuilds(self, sample_video_file):
+        index = get_seek_index(sample_video_file)
+        path = seek_index_path(sample_video_file)
+        assert index is not None
+        assert path.exists()
+
+        # Touching the video invalidates the persisted index
+        stat = sample_video_file.stat()
+        os.utime(sample_video_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        clear_seek_index_cache()
+        rebuilt = get_seek_index(sample_video_file)
+        assert rebuilt.mtime_ns == stat.st_mtime_ns + 10**9
+
+
+@skip_if_no_opencv()
+@skip_if_no_ffmpeg
+class TestKeyframeSeeking:
+    """Test that keyframe seeks return the same frames as full decodes."""
+
+    def test_ffmpeg_random_access_matches_full_decode(self, sample_video_file):
+        index = build_seek_index(sample_video_file)
+        all_frames = read_frames_ffmpeg_raw(sample_video_file)
+
+        for frame_index in (0, 4, 11, 19, 7):
+            frame = read_frame_ffmpeg_raw(sample_video_file, frame_index, seek_index=index)
+            np.testing.assert_array_equal(frame, all_frames[frame_index])
+
+    @pytest.mark.parametrize("backend", ["opencv", "ffmpeg"])
+    def test_session_random_access_matches_sequential(self, sample_video_file, backend):
+        get_seek_index(sample_video_file)
+        with VideoDecoderSession(sample_video_file, backend=backend) as sequential:
+            expected = [sequential.read(i) for i in range(20)]
+
+        with VideoDecoderSession(sample_video_file, backend=backend, max_forward_gap=0) as session:
+            for frame_index in (15, 2, 18, 9, 0, 19):
+                np.testing.assert_array_equal(session.read(frame_index), expected[frame_index])
+            assert session.seek_index is not None
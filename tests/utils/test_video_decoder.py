@@ -0,0 +1,403 @@
+"""
+Tests for sequential video decoder sessions and raw-pipe FFmpeg decoding.
+
+Tests that a shared decoder session serves forward-sequential frame requests
+without re-seeking, re-seeks on backward jumps, and integrates with
+FrameSequence.from_video; and that the FFmpeg raw-video pipe decodes frame
+ranges into numpy buffers matching OpenCV.
+"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from tests.conftest import skip_if_no_opencv
+
+from ambient.core.frame import FrameSequence
+from ambient.utils.video_decoder import (
+    DecodeGeometry,
+    FFmpegRawPipe,
+    VideoDecoderError,
+    VideoDecoderSession,
+    build_index_select_filter,
+    build_select_filter,
+    ffmpeg_on_path,
+    read_frames_ffmpeg_raw,
+    sample_frame_indices,
+)
+from ambient.utils.video_utils import VideoProcessor
+from ambient.video.processor import VideoProcessor as AmbientVideoProcessor
+from ambient.video.youtube_handler import YouTubeHandler
+
+
+skip_if_no_ffmpeg = pytest.mark.skipif(not ffmpeg_on_path(), reason="FFmpeg not available")
+
+
+@skip_if_no_opencv()
+class TestVideoDecoderSession:
+    """Test VideoDecoderSession decode behaviour."""
+
+    def test_sequential_reads_do_not_seek(self, sample_video_file):
+        """Forward-sequential reads continue decoding without seeking."""
+        with VideoDecoderSession(sample_video_file) as session:
+            for i in range(10):
+                frame = session.read(i)
+                assert frame.shape == (200, 200, 3)
+
+            stats = session.get_stats()
+            assert stats['reads'] == 10
+            assert stats['frames_decoded'] == 10
+            assert stats['seeks'] == 0
+            assert session.position == 10
+
+    def test_small_forward_gap_decodes_forward(self, sample_video_file):
+        """Small forward jumps grab intermediate frames instead of seeking."""
+        with VideoDecoderSession(sample_video_file, max_forward_gap=8) as session:
+            session.read(0)
+            session.read(5)
+
+            stats = session.get_stats()
+            assert stats['seeks'] == 0
+            assert stats['frames_decoded'] == 6
+
+    def test_backward_jump_seeks(self, sample_video_file):
+        """Backward jumps re-seek and return the requested frame."""
+        with VideoDecoderSession(sample_video_file) as session:
+            session.read(0)
+            forward = session.read(12)
+            session.read(3)
+            again = session.read(12)
+
+            assert session.get_stats()['seeks'] >= 1
+            np.testing.assert_array_equal(forward, again)
+
+    def test_read_past_end_raises(self, sample_video_file):
+        """Reading beyond the last frame raises VideoDecoderError."""
+        with VideoDecoderSession(sample_video_file) as session:
+            with pytest.raises(VideoDecoderError):
+                session.read(500)
+
+    def test_closed_session_raises(self, sample_video_file):
+        """A closed session refuses further reads."""
+        session = VideoDecoderSession(sample_video_file)
+        session.close()
+
+        assert session.is_closed
+        with pytest.raises(VideoDecoderError):
+            session.read(0)
+
+    def test_read_into_converts_in_place(self, sample_video_file):
+        """read_into writes BGR or resized frames into the given buffer."""
+        with VideoDecoderSession(sample_video_file) as session:
+            rgb = session.read(4)
+            batch = np.zeros((2, 200, 200, 3), dtype=np.uint8)
+
+            result = session.read_into(4, batch[1], color="BGR")
+
+            assert np.shares_memory(result, batch)
+            np.testing.assert_array_equal(batch[1], rgb[:, :, ::-1])
+
+            small = np.zeros((100, 50, 3), dtype=np.uint8)
+            session.read_into(5, small)
+            assert small.any()
+            assert session.frame_size == (200, 200)
+
+    def test_missing_video_raises(self, tmp_path):
+        """Creating a session for a missing file raises VideoDecoderError."""
+        with pytest.raises(VideoDecoderError):
+            VideoDecoderSession(tmp_path / "missing.mp4")
+
+
+@skip_if_no_opencv()
+class TestFrameSequenceSharedDecoder:
+    """Test FrameSequence.from_video with a shared decoder session."""
+
+    def test_frames_share_one_session(self, sample_video_file):
+        """All frames of a sequence share the sequence's decoder session."""
+        sequence = FrameSequence.from_video(sample_video_file)
+
+        assert sequence.decoder is not None
+        assert all(frame._decoder is sequence.decoder for frame in sequence.frames)
+
+        sequence.load_all()
+        stats = sequence.decoder.get_stats()
+        assert stats['frames_decoded'] == len(sequence)
+        assert stats['seeks'] == 0
+
+        sequence.close()
+        assert sequence.decoder.is_closed
+
+    def test_shared_decoder_matches_independent_decode(self, sample_video_file):
+        """Frames decoded through the session match independently decoded frames."""
+        shared = FrameSequence.from_video(sample_video_file, step=3)
+        independent = FrameSequence.from_video(
+            sample_video_file, step=3, shared_decoder=False
+        )
+
+        assert independent.decoder is None
+        for a, b in zip(shared.load_all(), independent.load_all()):
+            np.testing.assert_array_equal(a, b)
+
+        shared.close()
+
+    def test_closed_session_falls_back(self, sample_video_file):
+        """Frames still load after the shared session has been closed."""
+        sequence = FrameSequence.from_video(sample_video_file, end_frame=3)
+        sequence.close()
+
+        data = sequence.frames[2].load()
+        assert data.shape == (200, 200, 3)
+
+
+
+class TestDecodeGeometry:
+    """Test decode-time crop/downscale geometry."""
+
+    def test_fit_keeps_aspect_and_never_upscales(self):
+        geometry = DecodeGeometry.fit((1920, 1080), max_side=640)
+        assert geometry.output_size == (640, 360)
+        assert geometry.output_shape == (360, 640, 3)
+
+        assert DecodeGeometry.fit((320, 240), max_side=640).is_identity
+
+    def test_crop_is_clipped_to_source(self):
+        geometry = DecodeGeometry.fit((200, 100), crop=(150, 50, 100, 100))
+        assert geometry.crop == (150, 50, 50, 50)
+        assert geometry.output_size == (50, 50)
+
+        with pytest.raises(VideoDecoderError):
+            DecodeGeometry.fit((200, 100), crop=(300, 0, 10, 10))
+
+    def test_keypoints_map_back_to_source(self):
+        geometry = DecodeGeometry.fit((1920, 1080), max_side=640, crop=(0, 0, 1920, 1080))
+        assert geometry.to_source(320, 180) == (960.0, 540.0)
+
+        cropped = DecodeGeometry.fit((1920, 1080), max_side=100, crop=(800, 200, 400, 800))
+        mapped = cropped.map_keypoints([{"x": 25.0, "y": 50.0, "confidence": 0.9}])
+        assert mapped == [{"x": 1000.0, "y": 600.0, "confidence": 0.9}]
+
+    def test_ffmpeg_filter(self):
+        geometry = DecodeGeometry.fit((1920, 1080), max_side=960, crop=(0, 0, 1920, 540))
+        assert geometry.ffmpeg_filter() == "crop=1920:540:0:0,scale=960:270:flags=area"
+
+    def test_apply(self):
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        frame[:, 100:] = 255
+        geometry = DecodeGeometry.fit((200, 100), max_side=50, crop=(100, 0, 100, 100))
+
+        result = geometry.apply(frame)
+        assert result.shape == (50, 50, 3)
+        assert result.min() == 255
+
+
+@skip_if_no_opencv()
+class TestReducedResolutionDecoding:
+    """Test sessions and sequences decoding at a reduced size."""
+
+    def test_opencv_session_with_geometry(self, sample_video_file):
+        geometry = DecodeGeometry.fit((200, 200), max_side=100)
+        with VideoDecoderSession(sample_video_file, geometry=geometry) as small, \
+                VideoDecoderSession(sample_video_file) as full:
+            frame = small.read(3)
+            expected = geometry.apply(full.read(3))
+
+            assert frame.shape == (100, 100, 3)
+            np.testing.assert_array_equal(frame, expected)
+            assert small.frame_size == (100, 100)
+
+    @skip_if_no_ffmpeg
+    def test_ffmpeg_session_with_geometry(self, sample_video_file):
+        geometry = DecodeGeometry.fit((200, 200), max_side=100, crop=(0, 0, 200, 100))
+        with VideoDecoderSession(sample_video_file, backend="ffmpeg", geometry=geometry) as ff, \
+                VideoDecoderSession(sample_video_file, geometry=geometry) as cv:
+            for idx in (0, 7, 2):
+                frame = ff.read(idx)
+                assert frame.shape == (50, 100, 3)
+                diff = np.abs(frame.astype(np.int16) - cv.read(idx).astype(np.int16))
+                assert diff.mean() < 3.0
+
+    def test_sequence_decode_size_and_keypoint_mapping(self, sample_video_file):
+        sequence = FrameSequence.from_video(sample_video_file, decode_size=100)
+        frame = sequence.frames[5]
+
+        assert frame.load().shape == (100, 100, 3)
+        assert sequence.metadata["decode_geometry"]["output_size"] == [100, 100]
+        assert frame.to_source_keypoints([{"x": 10.0, "y": 20.0}]) == [{"x": 20.0, "y": 40.0}]
+        sequence.close()
+
+    def test_independent_frames_apply_roi(self, sample_video_file):
+        sequence = FrameSequence.from_video(
+            sample_video_file, shared_decoder=False, roi=(50, 50, 100, 60)
+        )
+
+        assert sequence.frames[0].load().shape == (60, 100, 3)
+        assert sequence.frames[0].to_source_keypoints([{"x": 0, "y": 0}]) == [{"x": 50.0, "y": 50.0}]
+
+
+class TestSelectFilter:
+    """Test FFmpeg select filter construction."""
+
+    def test_open_range(self):
+        assert build_select_filter(0, None, 1) == "select=gte(n\\,0)"
+
+    def test_bounded_stepped_range(self):
+        expr = build_select_filter(4, 10, 3)
+        assert "gte(n\\,4)" in expr
+        assert "lt(n\\,10)" in expr
+        assert "mod(n-4\\,3)" in expr
+
+    def test_index_filter_compresses_runs(self):
+        expr = build_index_select_filter(list(range(0, 300, 2)) + [301, 500])
+
+        assert expr == (
+            "select=between(n\\,0\\,298)*not(mod(n-0\\,2))"
+            "+between(n\\,301\\,500)*not(mod(n-301\\,199))"
+        )
+        assert build_index_select_filter([3, 4, 5, 9]) == \
+            "select=between(n\\,3\\,5)+eq(n\\,9)"
+
+
+class TestFrameRateSampling:
+    """Test selecting frames for a target frame rate."""
+
+    def test_sample_without_index(self):
+        assert sample_frame_indices(15.0, 20, 30.0) == list(range(0, 20, 2))
+        assert sample_frame_indices(10.0, 9, 30.0) == [0, 3, 6]
+
+    def test_higher_rate_keeps_every_frame(self):
+        assert sample_frame_indices(60.0, 5, 30.0) == [0, 1, 2, 3, 4]
+
+    def test_invalid_rate(self):
+        with pytest.raises(VideoDecoderError):
+            sample_frame_indices(0, 20, 30.0)
+        with pytest.raises(VideoDecoderError):
+            sample_frame_indices(10.0, 20, 0.0)
+
+
+@skip_if_no_opencv()
+class TestExtractFramesAtRate:
+    """Test decode-time frame-rate subsampling."""
+
+    def test_sequence_at_rate(self, sample_video_file):
+        sequence = FrameSequence.from_video(sample_video_file, frame_rate=15.0)
+
+        assert [f.metadata["frame_index"] for f in sequence.frames] == list(range(0, 20, 2))
+        assert sequence.frames[1].metadata["timestamp"] == pytest.approx(2 / 30.0, abs=1e-3)
+        assert sequence.metadata["frame_rate"] == 15.0
+
+        sequence.load_all()
+        # Skipped frames are grabbed but never converted or returned
+        assert sequence.decoder.get_stats()['frames_decoded'] <= 20
+        assert sequence.decoder.get_stats()['seeks'] == 0
+        sequence.close()
+
+    def test_processor_extract_frames(self, sample_video_file):
+        processor = AmbientVideoProcessor(youtube_handler=Mock(spec=YouTubeHandler))
+        sequence = processor.extract_frames(sample_video_file, frame_rate=10.0)
+
+        assert len(sequence) == 7
+        assert sequence.frames[-1].load().shape == (200, 200, 3)
+        sequence.close()
+
+        with pytest.raises(ValueError):
+            processor.extract_frames(sample_video_file, frame_rate=-1)
+
+    @skip_if_no_ffmpeg
+    def test_ffmpeg_session_decodes_only_planned_frames(self, sample_video_file):
+        plan = list(range(0, 20, 4))
+        with VideoDecoderSession(sample_video_file, backend="ffmpeg", frame_indices=plan) as planned, \
+                VideoDecoderSession(sample_video_file) as reference:
+            for idx in plan:
+                diff = np.abs(planned.read(idx).astype(np.int16) - reference.read(idx).astype(np.int16))
+                assert diff.mean() < 3.0
+
+            stats = planned.get_stats()
+            assert stats['frames_decoded'] == len(plan)
+            assert stats['seeks'] == 0
+
+            # Frames outside the plan are still served
+            assert planned.read(5).shape == (200, 200, 3)
+            assert planned.read(8).shape == (200, 200, 3)
+
+
+@skip_if_no_opencv()
+@skip_if_no_ffmpeg
+class TestFFmpegRawPipe:
+    """Test raw-video pipe decoding into numpy buffers."""
+
+    def test_range_matches_opencv(self, sample_video_file):
+        """Raw-pipe frames closely match OpenCV-decoded frames."""
+        frames = read_frames_ffmpeg_raw(sample_video_file, start=2, end=12, step=2)
+        assert frames.shape == (5, 200, 200, 3)
+        assert frames.dtype == np.uint8
+
+        reference = VideoProcessor(ffmpeg_mode="jpeg")._extract_frame_range_opencv(
+            sample_video_file, 2, 12, 2, None
+        )
+        # Decoders may differ by rounding in colour conversion only
+        diff = np.abs(frames.astype(np.int16) - reference.astype(np.int16))
+        assert diff.mean() < 3.0
+
+    def test_reads_into_preallocated_buffer(self, sample_video_file):
+        """Frames are written into a caller-supplied buffer without copies."""
+        out = np.zeros((4, 200, 200, 3), dtype=np.uint8)
+        result = read_frames_ffmpeg_raw(sample_video_file, start=0, end=4, out=out)
+
+        assert result.base is out or result is out
+        assert out.any()
+
+    def test_open_ended_range_reads_to_end(self, sample_video_file):
+        """A range without an end decodes until the video is exhausted."""
+        frames = read_frames_ffmpeg_raw(sample_video_file, start=15)
+        assert frames.shape[0] == 5
+
+    def test_explicit_indices_and_skip(self, sample_video_file):
+        """A pipe can select arbitrary frame indices and skip frames."""
+        with FFmpegRawPipe(sample_video_file, frame_indices=[1, 7, 9]) as pipe:
+            pipe.skip(1)
+            second = pipe.read()
+            third = pipe.read()
+            assert second.shape == (200, 200, 3)
+            assert third is not None
+            assert pipe.read() is None
+
+    def test_ffmpeg_session_matches_opencv_session(self, sample_video_file):
+        """The ffmpeg-backed session returns the same frames as OpenCV."""
+        with VideoDecoderSession(sample_video_file, backend="ffmpeg") as ff, \
+                VideoDecoderSession(sample_video_file) as cv:
+            for idx in (0, 1, 6, 3):
+                diff = np.abs(ff.read(idx).astype(np.int16) - cv.read(idx).astype(np.int16))
+                assert diff.mean() < 3.0
+
+
+    def test_ffmpeg_session_read_into(self, sample_video_file):
+        """The ffmpeg-backed session decodes straight into RGB buffers."""
+        with VideoDecoderSession(sample_video_file, backend="ffmpeg") as session:
+            expected = session.read(2)
+            out = np.zeros((200, 200, 3), dtype=np.uint8)
+            session.read_into(2, out)
+            np.testing.assert_array_equal(out, expected)
+
+            session.read_into(3, out, color="BGR")
+            np.testing.assert_array_equal(out[:, :, ::-1], session.read(3))
+
+
+@skip_if_no_opencv()
+class TestVideoProcessorFrameRange:
+    """Test VideoProcessor.extract_frame_range."""
+
+    def test_extract_frame_range(self, sample_video_file):
+        processor = VideoProcessor()
+        frames = processor.extract_frame_range(sample_video_file, start=0, end=10, step=3)
+
+        assert frames.shape == (4, 200, 200, 3)
+
+    def test_opencv_range_respects_buffer(self, sample_video_file):
+        processor = VideoProcessor()
+        out = np.zeros((3, 200, 200, 3), dtype=np.uint8)
+        frames = processor._extract_frame_range_opencv(sample_video_file, 5, 8, 1, out)
+
+        assert frames.shape == (3, 200, 200, 3)
+        assert np.shares_memory(frames, out)
+        assert out.any()
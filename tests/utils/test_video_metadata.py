@@ -0,0 +1,109 @@
+"""
+Tests for the cached video metadata and capability probes.
+
+Tests that repeated probes of an unchanged file are served from memory,
+that changed files are re-probed, that metadata persists through the SQLite
+store, and that executable checks are cached per PATH.
+"""
+
+import os
+import shutil
+
+import pytest
+
+from tests.conftest import skip_if_no_opencv
+
+from ambient.storage.sqlite_storage import SQLiteStorage
+from ambient.utils import video_metadata
+from ambient.utils.video_metadata import (
+    VideoMetadataCache,
+    VideoMetadataError,
+    clear_capability_cache,
+    executable_available,
+)
+from ambient.utils.video_utils import VideoProcessor
+
+
+class TestCapabilityCache:
+    """Test cached executable checks."""
+
+    def test_checks_once_per_path(self, monkeypatch):
+        clear_capability_cache()
+        calls = []
+
+        def which(name):
+            calls.append(name)
+            return None
+
+        monkeypatch.setattr(video_metadata.shutil, "which", which)
+        assert not executable_available("ffmpeg")
+        assert not executable_available("ffmpeg")
+        assert calls == ["ffmpeg"]
+
+        monkeypatch.setenv("PATH", os.environ.get("PATH", "") + os.pathsep + "/nonexistent")
+        executable_available("ffmpeg")
+        assert calls == ["ffmpeg", "ffmpeg"]
+        clear_capability_cache()
+
+    def test_matches_which(self):
+        clear_capability_cache()
+        assert executable_available("ffmpeg") == (shutil.which("ffmpeg") is not None)
+
+
+@skip_if_no_opencv()
+class TestVideoMetadataCache:
+    """Test metadata caching with real videos."""
+
+    def test_repeated_probes_hit_memory(self, sample_video_file):
+        cache = VideoMetadataCache()
+        first = cache.get(sample_video_file, "opencv")
+        second = cache.get(sample_video_file, "opencv")
+
+        assert first == second
+        assert first["frame_count"] == 20
+        assert cache.get_stats()["misses"] == 1
+        assert cache.get_stats()["hits"] == 1
+
+        # Results are copies
+        first["frame_count"] = 0
+        assert cache.get(sample_video_file, "opencv")["frame_count"] == 20
+
+    def test_changed_file_is_reprobed(self, sample_video_file):
+        cache = VideoMetadataCache()
+        cache.get(sample_video_file, "opencv")
+
+        stat = os.stat(sample_video_file)
+        os.utime(sample_video_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache.get(sample_video_file, "opencv")
+
+        assert cache.get_stats()["misses"] == 2
+
+    def test_persists_to_sqlite(self, sample_video_file, tmp_path):
+        storage = SQLiteStorage(db_path=tmp_path / "meta.db")
+        VideoMetadataCache(storage).get(sample_video_file, "opencv")
+
+        reopened = VideoMetadataCache(storage)
+        info = reopened.get(sample_video_file, "opencv")
+
+        assert info["width"] == 200
+        assert reopened.get_stats()["misses"] == 0
+        assert reopened.get_stats()["persistent_hits"] == 1
+
+    def test_missing_file_and_bad_source(self, sample_video_file, tmp_path):
+        cache = VideoMetadataCache()
+
+        with pytest.raises(VideoMetadataError):
+            cache.get(tmp_path / "missing.mp4")
+        with pytest.raises(VideoMetadataError):
+            cache.get(sample_video_file, "mediainfo")
+
+    def test_processor_queries_do_not_reprobe(self, sample_video_file, monkeypatch):
+        processor = VideoProcessor()
+        processor.get_video_info(sample_video_file)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("video was probed again")
+
+        monkeypatch.setitem(video_metadata._PROBES, "opencv", fail)
+        monkeypatch.setitem(video_metadata._PROBES, "ffprobe", fail)
+        assert processor.get_video_info(sample_video_file)["frame_count"] == 20